@@ -1,6 +1,7 @@
 import { Router, Request, Response, NextFunction } from 'express';
 import { z } from 'zod';
 import { runCypher } from '../db/neo4j';
+import { queryPg } from '../db/postgres';
 import { validate } from '../middleware/validate';
 import { AppError } from '../middleware/errorHandler';
 import {
@@ -229,3 +230,82 @@ ownershipRouter.get(
     }
   }
 );
+
+const historyQuerySchema = z.object({
+  as_of: z.string().regex(/^\d{4}-\d{2}-\d{2}$/, 'as_of must be YYYY-MM-DD').optional(),
+});
+
+interface HistoryRow {
+  facility_id: string;
+  facility_name: string | null;
+  owner_associate_id: string;
+  owner_type: string | null;
+  ownership_pct: string | number | null;
+  valid_from: string;
+  valid_to: string | null;
+  valid_from_basis: string | null;
+  valid_to_basis: string | null;
+}
+
+/**
+ * GET /v1/ownership/:npi/history[?as_of=YYYY-MM-DD]
+ *
+ * SNF ownership intervals from ownership_history (etl/transform/ownership_history.py).
+ * The provider's SNF facilities are the snf_facility records in its entity
+ * cluster (entity_cluster_members). With as_of, only the owners valid on that
+ * date are returned — an index seek on (facility_id, valid_from); without it,
+ * the full history, newest first.
+ */
+ownershipRouter.get(
+  '/:npi/history',
+  validate(npiSchema, 'params'),
+  validate(historyQuerySchema, 'query'),
+  async (req: Request, res: Response, next: NextFunction): Promise<void> => {
+    const start = Date.now();
+    const { npi } = req.params as z.infer<typeof npiSchema>;
+    const { as_of: asOf } = req.query as z.infer<typeof historyQuerySchema>;
+
+    try {
+      const rows = await queryPg<HistoryRow>(
+        `WITH facilities AS (
+           SELECT f.source_id AS facility_id
+             FROM entity_cluster_members p
+             JOIN entity_cluster_members f
+               ON f.entity_cluster_id = p.entity_cluster_id AND f.source = 'snf_facility'
+            WHERE p.source = 'nppes_org' AND p.source_id = $1
+         )
+         SELECT h.facility_id, h.facility_name, h.owner_associate_id, h.owner_type, h.ownership_pct,
+                h.valid_from::text AS valid_from, h.valid_to::text AS valid_to,
+                h.valid_from_basis, h.valid_to_basis
+           FROM facilities
+           JOIN ownership_history h ON h.facility_id = facilities.facility_id
+          WHERE $2::date IS NULL
+             OR (h.valid_from <= $2::date AND (h.valid_to IS NULL OR h.valid_to > $2::date))
+          ORDER BY h.facility_id, h.valid_from DESC, h.ownership_pct DESC NULLS LAST
+          LIMIT 500`,
+        [npi, asOf ?? null]
+      );
+
+      res.json({
+        data: {
+          npi,
+          as_of: asOf ?? null,
+          intervals: rows.map((r) => ({
+            facility_id: r.facility_id,
+            facility_name: r.facility_name,
+            owner_id: r.owner_associate_id,
+            owner_type: r.owner_type,
+            ownership_pct: toNumber(r.ownership_pct),
+            valid_from: r.valid_from,
+            valid_to: r.valid_to,
+            valid_from_basis: r.valid_from_basis,
+            valid_to_basis: r.valid_to_basis,
+          })),
+        },
+        meta: { source: 'claidex-v1', query_time_ms: Date.now() - start },
+      });
+    } catch (err) {
+      next(err);
+    }
+  }
+);
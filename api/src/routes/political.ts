@@ -1,8 +1,11 @@
 /**
  * GET /v1/providers/:npi/political
  *
- * Returns FEC political contribution linkages for the given NPI.
- * Stub: returns valid shape with empty arrays when no FEC data or matching is done.
+ * Returns FEC political contribution linkages for the given NPI, read from
+ * provider_fec_matches (precomputed by etl/compute/fec_matching.py):
+ *   matched_contributors — contributors matched to the provider by name + state
+ *   matched_employers    — contributions whose employer is the provider's
+ *                          organization or an SNF owner of its facility
  */
 
 import { Router, Request, Response, NextFunction } from 'express';
@@ -14,6 +17,51 @@ import { ApiResponse } from '../types/api';
 
 export const politicalRouter = Router();
 
+// Flag thresholds over the provider's matched contributions in the cycle
+const LARGE_DONOR_TOTAL = 10_000;
+const PARTISAN_SHARE = 0.9;
+const PARTISAN_MIN_TOTAL = 1_000;
+
+interface MatchRow {
+  match_type: 'individual' | 'employer' | 'snf_owner';
+  matched_name: string;
+  match_score: string | number | null;
+  contribution_count: number | null;
+  total_amount: string | number | null;
+  dem_amount: string | number | null;
+  rep_amount: string | number | null;
+  committee_count: number | null;
+  first_date: string | null;
+  last_date: string | null;
+}
+
+function toMatch(row: MatchRow) {
+  return {
+    name: row.matched_name,
+    match_type: row.match_type,
+    match_score: row.match_score != null ? Number(row.match_score) : null,
+    contribution_count: Number(row.contribution_count ?? 0),
+    total_amount: Number(row.total_amount ?? 0),
+    dem_amount: Number(row.dem_amount ?? 0),
+    rep_amount: Number(row.rep_amount ?? 0),
+    committee_count: Number(row.committee_count ?? 0),
+    first_date: row.first_date,
+    last_date: row.last_date,
+  };
+}
+
+function politicalFlags(contributors: ReturnType<typeof toMatch>[]): string[] {
+  const flags: string[] = [];
+  const total = contributors.reduce((s, c) => s + c.total_amount, 0);
+  const dem = contributors.reduce((s, c) => s + c.dem_amount, 0);
+  const rep = contributors.reduce((s, c) => s + c.rep_amount, 0);
+  if (total >= LARGE_DONOR_TOTAL) flags.push('large_donor');
+  if (total >= PARTISAN_MIN_TOTAL && Math.max(dem, rep) / total >= PARTISAN_SHARE) {
+    flags.push('partisan_concentration');
+  }
+  return flags;
+}
+
 const npiSchema = z.object({
   npi: z.string().regex(/^\d{10}$/, 'NPI must be exactly 10 digits'),
 });
@@ -41,20 +89,31 @@ politicalRouter.get(
         return next(AppError.notFound('Provider', npi));
       }
 
+      const matches = await queryPg<MatchRow>(
+        `SELECT match_type, matched_name, match_score, contribution_count, total_amount,
+                dem_amount, rep_amount, committee_count, first_date, last_date
+           FROM provider_fec_matches
+          WHERE npi = $1 AND cycle = $2
+          ORDER BY total_amount DESC NULLS LAST`,
+        [npi, cycle]
+      );
+      const matchedContributors = matches.filter((m) => m.match_type === 'individual').map(toMatch);
+      const matchedEmployers = matches.filter((m) => m.match_type !== 'individual').map(toMatch);
+
       const body: ApiResponse<{
         npi: string;
         cycle: number;
-        matched_contributors: unknown[];
-        matched_employers: unknown[];
+        matched_contributors: ReturnType<typeof toMatch>[];
+        matched_employers: ReturnType<typeof toMatch>[];
         flags: string[];
         meta: { cycle: number; source: string };
       }> = {
         data: {
           npi,
           cycle,
-          matched_contributors: [],
-          matched_employers: [],
-          flags: [],
+          matched_contributors: matchedContributors,
+          matched_employers: matchedEmployers,
+          flags: politicalFlags(matchedContributors),
           meta: { cycle, source: 'FEC' },
         },
         meta: { source: 'claidex-v1', query_time_ms: Date.now() - start },
@@ -133,7 +133,7 @@ providersRouter.get(
       }
       if (q && q.trim().length >= 2) {
         paramIdx++;
-        where += ` AND to_tsvector('english', coalesce(p.display_name,'') || ' ' || coalesce(p.npi,'') || ' ' || coalesce(p.city,'')) @@ plainto_tsquery('english', $${paramIdx})`;
+        where += ` AND p.search_vector @@ plainto_tsquery('english', $${paramIdx})`;
         params.push(q.trim());
       }
       paramIdx++;
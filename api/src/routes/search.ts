@@ -14,8 +14,10 @@ const searchQuerySchema = z.object({
 /**
  * GET /v1/search
  *
- * Full-text search over real providers (display_name, npi, city) with ts_rank.
- * Uses GIN index idx_providers_fts when available.
+ * Full-text search over real providers (display_name, npi, city) with ts_rank,
+ * plus trigram matching on the normalized name for misspellings and partial
+ * names. Both read stored columns built by the loader (providers_search.sql):
+ * search_vector (GIN) and search_name (GIN gin_trgm_ops).
  */
 searchRouter.get('/', validate(searchQuerySchema, 'query'), async (req: Request, res: Response, next: NextFunction) => {
   const startTime = Date.now();
@@ -37,19 +39,19 @@ searchRouter.get('/', validate(searchQuerySchema, 'query'), async (req: Request,
           p.is_excluded,
           prs.risk_label,
           prs.risk_score,
-          ts_rank(
-            to_tsvector('english', coalesce(p.display_name,'') || ' ' || coalesce(p.npi,'') || ' ' || coalesce(p.city,'')),
-            plainto_tsquery('english', $1)
-          ) AS rank
+          ts_rank(p.search_vector, plainto_tsquery('english', $1)) AS rank,
+          similarity(p.search_name, $3) AS name_similarity
         FROM providers p
         LEFT JOIN provider_risk_scores prs ON p.npi = prs.npi
-        WHERE to_tsvector('english', coalesce(p.display_name,'') || ' ' || coalesce(p.npi,'') || ' ' || coalesce(p.city,''))
-              @@ plainto_tsquery('english', $1)
-        ORDER BY rank DESC
+        WHERE p.search_vector @@ plainto_tsquery('english', $1)
+           OR p.search_name % $3
+        ORDER BY rank DESC, name_similarity DESC
         LIMIT $2
       `;
 
-      const searchResult: any = await queryPg(searchQuery, [q.trim(), limit]);
+      // Same normalization as the providers.search_name generated column
+      const normalized = q.toLowerCase().replace(/[^a-z0-9]+/g, ' ').trim();
+      const searchResult: any = await queryPg(searchQuery, [q.trim(), limit, normalized]);
 
       for (const row of searchResult) {
         results.push({
@@ -0,0 +1,35 @@
+"""
+claidex — command-line entry point for offline tools.
+
+Subcommands
+-----------
+  screen   Screen a provider roster against LEIE and risk scores
+           (etl/compute/roster_screen.py)
+
+Usage
+-----
+  scripts/claidex screen roster.csv -o hits.parquet
+  python -m etl.cli screen roster.csv
+"""
+import argparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="claidex", description="Claidex offline tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    from etl.compute import roster_screen
+    screen = sub.add_parser("screen", help="Screen a provider roster against LEIE and risk scores")
+    roster_screen.add_arguments(screen)
+    screen.set_defaults(func=roster_screen.run_args)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
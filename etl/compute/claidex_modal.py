@@ -114,17 +114,17 @@ def process_npi_batch(
     import numpy as np
     import polars as pl
     import psycopg2
-    from neo4j import GraphDatabase
 
     from etl.compute.risk_scores import (
         ALPHA, EPSILON, MAD_SCALE, PEER_MIN_SIZE, PEER_MIN_CLAIMS, WINDOW_YEARS,
-        WEIGHTS, LABEL_THRESHOLDS,
+        LABEL_THRESHOLDS,
+        r_raw_expr,
         compute_peer_metrics,
         compute_billing_score,
         compute_trajectory_score,
         compute_program_concentration,
         compute_exclusion_proximity,
-        compute_ownership_chain_risk,
+        chain_ownership_frame,
         generate_flags,
         risk_label,
     )
@@ -151,6 +151,18 @@ def process_npi_batch(
     payments = payments_all.filter(pl.col("npi").is_in(npi_batch))
     providers_df = providers_all.filter(pl.col("npi").is_in(npi_batch))
     exclusions_df = exclusions_all.filter(pl.col("npi").is_in(npi_batch))
+    # Optional: organizations entity_resolution tied to an excluded business
+    cluster_exclusions_path = f"{VOLUME_PATH}/cluster_exclusions.parquet"
+    cluster_exclusions_df = (
+        pl.read_parquet(cluster_exclusions_path).filter(pl.col("npi").is_in(npi_batch))
+        if os.path.exists(cluster_exclusions_path) else None
+    )
+    # Optional: per-NPI chain sibling counts from chain_membership (replaces the Neo4j traversal)
+    chain_ownership_path = f"{VOLUME_PATH}/chain_ownership.parquet"
+    chain_ownership_df = (
+        pl.read_parquet(chain_ownership_path).filter(pl.col("npi").is_in(npi_batch))
+        if os.path.exists(chain_ownership_path) else None
+    )
 
     print(f"[Batch {batch_index}] Loaded {len(payments)} payment rows, "
           f"{len(providers_df)} providers, {len(exclusions_df)} exclusions")
@@ -187,170 +199,26 @@ def process_npi_batch(
     )
 
     # -----------------------------------------------------------------------
-    # 3. Neo4j ownership + exclusion (batched UNWIND query)
+    # 3. Ownership chain: chain_membership counts, else Neo4j (batched UNWIND query)
     # -----------------------------------------------------------------------
-    print(f"[Batch {batch_index}] Running batched Neo4j ownership query...")
-    neo4j_results = {}
-    try:
-        uri = (os.environ.get("NEO4J_URI") or "").strip()
-        if uri and not (uri.startswith("bolt") or uri.startswith("neo4j")):
-            for prefix in ("NEO4J_URI=", "NEO4J_URI ="):
-                if uri.upper().startswith(prefix.upper()):
-                    uri = uri[len(prefix):].strip().strip('"').strip("'")
-                    break
-        driver = GraphDatabase.driver(
-            uri,
-            auth=(os.environ["NEO4J_USER"], os.environ["NEO4J_PASSWORD"]),
-        )
-
-        # Aura uses instance ID as database name; default "neo4j" does not exist there
-        database = os.environ.get("NEO4J_DATABASE", "").strip()
-        if not database and "databases.neo4j.io" in uri:
-            # e.g. neo4j+s://5c8d6587.databases.neo4j.io -> 5c8d6587
-            try:
-                from urllib.parse import urlparse
-                parsed = urlparse(uri)
-                host = parsed.hostname or ""
-                if host.endswith(".databases.neo4j.io"):
-                    database = host.split(".")[0] or "neo4j"
-                else:
-                    database = "neo4j"
-            except Exception:
-                database = "neo4j"
-        if not database:
-            database = "neo4j"
-
-        # Build NPI → display_name lookup
-        name_lookup = {
-            row["npi"]: row.get("display_name") or ""
-            for row in providers_df.iter_rows(named=True)
-        }
-
-        # Prepare batch input: list of {npi: str, name: str}
-        batch_inputs = [
-            {"npi": npi, "name": name_lookup.get(npi, "")}
-            for npi in npi_batch
-        ]
-
-        # CRITICAL: Batched UNWIND query replacing per-NPI loop
-        # This is the key optimization: 1 query for 1000 NPIs instead of 1000 queries
-        cypher = """
-        UNWIND $batch AS item
-        WITH item.npi AS npi, item.name AS provider_name
-
-        // Find SNF entity matching this provider name
-        OPTIONAL MATCH (snf:CorporateEntity)
-        WHERE snf.entityType = 'SNF'
-          AND toLower(snf.name) CONTAINS toLower(provider_name)
-          AND provider_name IS NOT NULL AND provider_name <> ''
-        WITH npi, provider_name, snf
-        ORDER BY npi, snf.name
-        WITH npi, provider_name, HEAD(COLLECT(snf)) AS snf
-
-        // Traverse up ownership chain
-        OPTIONAL MATCH path = (snf)<-[:OWNS*1..5]-(ancestor:CorporateEntity)
-
-        // Aggregate ancestors per (npi, snf) first — Neo4j 5 forbids mixing grouping keys with aggregation in one expression
-        WITH npi, snf, COLLECT(DISTINCT ancestor) AS ancestors
-        // Build chain_entities from grouping keys + aggregated list (no aggregation here)
-        WITH npi,
-             CASE WHEN snf IS NULL THEN []
-                  ELSE [snf] + [a IN ancestors WHERE a IS NOT NULL]
-             END AS chain_entities
-
-        // Expand back down: all SNFs owned by these ancestors
-        UNWIND CASE WHEN SIZE(chain_entities) = 0 THEN [null] ELSE chain_entities END AS ce
-        OPTIONAL MATCH (ce)-[:OWNS*0..5]->(sibling:CorporateEntity)
-        WITH npi, COLLECT(DISTINCT sibling) AS siblings, chain_entities
-        WITH npi, [e IN siblings WHERE e IS NOT NULL | e] + chain_entities AS all_entities
-
-        // Find providers associated with these entities (by name containment)
-        UNWIND CASE WHEN SIZE(all_entities) = 0 THEN [null] ELSE all_entities END AS ent
-        OPTIONAL MATCH (p2:Provider)
-        WHERE toLower(p2.name) CONTAINS toLower(ent.name)
-          AND ent.name IS NOT NULL AND ent.name <> ''
-
-        // Check for exclusions on providers
-        OPTIONAL MATCH (p2)-[:EXCLUDED_BY]->(x:Exclusion)
-
-        // Check if any owning entity has EXCLUDED_BY
-        OPTIONAL MATCH (ent)-[:EXCLUDED_BY]->(ox:Exclusion)
-
-        RETURN
-            npi,
-            COUNT(DISTINCT p2) AS chain_provider_count,
-            COUNT(DISTINCT CASE WHEN x IS NOT NULL THEN p2 END) AS chain_excluded_count,
-            COUNT(DISTINCT CASE WHEN ox IS NOT NULL THEN ent END) AS owner_excluded_count
-        """
-
-        # Suppress schema notifications (e.g. unknown label/relationship) when DB is empty or partial
-        with driver.session(
-            database=database,
-            notifications_min_severity="OFF",
-        ) as session:
-            result = session.run(cypher, {"batch": batch_inputs})
-            for record in result:
-                npi = record["npi"]
-                chain_provider_count = int(record["chain_provider_count"] or 0)
-                chain_excluded_count = int(record["chain_excluded_count"] or 0)
-                owner_excluded = int(record["owner_excluded_count"] or 0) > 0
-
-                # Compute ownership chain risk (same logic as original)
-                total = max(chain_provider_count, 1)
-                oc_risk = min(100.0, 100.0 * chain_excluded_count / total)
-
-                neo4j_results[npi] = {
-                    "ownership_chain_risk": round(oc_risk, 2),
-                    "chain_excluded_count": chain_excluded_count,
-                    "owner_excluded": owner_excluded,
-                }
-
-        driver.close()
-        print(f"[Batch {batch_index}] Neo4j query complete — {len(neo4j_results)} results")
-
-    except Exception as e:
-        print(f"[Batch {batch_index}] Neo4j error: {e}. Setting ownership=0 for batch.")
-        for npi in npi_batch:
-            neo4j_results[npi] = {
-                "ownership_chain_risk": 0.0,
-                "chain_excluded_count": 0,
-                "owner_excluded": False,
-            }
-
-    # Convert Neo4j results to DataFrame
-    ownership_rows = [
-        {
-            "npi": npi,
-            "ownership_chain_risk": data["ownership_chain_risk"],
-            "chain_excluded_count": data["chain_excluded_count"],
-        }
-        for npi, data in neo4j_results.items()
-    ]
-    ownership_df = pl.DataFrame(ownership_rows)
-
-    # Extract sets for exclusion proximity
-    chain_excluded_counts = {
-        npi: data["chain_excluded_count"]
-        for npi, data in neo4j_results.items()
-    }
-    owner_excluded_set = {
-        npi for npi, data in neo4j_results.items()
-        if data["owner_excluded"]
-    }
+    if chain_ownership_df is not None:
+        print(f"[Batch {batch_index}] Chain ownership from chain_membership...")
+        ownership_df = chain_ownership_frame(npi_batch, chain_ownership_df)
+    else:
+        ownership_df = _neo4j_ownership(batch_index, npi_batch, providers_df)
 
     # -----------------------------------------------------------------------
     # 4. Exclusion proximity score
     # -----------------------------------------------------------------------
     print(f"[Batch {batch_index}] Computing exclusion proximity...")
-    excl_prox_df = compute_exclusion_proximity(
-        exclusions_df, providers_df, chain_excluded_counts, owner_excluded_set
-    )
+    excl_prox_df = compute_exclusion_proximity(exclusions_df, providers_df, ownership_df, cluster_exclusions_df)
 
     # -----------------------------------------------------------------------
     # 5. Merge all components
     # -----------------------------------------------------------------------
     print(f"[Batch {batch_index}] Merging components...")
     scores = billing_df
+    ownership_df = ownership_df.drop("owner_excluded")
 
     for df in (trajectory_df, conc_df, ownership_df, excl_prox_df, top_program_df):
         if not df.is_empty():
@@ -372,15 +240,7 @@ def process_npi_batch(
     # 6. Composite scoring (per-batch raw scores, global calibration happens later)
     # -----------------------------------------------------------------------
     print(f"[Batch {batch_index}] Computing composite scores...")
-    scores = scores.with_columns([
-        (
-            pl.col("billing_outlier_score")       * WEIGHTS["billing_outlier_score"] +
-            pl.col("ownership_chain_risk")         * WEIGHTS["ownership_chain_risk"] +
-            pl.col("payment_trajectory_score")     * WEIGHTS["payment_trajectory_score"] +
-            pl.col("exclusion_proximity_score")    * WEIGHTS["exclusion_proximity_score"] +
-            pl.col("program_concentration_score")  * WEIGHTS["program_concentration_score"]
-        ).alias("r_raw"),
-    ])
+    scores = scores.with_columns(r_raw_expr())
 
     # Note: risk_score and risk_label will be computed globally in merge step
     # For now, just use r_raw as a placeholder
@@ -452,6 +312,133 @@ def process_npi_batch(
     return out_path
 
 
+# ---------------------------------------------------------------------------
+# Neo4j Ownership Fallback (no chain_ownership.parquet on the volume)
+# ---------------------------------------------------------------------------
+
+def _neo4j_ownership(batch_index: int, npi_batch: list[str], providers_df):
+    """
+    Ownership frame for one batch from a single batched Neo4j UNWIND query
+    instead of 1000 individual queries. Any Neo4j error scores the batch 0.
+    """
+    import polars as pl
+    from neo4j import GraphDatabase
+
+    from etl.compute.risk_scores import build_ownership_frame, empty_ownership_frame
+
+    print(f"[Batch {batch_index}] Running batched Neo4j ownership query...")
+    try:
+        uri = (os.environ.get("NEO4J_URI") or "").strip()
+        if uri and not (uri.startswith("bolt") or uri.startswith("neo4j")):
+            for prefix in ("NEO4J_URI=", "NEO4J_URI ="):
+                if uri.upper().startswith(prefix.upper()):
+                    uri = uri[len(prefix):].strip().strip('"').strip("'")
+                    break
+        driver = GraphDatabase.driver(
+            uri,
+            auth=(os.environ["NEO4J_USER"], os.environ["NEO4J_PASSWORD"]),
+        )
+
+        # Aura uses instance ID as database name; default "neo4j" does not exist there
+        database = os.environ.get("NEO4J_DATABASE", "").strip()
+        if not database and "databases.neo4j.io" in uri:
+            # e.g. neo4j+s://5c8d6587.databases.neo4j.io -> 5c8d6587
+            try:
+                from urllib.parse import urlparse
+                parsed = urlparse(uri)
+                host = parsed.hostname or ""
+                if host.endswith(".databases.neo4j.io"):
+                    database = host.split(".")[0] or "neo4j"
+                else:
+                    database = "neo4j"
+            except Exception:
+                database = "neo4j"
+        if not database:
+            database = "neo4j"
+
+        # Prepare batch input: list of {npi: str, name: str}
+        batch_inputs = (
+            pl.DataFrame({"npi": npi_batch}, schema={"npi": pl.Utf8})
+            .join(providers_df.select("npi", "display_name").unique("npi"), on="npi", how="left")
+            .select("npi", pl.col("display_name").fill_null("").alias("name"))
+            .to_dicts()
+        )
+
+        # CRITICAL: Batched UNWIND query replacing per-NPI loop
+        # This is the key optimization: 1 query for 1000 NPIs instead of 1000 queries
+        cypher = """
+        UNWIND $batch AS item
+        WITH item.npi AS npi, item.name AS provider_name
+
+        // Find SNF entity matching this provider name
+        OPTIONAL MATCH (snf:CorporateEntity)
+        WHERE snf.entityType = 'SNF'
+          AND toLower(snf.name) CONTAINS toLower(provider_name)
+          AND provider_name IS NOT NULL AND provider_name <> ''
+        WITH npi, provider_name, snf
+        ORDER BY npi, snf.name
+        WITH npi, provider_name, HEAD(COLLECT(snf)) AS snf
+
+        // Traverse up ownership chain
+        OPTIONAL MATCH path = (snf)<-[:OWNS*1..5]-(ancestor:CorporateEntity)
+
+        // Aggregate ancestors per (npi, snf) first — Neo4j 5 forbids mixing grouping keys with aggregation in one expression
+        WITH npi, snf, COLLECT(DISTINCT ancestor) AS ancestors
+        // Build chain_entities from grouping keys + aggregated list (no aggregation here)
+        WITH npi,
+             CASE WHEN snf IS NULL THEN []
+                  ELSE [snf] + [a IN ancestors WHERE a IS NOT NULL]
+             END AS chain_entities
+
+        // Expand back down: all SNFs owned by these ancestors
+        UNWIND CASE WHEN SIZE(chain_entities) = 0 THEN [null] ELSE chain_entities END AS ce
+        OPTIONAL MATCH (ce)-[:OWNS*0..5]->(sibling:CorporateEntity)
+        WITH npi, COLLECT(DISTINCT sibling) AS siblings, chain_entities
+        WITH npi, [e IN siblings WHERE e IS NOT NULL | e] + chain_entities AS all_entities
+
+        // Find providers associated with these entities (by name containment)
+        UNWIND CASE WHEN SIZE(all_entities) = 0 THEN [null] ELSE all_entities END AS ent
+        OPTIONAL MATCH (p2:Provider)
+        WHERE toLower(p2.name) CONTAINS toLower(ent.name)
+          AND ent.name IS NOT NULL AND ent.name <> ''
+
+        // Check for exclusions on providers
+        OPTIONAL MATCH (p2)-[:EXCLUDED_BY]->(x:Exclusion)
+
+        // Check if any owning entity has EXCLUDED_BY
+        OPTIONAL MATCH (ent)-[:EXCLUDED_BY]->(ox:Exclusion)
+
+        RETURN
+            npi,
+            COUNT(DISTINCT p2) AS chain_provider_count,
+            COUNT(DISTINCT CASE WHEN x IS NOT NULL THEN p2 END) AS chain_excluded_count,
+            COUNT(DISTINCT CASE WHEN ox IS NOT NULL THEN ent END) AS owner_excluded_count
+        """
+
+        # Suppress schema notifications (e.g. unknown label/relationship) when DB is empty or partial
+        with driver.session(
+            database=database,
+            notifications_min_severity="OFF",
+        ) as session:
+            records = list(session.run(cypher, {"batch": batch_inputs}))
+
+        driver.close()
+        # Column lists straight into the ownership frame (risk computed column-wise)
+        ownership_df = build_ownership_frame(
+            [r["npi"] for r in records],
+            [int(r["chain_provider_count"] or 0) for r in records],
+            [int(r["chain_excluded_count"] or 0) for r in records],
+            [int(r["owner_excluded_count"] or 0) > 0 for r in records],
+        )
+        print(f"[Batch {batch_index}] Neo4j query complete — {len(ownership_df)} results")
+
+    except Exception as e:
+        print(f"[Batch {batch_index}] Neo4j error: {e}. Setting ownership=0 for batch.")
+        ownership_df = empty_ownership_frame(npi_batch)
+
+    return ownership_df
+
+
 # ---------------------------------------------------------------------------
 # Merge Function — Concatenate All Chunks + Global Calibration
 # ---------------------------------------------------------------------------
@@ -474,12 +461,15 @@ def merge_results(
     import json
     from datetime import datetime, timezone
 
-    import numpy as np
     import polars as pl
     import psycopg2
     import psycopg2.extras
 
-    from etl.compute.risk_scores import LABEL_THRESHOLDS, risk_label
+    from etl.compute.risk_scores import (
+        build_calibration_table,
+        calibrate_scores,
+        write_calibration_table,
+    )
 
     print("[Merge] Reading all chunk files...")
     chunk_files = sorted(glob.glob(f"{VOLUME_PATH}/output_chunks/batch_*.parquet"))
@@ -503,39 +493,19 @@ def merge_results(
     # Global calibration: r_raw → risk_score via PERCENT_RANK
     # -----------------------------------------------------------------------
     print("[Merge] Performing global PERCENT_RANK calibration...")
-    r_raw_arr = df["r_raw"].to_numpy()
-    n = len(r_raw_arr)
-
-    if n > 1:
-        order = np.argsort(r_raw_arr)
-        rank_arr = np.empty(n, dtype=float)
-        rank_arr[order] = np.arange(n) / (n - 1)
-        calibrated = (rank_arr * 100.0).round(2)
-    else:
-        calibrated = (r_raw_arr / max(r_raw_arr.max(), 1) * 100.0).round(2)
-
-    df = df.with_columns([
-        pl.Series("risk_score", calibrated.tolist()),
-    ])
-
-    # Assign risk labels
-    def _risk_label(score: float) -> str:
-        for threshold, label in LABEL_THRESHOLDS:
-            if score >= threshold:
-                return label
-        return "Low"
-
-    df = df.with_columns(
-        pl.col("risk_score").map_elements(_risk_label, return_dtype=pl.Utf8).alias("risk_label")
-    )
+    df = calibrate_scores(df)
+    calibration = build_calibration_table(df)
 
     # -----------------------------------------------------------------------
     # Sort and write final file
     # -----------------------------------------------------------------------
     df = df.sort("npi")
     df.write_parquet(output_file)
+    calibration_file = str(Path(output_file).with_name("claidex_calibration.parquet"))
+    calibration.write_parquet(calibration_file)
     volume.commit()
     print(f"[Merge] Final merged file: {output_file} ({len(df):,} rows)")
+    print(f"[Merge] Calibration table: {calibration_file} ({len(calibration):,} breakpoints)")
 
     # -----------------------------------------------------------------------
     # Upsert to Postgres (optional)
@@ -607,6 +577,7 @@ def merge_results(
             with conn.cursor() as cur:
                 psycopg2.extras.execute_batch(cur, upsert_sql, rows, page_size=500)
             conn.commit()
+            write_calibration_table(conn, calibration)
             conn.close()
             print("[Merge] Upsert complete")
 
@@ -0,0 +1,411 @@
+"""
+Claidex LEIE name matching — links exclusions that carry no NPI
+===============================================================
+
+Most business exclusions and many individual LEIE rows have no NPI, so they
+never produce an EXCLUDED_BY edge. This stage links them by name to:
+
+  provider  NPPES providers (individuals and organizations)
+  entity    SNF organizational owners  (ownership/corporate_entities.parquet)
+  person    SNF individual owners      (ownership/entity_officers.parquet)
+
+Blocking — every candidate pair shares an exact key, so work grows with the
+number of rows per block rather than the product of the inputs:
+
+  individual  (state, soundex(last name), first initial)
+  business    (state, name token) on the two rarest informative tokens of
+              the excluded business name; tokens shared by more than
+              ``TOKEN_MAX_DF`` targets in a state are not used as blocks.
+
+Scoring is columnar:
+
+  individual  exact last name 0.5 (soundex-only 0.3) + full first name 0.3
+              (initial-only 0.15; conflicting full first names rejected)
+              + middle initial ±0.1 + city 0.1
+  business    Jaccard similarity of the name token sets; an identical
+              organization key scores 1.0
+
+Only the best-scoring target(s) per (exclusion, target type) at or above
+``MATCH_MIN_SCORE`` are kept, and blocks with more than ``MATCH_MAX_BLOCK``
+candidates for one exclusion are dropped as too ambiguous.
+
+Output columns: exclusion_id, target_type, target_id, match_method,
+confidence.
+
+Usage
+-----
+    python -m etl.compute.exclusion_matching
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+
+import polars as pl
+
+from etl.transform.name_normalizer import (
+    first_token,
+    normalize_name,
+    org_key,
+    state_code,
+)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROCESSED = Path(os.environ.get("DATA_PROCESSED", "data/processed"))
+EXCLUSIONS_PATH = PROCESSED / "exclusions" / "exclusions_final.parquet"
+PROVIDERS_PATH = PROCESSED / "providers" / "providers_final.parquet"
+ENTITIES_PATH = PROCESSED / "ownership" / "corporate_entities.parquet"
+OFFICERS_PATH = PROCESSED / "ownership" / "entity_officers.parquet"
+MATCHES_PATH = PROCESSED / "exclusions" / "exclusion_name_matches.parquet"
+
+# Minimum confidence for a match to be written
+MATCH_MIN_SCORE = float(os.environ.get("EXCL_MATCH_MIN_SCORE", "0.7"))
+# More candidates than this for one exclusion is too ambiguous to attribute
+MATCH_MAX_BLOCK = int(os.environ.get("EXCL_MATCH_MAX_BLOCK", "25"))
+# Business-name tokens used by more targets than this (per state) never block
+TOKEN_MAX_DF = int(os.environ.get("EXCL_MATCH_TOKEN_MAX_DF", "500"))
+# Rarest tokens of each excluded business name used as blocking keys
+BLOCK_TOKENS = 2
+
+# Individual score components
+SCORE_LAST_EXACT = 0.5
+SCORE_LAST_SOUNDEX = 0.3
+SCORE_FIRST_NAME = 0.3
+SCORE_FIRST_INITIAL = 0.15
+SCORE_MIDDLE = 0.1
+SCORE_CITY = 0.1
+
+# Tokens that carry no identifying signal in health-care business names
+_GENERIC_TOKENS = [
+    "AND", "OF", "THE", "AT", "FOR", "A", "HEALTH", "HEALTHCARE", "CARE",
+    "MEDICAL", "SERVICES", "SERVICE", "CENTER", "CENTERS", "CLINIC", "GROUP",
+    "ASSOCIATES", "HOME", "PHARMACY", "NURSING", "REHABILITATION", "REHAB",
+    "DBA", "MANAGEMENT", "HOLDINGS", "ENTERPRISES",
+]
+
+OUTPUT_SCHEMA = {
+    "exclusion_id": pl.Utf8, "target_type": pl.Utf8, "target_id": pl.Utf8,
+    "match_method": pl.Utf8, "confidence": pl.Float64,
+}
+
+# Soundex digit classes; vowels (and Y) are "0" separators, H/W are dropped
+_SOUNDEX_CODES = {
+    "BFPV": "1", "CGJKQSXZ": "2", "DT": "3", "L": "4", "MN": "5", "R": "6",
+    "AEIOUY": "0", "HW": "",
+}
+
+
+# ---------------------------------------------------------------------------
+# Keys
+# ---------------------------------------------------------------------------
+
+def soundex(expr: pl.Expr) -> pl.Expr:
+    """American Soundex as a string expression (no per-row Python)."""
+    letters = expr.str.to_uppercase().str.replace_all(r"[^A-Z]", "")
+    codes = letters
+    for chars, digit in _SOUNDEX_CODES.items():
+        codes = codes.str.replace_all(f"[{chars}]", digit)
+    for digit in "123456":
+        codes = codes.str.replace_all(f"{digit}+", digit)
+    first = letters.str.slice(0, 1)
+    # The first letter's own code is dropped, unless it was H/W (coded "")
+    tail = pl.when(first.is_in(["H", "W"])).then(codes).otherwise(codes.str.slice(1))
+    return (
+        pl.when(letters.str.len_chars() > 0)
+        .then(pl.concat_str([first, tail.str.replace_all("0", ""), pl.lit("000")]).str.slice(0, 4))
+        .otherwise(None)
+    )
+
+
+def _name_tokens(expr: pl.Expr) -> pl.Expr:
+    """Distinct informative tokens of an organization key."""
+    return (
+        expr.str.split(" ")
+        .list.eval(pl.element().filter(
+            (pl.element().str.len_chars() > 1) & ~pl.element().is_in(_GENERIC_TOKENS)
+        ))
+        .list.unique()
+    )
+
+
+# ---------------------------------------------------------------------------
+# Inputs → common shapes
+# ---------------------------------------------------------------------------
+
+def unlinked_exclusions(leie: pl.LazyFrame) -> tuple[pl.LazyFrame, pl.LazyFrame]:
+    """(individuals, businesses) among LEIE rows without an NPI."""
+    base = leie.filter(pl.col("npi").is_null() | (pl.col("npi").cast(pl.Utf8).str.strip_chars() == ""))
+    has_business = pl.col("business_name").is_not_null() & (pl.col("business_name").str.strip_chars() != "")
+    individuals = (
+        base.filter(~has_business & pl.col("last_name").is_not_null())
+        .select(
+            "exclusion_id",
+            normalize_name(pl.col("last_name")).alias("last_name"),
+            first_token(normalize_name(pl.col("first_name"))).alias("first_name"),
+            normalize_name(pl.col("middle_name")).str.slice(0, 1).alias("middle_initial"),
+            normalize_name(pl.col("city")).alias("city"),
+            state_code(pl.col("state")).alias("state"),
+        )
+    )
+    businesses = base.filter(has_business).select(
+        "exclusion_id",
+        org_key(pl.col("business_name")).alias("org_key"),
+        state_code(pl.col("state")).alias("state"),
+    )
+    return individuals, businesses
+
+
+def person_targets(providers: pl.LazyFrame | None, officers: pl.LazyFrame | None) -> pl.LazyFrame:
+    """NPPES individuals and SNF individual owners as (target_type, target_id, names, city, state)."""
+    frames = []
+    if providers is not None:
+        frames.append(
+            providers.filter(pl.col("entity_type_code").cast(pl.Utf8) == "1").select(
+                pl.lit("provider").alias("target_type"),
+                pl.col("npi").alias("target_id"),
+                pl.col("last_name"), pl.col("first_name"),
+                pl.lit(None, dtype=pl.Utf8).alias("middle_name"),
+                pl.col("city"), pl.col("state"),
+            )
+        )
+    if officers is not None:
+        frames.append(
+            officers.select(
+                pl.lit("person").alias("target_type"),
+                pl.col("owner_associate_id").alias("target_id"),
+                pl.col("owner_last_name").alias("last_name"),
+                pl.col("owner_first_name").alias("first_name"),
+                pl.col("owner_middle_name").alias("middle_name"),
+                pl.col("owner_city").alias("city"),
+                pl.col("owner_state").alias("state"),
+            )
+        )
+    return pl.concat(frames, how="vertical_relaxed").select(
+        "target_type", "target_id",
+        normalize_name(pl.col("last_name")).alias("t_last_name"),
+        first_token(normalize_name(pl.col("first_name"))).alias("t_first_name"),
+        normalize_name(pl.col("middle_name")).str.slice(0, 1).alias("t_middle_initial"),
+        normalize_name(pl.col("city")).alias("t_city"),
+        state_code(pl.col("state")).alias("state"),
+    )
+
+
+def org_targets(providers: pl.LazyFrame | None, entities: pl.LazyFrame | None) -> pl.LazyFrame:
+    """NPPES organizations and SNF organizational owners as (target_type, target_id, org_key, state)."""
+    frames = []
+    if providers is not None:
+        frames.append(
+            providers.filter(pl.col("entity_type_code").cast(pl.Utf8) == "2").select(
+                pl.lit("provider").alias("target_type"),
+                pl.col("npi").alias("target_id"),
+                pl.col("org_name").alias("name"),
+                pl.col("state"),
+            )
+        )
+    if entities is not None:
+        frames.append(
+            entities.select(
+                pl.lit("entity").alias("target_type"),
+                pl.col("entity_id").alias("target_id"),
+                pl.col("name"),
+                pl.col("owner_state").alias("state"),
+            )
+        )
+    return pl.concat(frames, how="vertical_relaxed").select(
+        "target_type", "target_id",
+        org_key(pl.col("name")).alias("t_org_key"),
+        state_code(pl.col("state")).alias("state"),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Matching
+# ---------------------------------------------------------------------------
+
+def _best(candidates: pl.LazyFrame, left_key: str = "exclusion_id") -> pl.LazyFrame:
+    """Drop ambiguous blocks, apply the threshold, keep the top score per target type."""
+    key = [left_key, "target_type"]
+    return (
+        candidates
+        .filter(pl.len().over(key) <= MATCH_MAX_BLOCK)
+        .filter(pl.col("confidence") >= MATCH_MIN_SCORE)
+        .filter(pl.col("confidence") == pl.col("confidence").max().over(key))
+    )
+
+
+def match_individuals(individuals: pl.LazyFrame, targets: pl.LazyFrame,
+                      left_key: str = "exclusion_id") -> pl.LazyFrame:
+    """Score (left_key, last/first/middle name, city, state) rows against person targets."""
+    block = ["state", "soundex", "first_initial"]
+    keyed = lambda lf, last, first: lf.with_columns(  # noqa: E731
+        soundex(pl.col(last)).alias("soundex"),
+        pl.col(first).str.slice(0, 1).alias("first_initial"),
+    ).filter(pl.all_horizontal(pl.col(block).is_not_null() & (pl.col(block) != "")))
+
+    # Oversized target blocks could never pass _best; dropping them before the
+    # join keeps its output linear in the inputs
+    pairs = keyed(individuals, "last_name", "first_name").join(
+        keyed(targets, "t_last_name", "t_first_name").filter(pl.len().over(block) <= MATCH_MAX_BLOCK),
+        on=block, how="inner",
+    )
+
+    full_first = (pl.col("first_name").str.len_chars() > 1) & (pl.col("t_first_name").str.len_chars() > 1)
+    first_agrees = pl.col("first_name") == pl.col("t_first_name")
+    # "JON" vs "JONATHAN" is compatible; "JOHN" vs "JAMES" is not
+    first_compatible = (
+        first_agrees
+        | ~full_first
+        | pl.col("first_name").str.starts_with(pl.col("t_first_name"))
+        | pl.col("t_first_name").str.starts_with(pl.col("first_name"))
+    )
+    both_middle = pl.col("middle_initial").is_not_null() & (pl.col("middle_initial") != "") \
+        & pl.col("t_middle_initial").is_not_null() & (pl.col("t_middle_initial") != "")
+    score = (
+        pl.when(pl.col("last_name") == pl.col("t_last_name"))
+        .then(SCORE_LAST_EXACT).otherwise(SCORE_LAST_SOUNDEX)
+        + pl.when(full_first & first_agrees).then(SCORE_FIRST_NAME).otherwise(SCORE_FIRST_INITIAL)
+        + pl.when(~both_middle).then(0.0)
+        .when(pl.col("middle_initial") == pl.col("t_middle_initial")).then(SCORE_MIDDLE)
+        .otherwise(-SCORE_MIDDLE)
+        + pl.when(pl.col("city").is_not_null() & (pl.col("city") == pl.col("t_city")))
+        .then(SCORE_CITY).otherwise(0.0)
+    )
+    return _best(
+        pairs.filter(first_compatible)
+        .select(
+            left_key, "target_type", "target_id",
+            pl.lit("name").alias("match_method"),
+            score.clip(0.0, 1.0).alias("confidence"),
+        ),
+        left_key,
+    )
+
+
+def match_businesses(businesses: pl.LazyFrame, targets: pl.LazyFrame,
+                     left_key: str = "exclusion_id") -> pl.LazyFrame:
+    """Score (left_key, org_key, state) rows against organization targets."""
+    target_tokens = (
+        targets.filter(pl.col("t_org_key").is_not_null() & (pl.col("t_org_key") != ""))
+        .with_columns(_name_tokens(pl.col("t_org_key")).alias("tokens"))
+        .with_columns(pl.col("tokens").list.len().alias("t_n_tokens"))
+    )
+    target_exploded = target_tokens.select("target_type", "target_id", "state", "t_n_tokens", "tokens") \
+        .explode("tokens").rename({"tokens": "token"}).drop_nulls("token")
+    doc_freq = target_exploded.group_by("state", "token").agg(pl.len().alias("df"))
+
+    business_tokens = (
+        businesses.filter(pl.col("org_key").is_not_null() & (pl.col("org_key") != ""))
+        .with_columns(_name_tokens(pl.col("org_key")).alias("tokens"))
+        .with_columns(pl.col("tokens").list.len().alias("n_tokens"))
+    )
+    business_exploded = business_tokens.select(left_key, "state", "tokens") \
+        .explode("tokens").rename({"tokens": "token"}).drop_nulls("token")
+
+    # Blocking: each exclusion's rarest informative tokens that are not too common
+    blocks = (
+        business_exploded.join(doc_freq, on=["state", "token"], how="inner")
+        .filter(pl.col("df") <= TOKEN_MAX_DF)
+        .sort(left_key, "df", "token")
+        .group_by(left_key, maintain_order=True)
+        .head(BLOCK_TOKENS)
+        .select(left_key, "state", "token")
+    )
+    pairs = (
+        blocks.join(target_exploded.select("target_type", "target_id", "state", "token"),
+                    on=["state", "token"], how="inner")
+        .select(left_key, "target_type", "target_id")
+        .unique()
+    )
+
+    # Token-set Jaccard: intersection from a join on the exploded tokens
+    overlap = (
+        pairs.join(business_exploded.select(left_key, "token"), on=left_key, how="inner")
+        .join(target_exploded.select("target_type", "target_id", "token"),
+              on=["target_type", "target_id", "token"], how="inner")
+        .group_by(left_key, "target_type", "target_id")
+        .agg(pl.len().alias("shared"))
+    )
+    scored = (
+        overlap
+        .join(business_tokens.select(left_key, "org_key", "n_tokens"), on=left_key, how="inner")
+        .join(target_tokens.select("target_type", "target_id", "t_org_key", "t_n_tokens"),
+              on=["target_type", "target_id"], how="inner")
+        .with_columns(
+            pl.when(pl.col("org_key") == pl.col("t_org_key"))
+            .then(1.0)
+            .otherwise(pl.col("shared") / (pl.col("n_tokens") + pl.col("t_n_tokens") - pl.col("shared")))
+            .alias("confidence")
+        )
+    )
+    return _best(
+        scored.select(
+            left_key, "target_type", "target_id",
+            pl.lit("business_name").alias("match_method"),
+            pl.col("confidence").cast(pl.Float64),
+        ),
+        left_key,
+    )
+
+
+def match_exclusions(
+    leie: pl.LazyFrame,
+    providers: pl.LazyFrame | None = None,
+    entities: pl.LazyFrame | None = None,
+    officers: pl.LazyFrame | None = None,
+) -> pl.DataFrame:
+    """Name matches for NPI-less LEIE rows, one row per (exclusion, target)."""
+    individuals, businesses = unlinked_exclusions(leie)
+    frames = []
+    if providers is not None or officers is not None:
+        frames.append(match_individuals(individuals, person_targets(providers, officers)))
+    if providers is not None or entities is not None:
+        frames.append(match_businesses(businesses, org_targets(providers, entities)))
+    if not frames:
+        return pl.DataFrame(schema=OUTPUT_SCHEMA)
+    return (
+        pl.concat(frames, how="vertical_relaxed")
+        .unique(subset=["exclusion_id", "target_type", "target_id"], keep="first")
+        .sort("exclusion_id", "target_type", "target_id")
+        .collect()
+        .cast(OUTPUT_SCHEMA)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def _scan_optional(path: Path) -> pl.LazyFrame | None:
+    return pl.scan_parquet(path) if path.exists() else None
+
+
+def run() -> pl.DataFrame:
+    if not EXCLUSIONS_PATH.exists():
+        raise FileNotFoundError(f"Run exclusions_transform.py first: {EXCLUSIONS_PATH}")
+    matches = match_exclusions(
+        pl.scan_parquet(EXCLUSIONS_PATH),
+        _scan_optional(PROVIDERS_PATH),
+        _scan_optional(ENTITIES_PATH),
+        _scan_optional(OFFICERS_PATH),
+    )
+    MATCHES_PATH.parent.mkdir(parents=True, exist_ok=True)
+    matches.write_parquet(MATCHES_PATH, compression="zstd")
+    counts = matches.group_by("target_type").len().sort("target_type").rows()
+    summary = ", ".join(f"{n:,} {t}" for t, n in counts) or "none"
+    print(f"[excl_match] {matches['exclusion_id'].n_unique():,} exclusions linked by name ({summary})")
+    print(f"[excl_match] → {MATCHES_PATH}")
+    return matches
+
+
+def main() -> None:
+    argparse.ArgumentParser(description="Link NPI-less LEIE exclusions to providers and SNF owners by name").parse_args()
+    run()
+
+
+if __name__ == "__main__":
+    main()
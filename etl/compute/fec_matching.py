@@ -0,0 +1,392 @@
+"""
+Claidex FEC ↔ provider matching — batch precompute
+===================================================
+
+Links FEC individual contributions to NPPES providers so
+``GET /v1/providers/:npi/political`` serves a single indexed read instead of
+searching contributions per request.
+
+Reads (data/processed/):
+  fec/contributions/cycle=YYYY/   — hive-partitioned contributions (fec_ingest)
+  fec/committees/cycle=YYYY/      — committee master, for party attribution
+  providers/providers_final.parquet
+  ownership/snf_owners.parquet    — optional, for SNF owner employer matches
+
+Writes ``provider_fec_matches`` (schema: ``etl/schemas/provider_fec_matches.sql``),
+one row per (npi, cycle, match_type, matched_name) with contribution count,
+total / DEM / REP amounts, committee count, date range and match score.
+
+Match paths — all exact-key (blocked) joins, scored with column expressions:
+  individual  contributor (last name, first initial, state) = NPPES individual;
+              score rises with full first-name and city agreement and a
+              health-care occupation, falls with block size; conflicting
+              full first names are rejected.
+  employer    normalized employer = NPPES organization name in the same state.
+  snf_owner   normalized employer = SNF organizational owner name, attributed
+              to the NPIs of the facilities it owns.
+
+Contributions are pre-aggregated per contributor identity and committee
+before any join, so the joins run over distinct donors rather than raw rows.
+
+Usage
+-----
+    python -m etl.compute.fec_matching
+    python -m etl.compute.fec_matching --cycle 2024 --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import polars as pl
+
+from etl.compute.risk_scores import get_pg_conn
+from etl.transform.name_normalizer import first_token, normalize_name, org_key
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+PROCESSED = Path(os.environ.get("DATA_PROCESSED", "data/processed"))
+CONTRIBUTIONS_PATH = PROCESSED / "fec" / "contributions"
+COMMITTEES_PATH = PROCESSED / "fec" / "committees"
+PROVIDERS_PATH = PROCESSED / "providers" / "providers_final.parquet"
+SNF_OWNERS_PATH = PROCESSED / "ownership" / "snf_owners.parquet"
+
+# Minimum score for a match to be written
+MATCH_MIN_SCORE = float(os.environ.get("FEC_MATCH_MIN_SCORE", "0.6"))
+# Blocks with more NPPES candidates than this are too ambiguous to attribute
+MATCH_MAX_BLOCK = int(os.environ.get("FEC_MATCH_MAX_BLOCK", "25"))
+
+# Individual score components
+SCORE_BLOCK = 0.45          # last name + first initial + state
+SCORE_FIRST_NAME = 0.25     # full first name agrees
+SCORE_CITY = 0.15           # city agrees
+SCORE_OCCUPATION = 0.15     # occupation is health care
+BLOCK_PENALTY = 0.05        # per additional NPPES candidate in the block
+
+# Employer scores (fixed per path)
+SCORE_EMPLOYER_ORG = 0.8
+SCORE_EMPLOYER_SNF_OWNER = 0.7
+
+# Employer strings that identify no employer
+NON_EMPLOYERS = (
+    "", "NONE", "N A", "NA", "SELF", "SELF EMPLOYED", "SELFEMPLOYED", "RETIRED",
+    "NOT EMPLOYED", "UNEMPLOYED", "HOMEMAKER", "STUDENT",
+    "INFORMATION REQUESTED", "INFORMATION REQUESTED PER BEST EFFORTS",
+    "REQUESTED", "PHYSICIAN", "DOCTOR",
+)
+
+_HEALTH_OCCUPATION_RE = (
+    r"PHYSICIAN|DOCTOR|\bMD\b|\bDO\b|SURGEON|NURSE|\bRN\b|\bNP\b|DENTIST|\bDDS\b|"
+    r"PHARMAC|THERAPIST|CHIROPRACT|OPTOMETR|PSYCHIATR|PSYCHOLOG|PODIATR|"
+    r"RADIOLOG|ANESTHES|CARDIOLOG|ONCOLOG|PEDIATRIC|MEDICAL|HEALTH|CLINIC|HOSPITAL"
+)
+
+# Pre-aggregated contribution grain: one contributor identity + committee
+_IDENTITY_COLS = [
+    "cycle", "normalized_name", "last_name", "first_initial", "first_name",
+    "state", "city", "employer_key", "health_occupation",
+]
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+
+def scan_contributions(cycles: list[int] | None = None) -> pl.LazyFrame:
+    """Contributions with committee party attached, optionally pruned to cycles."""
+    lf = pl.scan_parquet(CONTRIBUTIONS_PATH, hive_partitioning=True)
+    if cycles:
+        lf = lf.filter(pl.col("cycle").is_in(cycles))
+    if COMMITTEES_PATH.exists():
+        committees = (
+            pl.scan_parquet(COMMITTEES_PATH, hive_partitioning=True)
+            .select("committee_id", pl.col("cycle").cast(pl.Int64), "party")
+        )
+        lf = lf.with_columns(pl.col("cycle").cast(pl.Int64)).join(
+            committees, on=["committee_id", "cycle"], how="left"
+        )
+    else:
+        lf = lf.with_columns(pl.lit(None, dtype=pl.Utf8).alias("party"))
+    return lf
+
+
+def aggregate_contributions(contributions: pl.LazyFrame) -> pl.LazyFrame:
+    """Collapse raw contributions to one row per contributor identity + committee.
+
+    Blocking keys are derived from the raw ``contributor_name`` ("LAST, FIRST MI")
+    so matching does not depend on how older ingests split the name.
+    """
+    name_parts = pl.col("contributor_name").str.splitn(",", 2)
+    party = pl.col("party").str.to_uppercase()
+    return (
+        contributions
+        .with_columns(
+            normalize_name(pl.col("contributor_name")).alias("normalized_name"),
+            normalize_name(name_parts.struct.field("field_0")).alias("last_name"),
+            first_token(normalize_name(name_parts.struct.field("field_1"))).alias("first_name"),
+            normalize_name(pl.col("city")).alias("city"),
+            org_key(pl.col("employer")).alias("employer_key"),
+            normalize_name(pl.col("occupation").fill_null(""))
+            .str.contains(_HEALTH_OCCUPATION_RE)
+            .alias("health_occupation"),
+        )
+        .with_columns(pl.col("first_name").str.slice(0, 1).alias("first_initial"))
+        .group_by(_IDENTITY_COLS + ["committee_id"])
+        .agg(
+            pl.len().alias("contribution_count"),
+            pl.col("amount").sum().alias("total_amount"),
+            pl.col("amount").filter(party == "DEM").sum().alias("dem_amount"),
+            pl.col("amount").filter(party == "REP").sum().alias("rep_amount"),
+            pl.col("transaction_date").min().alias("first_date"),
+            pl.col("transaction_date").max().alias("last_date"),
+        )
+    )
+
+
+def provider_individuals(providers: pl.LazyFrame) -> pl.LazyFrame:
+    """NPPES individuals keyed for blocking, with the size of each block."""
+    block = ["last_name", "first_initial", "state"]
+    return (
+        providers
+        .filter(pl.col("entity_type_code").cast(pl.Utf8) == "1")
+        .select(
+            "npi",
+            normalize_name(pl.col("last_name")).alias("last_name"),
+            first_token(normalize_name(pl.col("first_name"))).alias("provider_first_name"),
+            pl.col("state").str.strip_chars().str.to_uppercase().alias("state"),
+            normalize_name(pl.col("city")).alias("provider_city"),
+        )
+        .with_columns(pl.col("provider_first_name").str.slice(0, 1).alias("first_initial"))
+        .filter(pl.all_horizontal(pl.col(block).is_not_null() & (pl.col(block) != "")))
+        .with_columns(pl.len().over(block).alias("block_size"))
+        .filter(pl.col("block_size") <= MATCH_MAX_BLOCK)
+    )
+
+
+def employer_targets(providers: pl.LazyFrame, snf_owners: pl.LazyFrame | None) -> pl.LazyFrame:
+    """(employer_key, state, npi, match_type, score) rows to join employers against.
+
+    ``state`` is null for SNF owners: a chain owner is matched nationally.
+    """
+    orgs = (
+        providers
+        .filter(pl.col("entity_type_code").cast(pl.Utf8) == "2")
+        .select(
+            "npi",
+            org_key(pl.col("org_name")).alias("employer_key"),
+            pl.col("state").str.strip_chars().str.to_uppercase().alias("state"),
+        )
+        .filter(pl.col("employer_key").str.len_chars() >= 4)
+    )
+    targets = [
+        orgs
+        .filter(pl.len().over(["employer_key", "state"]) <= MATCH_MAX_BLOCK)
+        .with_columns(
+            pl.lit("employer").alias("match_type"),
+            pl.lit(SCORE_EMPLOYER_ORG).alias("match_score"),
+        )
+    ]
+
+    if snf_owners is not None:
+        # Facility NPI: the enrolled facility name must identify exactly one
+        # NPPES organization nationally
+        facility_npis = (
+            orgs.filter(pl.len().over("employer_key") == 1)
+            .select(pl.col("employer_key").alias("facility_key"), "npi")
+        )
+        owners = (
+            snf_owners
+            .filter(pl.col("owner_type").str.strip_chars().str.to_uppercase() == "O")
+            .select(
+                org_key(pl.col("owner_org_name")).alias("employer_key"),
+                org_key(pl.col("provider_org_name")).alias("facility_key"),
+            )
+            .filter(pl.col("employer_key").str.len_chars() >= 4)
+            .join(facility_npis, on="facility_key", how="inner")
+            .select(
+                "npi", "employer_key",
+                pl.lit(None, dtype=pl.Utf8).alias("state"),
+                pl.lit("snf_owner").alias("match_type"),
+                pl.lit(SCORE_EMPLOYER_SNF_OWNER).alias("match_score"),
+            )
+            .unique()
+        )
+        targets.append(owners)
+
+    return pl.concat(targets, how="vertical_relaxed")
+
+
+# ---------------------------------------------------------------------------
+# Matching
+# ---------------------------------------------------------------------------
+
+def match_individuals(contribs: pl.LazyFrame, individuals: pl.LazyFrame) -> pl.LazyFrame:
+    """Block on (last name, first initial, state) and score every candidate pair."""
+    first_agrees = pl.col("first_name") == pl.col("provider_first_name")
+    # "J" is compatible with "JOHN"; "JOHN" and "JAMES" are not
+    first_conflicts = (
+        (pl.col("first_name").str.len_chars() > 1)
+        & (pl.col("provider_first_name").str.len_chars() > 1)
+        & ~first_agrees
+    )
+    score = (
+        pl.lit(SCORE_BLOCK)
+        + first_agrees.cast(pl.Float64) * SCORE_FIRST_NAME
+        + (pl.col("city") == pl.col("provider_city")).fill_null(False).cast(pl.Float64) * SCORE_CITY
+        + pl.col("health_occupation").cast(pl.Float64) * SCORE_OCCUPATION
+        - (pl.col("block_size") - 1).cast(pl.Float64) * BLOCK_PENALTY
+    )
+    return (
+        contribs
+        .filter(pl.col("first_initial").is_not_null() & (pl.col("first_initial") != ""))
+        .join(individuals, on=["last_name", "first_initial", "state"], how="inner")
+        .with_columns(
+            pl.when(first_conflicts).then(0.0).otherwise(score.clip(0.0, 1.0)).alias("match_score"),
+            pl.lit("individual").alias("match_type"),
+            pl.col("normalized_name").alias("matched_name"),
+        )
+    )
+
+
+def match_employers(contribs: pl.LazyFrame, targets: pl.LazyFrame) -> pl.LazyFrame:
+    """Exact employer-key joins: state-scoped for organizations, national for SNF owners."""
+    contribs = contribs.filter(
+        pl.col("employer_key").is_not_null() & ~pl.col("employer_key").is_in(NON_EMPLOYERS)
+    )
+    by_state = contribs.join(
+        targets.filter(pl.col("state").is_not_null()), on=["employer_key", "state"], how="inner"
+    )
+    national = contribs.join(
+        targets.filter(pl.col("state").is_null()).drop("state"), on="employer_key", how="inner"
+    )
+    return pl.concat([by_state, national], how="diagonal_relaxed").with_columns(
+        pl.col("employer_key").alias("matched_name")
+    )
+
+
+def summarize_matches(matches: pl.LazyFrame) -> pl.LazyFrame:
+    """Per-NPI aggregates at the provider_fec_matches grain."""
+    return (
+        matches
+        .filter(pl.col("match_score") >= MATCH_MIN_SCORE)
+        .group_by(["npi", "cycle", "match_type", "matched_name"])
+        .agg(
+            pl.col("match_score").max().round(3),
+            pl.col("contribution_count").sum(),
+            pl.col("total_amount").sum().round(2),
+            pl.col("dem_amount").sum().round(2),
+            pl.col("rep_amount").sum().round(2),
+            pl.col("committee_id").n_unique().alias("committee_count"),
+            pl.col("first_date").min(),
+            pl.col("last_date").max(),
+        )
+    )
+
+
+def compute_matches(
+    contributions: pl.LazyFrame,
+    providers: pl.LazyFrame,
+    snf_owners: pl.LazyFrame | None = None,
+) -> pl.DataFrame:
+    """Full match: aggregate contributions, run both paths, summarize per NPI."""
+    contribs = aggregate_contributions(contributions).cache()
+    individual = match_individuals(contribs, provider_individuals(providers))
+    employer = match_employers(contribs, employer_targets(providers, snf_owners))
+    return (
+        summarize_matches(pl.concat([individual, employer], how="diagonal_relaxed"))
+        .with_columns(pl.col("cycle").cast(pl.Int16))
+        .sort(["npi", "cycle", "match_type", "total_amount"], descending=[False, False, False, True])
+        .collect()
+    )
+
+
+# ---------------------------------------------------------------------------
+# Database write
+# ---------------------------------------------------------------------------
+
+def write_matches(conn, matches: pl.DataFrame, cycles: list[int] | None = None) -> None:
+    """Replace provider_fec_matches (only ``cycles`` when given) in one transaction."""
+    buf = io.BytesIO()
+    matches.write_csv(buf)
+    buf.seek(0)
+    with conn.cursor() as cur:
+        if cycles:
+            cur.execute("DELETE FROM provider_fec_matches WHERE cycle = ANY(%s)", (cycles,))
+        else:
+            cur.execute("TRUNCATE provider_fec_matches")
+        cur.copy_expert(
+            f"COPY provider_fec_matches ({', '.join(matches.columns)}) "
+            "FROM STDIN WITH (FORMAT CSV, HEADER TRUE, NULL '')",
+            buf,
+        )
+        cur.execute("ANALYZE provider_fec_matches")
+    conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Main orchestration
+# ---------------------------------------------------------------------------
+
+def run(cycles: list[int] | None = None, dry_run: bool = False) -> pl.DataFrame:
+    """Full FEC match batch.  Returns the provider_fec_matches DataFrame."""
+    print(f"[fec_match] Starting FEC matching — {datetime.now(timezone.utc).isoformat()}")
+    if not CONTRIBUTIONS_PATH.exists():
+        print(f"[fec_match] No contributions at {CONTRIBUTIONS_PATH}. Run fec_ingest first.")
+        return pl.DataFrame()
+    if not PROVIDERS_PATH.exists():
+        raise FileNotFoundError(f"Run providers_transform.py first: {PROVIDERS_PATH}")
+
+    snf_owners = pl.scan_parquet(SNF_OWNERS_PATH) if SNF_OWNERS_PATH.exists() else None
+    if snf_owners is None:
+        print("[fec_match] No SNF owners file — skipping snf_owner matches")
+
+    print("[fec_match] Matching contributions to providers…")
+    matches = compute_matches(
+        scan_contributions(cycles),
+        pl.scan_parquet(PROVIDERS_PATH),
+        snf_owners,
+    )
+    print(f"[fec_match]   {len(matches):,} match rows, {matches['npi'].n_unique():,} NPIs")
+    for (match_type,), part in matches.group_by(["match_type"]):
+        print(f"[fec_match]   {match_type}: {len(part):,} rows")
+
+    if not dry_run:
+        conn = get_pg_conn()
+        try:
+            print("[fec_match] Writing provider_fec_matches…")
+            write_matches(conn, matches, cycles)
+            print("[fec_match] Write complete.")
+        finally:
+            conn.close()
+    else:
+        print("[fec_match] Dry run — skipping DB write.")
+        print(matches.head(5))
+
+    print(f"[fec_match] Done — {datetime.now(timezone.utc).isoformat()}")
+    return matches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Match FEC contributions to providers into provider_fec_matches."
+    )
+    parser.add_argument(
+        "--cycle", type=int, action="append", dest="cycles",
+        help="Election cycle to (re)match; repeatable. Default: all ingested cycles.",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="Compute matches but do not write to the database.",
+    )
+    args = parser.parse_args()
+    run(cycles=args.cycles, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
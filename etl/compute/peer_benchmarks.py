@@ -0,0 +1,360 @@
+"""
+Claidex peer benchmarks — batch precompute
+==========================================
+
+Materializes the statistics behind ``GET /v1/providers/:npi/benchmark`` so the
+API serves a single indexed read instead of a window-function scan over
+combined payments (``payments_combined``).
+
+Writes two tables (schema: ``etl/schemas/peer_benchmarks.sql``):
+
+  peer_benchmark_groups — one row per (peer_group, year, program, metric):
+                          peer count, quantile ladder, median, log-scale
+                          median and MAD.
+  peer_benchmarks       — one row per (npi, year, program, metric): provider
+                          value, peer median/p10/p90, PERCENT_RANK percentile,
+                          robust log-scale z-score, direction and flag.
+
+Peer group levels (most → least specific, per year/program):
+  L1: taxonomy + state + entity_type, peers with >= PEER_MIN_CLAIMS claims
+  L2: taxonomy + Census division
+  L3: taxonomy nationally
+The most specific level with >= PEER_MIN_SIZE peers that contains the
+provider is used.
+
+Usage
+-----
+    python -m etl.compute.peer_benchmarks
+    python -m etl.compute.peer_benchmarks --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+from datetime import datetime, timezone
+
+import polars as pl
+
+from etl.compute.risk_scores import (
+    MAD_SCALE,
+    PEER_MIN_CLAIMS,
+    PEER_MIN_SIZE,
+    get_pg_conn,
+    payments_relation,
+)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+METRICS = (
+    "payments_per_claim",
+    "claims_per_beneficiary",
+    "total_payments",
+    "allowed_per_claim",
+)
+
+# Quantile ladder stored per peer group (PERCENTILE_CONT / linear interpolation)
+QUANTILES = (0.01, 0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95, 0.99)
+
+# Peer-group key columns per level
+LEVEL_KEYS: dict[int, list[str]] = {
+    1: ["taxonomy", "state", "entity_type"],
+    2: ["taxonomy", "census_division"],
+    3: ["taxonomy"],
+}
+
+# Denominator smoothing for the log-scale z-score (matches the API's former SQL)
+Z_DELTA = 0.001
+
+CENSUS_DIVISIONS: dict[str, str] = {
+    **dict.fromkeys(["CT", "ME", "MA", "NH", "RI", "VT"], "NewEngland"),
+    **dict.fromkeys(["NJ", "NY", "PA"], "MidAtlantic"),
+    **dict.fromkeys(["IL", "IN", "MI", "OH", "WI"], "EastNorthCentral"),
+    **dict.fromkeys(["IA", "KS", "MN", "MO", "NE", "ND", "SD"], "WestNorthCentral"),
+    **dict.fromkeys(["DE", "FL", "GA", "MD", "NC", "SC", "VA", "DC", "WV"], "SouthAtlantic"),
+    **dict.fromkeys(["AL", "KY", "MS", "TN"], "EastSouthCentral"),
+    **dict.fromkeys(["AR", "LA", "OK", "TX"], "WestSouthCentral"),
+    **dict.fromkeys(["AZ", "CO", "ID", "MT", "NV", "NM", "UT", "WY"], "Mountain"),
+    **dict.fromkeys(["AK", "CA", "HI", "OR", "WA"], "Pacific"),
+}
+
+PAYMENTS_SCHEMA = {
+    "npi": pl.Utf8, "year": pl.Int32, "program": pl.Utf8,
+    "payments": pl.Float64, "allowed": pl.Float64, "claims": pl.Float64,
+    "beneficiaries": pl.Float64, "taxonomy": pl.Utf8, "state": pl.Utf8,
+    "entity_type": pl.Utf8,
+}
+
+
+# ---------------------------------------------------------------------------
+# Step 1 — Load
+# ---------------------------------------------------------------------------
+
+def load_benchmark_payments(conn) -> pl.DataFrame:
+    """
+    Stream combined payments (with provider entity_type) out of Postgres via
+    COPY and parse it as CSV.  Schema: ``PAYMENTS_SCHEMA``.
+    """
+    sql = f"""
+        COPY (
+            SELECT
+                pc.npi,
+                pc.year,
+                pc.program,
+                COALESCE(pc.payments, 0)           AS payments,
+                pc.allowed,
+                COALESCE(pc.claims, 0)             AS claims,
+                COALESCE(pc.beneficiaries, 0)      AS beneficiaries,
+                COALESCE(pc.taxonomy, 'Unknown')   AS taxonomy,
+                COALESCE(pc.state, 'Unknown')      AS state,
+                COALESCE(pr.entity_type_code::TEXT, 'Unknown') AS entity_type
+            FROM {payments_relation(conn)} pc
+            JOIN providers pr ON pr.npi = pc.npi
+        ) TO STDOUT WITH (FORMAT CSV, HEADER TRUE)
+    """
+    buf = io.BytesIO()
+    with conn.cursor() as cur:
+        cur.copy_expert(sql, buf)
+    buf.seek(0)
+    return pl.read_csv(buf, schema=PAYMENTS_SCHEMA)
+
+
+# ---------------------------------------------------------------------------
+# Step 2 — Metrics and peer-level assignment
+# ---------------------------------------------------------------------------
+
+def compute_benchmark_metrics(payments: pl.DataFrame) -> pl.DataFrame:
+    """
+    Aggregate to (npi, year, program) and derive the four benchmark metrics,
+    Census division and the chosen peer level per NPI-year-program.
+    """
+    wide = (
+        payments
+        .group_by(["npi", "year", "program", "taxonomy", "state", "entity_type"])
+        .agg(
+            pl.col("payments").sum(),
+            # sum() of all-null is 0; keep allowed null when the program has none
+            pl.when(pl.col("allowed").is_not_null().any())
+            .then(pl.col("allowed").sum())
+            .alias("allowed"),
+            pl.col("claims").sum(),
+            pl.col("beneficiaries").sum(),
+        )
+        .with_columns(
+            pl.col("state").replace_strict(CENSUS_DIVISIONS, default="Other").alias("census_division"),
+            (pl.col("payments") / pl.col("claims").clip(lower_bound=1)).alias("payments_per_claim"),
+            (pl.col("claims") / pl.col("beneficiaries").clip(lower_bound=1)).alias("claims_per_beneficiary"),
+            pl.col("payments").alias("total_payments"),
+            (pl.col("allowed") / pl.col("claims").clip(lower_bound=1)).alias("allowed_per_claim"),
+        )
+    )
+
+    # Peer counts per level, on the same (year, program) partition as the API
+    is_l1_member = pl.col("claims") >= PEER_MIN_CLAIMS
+    for level, keys in LEVEL_KEYS.items():
+        member = is_l1_member if level == 1 else pl.lit(True)
+        wide = wide.with_columns(
+            pl.col("npi").filter(member).n_unique()
+            .over(["year", "program", *keys]).alias(f"cnt_l{level}")
+        )
+
+    use_l1 = (pl.col("cnt_l1") >= PEER_MIN_SIZE) & is_l1_member
+    use_l2 = pl.col("cnt_l2") >= PEER_MIN_SIZE
+    return wide.with_columns(
+        pl.when(use_l1).then(1).when(use_l2).then(2).otherwise(3)
+        .cast(pl.Int16).alias("peer_level"),
+        pl.when(use_l1).then(pl.col("cnt_l1"))
+        .when(use_l2).then(pl.col("cnt_l2"))
+        .otherwise(pl.col("cnt_l3"))
+        .cast(pl.Int32).alias("peer_count"),
+    )
+
+
+def _peer_group_expr(level: int) -> pl.Expr:
+    """Stable text key of a peer group, e.g. ``L1|207R00000X|TX|1``."""
+    return pl.concat_str(
+        [pl.lit(f"L{level}"), *[pl.col(k) for k in LEVEL_KEYS[level]]],
+        separator="|",
+    ).alias("peer_group")
+
+
+# ---------------------------------------------------------------------------
+# Step 3 — Group statistics and per-NPI benchmark rows
+# ---------------------------------------------------------------------------
+
+def compute_peer_benchmarks(metrics: pl.DataFrame) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Returns ``(groups, benchmarks)`` matching the ``peer_benchmark_groups`` and
+    ``peer_benchmarks`` tables.
+    """
+    long = (
+        metrics
+        .unpivot(
+            index=["npi", "year", "program", "taxonomy", "state", "entity_type",
+                   "census_division", "claims", "peer_level", "peer_count"],
+            on=list(METRICS),
+            variable_name="metric",
+            value_name="provider_value",
+        )
+        .filter(pl.col("provider_value").is_not_null())
+        .with_columns((pl.col("provider_value") + 1).log().alias("log_value"))
+    )
+
+    part = ["peer_group", "year", "program", "metric"]
+    group_frames: list[pl.DataFrame] = []
+    row_frames: list[pl.DataFrame] = []
+
+    for level in LEVEL_KEYS:
+        members = long.with_columns(_peer_group_expr(level))
+        if level == 1:
+            members = members.filter(pl.col("claims") >= PEER_MIN_CLAIMS)
+
+        log_med = pl.col("log_value").median()
+        stats = (
+            members
+            .group_by(part)
+            .agg(
+                pl.col("npi").n_unique().cast(pl.Int32).alias("group_size"),
+                pl.col("provider_value").median().alias("median"),
+                pl.col("provider_value").quantile(0.10, interpolation="linear").alias("p10"),
+                pl.col("provider_value").quantile(0.90, interpolation="linear").alias("p90"),
+                pl.concat_list([
+                    pl.col("provider_value").quantile(q, interpolation="linear")
+                    for q in QUANTILES
+                ]).first().alias("quantiles"),
+                log_med.alias("log_median"),
+                (pl.col("log_value") - log_med).abs().median().alias("log_mad"),
+            )
+            .with_columns(pl.lit(level, dtype=pl.Int16).alias("peer_level"))
+        )
+
+        # Percent rank within the group: ties share the minimum rank
+        n = pl.len().over(part)
+        ranked = members.with_columns(
+            pl.when(n > 1)
+            .then((pl.col("provider_value").rank(method="min").over(part) - 1) / (n - 1))
+            .otherwise(0.0)
+            .alias("pct_rank")
+        )
+
+        chosen = ranked.filter(pl.col("peer_level") == level).join(
+            stats.drop("peer_level", "quantiles", "group_size"), on=part, how="left"
+        )
+        row_frames.append(chosen)
+        # Keep only groups that some provider actually benchmarks against
+        group_frames.append(
+            stats.join(chosen.select(part).unique(), on=part, how="semi")
+        )
+
+    rows = pl.concat(row_frames, how="vertical_relaxed")
+    dev = pl.col("log_value") - pl.col("log_median")
+    scale = MAD_SCALE * pl.col("log_mad")
+    z = dev / (scale + Z_DELTA)
+    pct = (pl.col("pct_rank") * 100).round(0).cast(pl.Int16)
+
+    benchmarks = rows.select(
+        "npi", "year", "program", "metric", "peer_level", "peer_group", "peer_count",
+        pl.col("provider_value").round(4),
+        pl.col("median").round(4).alias("peer_median"),
+        pl.col("p10").round(4).alias("peer_p10"),
+        pl.col("p90").round(4).alias("peer_p90"),
+        pct.alias("provider_percentile"),
+        z.round(2).alias("z_score"),
+        pl.when(dev > scale).then(pl.lit("High"))
+        .when(dev < -scale).then(pl.lit("Low"))
+        .otherwise(pl.lit("Typical")).alias("direction"),
+        pl.when((pct >= 99) | (z.abs() >= 3.5)).then(pl.lit("ExtremeOutlier"))
+        .when((pct >= 95) | (z.abs() >= 2.5)).then(pl.lit("Outlier"))
+        .when((pct >= 80) | (z.abs() >= 1.5)).then(pl.lit("High"))
+        .otherwise(pl.lit("Typical")).alias("flag"),
+    ).sort(["npi", "year", "program", "metric"])
+
+    groups = pl.concat(group_frames, how="vertical_relaxed").select(
+        "peer_group", "year", "program", "metric", "peer_level",
+        pl.col("group_size").alias("peer_count"),
+        "median", "quantiles", "log_median", "log_mad",
+    )
+    return groups, benchmarks
+
+
+# ---------------------------------------------------------------------------
+# Step 4 — Write
+# ---------------------------------------------------------------------------
+
+def _copy_frame(cur, table: str, df: pl.DataFrame) -> None:
+    buf = io.BytesIO()
+    df.write_csv(buf)
+    buf.seek(0)
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT CSV, HEADER TRUE, NULL '')",
+        buf,
+    )
+
+
+def write_peer_benchmarks(conn, groups: pl.DataFrame, benchmarks: pl.DataFrame) -> None:
+    """Replace both benchmark tables in one transaction."""
+    # Postgres array literal for the quantile ladder
+    groups = groups.with_columns(
+        pl.format("{{{}}}", pl.col("quantiles").list.eval(pl.element().cast(pl.Utf8)).list.join(","))
+        .alias("quantiles")
+    )
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE peer_benchmark_groups, peer_benchmarks")
+        _copy_frame(cur, "peer_benchmark_groups", groups)
+        _copy_frame(cur, "peer_benchmarks", benchmarks)
+    conn.commit()
+
+
+# ---------------------------------------------------------------------------
+# Main orchestration
+# ---------------------------------------------------------------------------
+
+def run(dry_run: bool = False) -> pl.DataFrame:
+    """Full peer-benchmark batch.  Returns the per-NPI benchmark DataFrame."""
+    print(f"[benchmark] Starting peer benchmark compute — {datetime.now(timezone.utc).isoformat()}")
+    conn = get_pg_conn()
+    try:
+        print("[benchmark] Loading payments…")
+        payments = load_benchmark_payments(conn)
+        print(f"[benchmark]   {len(payments):,} payment rows")
+        if payments.is_empty():
+            print("[benchmark] No payment data found. Exiting.")
+            return pl.DataFrame()
+
+        print("[benchmark] Computing metrics and peer levels…")
+        metrics = compute_benchmark_metrics(payments)
+
+        print("[benchmark] Computing group statistics and percentiles…")
+        groups, benchmarks = compute_peer_benchmarks(metrics)
+        print(f"[benchmark]   {len(groups):,} peer groups, {len(benchmarks):,} benchmark rows")
+
+        if not dry_run:
+            print("[benchmark] Writing peer_benchmark_groups + peer_benchmarks…")
+            write_peer_benchmarks(conn, groups, benchmarks)
+            print("[benchmark] Write complete.")
+        else:
+            print("[benchmark] Dry run — skipping DB write.")
+            print(benchmarks.head(5))
+    finally:
+        conn.close()
+
+    print(f"[benchmark] Done — {datetime.now(timezone.utc).isoformat()}")
+    return benchmarks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Precompute peer benchmarks into peer_benchmarks / peer_benchmark_groups."
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="Compute benchmarks but do not write to the database.",
+    )
+    args = parser.parse_args()
+    run(dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,7 @@ from __future__ import annotations
 
 import argparse
 import os
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -32,6 +33,16 @@ import psycopg2
 import psycopg2.extras
 from dotenv import load_dotenv
 
+# Allow running by path (python etl/compute/prepare_modal_data.py) from repo root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from etl.compute.risk_scores import (  # noqa: E402
+    CHAIN_OWNERSHIP_SCHEMA,
+    CLUSTER_EXCLUSIONS_SQL,
+    chain_ownership_query,
+    payments_relation,
+)
+
 
 def get_pg_conn() -> psycopg2.extensions.connection:
     """Get Postgres connection from environment variables."""
@@ -150,6 +161,60 @@ def export_exclusions(conn, output_dir: Path, dry_run: bool = False) -> int:
     return len(df)
 
 
+def export_cluster_exclusions(conn, output_dir: Path, dry_run: bool = False) -> int:
+    """
+    Export NPPES organizations that entity resolution placed in the same
+    cluster as an actively excluded business (risk_scores.CLUSTER_EXCLUSIONS_SQL).
+
+    Required columns: npi. Skipped when entity_cluster_members is not loaded.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('entity_cluster_members') IS NOT NULL")
+        if not cur.fetchone()[0]:
+            print("  ⚠ entity_cluster_members not loaded — skipping cluster exclusions")
+            return 0
+        cur.execute(CLUSTER_EXCLUSIONS_SQL)
+        rows = cur.fetchall()
+
+    df = pl.DataFrame({"npi": [r[0] for r in rows]}, schema={"npi": pl.Utf8})
+    print(f"  ✓ {len(df):,} organizations resolved to excluded businesses")
+
+    if not dry_run and not df.is_empty():
+        output_path = output_dir / "cluster_exclusions.parquet"
+        df.write_parquet(output_path)
+        print(f"  → {output_path}")
+
+    return len(df)
+
+
+def export_chain_ownership(conn, output_dir: Path, dry_run: bool = False) -> int:
+    """
+    Export per-NPI chain sibling counts and owner exclusions
+    (risk_scores.chain_ownership_query).
+
+    Required columns: npi, chain_provider_count, chain_excluded_count,
+    owner_excluded. Skipped when chain_membership is not loaded (the Modal job
+    then falls back to the Neo4j traversal).
+    """
+    with conn.cursor() as cur:
+        query = chain_ownership_query(cur)
+        if query is None:
+            print("  ⚠ chain_membership not loaded — skipping chain ownership")
+            return 0
+        cur.execute(query)
+        rows = cur.fetchall()
+
+    df = pl.DataFrame(rows, schema=CHAIN_OWNERSHIP_SCHEMA, orient="row")
+    print(f"  ✓ {len(df):,} SNF providers with chain or owner data")
+
+    if not dry_run and not df.is_empty():
+        output_path = output_dir / "chain_ownership.parquet"
+        df.write_parquet(output_path)
+        print(f"  → {output_path}")
+
+    return len(df)
+
+
 def export_payments(
     conn,
     output_dir: Path,
@@ -157,7 +222,7 @@ def export_payments(
     dry_run: bool = False,
 ) -> int:
     """
-    Export payments_combined_v to parquet.
+    Export combined payments (payments_combined, else payments_combined_v) to parquet.
 
     Required columns: npi, year, program, payments, claims, beneficiaries, taxonomy, state
     """
@@ -173,6 +238,8 @@ def export_payments(
         year_filter = ""
         print(f"  → Exporting all years")
 
+    source = payments_relation(conn)
+
     sql = f"""
         SELECT
             npi,
@@ -183,12 +250,12 @@ def export_payments(
             beneficiaries,
             taxonomy,
             state
-        FROM payments_combined_v
+        FROM {source}
         {year_filter}
         ORDER BY npi, year, program
     """
 
-    print("  → Querying payments_combined_v (this may take a few minutes)...")
+    print(f"  → Querying {source} (this may take a few minutes)...")
     with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
         cur.execute(sql)
         rows = cur.fetchall()
@@ -277,6 +344,8 @@ def main() -> None:
         print()
 
         exclusion_count = export_exclusions(conn, output_dir, args.dry_run)
+        cluster_count = export_cluster_exclusions(conn, output_dir, args.dry_run)
+        chain_count = export_chain_ownership(conn, output_dir, args.dry_run)
         print()
 
         payment_count = export_payments(conn, output_dir, args.years, args.dry_run)
@@ -299,6 +368,10 @@ def main() -> None:
             print(f"   modal volume put claidex-data {output_dir}/providers.parquet providers.parquet")
             print(f"   modal volume put claidex-data {output_dir}/payments_combined.parquet payments_combined.parquet")
             print(f"   modal volume put claidex-data {output_dir}/exclusions.parquet exclusions.parquet")
+            if cluster_count:
+                print(f"   modal volume put claidex-data {output_dir}/cluster_exclusions.parquet cluster_exclusions.parquet")
+            if chain_count:
+                print(f"   modal volume put claidex-data {output_dir}/chain_ownership.parquet chain_ownership.parquet")
             print()
             print("2. Run the Modal pipeline:")
             print()
@@ -91,7 +91,7 @@ LABEL_THRESHOLDS = [
 # ---------------------------------------------------------------------------
 
 def get_pg_conn() -> psycopg2.extensions.connection:
-    # Prefer local POSTGRES_URL when set (e.g. Docker) so payments_combined_v is used
+    # Prefer local POSTGRES_URL when set (e.g. Docker) so payments_combined is used
     url = (
         os.environ.get("DATABASE_URL")
         or os.environ.get("POSTGRES_URL")
@@ -174,14 +174,38 @@ def risk_label(score: float) -> str:
     return "Low"
 
 
+def risk_label_expr(score: pl.Expr) -> pl.Expr:
+    """Vectorized :func:`risk_label`: threshold cut over ``LABEL_THRESHOLDS``."""
+    (first_threshold, first_label), *rest = LABEL_THRESHOLDS
+    expr = pl.when(score >= first_threshold).then(pl.lit(first_label))
+    for threshold, label in rest:
+        expr = expr.when(score >= threshold).then(pl.lit(label))
+    return expr.otherwise(pl.lit("Low"))
+
+
+def payments_relation(conn) -> str:
+    """
+    Relation to read combined payments from: the year-partitioned
+    payments_combined table maintained by the Postgres loader, or the
+    payments_combined_v view when it has not been materialized yet.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('payments_combined') IS NOT NULL")
+        if cur.fetchone()[0]:
+            cur.execute("SELECT EXISTS (SELECT 1 FROM payments_combined)")
+            if cur.fetchone()[0]:
+                return "payments_combined"
+    return "payments_combined_v"
+
+
 # ---------------------------------------------------------------------------
 # Step 1 — Load payment data from Postgres
 # ---------------------------------------------------------------------------
 
 def load_payments(conn, npis: Optional[list[str]] = None) -> pl.DataFrame:
     """
-    Load payments_combined_v (or fall back to raw tables if the view does not
-    yet exist) for the requested NPI list or all providers.
+    Load combined payments (see ``payments_relation``) within the scoring
+    window for the requested NPI list or all providers.
     """
     cur_year = datetime.now(timezone.utc).year
     min_year = cur_year - WINDOW_YEARS
@@ -204,7 +228,7 @@ def load_payments(conn, npis: Optional[list[str]] = None) -> pl.DataFrame:
             COALESCE(beneficiaries, 0) AS beneficiaries,
             taxonomy,
             state
-        FROM payments_combined_v
+        FROM {payments_relation(conn)}
         WHERE year >= %s
         {npi_filter}
         ORDER BY npi, year, program
@@ -304,6 +328,32 @@ def load_exclusions(conn, npis: Optional[list[str]] = None) -> pl.DataFrame:
     return pl.DataFrame(rows_data, schema=schema)
 
 
+# NPPES organizations resolved (entity_resolution) into the same entity cluster
+# as an actively excluded LEIE business
+CLUSTER_EXCLUSIONS_SQL = """
+    SELECT DISTINCT m.source_id AS npi
+    FROM entity_cluster_members m
+    JOIN entity_cluster_members b
+      ON b.entity_cluster_id = m.entity_cluster_id AND b.source = 'leie_business'
+    JOIN exclusions x
+      ON x.exclusion_id = b.source_id AND NOT COALESCE(x.reinstated, FALSE)
+    WHERE m.source = 'nppes_org'
+"""
+
+
+def load_cluster_exclusions(conn, npis: Optional[list[str]] = None) -> pl.DataFrame:
+    """(npi) of organizations resolved to an excluded business; empty before entity_resolution has loaded."""
+    schema = {"npi": pl.Utf8}
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass('entity_cluster_members')")
+        if cur.fetchone()[0] is None:
+            return pl.DataFrame(schema=schema)
+        cur.execute(CLUSTER_EXCLUSIONS_SQL)
+        rows = cur.fetchall()
+    df = pl.DataFrame({"npi": [r[0] for r in rows]}, schema=schema)
+    return df.filter(pl.col("npi").is_in(npis)) if npis else df
+
+
 # ---------------------------------------------------------------------------
 # Step 2 — Peer-group robust z-scores per (taxonomy_10, state, year)
 # ---------------------------------------------------------------------------
@@ -615,41 +665,61 @@ def compute_program_concentration(payments: pl.DataFrame) -> pl.DataFrame:
 def compute_exclusion_proximity(
     exclusions_df: pl.DataFrame,
     providers_df: pl.DataFrame,
-    chain_excluded: dict[str, int],   # npi → count of excluded providers in chain
-    owner_excluded: set[str],         # npi set whose direct owner is excluded
+    ownership_df: pl.DataFrame,
+    cluster_exclusions_df: Optional[pl.DataFrame] = None,
 ) -> pl.DataFrame:
     """
     Returns (npi, exclusion_proximity_score).
 
-    Rules:
+    ``ownership_df`` is the output of the ownership stage
+    (npi, chain_excluded_count, owner_excluded, …); ``cluster_exclusions_df``
+    (npi) lists organizations that entity resolution placed in the same
+    cluster as an excluded business.  Each rule is a join against a small
+    frame of matching NPIs, resolved with a when/then cascade:
       - Provider directly excluded        → 100
       - Owning entity directly excluded   →  80
+      - Resolved to an excluded business  →  80
       - Chain contains excluded providers →  50
       - Otherwise                         →   0
     """
     # Direct exclusions from exclusions table (active: reinstated == False)
     if not exclusions_df.is_empty():
-        active_excl = exclusions_df.filter(
+        direct = exclusions_df.filter(
             pl.col("reinstated").fill_null(False) == False  # noqa: E712
-        )
-        directly_excluded: set[str] = set(active_excl["npi"].to_list())
+        ).select("npi")
     else:
-        directly_excluded = set()
-
-    all_npis = providers_df["npi"].to_list()
-    rows = []
-    for npi in all_npis:
-        if npi in directly_excluded:
-            score = 100.0
-        elif npi in owner_excluded:
-            score = 80.0
-        elif chain_excluded.get(npi, 0) > 0:
-            score = 50.0
-        else:
-            score = 0.0
-        rows.append({"npi": npi, "exclusion_proximity_score": score})
+        direct = pl.DataFrame(schema={"npi": pl.Utf8})
 
-    return pl.DataFrame(rows)
+    if not ownership_df.is_empty():
+        owner = ownership_df.filter(pl.col("owner_excluded").fill_null(False)).select("npi")
+        chain = ownership_df.filter(pl.col("chain_excluded_count").fill_null(0) > 0).select("npi")
+    else:
+        owner = pl.DataFrame(schema={"npi": pl.Utf8})
+        chain = pl.DataFrame(schema={"npi": pl.Utf8})
+
+    if cluster_exclusions_df is not None:
+        cluster = cluster_exclusions_df.select(pl.col("npi").cast(pl.Utf8))
+    else:
+        cluster = pl.DataFrame(schema={"npi": pl.Utf8})
+
+    def _flag(npis: pl.DataFrame, name: str) -> pl.DataFrame:
+        return npis.unique().with_columns(pl.lit(True).alias(name))
+
+    return (
+        providers_df.select("npi")
+        .join(_flag(direct, "_direct"), on="npi", how="left")
+        .join(_flag(owner, "_owner"), on="npi", how="left")
+        .join(_flag(cluster, "_cluster"), on="npi", how="left")
+        .join(_flag(chain, "_chain"), on="npi", how="left")
+        .select(
+            "npi",
+            pl.when(pl.col("_direct")).then(100.0)
+            .when(pl.col("_owner") | pl.col("_cluster")).then(80.0)
+            .when(pl.col("_chain")).then(50.0)
+            .otherwise(0.0)
+            .alias("exclusion_proximity_score"),
+        )
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -741,6 +811,239 @@ def compute_ownership_chain_risk(chain_data: dict) -> float:
     return min(100.0, 100.0 * excluded / total)
 
 
+OWNERSHIP_SCHEMA = {
+    "npi": pl.Utf8,
+    "ownership_chain_risk": pl.Float64,
+    "chain_excluded_count": pl.Int64,
+    "owner_excluded": pl.Boolean,
+}
+
+
+def build_ownership_frame(
+    npis: list[str],
+    chain_provider_counts: list[int],
+    chain_excluded_counts: list[int],
+    owner_excluded: list[bool],
+) -> pl.DataFrame:
+    """
+    Assemble the ownership stage output from column lists collected off Neo4j.
+
+    Same formula as :func:`compute_ownership_chain_risk`, applied column-wise.
+    Returns (npi, ownership_chain_risk, chain_excluded_count, owner_excluded).
+    """
+    df = pl.DataFrame(
+        {
+            "npi": npis,
+            "chain_provider_count": chain_provider_counts,
+            "chain_excluded_count": chain_excluded_counts,
+            "owner_excluded": owner_excluded,
+        },
+        schema={
+            "npi": pl.Utf8,
+            "chain_provider_count": pl.Int64,
+            "chain_excluded_count": pl.Int64,
+            "owner_excluded": pl.Boolean,
+        },
+    )
+    return df.with_columns(
+        (
+            100.0 * pl.col("chain_excluded_count")
+            / pl.col("chain_provider_count").clip(lower_bound=1)
+        ).clip(upper_bound=100.0).round(2).alias("ownership_chain_risk")
+    ).select(list(OWNERSHIP_SCHEMA))
+
+
+def empty_ownership_frame(npis: list[str]) -> pl.DataFrame:
+    """Zero ownership risk for every NPI (Neo4j unavailable or query failed)."""
+    return pl.DataFrame({"npi": npis}, schema={"npi": pl.Utf8}).with_columns(
+        pl.lit(0.0).alias("ownership_chain_risk"),
+        pl.lit(0, dtype=pl.Int64).alias("chain_excluded_count"),
+        pl.lit(False).alias("owner_excluded"),
+    )
+
+
+def compute_neo4j_ownership(driver, all_npis: list[str], providers_df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Run :func:`query_neo4j_ownership` for each NPI and return the ownership
+    frame.  Falls back to :func:`empty_ownership_frame` when *driver* is None.
+    """
+    if driver is None:
+        return empty_ownership_frame(all_npis)
+
+    names = (
+        pl.DataFrame({"npi": all_npis}, schema={"npi": pl.Utf8})
+        .join(providers_df.select("npi", "display_name").unique("npi"), on="npi", how="left")
+        .with_columns(pl.col("display_name").fill_null(""))
+    )
+    provider_counts: list[int] = []
+    excluded_counts: list[int] = []
+    owner_excluded: list[bool] = []
+    for i, (npi, name) in enumerate(names.iter_rows()):
+        if i % 500 == 0:
+            print(f"[risk]   …Neo4j {i}/{len(names)}", end="\r")
+        chain_data = query_neo4j_ownership(driver, npi, name)
+        provider_counts.append(chain_data["chain_provider_count"])
+        excluded_counts.append(chain_data["chain_excluded_count"])
+        owner_excluded.append(chain_data["owner_excluded"])
+    print()
+    return build_ownership_frame(
+        names["npi"].to_list(), provider_counts, excluded_counts, owner_excluded
+    )
+
+
+# Chain siblings from chain_membership (etl/transform/chain_membership.py): one
+# self-join on chain_id replaces the OWNS*1..5 traversal. owner_excluded is set
+# when the chain's heading entity or any direct owner of the facility
+# (ownership_snf) is an excluded owner, so SNFs outside every chain are covered
+# too (their NPI comes from the facility's entity cluster).
+CHAIN_OWNERSHIP_SQL = """
+    WITH excluded_owners AS ({excluded_owners}),
+    facility_npis AS (
+        SELECT facility_id, facility_npi AS npi
+        FROM chain_membership
+        WHERE facility_npi IS NOT NULL
+        {cluster_facility_npis}
+    ),
+    chains AS (
+        SELECT m.facility_npi                 AS npi,
+               COUNT(DISTINCT s.facility_npi) AS chain_provider_count,
+               COUNT(DISTINCT x.npi)          AS chain_excluded_count
+        FROM chain_membership m
+        JOIN chain_membership s
+          ON s.chain_id = m.chain_id AND s.facility_npi IS NOT NULL
+        LEFT JOIN exclusions x
+          ON x.npi = s.facility_npi AND NOT COALESCE(x.reinstated, FALSE)
+        WHERE m.facility_npi IS NOT NULL
+        GROUP BY m.facility_npi
+    ),
+    owner_excluded AS (
+        SELECT m.facility_npi AS npi
+        FROM chain_membership m
+        JOIN excluded_owners e ON e.entity_id = m.entity_id
+        WHERE m.facility_npi IS NOT NULL
+        {direct_owners}
+    )
+    SELECT COALESCE(c.npi, o.npi)              AS npi,
+           COALESCE(c.chain_provider_count, 0) AS chain_provider_count,
+           COALESCE(c.chain_excluded_count, 0) AS chain_excluded_count,
+           o.npi IS NOT NULL                   AS owner_excluded
+    FROM chains c
+    FULL JOIN (SELECT DISTINCT npi FROM owner_excluded) o ON o.npi = c.npi
+"""
+
+# SNF owners (entity_id = owner_associate_id) resolved (entity_resolution) to an
+# actively excluded LEIE business
+EXCLUDED_ENTITIES_SQL = """
+    SELECT DISTINCT o.source_id AS entity_id
+    FROM entity_cluster_members o
+    JOIN entity_cluster_members b
+      ON b.entity_cluster_id = o.entity_cluster_id AND b.source = 'leie_business'
+    JOIN exclusions bx
+      ON bx.exclusion_id = b.source_id AND NOT COALESCE(bx.reinstated, FALSE)
+    WHERE o.source = 'snf_owner'
+"""
+
+# SNF organizational / individual owners linked by name (exclusion_matching) to
+# an active exclusion
+MATCHED_OWNERS_SQL = """
+    SELECT DISTINCT nm.target_id AS entity_id
+    FROM exclusion_name_matches nm
+    JOIN exclusions x
+      ON x.exclusion_id = nm.exclusion_id AND NOT COALESCE(x.reinstated, FALSE)
+    WHERE nm.target_type IN ('entity', 'person')
+"""
+
+# SNF facilities resolved to an NPPES organization (NPIs of unchained facilities)
+CLUSTER_FACILITY_NPIS_SQL = """
+    UNION
+    SELECT f.source_id AS facility_id, n.source_id AS npi
+    FROM entity_cluster_members f
+    JOIN entity_cluster_members n
+      ON n.entity_cluster_id = f.entity_cluster_id AND n.source = 'nppes_org'
+    WHERE f.source = 'snf_facility'
+"""
+
+# Facilities with an excluded direct owner
+DIRECT_OWNERS_SQL = """
+    UNION
+    SELECT f.npi
+    FROM facility_npis f
+    JOIN ownership_snf o ON o.provider_associate_id = f.facility_id
+    JOIN excluded_owners e ON e.entity_id = o.owner_associate_id
+"""
+
+CHAIN_OWNERSHIP_SCHEMA = {
+    "npi": pl.Utf8,
+    "chain_provider_count": pl.Int64,
+    "chain_excluded_count": pl.Int64,
+    "owner_excluded": pl.Boolean,
+}
+
+
+def chain_ownership_frame(npis: list[str], chains: pl.DataFrame) -> pl.DataFrame:
+    """Ownership frame for ``npis`` from per-NPI chain counts; NPIs in no chain score 0."""
+    df = (
+        pl.DataFrame({"npi": npis}, schema={"npi": pl.Utf8})
+        .join(chains.select(list(CHAIN_OWNERSHIP_SCHEMA)).unique("npi"), on="npi", how="left")
+        .with_columns(
+            pl.col("chain_provider_count").fill_null(0),
+            pl.col("chain_excluded_count").fill_null(0),
+            pl.col("owner_excluded").fill_null(False),
+        )
+    )
+    return build_ownership_frame(
+        df["npi"].to_list(),
+        df["chain_provider_count"].to_list(),
+        df["chain_excluded_count"].to_list(),
+        df["owner_excluded"].to_list(),
+    )
+
+
+def chain_ownership_query(cur) -> Optional[str]:
+    """CHAIN_OWNERSHIP_SQL over the tables loaded, or None without chain_membership.
+
+    Each optional table (entity clusters, name matches, ownership_snf) only
+    drops the owner / NPI sources that depend on it.
+    """
+    tables = ["chain_membership", "entity_cluster_members", "exclusion_name_matches", "ownership_snf"]
+    cur.execute("SELECT t, to_regclass(t) IS NOT NULL FROM unnest(%s::text[]) AS t", (tables,))
+    loaded = {t for t, exists in cur.fetchall() if exists}
+    if "chain_membership" not in loaded:
+        return None
+    owner_sources = [
+        sql for table, sql in (("entity_cluster_members", EXCLUDED_ENTITIES_SQL),
+                               ("exclusion_name_matches", MATCHED_OWNERS_SQL))
+        if table in loaded
+    ]
+    return CHAIN_OWNERSHIP_SQL.format(
+        excluded_owners=" UNION ".join(owner_sources) or "SELECT NULL::text AS entity_id WHERE FALSE",
+        cluster_facility_npis=CLUSTER_FACILITY_NPIS_SQL if "entity_cluster_members" in loaded else "",
+        direct_owners=DIRECT_OWNERS_SQL if "ownership_snf" in loaded else "",
+    )
+
+
+def load_chain_ownership(conn, npis: list[str]) -> Optional[pl.DataFrame]:
+    """Ownership frame from chain_membership, or None when it has not been loaded."""
+    with conn.cursor() as cur:
+        query = chain_ownership_query(cur)
+        if query is None:
+            return None
+        cur.execute(query)
+        rows = cur.fetchall()
+    chains = pl.DataFrame(rows, schema=CHAIN_OWNERSHIP_SCHEMA, orient="row")
+    return chain_ownership_frame(npis, chains)
+
+
+def compute_ownership(conn, driver, all_npis: list[str], providers_df: pl.DataFrame) -> pl.DataFrame:
+    """Chain ownership from chain_membership when loaded, else the Neo4j traversal."""
+    ownership_df = load_chain_ownership(conn, all_npis)
+    if ownership_df is not None:
+        print("[risk]   chain siblings from chain_membership")
+        return ownership_df
+    print("[risk]   chain_membership not loaded — traversing Neo4j")
+    return compute_neo4j_ownership(driver, all_npis, providers_df)
+
+
 # ---------------------------------------------------------------------------
 # Step 8 — Generate human-readable flags
 # ---------------------------------------------------------------------------
@@ -782,42 +1085,78 @@ def generate_flags(
 # Step 9 — Composite scoring + global calibration
 # ---------------------------------------------------------------------------
 
-def compute_composite(scores: pl.DataFrame) -> pl.DataFrame:
-    """
-    Apply component weights, compute R_raw, then calibrate to a global
-    percentile rank scaled to [0, 100].
+def r_raw_expr() -> pl.Expr:
+    """Weighted sum of the five component scores (pre-calibration R_raw)."""
+    return pl.sum_horizontal(
+        pl.col(component) * weight for component, weight in WEIGHTS.items()
+    ).alias("r_raw")
+
+
+def calibrate_scores(scores: pl.DataFrame) -> pl.DataFrame:
     """
-    scores = scores.with_columns([
-        (
-            pl.col("billing_outlier_score")       * WEIGHTS["billing_outlier_score"] +
-            pl.col("ownership_chain_risk")         * WEIGHTS["ownership_chain_risk"] +
-            pl.col("payment_trajectory_score")     * WEIGHTS["payment_trajectory_score"] +
-            pl.col("exclusion_proximity_score")    * WEIGHTS["exclusion_proximity_score"] +
-            pl.col("program_concentration_score")  * WEIGHTS["program_concentration_score"]
-        ).alias("r_raw"),
-    ])
+    Global calibration: risk_score = PERCENT_RANK(r_raw) scaled to [0, 100],
+    risk_label from ``LABEL_THRESHOLDS``.
 
-    # Global PERCENT_RANK calibration — rescale r_raw to [0, 100]
-    r_raw_arr = scores["r_raw"].to_numpy()
-    n = len(r_raw_arr)
+    Ties share the minimum rank (SQL PERCENT_RANK semantics), so equal r_raw
+    values always receive equal scores regardless of input order.  Shared by
+    :func:`run`, :func:`_run_pipeline` and the Modal merge step.
+    """
+    n = scores.height
     if n > 1:
-        # For each value, percent_rank = rank / (n - 1) (using dense rank via argsort)
-        order = np.argsort(r_raw_arr)
-        rank_arr = np.empty(n, dtype=float)
-        rank_arr[order] = np.arange(n) / (n - 1)
-        calibrated = (rank_arr * 100.0).round(2)
+        pct = (pl.col("r_raw").rank(method="min") - 1) / (n - 1)
     else:
-        calibrated = (r_raw_arr / max(r_raw_arr.max(), 1) * 100.0).round(2)
+        pct = pl.col("r_raw") / pl.col("r_raw").max().clip(lower_bound=1)
+    return scores.with_columns(
+        (pct * 100.0).round(2).alias("risk_score")
+    ).with_columns(
+        risk_label_expr(pl.col("risk_score")).alias("risk_label")
+    )
 
-    scores = scores.with_columns(
-        pl.Series("risk_score", calibrated.tolist())
+
+def build_calibration_table(scores: pl.DataFrame) -> pl.DataFrame:
+    """
+    Exact calibration breakpoints from calibrated *scores*: one row per
+    distinct r_raw, ascending, with the risk_score it was assigned.
+
+    A new NPI scores as the risk_score of the largest breakpoint <= its r_raw
+    (see :func:`apply_calibration`), without re-ranking the population.
+    """
+    return (
+        scores
+        .group_by("r_raw")
+        .agg(pl.col("risk_score").first())
+        .sort("r_raw")
+        .with_columns(risk_label_expr(pl.col("risk_score")).alias("risk_label"))
     )
-    scores = scores.with_columns(
-        pl.col("risk_score").map_elements(
-            risk_label, return_dtype=pl.Utf8
-        ).alias("risk_label")
+
+
+def apply_calibration(scores: pl.DataFrame, calibration: pl.DataFrame) -> pl.DataFrame:
+    """
+    Score *scores* (must carry r_raw) against a previous calibration table.
+    Values below the lowest breakpoint score 0.
+    """
+    return (
+        scores
+        .with_row_index("_order")
+        .sort("r_raw")
+        .join_asof(
+            calibration.select("r_raw", "risk_score").sort("r_raw"),
+            on="r_raw",
+            strategy="backward",
+        )
+        .sort("_order")
+        .drop("_order")
+        .with_columns(pl.col("risk_score").fill_null(0.0))
+        .with_columns(risk_label_expr(pl.col("risk_score")).alias("risk_label"))
     )
-    return scores
+
+
+def compute_composite(scores: pl.DataFrame) -> pl.DataFrame:
+    """
+    Apply component weights, compute R_raw, then calibrate to a global
+    percentile rank scaled to [0, 100] via :func:`calibrate_scores`.
+    """
+    return calibrate_scores(scores.with_columns(r_raw_expr()))
 
 
 # ---------------------------------------------------------------------------
@@ -867,6 +1206,20 @@ def upsert_risk_scores(conn, rows: list[dict]) -> None:
     conn.commit()
 
 
+def write_calibration_table(conn, calibration: pl.DataFrame) -> None:
+    """Replace ``risk_score_calibration`` with the breakpoints of this run."""
+    rows = calibration.select("r_raw", "risk_score", "risk_label").rows()
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE risk_score_calibration")
+        psycopg2.extras.execute_values(
+            cur,
+            "INSERT INTO risk_score_calibration (r_raw, risk_score, risk_label) VALUES %s",
+            rows,
+            page_size=5000,
+        )
+    conn.commit()
+
+
 # ---------------------------------------------------------------------------
 # Main orchestration
 # ---------------------------------------------------------------------------
@@ -878,10 +1231,13 @@ def _run_pipeline(
     output_conn,           # psycopg2 connection for upsert (closed by caller)
     neo4j_driver=None,
     dry_run: bool = False,
+    write_calibration: bool = True,
 ) -> pl.DataFrame:
     """
     Core compute pipeline operating on pre-loaded DataFrames.
     ``output_conn`` must be open; the caller is responsible for closing it.
+    ``write_calibration`` replaces ``risk_score_calibration`` on upsert; turn it
+    off for NPI-subset runs, whose ranks are not global.
     Returns the final scores DataFrame.
     """
     all_npis = payments["npi"].unique().to_list()
@@ -921,49 +1277,17 @@ def _run_pipeline(
     )
 
     # ------------------------------------------------------------------
-    # Components 2 & 4 — Neo4j (ownership chain + exclusion proximity)
+    # Components 2 & 4 — ownership chain (chain_membership, else Neo4j)
     # ------------------------------------------------------------------
-    print("[risk] Computing Neo4j ownership chain risk…")
-    chain_excluded_counts: dict[str, int] = {}
-    owner_excluded_set: set[str] = set()
-    ownership_risk_rows: list[dict] = []
-
-    if neo4j_driver is not None:
-        name_lookup: dict[str, str] = {}
-        for row in providers_df.iter_rows(named=True):
-            name_lookup[row["npi"]] = row.get("display_name") or ""
-
-        for i, npi in enumerate(all_npis):
-            if i % 500 == 0:
-                print(f"[risk]   …Neo4j {i}/{len(all_npis)}", end="\r")
-            name = name_lookup.get(npi, "")
-            chain_data = query_neo4j_ownership(neo4j_driver, npi, name)
-            oc_risk = compute_ownership_chain_risk(chain_data)
-            chain_excluded_counts[npi] = chain_data["chain_excluded_count"]
-            if chain_data["owner_excluded"]:
-                owner_excluded_set.add(npi)
-            ownership_risk_rows.append({
-                "npi": npi,
-                "ownership_chain_risk": round(oc_risk, 2),
-                "chain_excluded_count": chain_data["chain_excluded_count"],
-            })
-        print()
-    else:
-        for npi in all_npis:
-            ownership_risk_rows.append({
-                "npi": npi,
-                "ownership_chain_risk": 0.0,
-                "chain_excluded_count": 0,
-            })
-
-    ownership_df = pl.DataFrame(ownership_risk_rows)
+    print("[risk] Computing ownership chain risk…")
+    ownership_df = compute_ownership(output_conn, neo4j_driver, all_npis, providers_df)
 
     # ------------------------------------------------------------------
     # Component 4 — exclusion proximity
     # ------------------------------------------------------------------
     print("[risk] Computing exclusion proximity scores…")
     excl_prox_df = compute_exclusion_proximity(
-        exclusions_df, providers_df, chain_excluded_counts, owner_excluded_set
+        exclusions_df, providers_df, ownership_df, load_cluster_exclusions(output_conn, all_npis)
     )
 
     # ------------------------------------------------------------------
@@ -972,6 +1296,7 @@ def _run_pipeline(
     print("[risk] Merging components…")
     scores = billing_df
 
+    ownership_df = ownership_df.drop("owner_excluded")
     for df in (trajectory_df, conc_df, ownership_df, excl_prox_df, top_program_df):
         if not df.is_empty():
             common_cols = set(scores.columns) & set(df.columns) - {"npi"}
@@ -1047,6 +1372,8 @@ def _run_pipeline(
     if not dry_run:
         print("[risk] Upserting to provider_risk_scores…")
         upsert_risk_scores(output_conn, upsert_rows)
+        if write_calibration:
+            write_calibration_table(output_conn, build_calibration_table(scores))
         print("[risk] Upsert complete.")
     else:
         print("[risk] Dry run — skipping DB write.")
@@ -1106,6 +1433,7 @@ def run_from_frames(
         scores = _run_pipeline(
             payments, providers_df, exclusions_df,
             output_conn=conn, neo4j_driver=neo4j_driver, dry_run=dry_run,
+            write_calibration=not npis,
         )
     finally:
         conn.close()
@@ -1157,6 +1485,8 @@ def run(npis: Optional[list[str]] = None, dry_run: bool = False) -> pl.DataFrame
     print("[risk] Loading exclusions…")
     exclusions_df = load_exclusions(conn, all_npis)
     print(f"[risk]   {len(exclusions_df):,} exclusion rows")
+    cluster_exclusions_df = load_cluster_exclusions(conn, all_npis)
+    print(f"[risk]   {len(cluster_exclusions_df):,} organizations resolved to excluded businesses")
 
     # ------------------------------------------------------------------
     # Component 1 & billing percentile
@@ -1194,51 +1524,16 @@ def run(npis: Optional[list[str]] = None, dry_run: bool = False) -> pl.DataFrame
     )
 
     # ------------------------------------------------------------------
-    # Components 2 & 4 — Neo4j (ownership chain + exclusion proximity)
+    # Components 2 & 4 — ownership chain (chain_membership, else Neo4j)
     # ------------------------------------------------------------------
-    print("[risk] Computing Neo4j ownership chain risk…")
-    chain_excluded_counts: dict[str, int] = {}
-    owner_excluded_set: set[str] = set()
-    ownership_risk_rows: list[dict] = []
-
-    if neo4j_driver is not None:
-        # Build a npi → display_name lookup
-        name_lookup: dict[str, str] = {}
-        for row in providers_df.iter_rows(named=True):
-            name_lookup[row["npi"]] = row.get("display_name") or ""
-
-        for i, npi in enumerate(all_npis):
-            if i % 500 == 0:
-                print(f"[risk]   …Neo4j {i}/{len(all_npis)}", end="\r")
-            name = name_lookup.get(npi, "")
-            chain_data = query_neo4j_ownership(neo4j_driver, npi, name)
-            oc_risk = compute_ownership_chain_risk(chain_data)
-            chain_excluded_counts[npi] = chain_data["chain_excluded_count"]
-            if chain_data["owner_excluded"]:
-                owner_excluded_set.add(npi)
-            ownership_risk_rows.append({
-                "npi": npi,
-                "ownership_chain_risk": round(oc_risk, 2),
-                "chain_excluded_count": chain_data["chain_excluded_count"],
-            })
-        print()
-    else:
-        for npi in all_npis:
-            ownership_risk_rows.append({
-                "npi": npi,
-                "ownership_chain_risk": 0.0,
-                "chain_excluded_count": 0,
-            })
-
-    ownership_df = pl.DataFrame(ownership_risk_rows)
+    print("[risk] Computing ownership chain risk…")
+    ownership_df = compute_ownership(conn, neo4j_driver, all_npis, providers_df)
 
     # ------------------------------------------------------------------
     # Component 4 — exclusion proximity
     # ------------------------------------------------------------------
     print("[risk] Computing exclusion proximity scores…")
-    excl_prox_df = compute_exclusion_proximity(
-        exclusions_df, providers_df, chain_excluded_counts, owner_excluded_set
-    )
+    excl_prox_df = compute_exclusion_proximity(exclusions_df, providers_df, ownership_df, cluster_exclusions_df)
 
     # ------------------------------------------------------------------
     # Merge all components
@@ -1246,6 +1541,7 @@ def run(npis: Optional[list[str]] = None, dry_run: bool = False) -> pl.DataFrame
     print("[risk] Merging components…")
     scores = billing_df  # has npi, peer_taxonomy, peer_state, peer_count, data_window_years
 
+    ownership_df = ownership_df.drop("owner_excluded")
     for df in (trajectory_df, conc_df, ownership_df, excl_prox_df, top_program_df):
         if not df.is_empty():
             common_cols = set(scores.columns) & set(df.columns) - {"npi"}
@@ -1322,6 +1618,8 @@ def run(npis: Optional[list[str]] = None, dry_run: bool = False) -> pl.DataFrame
     if not dry_run:
         print("[risk] Upserting to provider_risk_scores…")
         upsert_risk_scores(conn, upsert_rows)
+        if not npis:
+            write_calibration_table(conn, build_calibration_table(scores))
         print("[risk] Upsert complete.")
     else:
         print("[risk] Dry run — skipping DB write.")
@@ -0,0 +1,493 @@
+"""
+Claidex roster screening — bulk LEIE / risk-score screen of an NPI roster
+========================================================================
+
+Screens a roster CSV (100k–2M rows of NPIs and/or names) offline against:
+
+  LEIE current state        exclusions/leie_current.parquet (leie_ingest)
+  LEIE name-match links     exclusions/exclusion_name_matches.parquet
+                            (exclusion_matching; NPI-less exclusions linked
+                            to NPPES providers)
+  Provider risk scores      RISK_SCORES_PATH (merged Modal output,
+                            default results/final.parquet)
+
+Index (data/processed/screening/, uncompressed Arrow IPC, memory-mapped):
+
+  exclusion_npis.arrow  NPI → exclusion, sorted by NPI (Int64). Exact hits
+                        are two ``np.searchsorted`` calls per roster batch.
+  risk_scores.arrow     NPI → risk_score / risk_label, sorted by NPI.
+  leie_persons.arrow    LEIE individuals keyed like exclusion_matching
+  leie_orgs.arrow       LEIE businesses keyed like exclusion_matching
+                        (token blocks); fuzzy name hits reuse its blocked
+                        matchers with the roster on the left.
+
+The index is rebuilt when a source is newer than it (or with
+``--rebuild-index``). The roster is streamed in ``SCREEN_BATCH_ROWS`` batches
+and up to ``--workers`` batches are screened concurrently; Polars
+parallelizes the joins within each batch.
+
+Roster columns (header, case-insensitive; all optional but at least one of
+npi / last_name / org_name is needed): npi, last_name, first_name,
+middle_name, org_name (or business_name), city, state.
+
+Report (Parquet or CSV by extension), one row per hit:
+  roster_row, [roster_id], roster_npi, hit_type, exclusion_id, match_method,
+  confidence, excl_type, excldate, reinstated, risk_score, risk_label
+hit_type: exclusion_npi | exclusion_name | high_risk
+
+Usage
+-----
+    claidex screen roster.csv -o hits.parquet
+    python -m etl.compute.roster_screen roster.csv -o hits.csv --id-column member_id
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from etl.compute.exclusion_matching import match_businesses, match_individuals
+from etl.transform.name_normalizer import (
+    first_token,
+    normalize_name,
+    org_key,
+    state_code,
+)
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+# Resolve from repo root: the claidex wrapper runs in the caller's directory
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _repo_path(value: str) -> Path:
+    return Path(value) if Path(value).is_absolute() else _REPO_ROOT / value
+
+
+PROCESSED = _repo_path(os.environ.get("DATA_PROCESSED", "data/processed"))
+LEIE_PATH = PROCESSED / "exclusions" / "leie_current.parquet"
+MATCHES_PATH = PROCESSED / "exclusions" / "exclusion_name_matches.parquet"
+RISK_SCORES_PATH = _repo_path(os.environ.get("RISK_SCORES_PATH", "results/final.parquet"))
+INDEX_DIR = PROCESSED / "screening"
+
+# Roster rows per streamed batch
+SCREEN_BATCH_ROWS = int(os.environ.get("SCREEN_BATCH_ROWS", "250000"))
+# Risk score at or above which a roster NPI is reported as high_risk
+SCREEN_MIN_RISK = float(os.environ.get("SCREEN_MIN_RISK", "80"))
+
+ROSTER_COLUMNS = ["npi", "last_name", "first_name", "middle_name", "org_name", "city", "state"]
+_ROSTER_ALIASES = {"business_name": "org_name", "organization_name": "org_name"}
+
+REPORT_SCHEMA = {
+    "roster_row": pl.Int64, "roster_npi": pl.Utf8, "hit_type": pl.Utf8,
+    "exclusion_id": pl.Utf8, "match_method": pl.Utf8, "confidence": pl.Float64,
+    "excl_type": pl.Utf8, "excldate": pl.Date, "reinstated": pl.Boolean,
+    "risk_score": pl.Float64, "risk_label": pl.Utf8,
+}
+
+_EXCLUSION_DETAIL = ["exclusion_id", "excl_type", "excldate", "reinstated"]
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+def _npi_int(expr: pl.Expr) -> pl.Expr:
+    """10-digit NPI string → Int64 (null when not numeric)."""
+    return expr.cast(pl.Utf8).str.strip_chars().cast(pl.Int64, strict=False)
+
+
+def build_index(
+    leie: pl.DataFrame,
+    name_matches: pl.DataFrame | None = None,
+    risk: pl.DataFrame | None = None,
+) -> dict[str, pl.DataFrame]:
+    """Screening index tables from LEIE current state, name matches and risk scores."""
+    detail = leie.select(
+        "exclusion_id",
+        pl.col("excl_type").str.strip_chars().str.to_lowercase(),
+        "excldate",
+        pl.col("reinstated").fill_null(False),
+    )
+    by_npi = leie.filter(_npi_int(pl.col("npi")).is_not_null()).select(
+        _npi_int(pl.col("npi")).alias("npi"), "exclusion_id",
+        pl.lit("npi").alias("match_method"), pl.lit(1.0).alias("confidence"),
+    )
+    frames = [by_npi]
+    if name_matches is not None and not name_matches.is_empty():
+        frames.append(
+            name_matches.filter(pl.col("target_type") == "provider").select(
+                _npi_int(pl.col("target_id")).alias("npi"), "exclusion_id",
+                "match_method", pl.col("confidence").cast(pl.Float64),
+            ).drop_nulls("npi")
+        )
+    exclusion_npis = (
+        pl.concat(frames)
+        .unique(subset=["npi", "exclusion_id"], keep="first", maintain_order=True)
+        .join(detail, on="exclusion_id", how="inner")
+        .sort("npi")
+    )
+
+    if risk is None:
+        risk = pl.DataFrame(schema={"npi": pl.Utf8, "risk_score": pl.Float64, "risk_label": pl.Utf8})
+    risk_scores = (
+        risk.select(_npi_int(pl.col("npi")).alias("npi"),
+                    pl.col("risk_score").cast(pl.Float64), pl.col("risk_label").cast(pl.Utf8))
+        .drop_nulls("npi")
+        .unique(subset=["npi"], keep="last")
+        .sort("npi")
+    )
+
+    has_business = pl.col("business_name").is_not_null() & (pl.col("business_name").str.strip_chars() != "")
+    persons = leie.filter(~has_business & pl.col("last_name").is_not_null()).select(
+        pl.lit("exclusion").alias("target_type"),
+        pl.col("exclusion_id").alias("target_id"),
+        normalize_name(pl.col("last_name")).alias("t_last_name"),
+        first_token(normalize_name(pl.col("first_name"))).alias("t_first_name"),
+        normalize_name(pl.col("middle_name")).str.slice(0, 1).alias("t_middle_initial"),
+        normalize_name(pl.col("city")).alias("t_city"),
+        state_code(pl.col("state")).alias("state"),
+    )
+    orgs = leie.filter(has_business).select(
+        pl.lit("exclusion").alias("target_type"),
+        pl.col("exclusion_id").alias("target_id"),
+        org_key(pl.col("business_name")).alias("t_org_key"),
+        state_code(pl.col("state")).alias("state"),
+    )
+    return {
+        "exclusion_npis": exclusion_npis,
+        "risk_scores": risk_scores,
+        "leie_persons": persons,
+        "leie_orgs": orgs,
+        "exclusion_detail": detail,
+    }
+
+
+def _index_sources() -> list[Path]:
+    return [p for p in (LEIE_PATH, MATCHES_PATH, RISK_SCORES_PATH) if p.exists()]
+
+
+def _index_is_stale(index_dir: Path) -> bool:
+    marker = index_dir / "exclusion_npis.arrow"
+    if not marker.exists():
+        return True
+    built = marker.stat().st_mtime
+    return any(p.stat().st_mtime > built for p in _index_sources())
+
+
+def write_index(index_dir: Path = INDEX_DIR) -> None:
+    if not LEIE_PATH.exists():
+        raise FileNotFoundError(f"Run leie_ingest.py first: {LEIE_PATH}")
+    tables = build_index(
+        pl.read_parquet(LEIE_PATH),
+        pl.read_parquet(MATCHES_PATH) if MATCHES_PATH.exists() else None,
+        pl.read_parquet(RISK_SCORES_PATH, columns=["npi", "risk_score", "risk_label"])
+        if RISK_SCORES_PATH.exists() else None,
+    )
+    index_dir.mkdir(parents=True, exist_ok=True)
+    # exclusion_npis last: its mtime marks the index as complete
+    for name in sorted(tables, key=lambda n: n == "exclusion_npis"):
+        staged = index_dir / f".{name}.arrow"
+        tables[name].write_ipc(staged, compression="uncompressed")  # mmap needs uncompressed
+        os.replace(staged, index_dir / f"{name}.arrow")
+    print(
+        f"[screen] Index built: {len(tables['exclusion_npis']):,} NPI→exclusion links, "
+        f"{len(tables['risk_scores']):,} risk scores, {len(tables['leie_persons']):,} LEIE individuals, "
+        f"{len(tables['leie_orgs']):,} LEIE businesses"
+    )
+
+
+def _mmap_ipc(path: Path) -> pl.DataFrame:
+    """Zero-copy DataFrame over a memory-mapped, uncompressed Arrow IPC file."""
+    # the map stays open for as long as the returned buffers reference it
+    return pl.from_arrow(pa.ipc.open_file(pa.memory_map(str(path))).read_all())
+
+
+@dataclass
+class ScreenIndex:
+    exclusion_npis: pl.DataFrame
+    risk_scores: pl.DataFrame
+    leie_persons: pl.DataFrame
+    leie_orgs: pl.DataFrame
+    exclusion_detail: pl.DataFrame
+
+    @classmethod
+    def open(cls, index_dir: Path = INDEX_DIR) -> "ScreenIndex":
+        return cls(**{name: _mmap_ipc(index_dir / f"{name}.arrow") for name in cls.__dataclass_fields__})
+
+    @classmethod
+    def from_tables(cls, tables: dict[str, pl.DataFrame]) -> "ScreenIndex":
+        return cls(**tables)
+
+    def __post_init__(self) -> None:
+        self._excl_npis = self.exclusion_npis["npi"].to_numpy()
+        self._risk_npis = self.risk_scores["npi"].to_numpy()
+
+
+# ---------------------------------------------------------------------------
+# Screening
+# ---------------------------------------------------------------------------
+
+def _sorted_lookup(keys: np.ndarray, queries: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """All (query position, key position) pairs with keys[k] == queries[q].
+
+    ``keys`` is sorted; duplicate keys yield one pair each.
+    """
+    lo = np.searchsorted(keys, queries, side="left")
+    hi = np.searchsorted(keys, queries, side="right")
+    counts = hi - lo
+    q_pos = np.repeat(np.arange(len(queries)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return q_pos, np.repeat(lo, counts) + offsets
+
+
+def normalize_roster(df: pl.DataFrame) -> pl.DataFrame:
+    """Roster batch → ROSTER_COLUMNS (lower-cased headers, missing columns null)."""
+    df = df.rename({c: _ROSTER_ALIASES.get(c.strip().lower(), c.strip().lower()) for c in df.columns})
+    return df.select(
+        "roster_row",
+        *[pl.col(c).cast(pl.Utf8) if c in df.columns else pl.lit(None, dtype=pl.Utf8).alias(c)
+          for c in ROSTER_COLUMNS],
+    )
+
+
+def screen_batch(
+    roster: pl.DataFrame,
+    index: ScreenIndex,
+    min_risk: float = SCREEN_MIN_RISK,
+    include_reinstated: bool = False,
+) -> pl.DataFrame:
+    """Hits for one normalized roster batch (``roster_row`` + ROSTER_COLUMNS).
+
+    Reinstated exclusions are only reported with ``include_reinstated``.
+    """
+    roster = roster.with_columns(
+        pl.col("npi").str.strip_chars().alias("roster_npi"),
+        _npi_int(pl.col("npi")).alias("_npi"),
+    )
+    frames = []
+
+    # Exact NPI hits: sorted-array membership on the memory-mapped index
+    with_npi = roster.filter(pl.col("_npi").is_not_null())
+    q_pos, k_pos = _sorted_lookup(index._excl_npis, with_npi["_npi"].to_numpy())
+    if len(q_pos):
+        frames.append(pl.concat([
+            with_npi[q_pos].select("roster_row", "roster_npi"),
+            index.exclusion_npis[k_pos].select("exclusion_id", "match_method", "confidence", *_EXCLUSION_DETAIL[1:]),
+        ], how="horizontal").with_columns(pl.lit("exclusion_npi").alias("hit_type")))
+
+    # Fuzzy name hits through the exclusion_matching blocks
+    individuals = roster.filter(pl.col("last_name").is_not_null() & pl.col("org_name").is_null()).select(
+        "roster_row",
+        normalize_name(pl.col("last_name")).alias("last_name"),
+        first_token(normalize_name(pl.col("first_name"))).alias("first_name"),
+        normalize_name(pl.col("middle_name")).str.slice(0, 1).alias("middle_initial"),
+        normalize_name(pl.col("city")).alias("city"),
+        state_code(pl.col("state")).alias("state"),
+    )
+    businesses = roster.filter(pl.col("org_name").is_not_null()).select(
+        "roster_row",
+        org_key(pl.col("org_name")).alias("org_key"),
+        state_code(pl.col("state")).alias("state"),
+    )
+    named = pl.concat([
+        match_individuals(individuals.lazy(), index.leie_persons.lazy(), left_key="roster_row"),
+        match_businesses(businesses.lazy(), index.leie_orgs.lazy(), left_key="roster_row"),
+    ]).collect()
+    if not named.is_empty():
+        frames.append(
+            named.rename({"target_id": "exclusion_id"})
+            .join(index.exclusion_detail, on="exclusion_id", how="inner")
+            .join(roster.select("roster_row", "roster_npi"), on="roster_row", how="left")
+            .select("roster_row", "roster_npi", "exclusion_id", "match_method", "confidence", *_EXCLUSION_DETAIL[1:])
+            .with_columns(pl.lit("exclusion_name").alias("hit_type"))
+        )
+
+    # Risk scores for every roster NPI; high scores are hits on their own
+    q_pos, k_pos = _sorted_lookup(index._risk_npis, with_npi["_npi"].to_numpy())
+    risk = pl.concat([
+        with_npi[q_pos].select("roster_row", "roster_npi"),
+        index.risk_scores[k_pos].select("risk_score", "risk_label"),
+    ], how="horizontal")
+    frames.append(
+        risk.filter(pl.col("risk_score") >= min_risk)
+        .select("roster_row", "roster_npi", pl.lit("high_risk").alias("hit_type"))
+    )
+
+    hits = pl.concat(frames, how="diagonal_relaxed")
+    hits = hits.select([
+        pl.col(c).cast(t) if c in hits.columns else pl.lit(None, dtype=t).alias(c)
+        for c, t in REPORT_SCHEMA.items() if c not in ("risk_score", "risk_label")
+    ])
+    if not include_reinstated:
+        hits = hits.filter(~pl.col("reinstated").fill_null(False))
+    return (
+        hits
+        # a name hit on an exclusion already hit by NPI adds nothing
+        .unique(subset=["roster_row", "exclusion_id"], keep="first", maintain_order=True)
+        .join(risk.select("roster_row", "risk_score", "risk_label"), on="roster_row", how="left")
+        .select(list(REPORT_SCHEMA))
+        .sort("roster_row", "hit_type")
+    )
+
+
+def _roster_batches(path: Path, batch_rows: int):
+    """Stream the roster CSV as Polars frames of ~batch_rows rows with a running roster_row."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    reader = pa_csv.open_csv(
+        path,
+        # every column as text: NPIs keep leading zeros, IDs are not reinterpreted
+        convert_options=pa_csv.ConvertOptions(
+            column_types={c: pa.string() for c in header}, strings_can_be_null=True,
+        ),
+        read_options=pa_csv.ReadOptions(block_size=16 * 1024 * 1024),
+    )
+    offset = 0
+    pending: list[pa.RecordBatch] = []
+    pending_rows = 0
+
+    def flush():
+        nonlocal offset, pending, pending_rows
+        df = pl.from_arrow(pa.Table.from_batches(pending))
+        df = df.with_row_index("roster_row", offset=offset).with_columns(pl.col("roster_row").cast(pl.Int64))
+        offset += len(df)
+        pending, pending_rows = [], 0
+        return df
+
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= batch_rows:
+            yield flush()
+    if pending_rows:
+        yield flush()
+
+
+class _ReportWriter:
+    """Appends hit batches to a Parquet or CSV report."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.rows = 0
+        self._writer = None
+
+    def write(self, df: pl.DataFrame) -> None:
+        table = df.to_arrow()
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.suffix == ".parquet":
+                self._writer = pq.ParquetWriter(self.path, table.schema, compression="zstd")
+            else:
+                self._writer = pa_csv.CSVWriter(self.path, table.schema)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    @property
+    def started(self) -> bool:
+        return self._writer is not None
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def screen(
+    roster_path: Path,
+    out_path: Path,
+    id_column: str | None = None,
+    workers: int | None = None,
+    batch_rows: int = SCREEN_BATCH_ROWS,
+    min_risk: float = SCREEN_MIN_RISK,
+    include_reinstated: bool = False,
+    rebuild_index: bool = False,
+    index_dir: Path = INDEX_DIR,
+) -> int:
+    """Screen ``roster_path`` and write the hit report to ``out_path``; returns hit count."""
+    if rebuild_index or _index_is_stale(index_dir):
+        write_index(index_dir)
+    index = ScreenIndex.open(index_dir)
+
+    t0 = time.time()
+    writer = _ReportWriter(out_path)
+    workers = workers or os.cpu_count() or 1
+    n_rows = 0
+
+    def run(batch: pl.DataFrame) -> pl.DataFrame:
+        roster = normalize_roster(batch.drop(id_column) if id_column else batch)
+        hits = screen_batch(roster, index, min_risk, include_reinstated)
+        if id_column:
+            hits = hits.join(batch.select("roster_row", pl.col(id_column).alias("roster_id")),
+                             on="roster_row", how="left")
+            hits = hits.select("roster_row", "roster_id", *[c for c in hits.columns if c not in ("roster_row", "roster_id")])
+        return hits
+
+    # Bounded in-flight window keeps memory at ~workers batches
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        inflight: deque = deque()
+        for batch in _roster_batches(roster_path, batch_rows):
+            n_rows += len(batch)
+            inflight.append(pool.submit(run, batch))
+            if len(inflight) >= workers:
+                writer.write(inflight.popleft().result())
+        while inflight:
+            writer.write(inflight.popleft().result())
+    if not writer.started:
+        # Empty roster: header-only report with the columns run() would produce
+        schema = dict(REPORT_SCHEMA)
+        if id_column:
+            schema = {"roster_row": schema.pop("roster_row"), "roster_id": pl.Utf8, **schema}
+        writer.write(pl.DataFrame(schema=schema))
+    writer.close()
+
+    print(f"[screen] {n_rows:,} roster rows → {writer.rows:,} hits in {time.time() - t0:.1f}s → {out_path}")
+    return writer.rows
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("roster", type=Path, help="Roster CSV (npi and/or name columns)")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="Hit report, .parquet or .csv (default: <roster>_hits.parquet)")
+    parser.add_argument("--id-column", default=None, help="Roster column carried into the report as roster_id")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent batches (default: all cores)")
+    parser.add_argument("--batch-rows", type=int, default=SCREEN_BATCH_ROWS, help="Roster rows per batch")
+    parser.add_argument("--min-risk", type=float, default=SCREEN_MIN_RISK,
+                        help="Risk score reported as a high_risk hit")
+    parser.add_argument("--include-reinstated", action="store_true",
+                        help="Also report exclusions that have been reinstated")
+    parser.add_argument("--rebuild-index", action="store_true", help="Rebuild the screening index first")
+
+
+def run_args(args: argparse.Namespace) -> None:
+    out = args.output or args.roster.with_name(f"{args.roster.stem}_hits.parquet")
+    screen(args.roster, out, id_column=args.id_column, workers=args.workers,
+           batch_rows=args.batch_rows, min_risk=args.min_risk,
+           include_reinstated=args.include_reinstated, rebuild_index=args.rebuild_index)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Screen a provider roster against LEIE and risk scores")
+    add_arguments(parser)
+    run_args(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
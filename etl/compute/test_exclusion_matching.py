@@ -0,0 +1,172 @@
+"""
+Unit tests for LEIE name matching of exclusions without an NPI.
+
+Run:
+    pytest etl/compute/test_exclusion_matching.py -v
+"""
+
+from __future__ import annotations
+
+import polars as pl
+import pytest
+
+from etl.compute.exclusion_matching import (
+    MATCH_MAX_BLOCK,
+    OUTPUT_SCHEMA,
+    SCORE_CITY,
+    SCORE_FIRST_NAME,
+    SCORE_LAST_EXACT,
+    SCORE_LAST_SOUNDEX,
+    SCORE_MIDDLE,
+    match_businesses,
+    match_exclusions,
+    match_individuals,
+    soundex,
+    unlinked_exclusions,
+)
+
+
+# ---------------------------------------------------------------------------
+# soundex
+# ---------------------------------------------------------------------------
+
+class TestSoundex:
+    def test_reference_codes(self):
+        names = ["Robert", "Rupert", "Ashcraft", "Tymczak", "Pfister", "Honeyman", "Lee"]
+        out = pl.DataFrame({"n": names}).select(soundex(pl.col("n")))["n"].to_list()
+        assert out == ["R163", "R163", "A261", "T522", "P236", "H555", "L000"]
+
+
+# ---------------------------------------------------------------------------
+# unlinked_exclusions
+# ---------------------------------------------------------------------------
+
+class TestUnlinkedExclusions:
+    def test_splits_npi_less_rows(self):
+        leie = pl.LazyFrame({
+            "exclusion_id": ["x1", "x2", "x3", "x4", "x5"],
+            "npi": ["1000000001", " ", None, None, None],
+            "last_name": ["Smith", "Doe", None, None, "Roe"],
+            "first_name": ["John", "Jane Ann", None, None, "Rick"],
+            "middle_name": ["", "", "", "", ""],
+            "business_name": ["", "", "Sunrise Home Health", " ", "Roe Clinic"],
+            "city": ["Austin", "Austin", "Austin", "Austin", "Austin"],
+            "state": ["TX", "tx", "TX", "TX", "TX"],
+        })
+        individuals, businesses = unlinked_exclusions(leie)
+        # blank NPI counts as missing; a business name wins over a person's name
+        assert individuals.collect().select("exclusion_id", "first_name", "state").rows() == [("x2", "JANE", "TX")]
+        assert businesses.collect()["exclusion_id"].to_list() == ["x3", "x5"]
+
+
+# ---------------------------------------------------------------------------
+# match_individuals
+# ---------------------------------------------------------------------------
+
+class TestMatchIndividuals:
+    TARGETS = pl.LazyFrame({
+        "target_type": ["provider", "person", "person"],
+        "target_id": ["1000000001", "P1", "P2"],
+        "t_last_name": ["SMITH", "DOE", "DOE"],
+        "t_first_name": ["JOHN", "JANE", "JANE"],
+        "t_middle_initial": ["", "A", "B"],
+        "t_city": ["AUSTIN", "AUSTIN", "AUSTIN"],
+        "state": ["TX", "TX", "TX"],
+    })
+
+    # x1 exact; x2 soundex variant in the same city, x3 in another; x4 conflicting
+    # first name; x5 other state; x6 middle initial picks P1 over P2
+    INDIVIDUALS = pl.LazyFrame({
+        "exclusion_id": ["x1", "x2", "x3", "x4", "x5", "x6"],
+        "last_name": ["SMITH", "SMYTH", "SMYTH", "SMITH", "SMITH", "DOE"],
+        "first_name": ["JOHN", "JOHN", "JOHN", "JAMES", "JOHN", "JANE"],
+        "middle_initial": ["", "", "", "", "", "A"],
+        "city": ["AUSTIN", "AUSTIN", "DALLAS", "AUSTIN", "AUSTIN", "AUSTIN"],
+        "state": ["TX", "TX", "TX", "TX", "OK", "TX"],
+    })
+
+    def test_scores(self):
+        out = match_individuals(self.INDIVIDUALS, self.TARGETS).collect().sort("exclusion_id")
+        assert out.select("exclusion_id", "target_id", "match_method").rows() == [
+            ("x1", "1000000001", "name"), ("x2", "1000000001", "name"), ("x6", "P1", "name"),
+        ]
+        assert out["confidence"].to_list() == pytest.approx([
+            SCORE_LAST_EXACT + SCORE_FIRST_NAME + SCORE_CITY,
+            SCORE_LAST_SOUNDEX + SCORE_FIRST_NAME + SCORE_CITY,
+            SCORE_LAST_EXACT + SCORE_FIRST_NAME + SCORE_MIDDLE + SCORE_CITY,
+        ])
+
+    def test_oversized_block_skipped(self):
+        n = MATCH_MAX_BLOCK + 1
+        targets = pl.LazyFrame({
+            "target_type": ["provider"] * n, "target_id": [f"1{i:09d}" for i in range(n)],
+            "t_last_name": ["SMITH"] * n, "t_first_name": ["J"] * n, "t_middle_initial": [""] * n,
+            "t_city": ["AUSTIN"] * n, "state": ["TX"] * n,
+        })
+        individuals = self.INDIVIDUALS.filter(pl.col("exclusion_id") == "x1")
+        assert match_individuals(individuals, targets).collect().is_empty()
+
+
+# ---------------------------------------------------------------------------
+# match_businesses
+# ---------------------------------------------------------------------------
+
+class TestMatchBusinesses:
+    TARGETS = pl.LazyFrame({
+        "target_type": ["provider", "provider", "entity"],
+        "target_id": ["2000000001", "2000000002", "E1"],
+        "t_org_key": ["SUNRISE VALLEY HOME HEALTH", "VALLEY HOME HEALTH", "SUNRISE DENTAL PARTNERS"],
+        "state": ["TX", "TX", "TX"],
+    })
+
+    def test_same_key_wins_over_partial_overlap(self):
+        businesses = pl.LazyFrame({"exclusion_id": ["b1"], "org_key": ["SUNRISE VALLEY HOME HEALTH"], "state": ["TX"]})
+        out = match_businesses(businesses, self.TARGETS).collect()
+        assert out.select("target_type", "target_id", "match_method", "confidence").rows() == [
+            ("provider", "2000000001", "business_name", 1.0),
+        ]
+
+    def test_partial_overlap_below_threshold(self):
+        businesses = pl.LazyFrame({"exclusion_id": ["b1"], "org_key": ["SUNRISE VALLEY MEDICAL SUPPLY"], "state": ["TX"]})
+        assert match_businesses(businesses, self.TARGETS.filter(pl.col("target_id") == "E1")).collect().is_empty()
+
+
+# ---------------------------------------------------------------------------
+# match_exclusions
+# ---------------------------------------------------------------------------
+
+class TestMatchExclusions:
+    LEIE = pl.LazyFrame({
+        "exclusion_id": ["b1", "x1", "x2"],
+        "npi": ["", "1000000009", ""],
+        "last_name": ["", "Smith", "Smith"],
+        "first_name": ["", "John", "John"],
+        "middle_name": ["", "", ""],
+        "business_name": ["Sunrise Valley Home Health, LLC", "", ""],
+        "city": ["Austin", "Austin", "Austin"],
+        "state": ["TX", "TX", "TX"],
+    })
+
+    def test_providers_and_owner_entities(self):
+        providers = pl.LazyFrame({
+            "npi": ["1000000001", "2000000001"],
+            "entity_type_code": ["1", "2"],
+            "org_name": ["", "SUNRISE VALLEY HOME HEALTH INC"],
+            "last_name": ["SMITH", ""],
+            "first_name": ["JOHN", ""],
+            "city": ["AUSTIN", "AUSTIN"],
+            "state": ["TX", "TX"],
+        })
+        entities = pl.LazyFrame({"entity_id": ["E1"], "name": ["SUNRISE VALLEY HOME HEALTH LLC"], "owner_state": ["TX"]})
+        out = match_exclusions(self.LEIE, providers, entities)
+        assert out.schema == pl.Schema(OUTPUT_SCHEMA)
+        # x1 has an NPI and is left to the NPI edges
+        assert out.select("exclusion_id", "target_type", "target_id", "match_method").rows() == [
+            ("b1", "entity", "E1", "business_name"),
+            ("b1", "provider", "2000000001", "business_name"),
+            ("x2", "provider", "1000000001", "name"),
+        ]
+
+    def test_no_targets(self):
+        out = match_exclusions(self.LEIE)
+        assert out.is_empty() and out.schema == pl.Schema(OUTPUT_SCHEMA)
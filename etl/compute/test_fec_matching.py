@@ -0,0 +1,128 @@
+"""
+Unit tests for the FEC ↔ provider matching batch stage.
+
+Run:
+    pytest etl/compute/test_fec_matching.py -v
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import polars as pl
+import pytest
+
+from etl.compute.fec_matching import (
+    MATCH_MAX_BLOCK,
+    SCORE_EMPLOYER_ORG,
+    compute_matches,
+)
+
+
+CONTRIBUTION_SCHEMA = {
+    "contributor_name": pl.Utf8, "city": pl.Utf8, "state": pl.Utf8,
+    "employer": pl.Utf8, "occupation": pl.Utf8, "amount": pl.Float64,
+    "committee_id": pl.Utf8, "transaction_date": pl.Date, "cycle": pl.Int64, "party": pl.Utf8,
+}
+PROVIDER_SCHEMA = {
+    "npi": pl.Utf8, "entity_type_code": pl.Utf8, "org_name": pl.Utf8,
+    "last_name": pl.Utf8, "first_name": pl.Utf8, "state": pl.Utf8, "city": pl.Utf8,
+}
+
+
+def _contribution(name: str, state: str = "TX", amount: float = 100.0, **kw) -> dict:
+    row = {
+        "contributor_name": name, "city": "Austin", "state": state,
+        "employer": None, "occupation": None, "amount": amount,
+        "committee_id": "C001", "transaction_date": date(2024, 3, 1),
+        "cycle": 2024, "party": "DEM",
+    }
+    row.update(kw)
+    return row
+
+
+def _provider(npi: str, last: str | None = None, first: str | None = None,
+              org: str | None = None, state: str = "TX", city: str = "AUSTIN") -> dict:
+    return {
+        "npi": npi, "entity_type_code": "2" if org else "1", "org_name": org,
+        "last_name": last, "first_name": first, "state": state, "city": city,
+    }
+
+
+def _match(contribs: list[dict], providers: list[dict], owners: list[dict] | None = None) -> pl.DataFrame:
+    return compute_matches(
+        pl.LazyFrame(contribs, schema=CONTRIBUTION_SCHEMA),
+        pl.LazyFrame(providers, schema=PROVIDER_SCHEMA),
+        pl.LazyFrame(owners) if owners else None,
+    )
+
+
+def test_individual_match_aggregates_per_npi():
+    out = _match(
+        [
+            _contribution("SMITH, JOHN A", occupation="Physician"),
+            _contribution("Smith, John A.", amount=250.0, committee_id="C002", party="REP"),
+        ],
+        [_provider("1000000001", "Smith", "John")],
+    )
+    row = out.filter(pl.col("match_type") == "individual").row(0, named=True)
+    assert row["npi"] == "1000000001"
+    assert row["cycle"] == 2024
+    assert row["contribution_count"] == 2
+    assert row["total_amount"] == pytest.approx(350.0)
+    assert row["dem_amount"] == pytest.approx(100.0)
+    assert row["rep_amount"] == pytest.approx(250.0)
+    assert row["committee_count"] == 2
+    assert row["match_score"] == pytest.approx(1.0)
+
+
+def test_conflicting_first_name_is_rejected():
+    out = _match(
+        [_contribution("SMITH, JAMES")],
+        [_provider("1000000001", "Smith", "John")],
+    )
+    assert out.is_empty()
+
+
+def test_block_requires_same_state():
+    out = _match(
+        [_contribution("SMITH, JOHN", state="CA")],
+        [_provider("1000000001", "Smith", "John")],
+    )
+    assert out.is_empty()
+
+
+def test_oversized_block_is_skipped():
+    providers = [_provider(f"1{i:09d}", "Smith", "J") for i in range(MATCH_MAX_BLOCK + 1)]
+    out = _match([_contribution("SMITH, JOHN")], providers)
+    assert out.is_empty()
+
+
+def test_employer_matches_org_in_state_ignoring_legal_form():
+    out = _match(
+        [_contribution("DOE, JANE", employer="Austin Heart, P.A.")],
+        [_provider("2000000001", org="AUSTIN HEART PA"), _provider("2000000002", org="AUSTIN HEART", state="OK")],
+    )
+    assert out["npi"].to_list() == ["2000000001"]
+    row = out.row(0, named=True)
+    assert row["match_type"] == "employer"
+    assert row["matched_name"] == "AUSTIN HEART"
+    assert row["match_score"] == pytest.approx(SCORE_EMPLOYER_ORG)
+
+
+def test_generic_employer_is_ignored():
+    out = _match(
+        [_contribution("DOE, JANE", employer="Self-Employed")],
+        [_provider("2000000001", org="SELF EMPLOYED")],
+    )
+    assert out.is_empty()
+
+
+def test_snf_owner_match_attributed_to_facility_npi():
+    out = _match(
+        [_contribution("DOE, JANE", state="NY", employer="Sunrise Care Holdings LLC")],
+        [_provider("3000000001", org="Oak Grove Nursing Center", state="FL")],
+        [{"owner_type": "O", "owner_org_name": "SUNRISE CARE HOLDINGS, LLC",
+          "provider_org_name": "OAK GROVE NURSING CENTER"}],
+    )
+    assert out.select("npi", "match_type").rows() == [("3000000001", "snf_owner")]
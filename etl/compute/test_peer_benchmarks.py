@@ -0,0 +1,98 @@
+"""
+Unit tests for the peer benchmark batch stage.
+
+Run:
+    pytest etl/compute/test_peer_benchmarks.py -v
+"""
+
+from __future__ import annotations
+
+import math
+
+import polars as pl
+import pytest
+
+from etl.compute.peer_benchmarks import (
+    PAYMENTS_SCHEMA,
+    QUANTILES,
+    compute_benchmark_metrics,
+    compute_peer_benchmarks,
+)
+from etl.compute.risk_scores import MAD_SCALE, PEER_MIN_SIZE
+
+
+def _payments(n: int, state: str = "TX", claims: float = 500.0, program: str = "Medicare") -> list[dict]:
+    return [
+        {
+            "npi": f"{state}{i:08d}", "year": 2023, "program": program,
+            "payments": 1000.0 * (i + 1), "allowed": 1200.0 * (i + 1) if program == "Medicare" else None,
+            "claims": claims, "beneficiaries": 10.0,
+            "taxonomy": "207R00000X", "state": state, "entity_type": "1",
+        }
+        for i in range(n)
+    ]
+
+
+def _benchmarks(rows: list[dict]) -> tuple[pl.DataFrame, pl.DataFrame]:
+    metrics = compute_benchmark_metrics(pl.DataFrame(rows, schema=PAYMENTS_SCHEMA))
+    return compute_peer_benchmarks(metrics)
+
+
+class TestPeerLevel:
+    def test_level_1_when_state_group_is_large(self):
+        _, bench = _benchmarks(_payments(PEER_MIN_SIZE))
+        assert set(bench["peer_level"].to_list()) == {1}
+        assert set(bench["peer_count"].to_list()) == {PEER_MIN_SIZE}
+
+    def test_falls_back_to_division_then_national(self):
+        # 30 TX + 30 LA share a Census division; 10 CA are alone nationally
+        rows = _payments(30, "TX") + _payments(30, "LA") + _payments(10, "CA")
+        _, bench = _benchmarks(rows)
+        levels = dict(bench.group_by("npi").agg(pl.col("peer_level").first()).iter_rows())
+        assert levels["TX00000000"] == 2
+        assert levels["CA00000000"] == 3
+
+    def test_low_claims_provider_is_not_benchmarked_at_level_1(self):
+        rows = _payments(PEER_MIN_SIZE) + [
+            {**_payments(1)[0], "npi": "LOWCLAIMS0", "claims": 10.0}
+        ]
+        _, bench = _benchmarks(rows)
+        low = bench.filter(pl.col("npi") == "LOWCLAIMS0")
+        assert set(low["peer_level"].to_list()) == {2}
+
+
+class TestStatistics:
+    def test_percentile_and_median(self):
+        _, bench = _benchmarks(_payments(PEER_MIN_SIZE))
+        tp = bench.filter(pl.col("metric") == "total_payments").sort("provider_value")
+        assert tp["provider_percentile"][0] == 0
+        assert tp["provider_percentile"][-1] == 100
+        expected_median = 1000.0 * (PEER_MIN_SIZE + 1) / 2
+        assert tp["peer_median"][0] == pytest.approx(expected_median)
+
+    def test_ties_share_percentile(self):
+        rows = _payments(PEER_MIN_SIZE)
+        for r in rows[:2]:
+            r["payments"] = 1.0
+        _, bench = _benchmarks(rows)
+        tp = bench.filter(pl.col("metric") == "total_payments").sort("provider_value")
+        assert tp["provider_percentile"][0] == tp["provider_percentile"][1] == 0
+
+    def test_z_score_log_scale(self):
+        groups, bench = _benchmarks(_payments(PEER_MIN_SIZE))
+        g = groups.filter(pl.col("metric") == "total_payments").row(0, named=True)
+        top = bench.filter(pl.col("metric") == "total_payments").sort("provider_value").row(-1, named=True)
+        expected = (math.log(top["provider_value"] + 1) - g["log_median"]) / (MAD_SCALE * g["log_mad"] + 0.001)
+        assert top["z_score"] == pytest.approx(expected, abs=0.01)
+
+    def test_allowed_per_claim_only_for_medicare(self):
+        rows = _payments(PEER_MIN_SIZE) + _payments(PEER_MIN_SIZE, program="Medicaid")
+        _, bench = _benchmarks(rows)
+        apc = bench.filter(pl.col("metric") == "allowed_per_claim")
+        assert set(apc["program"].to_list()) == {"Medicare"}
+
+    def test_group_quantile_ladder(self):
+        groups, _ = _benchmarks(_payments(PEER_MIN_SIZE))
+        ladder = groups.filter(pl.col("metric") == "total_payments")["quantiles"][0].to_list()
+        assert len(ladder) == len(QUANTILES)
+        assert ladder == sorted(ladder)
@@ -16,11 +16,20 @@ import pytest
 from etl.compute.risk_scores import (
     MAD_SCALE,
     WEIGHTS,
+    apply_calibration,
+    build_calibration_table,
+    build_ownership_frame,
+    calibrate_scores,
+    chain_ownership_frame,
+    chain_ownership_query,
     compute_composite,
+    compute_exclusion_proximity,
     compute_program_concentration,
+    empty_ownership_frame,
     generate_flags,
     map_to_score,
     risk_label,
+    risk_label_expr,
     robust_zscore,
 )
 
@@ -127,6 +136,11 @@ class TestRiskLabel:
     def test_labels(self, score, expected):
         assert risk_label(score) == expected
 
+    def test_expr_matches_scalar(self):
+        scores = [0.0, 15.0, 29.9, 30.0, 59.9, 60.0, 79.9, 80.0, 100.0]
+        labels = pl.DataFrame({"s": scores}).select(risk_label_expr(pl.col("s")).alias("label"))["label"]
+        assert labels.to_list() == [risk_label(s) for s in scores]
+
 
 # ---------------------------------------------------------------------------
 # compute_program_concentration
@@ -190,6 +204,94 @@ class TestComputeProgramConcentration:
         assert result.is_empty()
 
 
+# ---------------------------------------------------------------------------
+# Ownership frame + compute_exclusion_proximity
+# ---------------------------------------------------------------------------
+
+class TestOwnershipFrame:
+    def test_chain_risk_formula(self):
+        df = build_ownership_frame(["A", "B", "C"], [4, 0, 1], [1, 0, 3], [False, True, False])
+        risk = dict(zip(df["npi"], df["ownership_chain_risk"]))
+        assert risk["A"] == pytest.approx(25.0)
+        assert risk["B"] == pytest.approx(0.0)
+        assert risk["C"] == pytest.approx(100.0)  # capped
+
+    def test_empty_frame_is_all_zero(self):
+        df = empty_ownership_frame(["A", "B"])
+        assert df["ownership_chain_risk"].to_list() == [0.0, 0.0]
+        assert df["chain_excluded_count"].to_list() == [0, 0]
+        assert df["owner_excluded"].to_list() == [False, False]
+
+    def test_chain_membership_counts_and_unchained_npis(self):
+        chains = pl.DataFrame({
+            "npi": ["A", "B"], "chain_provider_count": [4, 2],
+            "chain_excluded_count": [1, 0], "owner_excluded": [False, True],
+        })
+        df = chain_ownership_frame(["A", "B", "C"], chains)
+        assert df["ownership_chain_risk"].to_list() == pytest.approx([25.0, 0.0, 0.0])
+        assert df["chain_excluded_count"].to_list() == [1, 0, 0]
+        assert df["owner_excluded"].to_list() == [False, True, False]
+
+    class _Cursor:
+        """Answers chain_ownership_query's to_regclass probe from a set of loaded tables."""
+
+        def __init__(self, loaded):
+            self.loaded = loaded
+
+        def execute(self, sql, params):
+            self.rows = [(t, t in self.loaded) for t in params[0]]
+
+        def fetchall(self):
+            return self.rows
+
+    def test_chain_query_needs_chain_membership(self):
+        assert chain_ownership_query(self._Cursor({"ownership_snf"})) is None
+
+    def test_chain_query_checks_direct_and_matched_owners(self):
+        query = chain_ownership_query(self._Cursor(
+            {"chain_membership", "entity_cluster_members", "exclusion_name_matches", "ownership_snf"}
+        ))
+        assert "JOIN ownership_snf o" in query
+        assert "FROM exclusion_name_matches nm" in query
+        assert "n.source = 'nppes_org'" in query  # unchained facilities get an NPI
+
+    def test_chain_query_without_optional_tables(self):
+        query = chain_ownership_query(self._Cursor({"chain_membership"}))
+        assert "ownership_snf" not in query
+        assert "exclusion_name_matches" not in query
+        assert "entity_cluster_members" not in query
+
+
+class TestComputeExclusionProximity:
+    def test_cascade_priority(self):
+        providers = pl.DataFrame({"npi": ["D", "O", "C", "N", "R"]})
+        exclusions = pl.DataFrame({
+            "npi": ["D", "R"], "excldate": ["20200101", "20190101"], "reinstated": [False, True],
+        })
+        ownership = build_ownership_frame(
+            ["D", "O", "C", "N", "R"], [1, 1, 2, 1, 1], [1, 1, 1, 0, 0],
+            [True, True, False, False, False],
+        )
+        result = compute_exclusion_proximity(exclusions, providers, ownership)
+        scores = dict(zip(result["npi"], result["exclusion_proximity_score"]))
+        assert scores == {"D": 100.0, "O": 80.0, "C": 50.0, "N": 0.0, "R": 0.0}
+
+    def test_resolved_cluster_exclusion_scores_as_owner(self):
+        providers = pl.DataFrame({"npi": ["D", "E", "N"]})
+        exclusions = pl.DataFrame({"npi": ["D"], "excldate": ["20200101"], "reinstated": [False]})
+        result = compute_exclusion_proximity(
+            exclusions, providers, empty_ownership_frame([]), pl.DataFrame({"npi": ["D", "E"]}),
+        )
+        scores = dict(zip(result["npi"], result["exclusion_proximity_score"]))
+        assert scores == {"D": 100.0, "E": 80.0, "N": 0.0}
+
+    def test_empty_inputs(self):
+        providers = pl.DataFrame({"npi": ["A"]})
+        exclusions = pl.DataFrame(schema={"npi": pl.Utf8, "excldate": pl.Utf8, "reinstated": pl.Boolean})
+        result = compute_exclusion_proximity(exclusions, providers, empty_ownership_frame([]))
+        assert result.row(0, named=True) == {"npi": "A", "exclusion_proximity_score": 0.0}
+
+
 # ---------------------------------------------------------------------------
 # compute_composite + risk_label via compute_composite
 # ---------------------------------------------------------------------------
@@ -295,6 +397,35 @@ class TestComputeComposite:
         assert low_row["risk_label"] in ("Low", "Moderate")
 
 
+# ---------------------------------------------------------------------------
+# calibrate_scores + calibration table
+# ---------------------------------------------------------------------------
+
+class TestCalibration:
+    def test_ties_share_score_regardless_of_order(self):
+        df = pl.DataFrame({"npi": ["A", "B", "C", "D"], "r_raw": [10.0, 20.0, 10.0, 30.0]})
+        for frame in (df, df.reverse()):
+            scores = dict(zip(*calibrate_scores(frame).select("npi", "risk_score")))
+            assert scores["A"] == scores["C"] == pytest.approx(0.0)
+            assert scores["B"] == pytest.approx(66.67)
+            assert scores["D"] == pytest.approx(100.0)
+
+    def test_table_round_trips_through_apply(self):
+        df = calibrate_scores(pl.DataFrame({"r_raw": [5.0, 1.0, 5.0, 9.0, 3.0]}))
+        table = build_calibration_table(df)
+        assert table["r_raw"].to_list() == [1.0, 3.0, 5.0, 9.0]
+        rescored = apply_calibration(df.select("r_raw"), table)
+        assert rescored["risk_score"].to_list() == df["risk_score"].to_list()
+
+    def test_apply_between_and_below_breakpoints(self):
+        table = build_calibration_table(
+            calibrate_scores(pl.DataFrame({"r_raw": [10.0, 20.0, 30.0]}))
+        )
+        new = apply_calibration(pl.DataFrame({"r_raw": [25.0, 5.0, 99.0]}), table)
+        assert new["risk_score"].to_list() == [50.0, 0.0, 100.0]
+        assert new["risk_label"].to_list() == ["Moderate", "Low", "High"]
+
+
 # ---------------------------------------------------------------------------
 # generate_flags
 # ---------------------------------------------------------------------------
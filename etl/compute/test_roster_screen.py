@@ -0,0 +1,171 @@
+"""
+Unit tests for bulk roster screening.
+
+Run:
+    pytest etl/compute/test_roster_screen.py -v
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+import polars as pl
+import pytest
+
+from etl.compute import roster_screen
+from etl.compute.roster_screen import (
+    ScreenIndex,
+    _sorted_lookup,
+    build_index,
+    normalize_roster,
+    screen_batch,
+)
+
+
+# x1 NPI-linked; x2 individual and x3 business without NPI; x4 reinstated;
+# x5 linked to 1000000005 by name matching only
+LEIE = pl.DataFrame({
+    "exclusion_id": ["x1", "x2", "x3", "x4", "x5"],
+    "npi": ["1000000001", None, None, "1000000004", None],
+    "last_name": ["SMITH", "DOE", None, "OLD", "ROE"],
+    "first_name": ["JOHN", "JANE", None, "CASE", "RICK"],
+    "middle_name": [None] * 5,
+    "business_name": [None, None, "Sunrise Valley Home Health LLC", None, None],
+    "city": ["AUSTIN"] * 5,
+    "state": ["TX"] * 5,
+    "excl_type": [" 1128A1"] * 5,
+    "excldate": [date(2020, 1, 1)] * 5,
+    "reinstated": [False, False, False, True, None],
+}, schema_overrides={"middle_name": pl.Utf8})
+NAME_MATCHES = pl.DataFrame({
+    "exclusion_id": ["x5", "x2"],
+    "target_type": ["provider", "person"],
+    "target_id": ["1000000005", "P1"],
+    "match_method": ["name", "name"],
+    "confidence": [0.9, 0.8],
+})
+RISK = pl.DataFrame({
+    "npi": ["1000000001", "1000000003", "1000000003"],
+    "risk_score": [40.0, 70.0, 92.0],
+    "risk_label": ["Moderate", "Elevated", "High"],
+})
+
+
+@pytest.fixture
+def index() -> ScreenIndex:
+    return ScreenIndex.from_tables(build_index(LEIE, NAME_MATCHES, RISK))
+
+
+# ---------------------------------------------------------------------------
+# _sorted_lookup
+# ---------------------------------------------------------------------------
+
+class TestSortedLookup:
+    def test_returns_every_duplicate(self):
+        q, k = _sorted_lookup(np.array([1, 3, 3, 7]), np.array([3, 5, 7]))
+        assert list(zip(q, k)) == [(0, 1), (0, 2), (2, 3)]
+
+    def test_no_keys(self):
+        q, k = _sorted_lookup(np.array([], dtype=np.int64), np.array([3, 5]))
+        assert len(q) == len(k) == 0
+
+
+# ---------------------------------------------------------------------------
+# build_index
+# ---------------------------------------------------------------------------
+
+class TestBuildIndex:
+    def test_npi_links_include_provider_name_matches(self, index):
+        assert index.exclusion_npis.select("npi", "exclusion_id", "match_method", "excl_type").rows() == [
+            (1000000001, "x1", "npi", "1128a1"),
+            (1000000004, "x4", "npi", "1128a1"),
+            (1000000005, "x5", "name", "1128a1"),
+        ]
+        assert index.exclusion_detail["reinstated"].to_list() == [False, False, False, True, False]
+
+    def test_risk_scores_keep_last_per_npi(self, index):
+        assert index.risk_scores.rows() == [(1000000001, 40.0, "Moderate"), (1000000003, 92.0, "High")]
+
+    def test_name_targets_split_by_business(self, index):
+        assert index.leie_persons["target_id"].to_list() == ["x1", "x2", "x4", "x5"]
+        assert index.leie_orgs["target_id"].to_list() == ["x3"]
+
+
+# ---------------------------------------------------------------------------
+# screen_batch
+# ---------------------------------------------------------------------------
+
+class TestScreenBatch:
+    def test_npi_hits(self, index):
+        roster = normalize_roster(pl.DataFrame({"roster_row": [0, 1, 2], "NPI": ["1000000001", "1000000005", "1999999999"]}))
+        hits = screen_batch(roster, index)
+        assert hits.select("roster_row", "hit_type", "exclusion_id", "match_method", "risk_score").rows() == [
+            (0, "exclusion_npi", "x1", "npi", 40.0),
+            (1, "exclusion_npi", "x5", "name", None),
+        ]
+
+    def test_fuzzy_individual_and_business_names(self, index):
+        roster = normalize_roster(pl.DataFrame({
+            "roster_row": [0, 1, 2],
+            "Last_Name": ["Doe", None, "Doe"],
+            "First_Name": ["Jane", None, "Jane"],
+            "Business_Name": [None, "SUNRISE VALLEY HOME HEALTH, INC.", None],
+            "City": ["Austin", None, None],
+            "State": ["tx", "TX", "OK"],
+        }))
+        hits = screen_batch(roster, index)
+        assert hits.select("roster_row", "hit_type", "exclusion_id").rows() == [
+            (0, "exclusion_name", "x2"),
+            (1, "exclusion_name", "x3"),
+        ]
+
+    def test_npi_and_name_hit_on_same_exclusion_reported_once(self, index):
+        roster = normalize_roster(pl.DataFrame({
+            "roster_row": [0], "npi": ["1000000001"], "last_name": ["Smith"], "first_name": ["John"], "state": ["TX"],
+        }))
+        assert screen_batch(roster, index).select("hit_type", "exclusion_id").rows() == [("exclusion_npi", "x1")]
+
+    def test_high_risk_and_reinstated(self, index):
+        roster = normalize_roster(pl.DataFrame({"roster_row": [0, 1], "npi": ["1000000003", "1000000004"]}))
+        hits = screen_batch(roster, index)
+        assert hits.select("roster_row", "hit_type", "risk_label").rows() == [(0, "high_risk", "High")]
+        hits = screen_batch(roster, index, include_reinstated=True)
+        assert hits.select("roster_row", "exclusion_id").rows() == [(0, None), (1, "x4")]
+
+
+# ---------------------------------------------------------------------------
+# screen
+# ---------------------------------------------------------------------------
+
+class TestScreen:
+    @pytest.fixture(autouse=True)
+    def sources(self, tmp_path, monkeypatch):
+        leie_path = tmp_path / "leie_current.parquet"
+        LEIE.head(1).with_columns(npi=pl.lit("0123456789")).write_parquet(leie_path)
+        monkeypatch.setattr(roster_screen, "LEIE_PATH", leie_path)
+        monkeypatch.setattr(roster_screen, "MATCHES_PATH", tmp_path / "missing.parquet")
+        monkeypatch.setattr(roster_screen, "RISK_SCORES_PATH", tmp_path / "missing.parquet")
+
+    def test_streams_csv_to_report(self, tmp_path):
+        roster = tmp_path / "roster.csv"
+        roster.write_text("member_id,npi\nA,0123456789\nB,1111111111\nC,0123456789\n")
+        out = tmp_path / "hits.csv"
+        n = roster_screen.screen(roster, out, id_column="member_id", workers=2, batch_rows=1,
+                                 index_dir=tmp_path / "index")
+        assert n == 2
+        report = pl.read_csv(out, schema_overrides={"roster_npi": pl.Utf8})
+        assert report.select("roster_row", "roster_id", "roster_npi", "exclusion_id").rows() == [
+            (0, "A", "0123456789", "x1"),
+            (2, "C", "0123456789", "x1"),
+        ]
+
+    @pytest.mark.parametrize("rows", ["A,1111111111\nB,2222222222\n", ""])
+    def test_clean_or_empty_roster_writes_empty_parquet(self, tmp_path, rows):
+        roster = tmp_path / "roster.csv"
+        roster.write_text("member_id,npi\n" + rows)
+        out = tmp_path / "hits.parquet"
+        assert roster_screen.screen(roster, out, id_column="member_id", index_dir=tmp_path / "index") == 0
+        report = pl.read_parquet(out)
+        assert report.is_empty()
+        assert report.columns[:3] == ["roster_row", "roster_id", "roster_npi"]
@@ -13,6 +13,10 @@ Files produced
   edges_ownership.csv   OWNS / CONTROLLED_BY edges (owner → SNF)
   edges_payments.csv   RECEIVED_PAYMENT edges (provider → PaymentSummary)
   edges_exclusions.csv  EXCLUDED_BY edges (provider → exclusion)
+  edges_entity_exclusions.csv / edges_person_exclusions.csv
+                        EXCLUDED_BY edges (SNF owner → exclusion, name-matched)
+  edges_chain_membership.csv
+                        IN_CHAIN / HEADS_CHAIN edges (SNF / owner → Chain)
 
 Column names here are the ground-truth used by infra/neo4j_init.cypher.
 If providers_final.parquet is not yet available, providers are derived from
@@ -40,6 +44,11 @@ _exports = os.environ.get("DATA_EXPORTS", str(_exports_default))
 PROCESSED = Path(_proc) if Path(_proc).is_absolute() else _REPO_ROOT / _proc
 EXPORTS = Path(_exports) if Path(_exports).is_absolute() else _REPO_ROOT / _exports
 
+# Allow running by path (python etl/export_for_neo4j.py) from repo root
+sys.path.insert(0, str(_REPO_ROOT))
+
+from etl.transform.exclusions_transform import EDGE_FILES, exclusion_edges  # noqa: E402
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -80,6 +89,20 @@ def _safe_bool_col(df: pl.DataFrame, col: str) -> pl.DataFrame:
     )
 
 
+def _with_cluster_ids(df: pl.DataFrame, id_col: str, sources: list[str]) -> pl.DataFrame:
+    """Add entity_cluster_id from entity_resolution (null where unresolved)."""
+    path = PROCESSED / "entities" / "entity_cluster_members.parquet"
+    if not path.exists():
+        return df.with_columns(pl.lit(None).cast(pl.Utf8).alias("entity_cluster_id"))
+    clusters = (
+        pl.read_parquet(path, columns=["source", "source_id", "entity_cluster_id"])
+        .filter(pl.col("source").is_in(sources))
+        .unique(subset=["source_id"], keep="first")
+        .select(pl.col("source_id").alias(id_col), "entity_cluster_id")
+    )
+    return df.join(clusters, on=id_col, how="left")
+
+
 # ---------------------------------------------------------------------------
 # Node exports
 # ---------------------------------------------------------------------------
@@ -87,7 +110,8 @@ def _safe_bool_col(df: pl.DataFrame, col: str) -> pl.DataFrame:
 def export_providers() -> Path:
     """
     nodes_providers.csv columns:
-      npi, display_name, entity_type, city, state, zip, taxonomy_1, is_excluded
+      npi, display_name, entity_type, city, state, zip, taxonomy_1, is_excluded,
+      entity_cluster_id
     """
     out = EXPORTS / "nodes_providers.csv"
     providers_path = PROCESSED / "providers" / "providers_final.parquet"
@@ -164,6 +188,7 @@ def export_providers() -> Path:
         )
 
     df = df.filter(pl.col("npi").is_not_null() & (pl.col("npi").cast(pl.Utf8) != ""))
+    df = _with_cluster_ids(df.with_columns(pl.col("npi").cast(pl.Utf8)), "npi", ["nppes_org"])
     df.write_csv(out)
     print(f"[export] nodes_providers.csv    {len(df):>10,} rows  (source: {source})")
     return out
@@ -174,7 +199,8 @@ def export_entities() -> Path:
     nodes_entities.csv columns:
       entity_id, name, dba, city, state, zip, entity_type,
       flag_corporation, flag_llc, flag_holding_company,
-      flag_investment_firm, flag_private_equity, flag_for_profit, flag_non_profit
+      flag_investment_firm, flag_private_equity, flag_for_profit, flag_non_profit,
+      entity_cluster_id
     """
     out = EXPORTS / "nodes_entities.csv"
     corp_path  = PROCESSED / "ownership" / "corporate_entities.parquet"
@@ -222,10 +248,11 @@ def export_entities() -> Path:
         _write_header_only_csv(out, ["entity_id", "name", "dba", "city", "state", "zip", "entity_type",
             "flag_corporation", "flag_llc", "flag_holding_company",
             "flag_investment_firm", "flag_private_equity",
-            "flag_for_profit", "flag_non_profit"])
+            "flag_for_profit", "flag_non_profit", "entity_cluster_id"])
         return out
 
     combined = pl.concat(frames, how="diagonal").unique(subset=["entity_id"], keep="first")
+    combined = _with_cluster_ids(combined, "entity_id", ["snf_owner", "snf_facility"])
 
     # Normalize boolean flag columns
     for flag in ["flag_corporation", "flag_llc", "flag_holding_company",
@@ -375,24 +402,45 @@ def export_edges_payments() -> Path:
     return out
 
 
-def export_edges_exclusions() -> Path:
+def export_edges_exclusions() -> dict[str, Path]:
     """
-    edges_exclusions.csv columns:
-      npi, exclusion_id, excldate
+    EXCLUDED_BY edge files, built by exclusions_transform.exclusion_edges:
+      edges_exclusions.csv         npi, exclusion_id, excldate, match_method, confidence
+      edges_entity_exclusions.csv  entity_id, exclusion_id, excldate, match_method, confidence
+      edges_person_exclusions.csv  associate_id, exclusion_id, excldate, match_method, confidence
+    NPI-linked rows have match_method 'npi' and confidence 1.0; the rest are
+    name matches (exclusion_name_matches.parquet).
     """
-    out  = EXPORTS / "edges_exclusions.csv"
-    path = PROCESSED / "exclusions" / "exclusions_final.parquet"
+    excl = _read_optional(PROCESSED / "exclusions" / "exclusions_final.parquet")
+    matches = _read_optional(PROCESSED / "exclusions" / "exclusion_name_matches.parquet")
+    outs = {name: EXPORTS / f"{name}.csv" for name in EDGE_FILES}
+    if excl is None:
+        for name, (id_col, _) in EDGE_FILES.items():
+            _write_header_only_csv(outs[name], [id_col, "exclusion_id", "excldate", "match_method", "confidence"])
+        return outs
+    for name, df in exclusion_edges(excl, matches).items():
+        df.write_csv(outs[name])
+        print(f"[export] {name}.csv {len(df):>10,} rows")
+    return outs
+
+
+def export_edges_chain_membership() -> Path:
+    """
+    edges_chain_membership.csv columns:
+      chain_id, chain_name, facility_id, entity_id
 
-    df = _read_optional(path)
+    facility_id = provider_associate_id (→ CorporateEntity.entity_id — the SNF)
+    entity_id   = corporate entity heading the chain (empty if unmatched)
+    """
+    out = EXPORTS / "edges_chain_membership.csv"
+    df = _read_optional(PROCESSED / "ownership" / "chain_membership.parquet")
     if df is None:
-        _write_header_only_csv(out, ["npi", "exclusion_id", "excldate"])
+        _write_header_only_csv(out, ["chain_id", "chain_name", "facility_id", "entity_id"])
         return out
-    df = (
-        df.filter(pl.col("npi").is_not_null() & (pl.col("npi").cast(pl.Utf8) != ""))
-          .select([c for c in ["npi", "exclusion_id", "excldate"] if c in df.columns])
-    )
+    df = df.select("chain_id", "chain_name", "facility_id", "entity_id")
     df.write_csv(out)
-    print(f"[export] edges_exclusions.csv   {len(df):>10,} rows")
+    print(f"[export] edges_chain_membership.csv {len(df):>10,} rows  "
+          f"({df['chain_id'].n_unique():,} chains)")
     return out
 
 
@@ -415,7 +463,8 @@ def export_all() -> dict[str, Path]:
     # Then edges
     results["edges_ownership"]  = export_edges_ownership()
     results["edges_payments"]   = export_edges_payments()
-    results["edges_exclusions"] = export_edges_exclusions()
+    results.update(export_edges_exclusions())
+    results["edges_chain_membership"] = export_edges_chain_membership()
 
     print(f"\n[export] Complete — {len(results)} CSVs written to {EXPORTS.resolve()}\n")
     return results
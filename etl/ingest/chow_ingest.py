@@ -12,6 +12,11 @@ Column mapping (SNF_CHOW CSV):
   BUYER = new owner (facility after CHOW); SELLER = prior owner.
   facility_ccn = CCN - BUYER, facility_name = ORGANIZATION NAME - BUYER,
   from_owner = SELLER, to_owner = BUYER, effective_date = EFFECTIVE DATE.
+  associate_id_buyer / associate_id_seller / state_seller are kept as reported,
+  so unresolved buyers and sellers can still be matched downstream.
+
+All month files are scanned lazily and collected in one pass; entity ids are
+resolved with is_in against id columns read once from the ownership outputs.
 """
 import os
 from pathlib import Path
@@ -59,28 +64,24 @@ def _find_chow_file(month_dir: Path) -> Path | None:
     return max(csvs, key=lambda f: f.stat().st_size)
 
 
-def _load_chow_csv(path: Path) -> pl.DataFrame:
-    available = pl.read_csv(path, n_rows=0, infer_schema_length=0).columns
-    wanted = {k: v for k, v in CHOW_COL_MAP.items() if k in available}
-    if not wanted:
-        return pl.DataFrame()
-    df = pl.read_csv(
+def _scan_chow_csv(path: Path) -> pl.LazyFrame | None:
+    """Lazy scan of one CHOW file projected onto CHOW_COL_MAP (missing columns → null)."""
+    lf = pl.scan_csv(
         path,
         infer_schema_length=0,
         null_values=["", " "],
-        columns=list(wanted),
         encoding="utf8-lossy",
-    ).rename(wanted)
-
-    # Parse effective date (M/D/YYYY)
-    if "effective_date_raw" in df.columns:
-        df = df.with_columns(
-            pl.col("effective_date_raw")
-            .str.strip_chars()
-            .str.to_date("%m/%d/%Y", strict=False)
-            .alias("effective_date")
-        ).drop("effective_date_raw")
-    return df
+    )
+    available = set(lf.collect_schema().names())
+    if not available & set(CHOW_COL_MAP):
+        return None
+    return lf.select(
+        [
+            (pl.col(raw) if raw in available else pl.lit(None, dtype=pl.Utf8)).alias(col)
+            for raw, col in CHOW_COL_MAP.items()
+        ]
+        + [pl.lit(path.name).alias("source_file")]
+    )
 
 
 def _event_type_expr(
@@ -106,43 +107,43 @@ def _event_type_expr(
 
 
 def _resolve_entity_ids(
-    df: pl.DataFrame,
-    entity_ids: set[str],
-    facility_entity_ids: set[str],
-) -> pl.DataFrame:
+    lf: pl.LazyFrame,
+    entity_ids: pl.Series,
+    facility_entity_ids: pl.Series,
+) -> pl.LazyFrame:
     """
     Resolve facility and owner associate IDs to entity_id.
     entity_ids: from corporate_entities (owners + orgs).
     facility_entity_ids: from ownership_edges.provider_associate_id (SNF facilities).
+    Both are unique Utf8 id columns; membership is a vectorized is_in.
     """
-    all_owner_ids = entity_ids
-    all_facility_ids = facility_entity_ids | entity_ids
-
-    def resolve_owner(associate_id_series: pl.Series) -> pl.Series:
-        return associate_id_series.map_elements(
-            lambda x: x if x and str(x).strip() in all_owner_ids else None,
-            return_dtype=pl.Utf8,
-        )
+    all_facility_ids = pl.concat([facility_entity_ids, entity_ids]).unique()
+    buyer = pl.col("associate_id_buyer").cast(pl.Utf8).str.strip_chars()
+    seller = pl.col("associate_id_seller").cast(pl.Utf8).str.strip_chars()
+    return lf.with_columns(
+        pl.when(buyer.is_in(all_facility_ids)).then(buyer).alias("facility_entity_id"),
+        pl.when(seller.is_in(entity_ids)).then(seller).alias("from_owner_entity_id"),
+        pl.when(buyer.is_in(entity_ids)).then(buyer).alias("to_owner_entity_id"),
+    )
 
-    def resolve_facility(associate_id_series: pl.Series) -> pl.Series:
-        return associate_id_series.map_elements(
-            lambda x: x if x and str(x).strip() in all_facility_ids else None,
-            return_dtype=pl.Utf8,
-        )
 
-    if "associate_id_buyer" in df.columns:
-        df = df.with_columns(
-            resolve_facility(pl.col("associate_id_buyer").cast(pl.Utf8).str.strip_chars()).alias(
-                "facility_entity_id"
-            ),
-            resolve_owner(pl.col("associate_id_seller").cast(pl.Utf8).str.strip_chars()).alias(
-                "from_owner_entity_id"
-            ),
-            resolve_owner(pl.col("associate_id_buyer").cast(pl.Utf8).str.strip_chars()).alias(
-                "to_owner_entity_id"
-            ),
-        )
-    return df
+def _load_ids(path: Path, col: str, fallback: str | None = None) -> pl.Series:
+    """Unique stripped Utf8 ids from one column of a parquet file (empty if absent)."""
+    empty = pl.Series("id", [], dtype=pl.Utf8)
+    if not path.exists():
+        return empty
+    names = pl.read_parquet_schema(path)
+    if col not in names:
+        if fallback is None or fallback not in names:
+            return empty
+        col = fallback
+    return (
+        pl.read_parquet(path, columns=[col])
+        .select(pl.col(col).cast(pl.Utf8).str.strip_chars().alias("id"))
+        .drop_nulls()
+        .unique()
+        .to_series()
+    )
 
 
 def ingest(raw_dir: Path = RAW_DIR, out_dir: Path = OUT_DIR) -> None:
@@ -158,80 +159,73 @@ def ingest(raw_dir: Path = RAW_DIR, out_dir: Path = OUT_DIR) -> None:
     if not month_dirs:
         raise FileNotFoundError(f"No month dirs under {snf_base}")
 
-    # Load corporate_entities (owners) and ownership_edges (SNF facilities) for resolution
-    corp_path = PROCESSED / "ownership" / "corporate_entities.parquet"
-    edges_path = PROCESSED / "ownership" / "ownership_edges.parquet"
-    entity_ids: set[str] = set()
-    facility_entity_ids: set[str] = set()
-    if corp_path.exists():
-        entities = pl.read_parquet(corp_path)
-        if "entity_id" not in entities.columns and "owner_associate_id" in entities.columns:
-            entities = entities.with_columns(
-                pl.col("owner_associate_id").alias("entity_id")
-            )
-        entity_ids = set(entities["entity_id"].drop_nulls().cast(pl.Utf8).str.strip_chars().to_list())
+    # Load corporate_entities (owners) and ownership_edges (SNF facilities) once, as id columns
+    entity_ids = _load_ids(PROCESSED / "ownership" / "corporate_entities.parquet", "entity_id", "owner_associate_id")
+    facility_entity_ids = _load_ids(PROCESSED / "ownership" / "ownership_edges.parquet", "provider_associate_id")
+    if len(entity_ids):
         print(f"[chow_ingest] Resolving using {len(entity_ids):,} corporate entities")
-    if edges_path.exists():
-        edges = pl.read_parquet(edges_path)
-        if "provider_associate_id" in edges.columns:
-            facility_entity_ids = set(
-                edges["provider_associate_id"].drop_nulls().cast(pl.Utf8).str.strip_chars().to_list()
-            )
-            print(f"[chow_ingest] Facility IDs from edges: {len(facility_entity_ids):,}")
-    if not entity_ids and not facility_entity_ids:
+    if len(facility_entity_ids):
+        print(f"[chow_ingest] Facility IDs from edges: {len(facility_entity_ids):,}")
+    if not len(entity_ids) and not len(facility_entity_ids):
         print("[chow_ingest] No corporate_entities or ownership_edges; *_entity_id columns will be NULL")
 
-    frames = []
+    # One lazy scan over every month's file, newest month first so the dedupe
+    # below keeps the most recent report of each event
+    scans = []
     for month_dir in month_dirs:
         chow_path = _find_chow_file(month_dir)
         if not chow_path:
             continue
-        df = _load_chow_csv(chow_path)
-        if df.is_empty():
-            continue
-        # Build output schema
-        code_col = pl.col("chow_type_code") if "chow_type_code" in df.columns else pl.lit("")
-        text_col = pl.col("chow_type_text") if "chow_type_text" in df.columns else pl.lit("")
-        df = df.with_columns(
-            pl.col("org_name_buyer").alias("facility_name"),
-            pl.col("state").cast(pl.Utf8),
-            pl.col("org_name_seller").alias("from_owner_name"),
-            pl.col("org_name_buyer").alias("to_owner_name"),
-            _event_type_expr(code_col, text_col).alias("event_type"),
-            pl.lit(chow_path.name).alias("source_file"),
-        )
-        df = _resolve_entity_ids(df, entity_ids, facility_entity_ids)
-        # Select final columns
-        out_cols = [
-            "facility_entity_id",
-            "facility_ccn",
-            "facility_name",
-            "state",
-            "effective_date",
-            "from_owner_entity_id",
-            "from_owner_name",
-            "to_owner_entity_id",
-            "to_owner_name",
-            "event_type",
-            "source_file",
-        ]
-        df = df.select([c for c in out_cols if c in df.columns])
-        frames.append(df)
-        print(f"[chow_ingest] {chow_path.name} → {len(df):,} rows")
+        lf = _scan_chow_csv(chow_path)
+        if lf is not None:
+            scans.append(lf)
+            print(f"[chow_ingest] {month_dir.name}/{chow_path.name}")
 
-    if not frames:
+    if not scans:
         raise FileNotFoundError(
             f"No SNF_CHOW_*.csv (excluding Owners) with data under {snf_base}"
         )
 
-    combined = pl.concat(frames, how="diagonal")
+    events = pl.concat(scans, how="vertical").with_columns(
+        pl.col("effective_date_raw")
+        .str.strip_chars()
+        .str.to_date("%m/%d/%Y", strict=False)
+        .alias("effective_date"),
+        pl.col("associate_id_buyer", "associate_id_seller").str.strip_chars(),
+        pl.col("org_name_buyer").alias("facility_name"),
+        pl.col("state").cast(pl.Utf8),
+        pl.col("org_name_seller").alias("from_owner_name"),
+        pl.col("org_name_buyer").alias("to_owner_name"),
+        _event_type_expr(pl.col("chow_type_code"), pl.col("chow_type_text")).alias("event_type"),
+    )
+    events = _resolve_entity_ids(events, entity_ids, facility_entity_ids)
+    out_cols = [
+        "facility_entity_id",
+        "facility_ccn",
+        "facility_name",
+        "state",
+        "effective_date",
+        "from_owner_entity_id",
+        "from_owner_name",
+        "to_owner_entity_id",
+        "to_owner_name",
+        "event_type",
+        "source_file",
+        "associate_id_buyer",
+        "associate_id_seller",
+        "state_seller",
+    ]
     # Dedupe by facility_ccn + effective_date + from/to (same event can appear in multiple files)
-    combined = combined.unique(
-        subset=["facility_ccn", "effective_date", "from_owner_name", "to_owner_name"],
-        keep="first",
+    combined = (
+        events.select(out_cols)
+        .unique(
+            subset=["facility_ccn", "effective_date", "from_owner_name", "to_owner_name"],
+            keep="first",
+        )
+        .collect()
     )
     combined.write_parquet(out_dir / "chow_events.parquet", compression="zstd")
-    print(f"[chow_ingest] → {out_dir}/chow_events.parquet  ({len(combined):,} rows)")
+    print(f"[chow_ingest] → {out_dir}/chow_events.parquet  ({len(combined):,} rows from {len(scans)} files)")
 
 
 if __name__ == "__main__":
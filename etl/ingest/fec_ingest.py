@@ -6,24 +6,37 @@ Sources (data/raw/fec/):
   indiv24.zip             — itcont.txt (all individual contributions, 2024 cycle)
   cm24.zip                — cm.txt (committee master, 2024 cycle)
 
-Outputs (data/processed/fec/):
-  fec_contributions.parquet
-  fec_committees.parquet
+Outputs (data/processed/fec/), hive-partitioned by election cycle:
+  contributions/cycle=YYYY/part-0.parquet
+  committees/cycle=YYYY/part-0.parquet
+
+Ingesting a cycle replaces only that cycle's partitions; other cycles are
+left untouched. Read with pl.scan_parquet(OUT_DIR / "contributions",
+hive_partitioning=True) and filter on ``cycle`` to prune partitions.
 
 Usage:
-  python etl/ingest/fec_ingest.py            # default: 2024 cycle
-  python etl/ingest/fec_ingest.py 2022       # specify cycle year
+  python etl/ingest/fec_ingest.py                # default: 2024 cycle
+  python etl/ingest/fec_ingest.py 2022           # specify cycle year
+  python etl/ingest/fec_ingest.py 2022 2024 2026 --workers 2
 """
+import argparse
 import io
 import os
-import re
+import shutil
 import sys
+import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import polars as pl
 from dotenv import load_dotenv
 
+# Allow running by path (python etl/ingest/fec_ingest.py) from repo root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from etl.transform.name_normalizer import normalize_name  # noqa: E402
+
 load_dotenv()
 
 RAW_DIR = Path(os.environ.get("DATA_RAW", "data/raw")) / "fec"
@@ -45,19 +58,6 @@ CM_COLS = [
     "CONNECTED_ORG_NM", "CAND_ID",
 ]
 
-_PUNCT_RE = re.compile(r"[^A-Z0-9 ]")
-
-
-def _normalize(expr: pl.Expr) -> pl.Expr:
-    """Uppercase → strip punctuation → compress whitespace."""
-    return (
-        expr.str.to_uppercase()
-        .str.replace_all(_PUNCT_RE.pattern, " ")
-        .str.replace_all(r" {2,}", " ")
-        .str.strip_chars()
-    )
-
-
 def _read_zip_member(zip_path: Path, member: str) -> bytes:
     """Read a single member from a zip into memory as bytes."""
     with zipfile.ZipFile(zip_path) as zf:
@@ -65,82 +65,62 @@ def _read_zip_member(zip_path: Path, member: str) -> bytes:
             return f.read()
 
 
-def ingest_contributions(cycle: int = 2024) -> pl.DataFrame:
-    """
-    Stream-parse indiv{YY}.zip → normalised contributions DataFrame.
-    Only individual (ENTITY_TP = 'IND') contributions are kept.
-    """
-    zip_path = RAW_DIR / f"indiv{str(cycle)[-2:]}.zip"
-    if not zip_path.exists():
-        raise FileNotFoundError(f"FEC contributions zip not found: {zip_path}")
+def _extract_zip_member(zip_path: Path, member: str, dest: Path) -> Path:
+    """Decompress a zip member to ``dest`` in fixed-size chunks (bounded memory)."""
+    with zipfile.ZipFile(zip_path) as zf, zf.open(member) as src, open(dest, "wb") as out:
+        shutil.copyfileobj(src, out, length=16 * 1024 * 1024)
+    return dest
 
-    # FEC files are large; read the main itcont.txt member
-    with zipfile.ZipFile(zip_path) as zf:
-        members = zf.namelist()
-        # Prefer the top-level itcont.txt over the by_date partitions
-        main_member = next((m for m in members if "/" not in m), members[0])
-        print(f"[fec] Reading {zip_path.name}:{main_member}")
-        raw_bytes = zf.open(main_member).read()
-
-    df = pl.read_csv(
-        io.BytesIO(raw_bytes),
-        separator="|",
-        has_header=False,
-        new_columns=INDIV_COLS,
-        infer_schema_length=0,          # all str; we cast manually
-        null_values=["", " "],
-        truncate_ragged_lines=True,
-        encoding="utf8-lossy",
-    )
 
-    # Keep only individual contributors (not PAC-level)
-    df = df.filter(pl.col("ENTITY_TP").fill_null("IND") == "IND")
-
-    # Cast amount; drop rows with unparseable amounts
-    df = df.with_columns(
-        pl.col("TRANSACTION_AMT")
-        .str.strip_chars()
-        .cast(pl.Float64, strict=False)
-        .alias("amount")
-    ).filter(pl.col("amount").is_not_null() & (pl.col("amount") > 0))
-
-    # Parse date: MMDDYYYY → date
-    df = df.with_columns(
-        pl.col("TRANSACTION_DT")
-        .str.strip_chars()
-        .str.to_date("%m%d%Y", strict=False)
-        .alias("transaction_date")
-    )
-
-    # Raw contributor name (original casing preserved)
-    df = df.with_columns(
-        pl.col("NAME").str.strip_chars().alias("contributor_name"),
-        pl.col("STATE").str.strip_chars().str.to_uppercase().alias("state"),
-        pl.col("CITY").str.strip_chars().alias("city"),
-        pl.col("EMPLOYER").str.strip_chars().alias("employer"),
-        pl.col("OCCUPATION").str.strip_chars().alias("occupation"),
-        pl.col("CMTE_ID").str.strip_chars().alias("committee_id"),
-        pl.lit(cycle).cast(pl.Int16).alias("cycle"),
-    )
-
-    # Normalized name (uppercase, no punctuation)
-    df = df.with_columns(
-        _normalize(pl.col("contributor_name")).alias("normalized_name"),
-        _normalize(pl.col("employer").fill_null("")).alias("normalized_employer"),
+def contributions_pipeline(raw: pl.LazyFrame, cycle: int, with_cycle: bool = True) -> pl.LazyFrame:
+    """
+    Filtering and normalization of raw itcont rows (all-string INDIV_COLS)
+    into the fec_contributions schema. Lazy, so it runs batch-wise under
+    sink_parquet. Only individual (ENTITY_TP = 'IND') contributions are kept.
+    ``with_cycle=False`` omits the cycle column for hive-partitioned output.
+    """
+    lf = (
+        raw
+        # Keep only individual contributors (not PAC-level)
+        .filter(pl.col("ENTITY_TP").fill_null("IND") == "IND")
+        # Cast amount; drop rows with unparseable amounts
+        .with_columns(
+            pl.col("TRANSACTION_AMT")
+            .str.strip_chars()
+            .cast(pl.Float64, strict=False)
+            .alias("amount")
+        )
+        .filter(pl.col("amount").is_not_null() & (pl.col("amount") > 0))
+        # Parse date: MMDDYYYY → date
+        .with_columns(
+            pl.col("TRANSACTION_DT")
+            .str.strip_chars()
+            .str.to_date("%m%d%Y", strict=False)
+            .alias("transaction_date")
+        )
+        # Raw contributor name (original casing preserved)
+        .with_columns(
+            pl.col("NAME").str.strip_chars().alias("contributor_name"),
+            pl.col("STATE").str.strip_chars().str.to_uppercase().alias("state"),
+            pl.col("CITY").str.strip_chars().alias("city"),
+            pl.col("EMPLOYER").str.strip_chars().alias("employer"),
+            pl.col("OCCUPATION").str.strip_chars().alias("occupation"),
+            pl.col("CMTE_ID").str.strip_chars().alias("committee_id"),
+            pl.lit(cycle).cast(pl.Int16).alias("cycle"),
+        )
+        # Normalized name (uppercase, no punctuation)
+        .with_columns(
+            normalize_name(pl.col("contributor_name")).alias("normalized_name"),
+            normalize_name(pl.col("employer").fill_null("")).alias("normalized_employer"),
+        )
     )
 
-    # Split normalized_name into last / first: "LAST FIRST MI" or "LAST, FIRST MI"
-    # FEC NAME format is "LAST, FIRST MI" — split on first comma
-    df = df.with_columns(
-        pl.col("normalized_name")
-        .str.splitn(",", 2)
-        .struct.field("field_0")
-        .str.strip_chars()
-        .alias("normalized_last_name"),
-        pl.col("normalized_name")
-        .str.splitn(",", 2)
-        .struct.field("field_1")
-        .str.strip_chars()
+    # FEC NAME format is "LAST, FIRST MI" — split the raw name on the first
+    # comma (normalization strips it) and normalize each side separately
+    name_parts = pl.col("contributor_name").str.splitn(",", 2)
+    lf = lf.with_columns(
+        normalize_name(name_parts.struct.field("field_0")).alias("normalized_last_name"),
+        normalize_name(name_parts.struct.field("field_1"))
         .str.slice(0, 1)                # first initial only
         .alias("first_name_initial"),
     )
@@ -151,10 +131,50 @@ def ingest_contributions(cycle: int = 2024) -> pl.DataFrame:
         "occupation", "city", "state", "amount", "committee_id",
         "transaction_date", "cycle",
     ]
-    df = df.select([c for c in keep if c in df.columns])
+    return lf.select([c for c in keep if with_cycle or c != "cycle"])
 
-    print(f"[fec] contributions: {len(df):,} rows after filtering")
-    return df
+
+def ingest_contributions(cycle: int = 2024, out_path: Path | None = None, with_cycle: bool = False) -> Path:
+    """
+    Stream indiv{YY}.zip → normalised contributions Parquet at ``out_path``
+    (default: the cycle's partition). The cycle column is only written into
+    the file with ``with_cycle=True``; in the partitioned store it comes from
+    the directory name.
+
+    The multi-GB itcont.txt is decompressed to a temp file next to the zip,
+    then scanned lazily and written with sink_parquet, so peak memory is
+    bounded by Polars' streaming batch size rather than the file size.
+    """
+    zip_path = RAW_DIR / f"indiv{str(cycle)[-2:]}.zip"
+    if not zip_path.exists():
+        raise FileNotFoundError(f"FEC contributions zip not found: {zip_path}")
+    out_path = out_path or partition_path("contributions", cycle)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # FEC files are large; read the main itcont.txt member
+    with zipfile.ZipFile(zip_path) as zf:
+        members = zf.namelist()
+        # Prefer the top-level itcont.txt over the by_date partitions
+        main_member = next((m for m in members if "/" not in m), members[0])
+
+    with tempfile.TemporaryDirectory(dir=zip_path.parent, prefix=".fec_") as tmp:
+        print(f"[fec] Extracting {zip_path.name}:{main_member}")
+        txt_path = _extract_zip_member(zip_path, main_member, Path(tmp) / "itcont.txt")
+        raw = pl.scan_csv(
+            txt_path,
+            separator="|",
+            has_header=False,
+            new_columns=INDIV_COLS,
+            infer_schema_length=0,          # all str; we cast manually
+            null_values=["", " "],
+            truncate_ragged_lines=True,
+            encoding="utf8-lossy",
+        )
+        contributions_pipeline(raw, cycle, with_cycle).sink_parquet(out_path, compression="zstd")
+
+    n_rows = pl.scan_parquet(out_path).select(pl.len()).collect().item()
+    print(f"[fec] contributions: {n_rows:,} rows after filtering")
+    return out_path
 
 
 def ingest_committees(cycle: int = 2024) -> pl.DataFrame:
@@ -196,27 +216,56 @@ def ingest_committees(cycle: int = 2024) -> pl.DataFrame:
         pl.col("party").str.strip_chars(),
     )
 
-    # Deduplicate on committee_id (keep last for most recent cycle data)
+    # Deduplicate on committee_id (keep last for most recent data within the cycle)
     df = df.unique(subset=["committee_id"], keep="last")
 
     print(f"[fec] committees: {len(df):,} rows")
     return df
 
 
+def partition_path(dataset: str, cycle: int) -> Path:
+    """Parquet file for one cycle of a hive-partitioned FEC dataset."""
+    return OUT_DIR / dataset / f"cycle={cycle}" / "part-0.parquet"
+
+
+def _replace_partition(staged: Path, dataset: str, cycle: int) -> Path:
+    """Move a fully written staging file into place as the cycle's partition.
+
+    Readers see either the old partition or the new one, never a partial file.
+    """
+    final = partition_path(dataset, cycle)
+    final.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(staged, final)
+    return final
+
+
 def ingest(cycle: int = 2024) -> None:
-    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    staging = OUT_DIR / ".staging"
+    staging.mkdir(parents=True, exist_ok=True)
 
-    contrib_df = ingest_contributions(cycle)
-    contrib_out = OUT_DIR / "fec_contributions.parquet"
-    contrib_df.write_parquet(contrib_out, compression="zstd")
-    print(f"[fec] → {contrib_out}")
+    # Partition column comes from the directory name, not the file
+    staged = ingest_contributions(cycle, staging / f"contributions-{cycle}.parquet", with_cycle=False)
+    print(f"[fec] → {_replace_partition(staged, 'contributions', cycle)}")
 
     cmte_df = ingest_committees(cycle)
-    cmte_out = OUT_DIR / "fec_committees.parquet"
-    cmte_df.write_parquet(cmte_out, compression="zstd")
-    print(f"[fec] → {cmte_out}")
+    staged = staging / f"committees-{cycle}.parquet"
+    cmte_df.write_parquet(staged, compression="zstd")
+    print(f"[fec] → {_replace_partition(staged, 'committees', cycle)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest FEC individual contributions and committees by cycle")
+    parser.add_argument("cycles", nargs="*", type=int, default=[2024], help="Election cycles (default: 2024)")
+    parser.add_argument("--workers", type=int, default=1, help="Cycles to ingest concurrently")
+    args = parser.parse_args()
+
+    if args.workers <= 1 or len(args.cycles) <= 1:
+        for cycle in args.cycles:
+            ingest(cycle)
+        return
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(ingest, args.cycles))
 
 
 if __name__ == "__main__":
-    cycle_arg = int(sys.argv[1]) if len(sys.argv) > 1 else 2024
-    ingest(cycle_arg)
+    main()
@@ -8,7 +8,8 @@ Inputs:
   Hospitals: data/raw/hcris/hospital/CostReport_2020_Final.csv … CostReport_2023_Final.csv
   SNFs:      data/raw/hcris/snf/CostReportsnf_Final_20.csv … CostReportsnf_Final_23.csv
   POS:       data/raw/pos/pos2015.csv (and pos2016–pos2018) for CCN → facility_name, state, type
-  Optional:  data/raw/pos/ccn_npi_crosswalk.csv (columns: ccn, npi) for CCN→NPI linkage
+  Optional:  data/raw/pos/ccn_npi_crosswalk.csv (columns: ccn, npi) for CCN→NPI linkage,
+             else data/processed/providers/provider_identifiers/ (NPPES type 06 identifiers)
 
 Column mapping: see docs/HCRIS_MAPPING.md.
 """
@@ -225,7 +226,11 @@ def _load_pos_ccn_lookup() -> pl.DataFrame:
 
 
 def _load_ccn_npi_crosswalk() -> pl.DataFrame | None:
-    """Load optional CCN→NPI crosswalk. Columns: ccn, npi (or prvdr_num/npi)."""
+    """Load optional CCN→NPI crosswalk. Columns: ccn, npi (or prvdr_num/npi).
+
+    Falls back to the NPPES identifier side table (type 06, Medicare
+    OSCAR/Certification number) written by nppes_ingest.
+    """
     candidates = [
         POS_DIR / "ccn_npi_crosswalk.csv",
         RAW / "pos" / "ccn_npi_crosswalk.csv",
@@ -245,6 +250,23 @@ def _load_ccn_npi_crosswalk() -> pl.DataFrame | None:
             )
             df = df.filter(pl.col("ccn").is_not_null() & pl.col("npi").is_not_null())
             return df
+
+    identifiers = PROCESSED / "providers" / "provider_identifiers"
+    if identifiers.exists():
+        df = (
+            pl.scan_parquet(identifiers / "*" / "*.parquet", hive_partitioning=True)
+            .filter(pl.col("type_code") == "06")
+            .select(
+                _normalize_ccn(pl.col("identifier")).alias("ccn"),
+                pl.col("npi").str.strip_chars().str.zfill(10).alias("npi"),
+            )
+            .filter(pl.col("ccn").is_not_null() & pl.col("npi").is_not_null())
+            .unique()
+            .collect()
+        )
+        if not df.is_empty():
+            print(f"[hcris] CCN→NPI crosswalk from NPPES identifiers: {len(df):,} pairs")
+            return df
     return None
 
 
@@ -1,13 +1,22 @@
 """
-LEIE ingest: reads the OIG full exclusion CSV (+ monthly supplement) and
-produces data/processed/exclusions/leie_current.parquet
+LEIE ingest: applies the OIG full exclusion CSV and its exclusion /
+reinstatement supplements as one ordered event log, producing
+
+  data/processed/exclusions/leie_current.parquet  one row per exclusion_id
+  data/processed/exclusions/leie_history.parquet  distinct exclusion /
+                                                  reinstatement / dropped events
+
+The latest full file is the authoritative list of current exclusions: an
+exclusion seen only in earlier (archived) supplements that the full file no
+longer lists is closed with a "dropped" event.
 
 Source columns: LASTNAME, FIRSTNAME, MIDNAME, BUSNAME, GENERAL, SPECIALTY,
                 UPIN, NPI, DOB, ADDRESS, CITY, STATE, ZIP,
                 EXCLTYPE, EXCLDATE, REINDATE, WAIVERDATE, WVRSTATE
 """
+import hashlib
 import os
-import uuid
+import re
 from pathlib import Path
 import polars as pl
 from dotenv import load_dotenv
@@ -19,6 +28,41 @@ OUT_DIR = Path(os.environ.get("DATA_PROCESSED", "data/processed")) / "exclusions
 
 DATE_FMT = "%Y%m%d"  # LEIE dates are YYYYMMDD strings
 
+# Fields that identify one exclusion action. REINDATE / waiver fields are
+# deliberately absent: a reinstatement keeps the id of the exclusion it closes.
+IDENTITY_COLS = [
+    "npi", "last_name", "first_name", "middle_name", "business_name",
+    "dob_raw", "state", "excl_type", "excldate",
+]
+
+
+def _blake2b_hex(values: pl.Series) -> pl.Series:
+    """128-bit hash of each distinct value (the full file and supplements restate
+    the same exclusions, so only uniques are hashed)."""
+    uniques = values.drop_nulls().unique()
+    digests = pl.Series([hashlib.blake2b(v.encode(), digest_size=16).hexdigest() for v in uniques], dtype=pl.Utf8)
+    return values.replace_strict(uniques, digests, default=None, return_dtype=pl.Utf8)
+
+
+def exclusion_id_expr() -> pl.Expr:
+    """Stable exclusion_id: 128-bit blake2b of the normalized identity fields.
+
+    The same exclusion gets the same id on every run (and in every supplement),
+    so Postgres merges and Neo4j MERGEs match existing rows instead of minting
+    duplicates. The identity string is built vectorially; the hash stays in
+    Python because Expr.hash is only 64 bits and not stable across Polars
+    versions, and these ids are persisted in Postgres and Neo4j.
+    """
+    parts = [
+        pl.col(c).cast(pl.Utf8).str.to_uppercase().str.replace_all(r"\s+", " ").str.strip_chars().fill_null("")
+        for c in IDENTITY_COLS
+    ]
+    return (
+        pl.concat_str(parts, separator="\x1f")
+        .map_batches(_blake2b_hex, return_dtype=pl.Utf8)
+        .alias("exclusion_id")
+    )
+
 
 def _parse_date(col: str) -> pl.Expr:
     """Parse YYYYMMDD string; '00000000' → null."""
@@ -73,12 +117,154 @@ def _load_leie_csv(path: Path) -> pl.DataFrame:
     return df.select([c for c in keep if c in df.columns])
 
 
+def _event_files(leie_base: Path, latest: Path) -> list[tuple[Path, str]]:
+    """LEIE files in application order, each tagged with its event kind.
+
+    Archived monthly-supplements/ come first (filename order), then the
+    latest month's full file (kind "full"), then its exclusion and
+    reinstatement supplements. Zero-byte / header-only files are skipped.
+    """
+    full_files = sorted(latest.glob("leie_full_*.csv"))
+    if not full_files:
+        raise FileNotFoundError(f"No leie_full_*.csv in {latest}")
+
+    files = []
+    monthly_dir = leie_base / "monthly-supplements"
+    if monthly_dir.exists():
+        files += [
+            (f, "reinstatement" if "rein" in f.name.lower() else "exclusion")
+            for f in sorted(monthly_dir.glob("*.csv"))
+        ]
+    files.append((full_files[-1], "full"))
+    files += [(f, "exclusion") for f in sorted(latest.glob("*excl*.csv"))]
+    files += [(f, "reinstatement") for f in sorted(latest.glob("*rein*.csv"))]
+    return [(f, kind) for f, kind in files if f.stat().st_size > 100]
+
+
+def load_events(files: list[tuple[Path, str]]) -> pl.DataFrame:
+    """Stack every file into one event log ordered by (file, row).
+
+    A row is a reinstatement event if it came from a reinstatement file or
+    carries a REINDATE; everything else adds (or re-states) an exclusion.
+    Rows of the full file are flagged ``_snapshot``.
+    """
+    frames = []
+    for seq, (path, kind) in enumerate(files):
+        df = _load_leie_csv(path)
+        print(f"[leie] {path.name}: {len(df):,} {kind} rows")
+        frames.append(df.with_columns(
+            pl.lit(seq, dtype=pl.Int32).alias("_seq"),
+            pl.int_range(pl.len(), dtype=pl.Int64).alias("_row"),
+            pl.lit(path.name).alias("source_file"),
+            pl.lit(kind).alias("_file_kind"),
+        ))
+    events = pl.concat(frames, how="diagonal")
+    return (
+        # blank / padding lines carry no identity at all
+        events.filter(pl.any_horizontal(pl.col("npi", "last_name", "business_name").is_not_null()))
+        .with_columns(
+            exclusion_id_expr(),
+            pl.when((pl.col("_file_kind") == "reinstatement") | pl.col("reindate").is_not_null())
+            .then(pl.lit("reinstatement"))
+            .otherwise(pl.lit("exclusion"))
+            .alias("event"),
+            (pl.col("_file_kind") == "full").alias("_snapshot"),
+        )
+        .drop("_file_kind")
+        .sort(["_seq", "_row"])
+    )
+
+
+def apply_events(events: pl.DataFrame) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Fold the ordered event log into (current state, history).
+
+    current — one row per exclusion_id: attributes from its latest event,
+              closed (reinstated=True) if any reinstatement event exists for
+              it (reindate set) or the full file dropped it (reindate null).
+    history — each distinct (exclusion_id, event, event_date) once, at its
+              first appearance; repeats across full file and supplements
+              collapse. Dropped exclusions get a "dropped" event (no date)
+              at the full file.
+    """
+    latest = events.unique(subset=["exclusion_id"], keep="last", maintain_order=True)
+    dropped = _dropped(events)
+    dropped_events = (
+        latest.join(dropped, on="exclusion_id")
+        .join(events.filter(pl.col("_snapshot")).select("_seq", "source_file").head(1), how="cross",
+              suffix="_full")
+        .select(
+            "exclusion_id",
+            pl.lit("dropped").alias("event"),
+            pl.lit(None, dtype=pl.Date).alias("event_date"),
+            "npi", "excl_type", "state",
+            pl.col("source_file_full").alias("source_file"),
+            pl.col("_seq_full").alias("_seq"),
+            pl.lit(None, dtype=pl.Int64).alias("_row"),
+        )
+    )
+    history = (
+        pl.concat([
+            events.with_columns(
+                pl.when(pl.col("event") == "reinstatement")
+                .then(pl.col("reindate"))
+                .otherwise(pl.col("excldate"))
+                .alias("event_date")
+            )
+            .unique(subset=["exclusion_id", "event", "event_date"], keep="first", maintain_order=True)
+            .select(dropped_events.columns),
+            dropped_events,
+        ])
+        .sort(["_seq", "_row"], nulls_last=True, maintain_order=True)
+        .rename({"_seq": "file_seq", "_row": "file_row"})
+    )
+
+    closes = (
+        events.filter(pl.col("event") == "reinstatement")
+        .group_by("exclusion_id")
+        .agg(pl.col("reindate").max())
+    )
+    orphans = closes.join(
+        events.filter(pl.col("event") == "exclusion").select("exclusion_id"), on="exclusion_id", how="anti"
+    )
+    if len(orphans):
+        print(f"[leie] {len(orphans):,} reinstatements without a matching exclusion row (kept as closed)")
+    if len(dropped):
+        print(f"[leie] {len(dropped):,} exclusions no longer in the full file (closed as dropped)")
+
+    current = (
+        latest.drop("reindate")
+        .join(closes, on="exclusion_id", how="left")
+        .join(dropped.with_columns(pl.lit(True).alias("_dropped")), on="exclusion_id", how="left")
+        .with_columns(
+            pl.lit("LEIE").alias("source"),
+            (pl.col("reindate").is_not_null() | pl.col("_dropped").fill_null(False)).alias("reinstated"),
+        )
+        .drop("_seq", "_row", "event", "_snapshot", "_dropped")
+    )
+    return current, history
+
+
+def _dropped(events: pl.DataFrame) -> pl.DataFrame:
+    """(exclusion_id) of exclusions added before the full file, missing from it
+    and not re-stated after it. Empty when the log has no full file."""
+    snapshot_seq = events.filter(pl.col("_snapshot"))["_seq"].max()
+    if snapshot_seq is None:
+        return pl.DataFrame(schema={"exclusion_id": pl.Utf8})
+    return (
+        events.filter(pl.col("event") == "exclusion")
+        .group_by("exclusion_id")
+        .agg(pl.col("_seq").max())
+        .filter(pl.col("_seq") < snapshot_seq)
+        .select("exclusion_id")
+        .sort("exclusion_id")
+    )
+
+
 def ingest(raw_dir: Path = RAW_DIR, out_dir: Path = OUT_DIR) -> None:
     out_dir.mkdir(parents=True, exist_ok=True)
 
     leie_base = raw_dir / "leie"
     # pick the latest YYYY-MM folder (skip named subdirs like monthly-supplements)
-    import re
     month_dirs = sorted(
         [d for d in leie_base.iterdir()
          if d.is_dir() and re.match(r'^\d{4}-\d{2}$', d.name)],
@@ -90,38 +276,14 @@ def ingest(raw_dir: Path = RAW_DIR, out_dir: Path = OUT_DIR) -> None:
     latest = month_dirs[0]
     print(f"[leie] Using {latest}")
 
-    # full file
-    full_files = sorted(latest.glob("leie_full_*.csv"))
-    if not full_files:
-        raise FileNotFoundError(f"No leie_full_*.csv in {latest}")
-    df = _load_leie_csv(full_files[-1])
-    print(f"[leie] Full file: {len(df):,} rows")
-
-    # supplements (may be empty / zero-byte)
-    for supp in sorted(latest.glob("*excl*.csv")) + sorted(latest.glob("*rein*.csv")):
-        if supp.stat().st_size > 100:
-            supp_df = _load_leie_csv(supp)
-            print(f"[leie] Supplement {supp.name}: {len(supp_df):,} rows")
-            df = pl.concat([df, supp_df], how="diagonal")
-
-    # monthly-supplements folder
-    monthly_dir = leie_base / "monthly-supplements"
-    if monthly_dir.exists():
-        for f in sorted(monthly_dir.glob("*.csv")):
-            if f.stat().st_size > 100:
-                supp_df = _load_leie_csv(f)
-                print(f"[leie] Monthly supplement {f.name}: {len(supp_df):,} rows")
-                df = pl.concat([df, supp_df], how="diagonal")
-
-    # stable exclusion_id: hash of npi+excl_type+excl_date or row hash
-    df = df.with_columns(
-        pl.Series("exclusion_id", [str(uuid.uuid4()) for _ in range(len(df))]),
-        pl.lit("LEIE").alias("source"),
-        pl.col("reindate").is_not_null().alias("reinstated"),
-    )
+    events = load_events(_event_files(leie_base, latest))
+    current, history = apply_events(events)
+    n_active = current.filter(~pl.col("reinstated")).height
+    print(f"[leie] {len(events):,} events → {len(current):,} exclusions ({n_active:,} active), {len(history):,} history rows")
 
-    df.write_parquet(out_dir / "leie_current.parquet", compression="zstd")
-    print(f"[leie] → {out_dir}/leie_current.parquet  ({len(df):,} rows)")
+    current.write_parquet(out_dir / "leie_current.parquet", compression="zstd")
+    history.write_parquet(out_dir / "leie_history.parquet", compression="zstd")
+    print(f"[leie] → {out_dir}/leie_current.parquet, leie_history.parquet")
 
 
 if __name__ == "__main__":
@@ -7,13 +7,23 @@ Source: data/raw/medicaid-puf/datasets--HHS-Official--medicaid-provider-spending
 Columns: BILLING_PROVIDER_NPI_NUM, SERVICING_PROVIDER_NPI_NUM, HCPCS_CODE,
          CLAIM_FROM_MONTH, TOTAL_UNIQUE_BENEFICIARIES, TOTAL_CLAIMS, TOTAL_PAID
 
-Output: data/processed/payments/medicaid_by_npi_year.parquet
+Outputs (data/processed/payments/):
+  medicaid_by_npi_year.parquet        — billing NPI × year totals
+  medicaid_services/year=YYYY/month=MM/part-0.parquet
+                                      — billing NPI × servicing NPI × HCPCS × month,
+                                        sorted by NPI so row-group min/max
+                                        statistics prune NPI lookups
+
+Read the service dataset with pl.scan_parquet(OUT_DIR / "medicaid_services",
+hive_partitioning=True) and filter on year / month / npi.
 """
-import io
 import os
+import shutil
+import tempfile
 import zipfile
 from pathlib import Path
 import polars as pl
+import pyarrow.dataset as ds
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -24,6 +34,13 @@ OUT_DIR = Path(os.environ.get("DATA_PROCESSED", "data/processed")) / "payments"
 # Known blob path (HuggingFace cache layout)
 BLOB_PARENT = "medicaid-puf/datasets--HHS-Official--medicaid-provider-spending/blobs"
 
+SERVICES_DIR = "medicaid_services"
+# Rows per Parquet row group in the service dataset (zone-map granularity)
+SERVICES_ROW_GROUP = int(os.environ.get("MEDICAID_SERVICES_ROW_GROUP", "100000"))
+
+SERVICE_GRAIN = ["npi", "servicing_npi", "hcpcs_code"]
+TOTAL_COLS = ["total_paid", "total_claims", "total_beneficiaries"]
+
 
 def _find_zip(raw_dir: Path) -> Path:
     blobs_dir = raw_dir / BLOB_PARENT
@@ -36,78 +53,180 @@ def _find_zip(raw_dir: Path) -> Path:
     return max(zips, key=lambda f: f.stat().st_size)
 
 
-def ingest(raw_dir: Path = RAW_DIR, out_dir: Path = OUT_DIR) -> None:
-    out_dir.mkdir(parents=True, exist_ok=True)
-    zip_path = _find_zip(raw_dir)
-    print(f"[medicaid_puf] Reading {zip_path.name} …")
-
+def _extract_csv(zip_path: Path, dest_dir: Path) -> Path:
+    """Decompress the CSV member to ``dest_dir`` in fixed-size chunks (bounded memory)."""
     with zipfile.ZipFile(zip_path) as zf:
         csv_names = [n for n in zf.namelist() if n.endswith(".csv")]
         if not csv_names:
             raise ValueError(f"No CSV inside {zip_path}")
         csv_name = csv_names[0]
         print(f"[medicaid_puf] Extracting {csv_name} …")
-        with zf.open(csv_name) as f:
-            df = pl.read_csv(
-                io.BytesIO(f.read()),
-                infer_schema_length=10_000,
-                null_values=["", "NULL", "N/A"],
-            )
+        dest = dest_dir / Path(csv_name).name
+        with zf.open(csv_name) as src, open(dest, "wb") as out:
+            shutil.copyfileobj(src, out, length=16 * 1024 * 1024)
+    return dest
 
-    print(f"[medicaid_puf] Raw: {len(df):,} rows, columns: {df.columns}")
 
-    # Normalize column names to lowercase
-    df = df.rename({c: c.strip().lower().replace(" ", "_") for c in df.columns})
+def _detect_columns(header: list[str]) -> dict[str, str]:
+    """Map raw header names → npi / servicing_npi / hcpcs_code / month_raw /
+    total_* from the header alone."""
+    norm = {c: c.strip().lower().replace(" ", "_") for c in header}
+    cols = list(norm.values())
 
     npi_col = next(
-        (c for c in df.columns if "billing" in c and "npi" in c),
-        next((c for c in df.columns if "npi" in c), None),
+        (c for c in cols if "billing" in c and "npi" in c),
+        next((c for c in cols if "npi" in c and "servicing" not in c), None),
     )
     if npi_col is None:
-        raise ValueError(f"Cannot find NPI column. Columns: {df.columns}")
+        raise ValueError(f"Cannot find NPI column. Columns: {header}")
+    servicing_col = next((c for c in cols if "servicing" in c and "npi" in c), None)
+    hcpcs_col = next((c for c in cols if "hcpcs" in c), None)
 
-    month_col = next((c for c in df.columns if "month" in c or "year" in c), None)
-    paid_col = next((c for c in df.columns if "paid" in c or "payment" in c), None)
-    claims_col = next((c for c in df.columns if "claim" in c), None)
-    bene_col = next((c for c in df.columns if "benef" in c), None)
+    month_col = next((c for c in cols if "month" in c or "year" in c), None)
+    paid_col = next((c for c in cols if "paid" in c or "payment" in c), None)
+    claims_col = next((c for c in cols if "claim" in c and c != month_col), None)
+    bene_col = next((c for c in cols if "benef" in c), None)
 
     print(f"[medicaid_puf] Using columns: npi={npi_col}, month={month_col}, "
-          f"paid={paid_col}, claims={claims_col}, bene={bene_col}")
-
-    select_cols = {npi_col: "npi"}
+          f"paid={paid_col}, claims={claims_col}, bene={bene_col}, "
+          f"servicing={servicing_col}, hcpcs={hcpcs_col}")
+
+    targets = {npi_col: "npi"}
+    if servicing_col:
+        targets[servicing_col] = "servicing_npi"
+    if hcpcs_col:
+        targets[hcpcs_col] = "hcpcs_code"
     if month_col:
-        select_cols[month_col] = "month_raw"
+        targets[month_col] = "month_raw"
     if paid_col:
-        select_cols[paid_col] = "total_paid"
+        targets[paid_col] = "total_paid"
     if claims_col:
-        select_cols[claims_col] = "total_claims"
+        targets[claims_col] = "total_claims"
     if bene_col:
-        select_cols[bene_col] = "total_beneficiaries"
-
-    df = df.select(list(select_cols)).rename(select_cols)
-    df = df.with_columns(pl.col("npi").cast(pl.Utf8).str.strip_chars())
-
-    # Parse year from YYYYMM or YYYY-MM
-    if "month_raw" in df.columns:
-        df = df.with_columns(
-            pl.col("month_raw").cast(pl.Utf8).str.slice(0, 4).cast(pl.Int32, strict=False).alias("year")
+        targets[bene_col] = "total_beneficiaries"
+    return {raw: targets[n] for raw, n in norm.items() if n in targets}
+
+
+def typed_pipeline(raw: pl.LazyFrame, columns: dict[str, str]) -> pl.LazyFrame:
+    """Project the detected columns, trim ids, parse year / month and cast totals."""
+    lf = raw.select(list(columns)).rename(columns)
+    present = set(columns.values())
+    lf = lf.with_columns([
+        pl.col(c).cast(pl.Utf8).str.strip_chars()
+        for c in ["npi", "servicing_npi", "hcpcs_code"] if c in present
+    ])
+
+    # Parse year / month from YYYYMM or YYYY-MM
+    if "month_raw" in present:
+        digits = pl.col("month_raw").cast(pl.Utf8).str.replace_all(r"[^0-9]", "")
+        lf = lf.with_columns(
+            digits.str.slice(0, 4).cast(pl.Int32, strict=False).alias("year"),
+            digits.str.slice(4, 2).cast(pl.Int8, strict=False).alias("month"),
         ).drop("month_raw")
 
-    # Aggregate to NPI + year
-    agg_cols = [c for c in ["total_paid", "total_claims", "total_beneficiaries"] if c in df.columns]
-    group_cols = [c for c in ["npi", "year"] if c in df.columns]
+    return lf.with_columns([
+        pl.col(c).cast(pl.Float64, strict=False) for c in TOTAL_COLS if c in present
+    ])
 
-    df = (
-        df.with_columns([
-            pl.col(c).cast(pl.Float64, strict=False) for c in agg_cols
-        ])
-        .group_by(group_cols)
+
+def npi_year_pipeline(typed: pl.LazyFrame) -> pl.LazyFrame:
+    """Aggregate typed rows to NPI + year (lazy, streamable)."""
+    names = typed.collect_schema().names()
+    agg_cols = [c for c in TOTAL_COLS if c in names]
+    group_cols = [c for c in ["npi", "year"] if c in names]
+    return (
+        typed.group_by(group_cols)
         .agg([pl.col(c).sum() for c in agg_cols])
         .sort(group_cols)
     )
 
-    df.write_parquet(out_dir / "medicaid_by_npi_year.parquet", compression="zstd")
-    print(f"[medicaid_puf] → {out_dir}/medicaid_by_npi_year.parquet  ({len(df):,} rows)")
+
+def write_services(staged: Path, out_dir: Path, work_dir: Path) -> int:
+    """
+    Typed rows → hive-partitioned (year / month) service dataset under
+    ``out_dir``, replacing the previous one. Returns the row count.
+
+    pyarrow splits the staged file by month in one streaming pass; each month
+    is then aggregated to the service grain, sorted by NPI and written with
+    SERVICES_ROW_GROUP-row groups so min/max statistics prune NPI filters.
+    """
+    by_month = work_dir / "by_month"
+    # Rows with an unparseable month have no partition to live in
+    dated = ds.field("year").is_valid() & ds.field("month").is_valid()
+    ds.write_dataset(
+        ds.dataset(staged, format="parquet").scanner(filter=dated),
+        by_month,
+        format="parquet",
+        partitioning=["year", "month"],
+        partitioning_flavor="hive",
+    )
+
+    build = work_dir / SERVICES_DIR
+    n_rows = 0
+    for part in sorted(by_month.glob("year=*/month=*")):
+        month = (
+            pl.scan_parquet(part / "*.parquet")
+            .group_by(SERVICE_GRAIN)
+            .agg([pl.col(c).sum() for c in TOTAL_COLS])
+            .sort(SERVICE_GRAIN)
+            .collect()
+        )
+        dest = build / part.relative_to(by_month) / "part-0.parquet"
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        month.write_parquet(dest, compression="zstd", statistics=True, row_group_size=SERVICES_ROW_GROUP)
+        n_rows += len(month)
+
+    # Swap the finished dataset in; readers never see a partial month
+    final = out_dir / SERVICES_DIR
+    old = work_dir / f"{SERVICES_DIR}.old"
+    if final.exists():
+        os.replace(final, old)
+    os.replace(build, final)
+    return n_rows
+
+
+def ingest(raw_dir: Path = RAW_DIR, out_dir: Path = OUT_DIR) -> None:
+    """
+    Stream the PUF zip → NPI-year Parquet and the service-level dataset.
+
+    The CSV is decompressed to a spill file under ``out_dir``, its header is
+    read once for column detection, and a single projected scan writes typed
+    rows with sink_parquet. Both outputs are derived from that columnar
+    staging file, so the CSV is parsed once and peak memory is bounded by the
+    largest month rather than the file size.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    zip_path = _find_zip(raw_dir)
+    print(f"[medicaid_puf] Reading {zip_path.name} …")
+    out_path = out_dir / "medicaid_by_npi_year.parquet"
+
+    with tempfile.TemporaryDirectory(dir=out_dir, prefix=".medicaid_") as tmp:
+        tmp = Path(tmp)
+        csv_path = _extract_csv(zip_path, tmp)
+        header = pl.read_csv(csv_path, n_rows=0).columns
+        print(f"[medicaid_puf] Header: {header}")
+        columns = _detect_columns(header)
+
+        raw = pl.scan_csv(
+            csv_path,
+            infer_schema_length=0,          # all str; we cast manually
+            null_values=["", "NULL", "N/A"],
+        )
+        typed_path = tmp / "typed.parquet"
+        typed_pipeline(raw, columns).sink_parquet(typed_path, compression="zstd")
+        csv_path.unlink()                   # free the spill before writing outputs
+
+        staged = tmp / out_path.name
+        npi_year_pipeline(pl.scan_parquet(typed_path)).sink_parquet(staged, compression="zstd")
+        os.replace(staged, out_path)
+        n_rows = pl.scan_parquet(out_path).select(pl.len()).collect().item()
+        print(f"[medicaid_puf] → {out_path}  ({n_rows:,} rows)")
+
+        if {"servicing_npi", "hcpcs_code", "month_raw"} <= set(columns.values()):
+            n_rows = write_services(typed_path, out_dir, tmp)
+            print(f"[medicaid_puf] → {out_dir / SERVICES_DIR}  ({n_rows:,} rows)")
+        else:
+            print("[medicaid_puf] No servicing NPI / HCPCS / month columns — skipping service dataset")
 
 
 if __name__ == "__main__":
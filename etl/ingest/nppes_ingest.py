@@ -1,15 +1,51 @@
 """
-NPPES ingest: reads the full NPI dissemination CSV and produces
-data/processed/providers/providers_canonical.parquet
+NPPES ingest: reads the NPI dissemination CSVs and produces
+data/processed/providers/providers_canonical/npi_prefix=NNN/part-0.parquet
+data/processed/providers/provider_taxonomies/npi_prefix=NNN/part-0.parquet
+data/processed/providers/provider_licenses/npi_prefix=NNN/part-0.parquet
+data/processed/providers/provider_identifiers/npi_prefix=NNN/part-0.parquet
 data/processed/providers/providers_nppes_orgs.parquet
 
+The side tables unpivot NPPES's numbered slots (15 taxonomy/license slots,
+50 "Other Provider Identifier" slots) into one row per (npi, slot). They are
+built in the same pass as the provider rows.
+
+Each npidata file (full or weekly) is parsed once: a projected scan_csv is
+sunk to a columnar spill, provider rows and the melted side tables are
+streamed from the spill into staging datasets partitioned by NPI prefix, and
+partitions are then finalized one at a time. Peak memory is one partition,
+not the file.
+
 Source: data/raw/nppes/YYYY-MM/NPPES_Data_Dissemination_*_V2/npidata_pfile_*.csv
-The February 2026 full file is used as canonical; weekly deltas go in the same
-folder if present (handled by the merge in providers_transform.py).
+        data/raw/nppes/**/NPPES_Data_Dissemination_*_Weekly_V2/npidata_pfile_*.csv
+
+Every dataset is hive-partitioned by NPI prefix and sorted by NPI within
+each partition. Two modes:
+
+  full         rebuild the store from the latest monthly full file
+               (periodic compaction; clears the applied-delta list)
+  incremental  apply weekly delta files newer than the full file that have
+               not been applied yet, rewriting only the partitions whose NPIs
+               they touch
+
+Read the store with pl.scan_parquet(OUT_DIR / "providers_canonical" / "*" /
+"*.parquet", hive_partitioning=True) and drop ``npi_prefix``; the glob skips
+the ``_manifest.json`` that records which files have been applied.
+
+Usage:
+  python -m etl.ingest.nppes_ingest           # incremental if a store exists, else full
+  python -m etl.ingest.nppes_ingest --full    # rebuild from the monthly full file
 """
+import argparse
+import json
 import os
+import re
+import tempfile
 from pathlib import Path
+from typing import Callable
+
 import polars as pl
+import pyarrow.dataset as ds
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -48,6 +84,59 @@ NPI_COL_MAP = {
     "Authorized Official Telephone Number": "auth_official_phone",
 }
 
+CANONICAL_DIR = "providers_canonical"
+MANIFEST = "_manifest.json"
+# Leading NPI digits per canonical partition (3 → ~200 partitions of ~40k NPIs)
+NPI_PREFIX_DIGITS = int(os.environ.get("NPPES_PREFIX_DIGITS", "3"))
+
+# npidata_pfile_<start>-<end>.csv — end date orders full files and deltas
+_PFILE_END_RE = re.compile(r"npidata_pfile_\d{8}-(\d{8})", re.IGNORECASE)
+
+# Provider-slot side tables: dataset → (slots, {raw column template: field}).
+# The first field is the slot's value; slots where it is empty are dropped.
+TAXONOMY_SLOTS = 15
+IDENTIFIER_SLOTS = 50
+SLOT_TABLES: dict[str, tuple[int, dict[str, str]]] = {
+    "provider_taxonomies": (TAXONOMY_SLOTS, {
+        "Healthcare Provider Taxonomy Code_{}": "taxonomy_code",
+        "Healthcare Provider Primary Taxonomy Switch_{}": "primary_switch",
+    }),
+    "provider_licenses": (TAXONOMY_SLOTS, {
+        "Provider License Number_{}": "license_number",
+        "Provider License Number State Code_{}": "license_state",
+        "Healthcare Provider Taxonomy Code_{}": "taxonomy_code",
+    }),
+    "provider_identifiers": (IDENTIFIER_SLOTS, {
+        "Other Provider Identifier_{}": "identifier",
+        "Other Provider Identifier Type Code_{}": "type_code",
+        "Other Provider Identifier State_{}": "state",
+        "Other Provider Identifier Issuer_{}": "issuer",
+    }),
+}
+
+# Other Provider Identifier Type Code → label (06 carries the Medicare CCN)
+IDENTIFIER_TYPES = {
+    "01": "OTHER",
+    "02": "MEDICARE UPIN",
+    "04": "MEDICARE ID-TYPE UNSPECIFIED",
+    "05": "MEDICAID",
+    "06": "MEDICARE OSCAR/CERTIFICATION",
+    "07": "MEDICARE NSC",
+    "08": "MEDICARE PIN",
+}
+
+SLOT_FINISH: dict[str, Callable[[pl.LazyFrame], pl.LazyFrame]] = {
+    "provider_taxonomies": lambda lf: lf.with_columns(
+        (pl.col("primary_switch") == "Y").fill_null(False).alias("is_primary")
+    ).drop("primary_switch"),
+    "provider_licenses": lambda lf: lf,
+    "provider_identifiers": lambda lf: lf.with_columns(
+        pl.col("type_code").str.zfill(2),
+    ).with_columns(
+        pl.col("type_code").replace_strict(IDENTIFIER_TYPES, default=None).alias("identifier_type"),
+    ),
+}
+
 ORG_COLS = [
     "npi", "entity_type_code", "org_name",
     "auth_official_last_name", "auth_official_first_name", "auth_official_title",
@@ -73,7 +162,10 @@ def _resolve_npi_file(raw_dir: Path) -> Path:
             matches = sorted(raw_dir.glob(pattern))
         except Exception:
             matches = []
-        matches = [f for f in matches if f.is_file() and "fileheader" not in f.name.lower()]
+        matches = [
+            f for f in matches
+            if f.is_file() and "fileheader" not in f.name.lower() and "weekly" not in f.parent.name.lower()
+        ]
         all_matches.extend(matches)
     if all_matches:
         # Dedupe and take latest by path (later month/dir wins)
@@ -84,44 +176,273 @@ def _resolve_npi_file(raw_dir: Path) -> Path:
     )
 
 
-def ingest(raw_dir: Path | None = None, out_dir: Path | None = None) -> None:
-    raw_dir = raw_dir or RAW_DIR
-    out_dir = out_dir or OUT_DIR
-    out_dir.mkdir(parents=True, exist_ok=True)
-    # NPPES raw data lives under raw_dir/nppes (e.g. data/raw/nppes/2026-02/...)
-    nppes_raw = raw_dir / "nppes" if raw_dir.name != "nppes" else raw_dir
-    npi_path = _resolve_npi_file(nppes_raw)
-    print(f"[nppes] Reading {npi_path} …")
+def _resolve_delta_files(raw_dir: Path) -> list[Path]:
+    """Weekly delta files, oldest first."""
+    matches = {
+        f for f in raw_dir.glob("**/NPPES_Data_Dissemination_*_Weekly_V2/npidata_pfile_*.csv")
+        if f.is_file() and "fileheader" not in f.name.lower()
+    }
+    return sorted(matches, key=lambda f: (_pfile_end(f), f.name))
+
+
+def _pfile_end(path: Path) -> str:
+    """End date (YYYYMMDD) from an npidata_pfile name; '' when absent."""
+    m = _PFILE_END_RE.search(path.name)
+    return m.group(1) if m else ""
+
 
-    # read only the columns we care about; NPPES has 330 columns so we save a lot
+def _slot_columns(available: list[str]) -> dict[str, dict[int, dict[str, str]]]:
+    """Per side table: slot number → {raw column: field} for the slots present."""
+    out: dict[str, dict[int, dict[str, str]]] = {}
+    for dataset, (n_slots, fields) in SLOT_TABLES.items():
+        slots = {}
+        for i in range(1, n_slots + 1):
+            cols = {tpl.format(i): field for tpl, field in fields.items() if tpl.format(i) in available}
+            if cols:
+                slots[i] = cols
+        out[dataset] = slots
+    return out
+
+
+def _with_prefix(lf: pl.LazyFrame) -> pl.LazyFrame:
+    return lf.with_columns(pl.col("npi").str.slice(0, NPI_PREFIX_DIGITS).alias("npi_prefix"))
+
+
+def _scan_npi_file(npi_path: Path) -> tuple[pl.LazyFrame, dict[str, dict[int, dict[str, str]]]]:
+    """Projected scan of a full or weekly npidata file: only the NPI_COL_MAP and
+    slot columns (NPPES has 330), all Utf8. Also returns the slot layout."""
     available = pl.read_csv(npi_path, n_rows=0).columns
-    wanted = [c for c in NPI_COL_MAP if c in available]
-    rename = {c: NPI_COL_MAP[c] for c in wanted}
-
-    df = (
-        pl.scan_csv(npi_path, infer_schema_length=0)
-        .select(wanted)
-        .rename(rename)
-        .with_columns(
-            pl.col("npi").str.strip_chars(),
-            pl.col("zip").str.slice(0, 5).alias("zip"),
-            pl.col("entity_type_code").cast(pl.Int8, strict=False),
-        )
-        .collect(engine="streaming")
+    slot_cols = _slot_columns(available)
+    wanted = sorted(
+        {c for c in NPI_COL_MAP if c in available}
+        | {raw for slots in slot_cols.values() for cols in slots.values() for raw in cols}
     )
+    return pl.scan_csv(npi_path, infer_schema_length=0, null_values=[""]).select(wanted), slot_cols
+
+
+def _project(wide: pl.LazyFrame, slot_cols: dict[str, dict[int, dict[str, str]]]) -> dict[str, pl.LazyFrame]:
+    """Raw columns (plus the file's ``_row`` index) → provider rows and the long side tables."""
+    wide = wide.with_columns(pl.col("NPI").str.strip_chars()).filter(
+        pl.col("NPI").is_not_null() & (pl.col("NPI") != "")
+    )
+    main_cols = [c for c in NPI_COL_MAP if c in wide.collect_schema().names()]
+    frames = {
+        CANONICAL_DIR: _with_prefix(
+            wide.select("_row", *main_cols)
+            .rename({c: NPI_COL_MAP[c] for c in main_cols})
+            .with_columns(
+                pl.col("zip").str.slice(0, 5).alias("zip"),
+                pl.col("entity_type_code").cast(pl.Int8, strict=False),
+            )
+        )
+    }
+
+    # Melt the numbered slots: one narrow select per slot, stacked, empties dropped
+    for dataset, slots in slot_cols.items():
+        fields = list(SLOT_TABLES[dataset][1].values())
+        parts = []
+        for i, cols in slots.items():
+            raw_for = {field: raw for raw, field in cols.items()}
+            parts.append(wide.select(
+                "_row",
+                pl.col("NPI").alias("npi"),
+                pl.lit(i, dtype=pl.Int16).alias("slot"),
+                *[
+                    pl.col(raw_for[f]).str.strip_chars().alias(f) if f in raw_for
+                    else pl.lit(None, dtype=pl.Utf8).alias(f)
+                    for f in fields
+                ],
+            ))
+        if not parts:
+            continue
+        key = fields[0]
+        long = pl.concat(parts).filter(pl.col(key).is_not_null() & (pl.col(key) != ""))
+        frames[dataset] = _with_prefix(SLOT_FINISH[dataset](long))
+    return frames
+
+
+def _stage_npi_file(npi_path: Path, work_dir: Path) -> dict[str, Path]:
+    """
+    Single streaming pass over a full or weekly npidata file.
+
+    The projected scan is sunk once to a columnar spill (the only CSV parse);
+    provider rows and each side table are then streamed from the spill into
+    ``work_dir/<dataset>/npi_prefix=NNN/`` staging partitions. Nothing is
+    collected whole. Returns dataset → staging directory.
+    """
+    work_dir.mkdir(parents=True, exist_ok=True)
+    wide, slot_cols = _scan_npi_file(npi_path)
+    spill = work_dir / "wide.parquet"
+    wide.with_row_index("_row").sink_parquet(spill, compression="zstd")
+
+    staged = {}
+    for dataset, frame in _project(pl.scan_parquet(spill), slot_cols).items():
+        flat = work_dir / f"{dataset}.parquet"
+        frame.sink_parquet(flat, compression="zstd")
+        ds.write_dataset(
+            ds.dataset(flat, format="parquet"),
+            work_dir / dataset,
+            format="parquet",
+            partitioning=["npi_prefix"],
+            partitioning_flavor="hive",
+        )
+        flat.unlink()
+        staged[dataset] = work_dir / dataset
+    spill.unlink()
+    return staged
+
+
+def _latest_rows(rows: pl.DataFrame) -> pl.DataFrame:
+    """Keep each NPI's rows from its last occurrence in the file (a repeated
+    NPI replaces the earlier copy, slots included), without ``_row``."""
+    return rows.filter(pl.col("_row") == pl.col("_row").max().over("npi")).drop("_row")
+
+
+def _staged_partition(staged: Path, prefix: str) -> pl.DataFrame | None:
+    """One finalized staging partition, or None when the file has no rows there."""
+    part = staged / f"npi_prefix={prefix}"
+    if not part.exists():
+        return None
+    return _latest_rows(pl.read_parquet(part / "*.parquet", hive_partitioning=False))
+
+
+def _staged_prefixes(staged: Path) -> list[str]:
+    return sorted(p.name.split("=", 1)[1] for p in staged.glob("npi_prefix=*")) if staged.exists() else []
+
+
+def _read_manifest(store: Path) -> dict:
+    path = store / MANIFEST
+    return json.loads(path.read_text()) if path.exists() else {}
 
-    print(f"[nppes] {len(df):,} rows loaded")
 
-    # canonical (all individual + org providers)
-    df.write_parquet(out_dir / "providers_canonical.parquet", compression="zstd")
-    print(f"[nppes] → {out_dir}/providers_canonical.parquet")
+def _write_manifest(store: Path, manifest: dict) -> None:
+    tmp = store / f"{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, store / MANIFEST)
 
-    # org-only with authorized officials
-    org_available = [c for c in ORG_COLS if c in df.columns]
-    orgs = df.filter(pl.col("entity_type_code") == 2).select(org_available)
+
+def _write_partition(store: Path, prefix: str, rows: pl.DataFrame, work_dir: Path) -> None:
+    """Replace one NPI-prefix partition with ``rows`` (sorted by NPI)."""
+    staged = work_dir / f"{prefix}.parquet"
+    order = [c for c in ("npi", "slot") if c in rows.columns]
+    rows.sort(order).write_parquet(staged, compression="zstd")
+    final = store / f"npi_prefix={prefix}" / "part-0.parquet"
+    final.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(staged, final)
+
+
+def _write_orgs(store: Path, out_dir: Path) -> None:
+    """Org-only extract with authorized officials, from the canonical store."""
+    lf = pl.scan_parquet(store / "*" / "*.parquet", hive_partitioning=True)
+    org_available = [c for c in ORG_COLS if c in lf.collect_schema().names()]
+    orgs = lf.filter(pl.col("entity_type_code") == 2).select(org_available).collect()
     orgs.write_parquet(out_dir / "providers_nppes_orgs.parquet", compression="zstd")
     print(f"[nppes] → {out_dir}/providers_nppes_orgs.parquet  ({len(orgs):,} org rows)")
 
 
+def ingest_full(nppes_raw: Path, out_dir: Path) -> None:
+    """Rebuild the canonical store and side tables from the latest monthly full file."""
+    npi_path = _resolve_npi_file(nppes_raw)
+    print(f"[nppes] Reading {npi_path} …")
+
+    with tempfile.TemporaryDirectory(dir=out_dir, prefix=".nppes_") as tmp:
+        tmp = Path(tmp)
+        staged = _stage_npi_file(npi_path, tmp / "staged")
+        for dataset, staged_dir in staged.items():
+            build = tmp / dataset
+            build.mkdir()
+            n_rows = 0
+            prefixes = _staged_prefixes(staged_dir)
+            for prefix in prefixes:
+                rows = _staged_partition(staged_dir, prefix)
+                _write_partition(build, prefix, rows, tmp)
+                n_rows += len(rows)
+            if dataset == CANONICAL_DIR:
+                _write_manifest(build, {"full_file": npi_path.name, "full_end": _pfile_end(npi_path), "deltas": []})
+
+            # Swap each rebuilt dataset in whole; the old one goes away with tmp
+            final = out_dir / dataset
+            if final.exists():
+                os.replace(final, tmp / f"{dataset}.old")
+            os.replace(build, final)
+            print(f"[nppes] → {final}  ({n_rows:,} rows, {len(prefixes):,} partitions)")
+
+
+def _apply_delta(out_dir: Path, staged: dict[str, Path], work_dir: Path) -> int:
+    """Replace every delta NPI's rows in the partitions the delta touches.
+
+    Returns the number of partitions rewritten.
+    """
+    prefixes = _staged_prefixes(staged[CANONICAL_DIR])
+    for prefix in prefixes:
+        delta_npis = _staged_partition(staged[CANONICAL_DIR], prefix).select("npi")
+        for dataset in [CANONICAL_DIR, *SLOT_TABLES]:
+            parts = []
+            part = out_dir / dataset / f"npi_prefix={prefix}" / "part-0.parquet"
+            if part.exists():
+                # An NPI in the delta replaces all of its old rows, slots included
+                parts.append(pl.read_parquet(part).join(delta_npis, on="npi", how="anti"))
+            new_rows = _staged_partition(staged[dataset], prefix) if dataset in staged else None
+            if new_rows is not None:
+                parts.append(new_rows)
+            if parts:
+                _write_partition(out_dir / dataset, prefix, pl.concat(parts, how="diagonal_relaxed"), work_dir)
+    return len(prefixes)
+
+
+def ingest_incremental(nppes_raw: Path, out_dir: Path) -> None:
+    """Apply pending weekly deltas, rewriting only the partitions they touch."""
+    store = out_dir / CANONICAL_DIR
+    manifest = _read_manifest(store)
+    applied = set(manifest.get("deltas", []))
+    pending = [
+        f for f in _resolve_delta_files(nppes_raw)
+        if f.name not in applied and _pfile_end(f) > manifest.get("full_end", "")
+    ]
+    if not pending:
+        print("[nppes] No pending weekly deltas")
+        return
+
+    for delta_path in pending:
+        print(f"[nppes] Applying delta {delta_path.name} …")
+        with tempfile.TemporaryDirectory(dir=out_dir, prefix=".nppes_") as tmp:
+            tmp = Path(tmp)
+            staged = _stage_npi_file(delta_path, tmp / "staged")
+            n_parts = _apply_delta(out_dir, staged, tmp)
+        print(f"[nppes]   {n_parts:,} partitions rewritten")
+
+        # Record each delta as soon as its partitions are in place
+        manifest["deltas"] = manifest.get("deltas", []) + [delta_path.name]
+        _write_manifest(store, manifest)
+
+
+def ingest(raw_dir: Path | None = None, out_dir: Path | None = None, full: bool | None = None) -> None:
+    """
+    Refresh the canonical provider store. ``full=None`` runs incrementally
+    when a store already exists and rebuilds it otherwise.
+    """
+    raw_dir = raw_dir or RAW_DIR
+    out_dir = out_dir or OUT_DIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # NPPES raw data lives under raw_dir/nppes (e.g. data/raw/nppes/2026-02/...)
+    nppes_raw = raw_dir / "nppes" if raw_dir.name != "nppes" else raw_dir
+    store = out_dir / CANONICAL_DIR
+
+    if full is None:
+        full = not (store / MANIFEST).exists()
+    if full:
+        ingest_full(nppes_raw, out_dir)
+    ingest_incremental(nppes_raw, out_dir)
+    _write_orgs(store, out_dir)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest NPPES into the partitioned canonical provider store")
+    parser.add_argument("--full", action="store_true", default=None,
+                        help="Rebuild from the latest monthly full file (compaction)")
+    args = parser.parse_args()
+    ingest(full=args.full)
+
+
 if __name__ == "__main__":
-    ingest()
+    main()
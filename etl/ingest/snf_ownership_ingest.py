@@ -6,9 +6,14 @@ Sources (all under data/raw/snf-ownership/YYYY-MM/):
   - SNF_Affiliated_Entities_*.zip/csv   → affiliated chain entities
 
 Outputs:
-  data/processed/ownership/snf_owners.parquet
+  data/processed/ownership/snf_owners.parquet               (latest month)
+  data/processed/ownership/snf_owner_snapshots.parquet      (every month, slim)
   data/processed/ownership/snf_affiliated_entities.parquet
 
+snf_owner_snapshots holds one row per (snapshot_date, facility, owner, role)
+from every month's SNF_All_Owners file, scanned lazily in one pass; the
+ownership history transform diffs consecutive snapshots into intervals.
+
 Column reference (SNF_All_Owners):
   ENROLLMENT ID, ASSOCIATE ID, ORGANIZATION NAME,
   ASSOCIATE ID - OWNER, TYPE - OWNER, ROLE CODE - OWNER, ROLE TEXT - OWNER,
@@ -26,7 +31,9 @@ Column reference (SNF_All_Owners):
   PARENT COMPANY - OWNER, OWNED BY ANOTHER ORG OR IND - OWNER
 """
 import os
+import re
 import zipfile
+from datetime import date
 from pathlib import Path
 import polars as pl
 from dotenv import load_dotenv
@@ -67,6 +74,17 @@ OWNER_COL_MAP = {
     "OWNED BY ANOTHER ORG OR IND - OWNER": "flag_owned_by_another",
 }
 
+# Columns kept per monthly snapshot (ownership history only needs who owned what, and how much)
+SNAPSHOT_COLS = [
+    "provider_associate_id",
+    "provider_org_name",
+    "owner_associate_id",
+    "owner_type",
+    "role_code",
+    "ownership_pct",
+    "association_date",
+]
+
 FLAG_COLS = [v for k, v in OWNER_COL_MAP.items() if k.startswith("flag_") or v.startswith("flag_")]
 
 
@@ -118,6 +136,59 @@ def _find_owners_file(month_dir: Path) -> Path:
     raise FileNotFoundError(f"No SNF_All_Owners_*.csv with data in {month_dir}")
 
 
+def _snapshot_date(path: Path, month_dir: Path) -> date:
+    """Date of an owners snapshot: from the file name (SNF_All_Owners_YYYY.MM.DD), else the month dir."""
+    m = re.search(r"(\d{4})\.(\d{2})\.(\d{2})", path.name)
+    if m:
+        return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    year, month = month_dir.name.split("-")[:2]
+    return date(int(year), int(month), 1)
+
+
+def _scan_snapshot(path: Path, snapshot: date) -> pl.LazyFrame:
+    """Lazy scan of one owners file projected onto SNAPSHOT_COLS (missing columns → null)."""
+    lf = pl.scan_csv(path, infer_schema_length=0, null_values=["", " "], encoding="utf8-lossy")
+    raw = {v: k for k, v in OWNER_COL_MAP.items()}
+    raw["association_date"] = raw.pop("association_date_raw")
+    available = set(lf.collect_schema().names())
+    cols = {
+        col: (pl.col(raw[col]).str.strip_chars() if raw[col] in available else pl.lit(None, dtype=pl.Utf8))
+        for col in SNAPSHOT_COLS
+    }
+    cols["ownership_pct"] = cols["ownership_pct"].cast(pl.Float64, strict=False)
+    cols["association_date"] = cols["association_date"].str.to_date("%m/%d/%Y", strict=False)
+    return lf.select(
+        pl.lit(snapshot).alias("snapshot_date"),
+        *[expr.alias(col) for col, expr in cols.items()],
+    )
+
+
+def write_snapshots(month_dirs: list[Path], out_dir: Path) -> None:
+    """All monthly owner snapshots → snf_owner_snapshots.parquet (one collect over every file)."""
+    scans = []
+    for month_dir in month_dirs:
+        try:
+            path = _find_owners_file(month_dir)
+        except FileNotFoundError:
+            continue
+        scans.append(_scan_snapshot(path, _snapshot_date(path, month_dir)))
+    if not scans:
+        print("[snf_ownership] No owner snapshots found, skipping history.")
+        return
+    snapshots = (
+        pl.concat(scans, how="vertical")
+        .filter(pl.col("provider_associate_id").is_not_null() & pl.col("owner_associate_id").is_not_null())
+        .unique(subset=["snapshot_date", "provider_associate_id", "owner_associate_id", "role_code"], keep="first")
+        .sort("snapshot_date", "provider_associate_id", "owner_associate_id")
+        .collect()
+    )
+    snapshots.write_parquet(out_dir / "snf_owner_snapshots.parquet", compression="zstd")
+    print(
+        f"[snf_ownership] → {out_dir}/snf_owner_snapshots.parquet  "
+        f"({len(snapshots):,} rows over {len(scans)} snapshots)"
+    )
+
+
 def _load_affiliated_csv(path: Path) -> pl.DataFrame:
     return pl.read_csv(path, infer_schema_length=0, null_values=["", " "])
 
@@ -143,6 +214,9 @@ def ingest(raw_dir: Path = RAW_DIR, out_dir: Path = OUT_DIR) -> None:
     owners_df.write_parquet(out_dir / "snf_owners.parquet", compression="zstd")
     print(f"[snf_ownership] → {out_dir}/snf_owners.parquet")
 
+    # Every month's owners, for ownership history
+    write_snapshots(month_dirs, out_dir)
+
     # Affiliated entities (may be zipped)
     affil_frames = []
     for affil_zip in sorted(latest.glob("SNF_Affiliated_Entities_*.zip")):
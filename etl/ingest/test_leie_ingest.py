@@ -0,0 +1,112 @@
+"""
+Unit tests for the LEIE event log: file ordering, reinstatement closing,
+history dedup and the full file as the authoritative snapshot.
+
+Run:
+    pytest etl/ingest/test_leie_ingest.py -v
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import polars as pl
+
+from etl.ingest.leie_ingest import _event_files, apply_events, load_events
+
+HEADER = [
+    "LASTNAME", "FIRSTNAME", "MIDNAME", "BUSNAME", "GENERAL", "SPECIALTY",
+    "UPIN", "NPI", "DOB", "ADDRESS", "CITY", "STATE", "ZIP",
+    "EXCLTYPE", "EXCLDATE", "REINDATE", "WAIVERDATE", "WVRSTATE",
+]
+
+
+def _write_leie(path: Path, rows: list[tuple[str, str, str]]) -> Path:
+    """rows are (business name, EXCLDATE, REINDATE); every other field is fixed."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pl.DataFrame(
+        [
+            dict(zip(HEADER, ["", "", "", busname, "OTHER", "NURSING HOME", "", "0000000000", "",
+                              "1 MAIN ST", "SPRINGFIELD", "IL", "62701", "1128a1", excl, rein, "00000000", ""]))
+            for busname, excl, rein in rows
+        ],
+        schema={c: pl.Utf8 for c in HEADER},
+    ).write_csv(path)
+    return path
+
+
+def _state(events: pl.DataFrame) -> dict[str, bool]:
+    current, _ = apply_events(events)
+    return dict(current.select("business_name", "reinstated").rows())
+
+
+# ---------------------------------------------------------------------------
+# load_events
+# ---------------------------------------------------------------------------
+
+class TestLoadEvents:
+    def test_file_order_and_event_kinds(self, tmp_path):
+        base, latest = tmp_path / "leie", tmp_path / "leie" / "2026-02"
+        _write_leie(base / "monthly-supplements" / "2601excl.csv", [("AAA", "20260105", "00000000")])
+        _write_leie(base / "monthly-supplements" / "2601rein.csv", [("OLD", "20200101", "20260110")])
+        _write_leie(latest / "leie_full_202602.csv", [("AAA", "20260105", "00000000"), ("BBB", "20250301", "00000000")])
+        _write_leie(latest / "2602excl.csv", [("DDD", "20260203", "00000000")])
+        (latest / "2602rein.csv").touch()  # empty month: skipped
+
+        files = _event_files(base, latest)
+        assert [(f.name, kind) for f, kind in files] == [
+            ("2601excl.csv", "exclusion"), ("2601rein.csv", "reinstatement"),
+            ("leie_full_202602.csv", "full"), ("2602excl.csv", "exclusion"),
+        ]
+        events = load_events(files)
+        assert events.select("business_name", "event", "_seq", "_snapshot").rows() == [
+            ("AAA", "exclusion", 0, False), ("OLD", "reinstatement", 1, False),
+            ("AAA", "exclusion", 2, True), ("BBB", "exclusion", 2, True), ("DDD", "exclusion", 3, False),
+        ]
+
+    def test_same_exclusion_same_id_across_files(self, tmp_path):
+        a = _write_leie(tmp_path / "a.csv", [("AAA", "20260105", "00000000")])
+        b = _write_leie(tmp_path / "b.csv", [("AAA", "20260105", "20260301")])
+        events = load_events([(a, "exclusion"), (b, "reinstatement")])
+        assert events["exclusion_id"].n_unique() == 1
+        assert events["event"].to_list() == ["exclusion", "reinstatement"]
+
+
+# ---------------------------------------------------------------------------
+# apply_events
+# ---------------------------------------------------------------------------
+
+class TestApplyEvents:
+    def test_reinstatement_closes_exclusion(self, tmp_path):
+        full = _write_leie(tmp_path / "leie_full_202602.csv", [("AAA", "20250105", "00000000"), ("BBB", "20250301", "00000000")])
+        rein = _write_leie(tmp_path / "2602rein.csv", [("AAA", "20250105", "20260210")])
+        current, _ = apply_events(load_events([(full, "full"), (rein, "reinstatement")]))
+        rows = {r["business_name"]: r for r in current.iter_rows(named=True)}
+        assert rows["AAA"]["reinstated"] and str(rows["AAA"]["reindate"]) == "2026-02-10"
+        assert not rows["BBB"]["reinstated"] and rows["BBB"]["reindate"] is None
+        assert "_snapshot" not in current.columns
+
+    def test_history_keeps_first_appearance_only(self, tmp_path):
+        supp = _write_leie(tmp_path / "2601excl.csv", [("AAA", "20260105", "00000000")])
+        full = _write_leie(tmp_path / "leie_full_202602.csv", [("AAA", "20260105", "00000000")])
+        rein = _write_leie(tmp_path / "2602rein.csv", [("AAA", "20260105", "20260210")])
+        _, history = apply_events(load_events([(supp, "exclusion"), (full, "full"), (rein, "reinstatement")]))
+        assert history.select("event", "source_file", "file_seq").rows() == [
+            ("exclusion", "2601excl.csv", 0), ("reinstatement", "2602rein.csv", 2),
+        ]
+
+    def test_supplement_only_exclusion_dropped_by_full_file(self, tmp_path):
+        supp = _write_leie(tmp_path / "2601excl.csv", [("AAA", "20260105", "00000000"), ("CCC", "20260107", "00000000")])
+        full = _write_leie(tmp_path / "leie_full_202602.csv", [("AAA", "20260105", "00000000")])
+        new = _write_leie(tmp_path / "2602excl.csv", [("DDD", "20260203", "00000000")])
+        events = load_events([(supp, "exclusion"), (full, "full"), (new, "exclusion")])
+        assert _state(events) == {"AAA": False, "CCC": True, "DDD": False}
+
+        current, history = apply_events(events)
+        assert current.filter(pl.col("business_name") == "CCC")["reindate"].to_list() == [None]
+        dropped = history.filter(pl.col("event") == "dropped")
+        assert dropped.select("source_file", "file_seq", "event_date").rows() == [("leie_full_202602.csv", 1, None)]
+
+    def test_no_full_file_drops_nothing(self, tmp_path):
+        supp = _write_leie(tmp_path / "2601excl.csv", [("CCC", "20260107", "00000000")])
+        assert _state(load_events([(supp, "exclusion")])) == {"CCC": False}
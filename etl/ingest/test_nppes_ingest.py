@@ -0,0 +1,152 @@
+"""
+Unit tests for the partitioned NPPES store: full build, weekly deltas and the
+slot side tables.
+
+Run:
+    pytest etl/ingest/test_nppes_ingest.py -v
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import polars as pl
+
+from etl.ingest.nppes_ingest import CANONICAL_DIR, MANIFEST, ingest
+
+HEADER = [
+    "NPI", "Entity Type Code", "Provider Organization Name (Legal Business Name)",
+    "Provider Last Name (Legal Name)", "Provider First Name",
+    "Provider Business Practice Location Address Postal Code",
+    "Healthcare Provider Taxonomy Code_1", "Healthcare Provider Primary Taxonomy Switch_1",
+    "Provider License Number_1", "Provider License Number State Code_1",
+    "Healthcare Provider Taxonomy Code_2", "Healthcare Provider Primary Taxonomy Switch_2",
+    "Provider License Number_2", "Provider License Number State Code_2",
+    "Other Provider Identifier_1", "Other Provider Identifier Type Code_1",
+    "Other Provider Identifier State_1", "Other Provider Identifier Issuer_1",
+    "Other Provider Identifier_2", "Other Provider Identifier Type Code_2",
+    "Other Provider Identifier State_2", "Other Provider Identifier Issuer_2",
+]
+
+
+def _write_pfile(path: Path, rows: list[list[str]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pl.DataFrame([dict(zip(HEADER, r)) for r in rows], schema={c: pl.Utf8 for c in HEADER}).write_csv(path)
+
+
+def _provider(npi, org="", last="", zip_code="123456789", taxonomies=(), identifiers=()):
+    """One npidata row: taxonomies are (code, primary, license, state), identifiers (id, type, state)."""
+    slots_tax = list(taxonomies) + [("", "", "", "")] * (2 - len(taxonomies))
+    slots_id = list(identifiers) + [("", "", "")] * (2 - len(identifiers))
+    row = [npi, "2" if org else "1", org, last, "", zip_code]
+    for code, primary, lic, state in slots_tax:
+        row += [code, primary, lic, state]
+    for ident, type_code, state in slots_id:
+        row += [ident, type_code, state, ""]
+    return row
+
+
+def _read(out: Path, dataset: str) -> pl.DataFrame:
+    return pl.read_parquet(out / dataset / "*" / "*.parquet", hive_partitioning=True)
+
+
+FULL = "nppes/2026-02/NPPES_Data_Dissemination_February_2026_V2/npidata_pfile_20050523-20260208.csv"
+DELTA = "nppes/weekly/NPPES_Data_Dissemination_021626_022226_Weekly_V2/npidata_pfile_20260216-20260222.csv"
+
+
+def _full_file(raw: Path) -> None:
+    _write_pfile(raw / FULL, [
+        _provider("1000000001", org="ACME SNF",
+                  taxonomies=[("314000000X", "Y", "L1", "CA"), ("261QM0801X", "N", "L2", "NV")],
+                  identifiers=[("056789", "6", "CA"), ("MCD1", "05", "CA")]),
+        _provider("1000000002", last="SMITH", taxonomies=[("207Q00000X", "Y", "", "")]),
+        _provider("2000000001", last="JONES"),
+    ])
+
+
+# ---------------------------------------------------------------------------
+# Full build
+# ---------------------------------------------------------------------------
+
+class TestFullBuild:
+    def test_partitions_side_tables_and_manifest(self, tmp_path):
+        raw, out = tmp_path / "raw", tmp_path / "out"
+        _full_file(raw)
+        ingest(raw_dir=raw, out_dir=out, full=True)
+
+        providers = _read(out, CANONICAL_DIR).sort("npi")
+        assert providers["npi"].to_list() == ["1000000001", "1000000002", "2000000001"]
+        assert sorted(d.name for d in (out / CANONICAL_DIR).glob("npi_prefix=*")) == ["npi_prefix=100", "npi_prefix=200"]
+        assert providers["zip"][0] == "12345"
+
+        taxonomies = _read(out, "provider_taxonomies").sort("npi", "slot")
+        assert taxonomies.select("npi", "slot", "is_primary").rows() == [
+            ("1000000001", 1, True), ("1000000001", 2, False), ("1000000002", 1, True),
+        ]
+        identifiers = _read(out, "provider_identifiers").sort("slot")
+        assert identifiers["type_code"].to_list() == ["06", "05"]
+        assert identifiers["identifier_type"].to_list() == ["MEDICARE OSCAR/CERTIFICATION", "MEDICAID"]
+
+        manifest = json.loads((out / CANONICAL_DIR / MANIFEST).read_text())
+        assert manifest == {"full_file": Path(FULL).name, "full_end": "20260208", "deltas": []}
+
+    def test_repeated_npi_keeps_last_copy_and_its_slots(self, tmp_path):
+        raw, out = tmp_path / "raw", tmp_path / "out"
+        _write_pfile(raw / FULL, [
+            _provider("1000000001", last="OLD", taxonomies=[("A", "Y", "", ""), ("B", "N", "", "")]),
+            _provider("1000000001", last="NEW", taxonomies=[("C", "Y", "", "")]),
+        ])
+        ingest(raw_dir=raw, out_dir=out, full=True)
+        assert _read(out, CANONICAL_DIR)["last_name"].to_list() == ["NEW"]
+        assert _read(out, "provider_taxonomies")["taxonomy_code"].to_list() == ["C"]
+
+
+# ---------------------------------------------------------------------------
+# Weekly deltas
+# ---------------------------------------------------------------------------
+
+class TestDelta:
+    def _store_with_delta(self, tmp_path) -> Path:
+        raw, out = tmp_path / "raw", tmp_path / "out"
+        _full_file(raw)
+        ingest(raw_dir=raw, out_dir=out, full=True)
+        # 1000000001 drops its second taxonomy / license and an identifier; 3000000001 is new
+        _write_pfile(raw / DELTA, [
+            _provider("1000000001", org="ACME SNF LLC",
+                      taxonomies=[("314000000X", "Y", "L1", "CA")], identifiers=[("056789", "6", "CA")]),
+            _provider("3000000001", last="NEW"),
+        ])
+        ingest(raw_dir=raw, out_dir=out)
+        return out
+
+    def test_round_trip_replaces_rows_and_slots(self, tmp_path):
+        out = self._store_with_delta(tmp_path)
+        providers = _read(out, CANONICAL_DIR).sort("npi")
+        assert providers.select("npi", "org_name").rows() == [
+            ("1000000001", "ACME SNF LLC"), ("1000000002", None), ("2000000001", None), ("3000000001", None),
+        ]
+        taxonomies = _read(out, "provider_taxonomies").sort("npi", "slot")
+        assert taxonomies.select("npi", "slot").rows() == [("1000000001", 1), ("1000000002", 1)]
+        licenses = _read(out, "provider_licenses")
+        assert licenses.select("npi", "slot").rows() == [("1000000001", 1)]
+        identifiers = _read(out, "provider_identifiers")
+        assert identifiers.select("npi", "slot", "identifier").rows() == [("1000000001", 1, "056789")]
+
+    def test_delta_recorded_and_not_reapplied(self, tmp_path):
+        out = self._store_with_delta(tmp_path)
+        manifest = json.loads((out / CANONICAL_DIR / MANIFEST).read_text())
+        assert manifest["deltas"] == [Path(DELTA).name]
+
+        untouched = out / CANONICAL_DIR / "npi_prefix=200" / "part-0.parquet"
+        mtime = untouched.stat().st_mtime_ns
+        ingest(raw_dir=tmp_path / "raw", out_dir=out)
+        assert json.loads((out / CANONICAL_DIR / MANIFEST).read_text())["deltas"] == [Path(DELTA).name]
+        assert untouched.stat().st_mtime_ns == mtime
+
+    def test_full_rebuild_then_newer_delta(self, tmp_path):
+        out = self._store_with_delta(tmp_path)
+        ingest(raw_dir=tmp_path / "raw", out_dir=out, full=True)
+        # Compaction rebuilds from the full file, then re-applies the newer delta
+        assert _read(out, CANONICAL_DIR).height == 4
+        assert _read(out, "provider_licenses").select("npi", "slot").rows() == [("1000000001", 1)]
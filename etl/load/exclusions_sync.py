@@ -0,0 +1,147 @@
+"""
+Incremental exclusions sync: applies only new, changed (e.g. reinstated) and
+removed LEIE exclusions to Postgres ``exclusions`` and the Neo4j Exclusion
+graph, instead of reloading and re-MERGEing every row.
+
+Relies on the content-derived exclusion_id from leie_ingest: the same
+exclusion has the same id on every run, so a monthly LEIE update diffs down
+to the rows that actually changed.
+
+This is the normal path for exclusions after the first load: postgres_loader
+and neo4j_loader skip them once loaded. In run_pipeline.sh it runs between
+load_postgres and load_neo4j, so the graph load's EXCLUDED_BY edges see the
+synced Exclusion nodes.
+
+Steps
+-----
+1. Diff exclusions_final.parquet against the (exclusion_id, row_hash) pairs
+   stored in Postgres, using the loader's own row hashing.
+2. Write the delta to data/exports/:
+     exclusions_delta_nodes.csv    new / changed Exclusion nodes
+     exclusions_delta_edges.csv    their EXCLUDED_BY edges (NPI-linked rows)
+     exclusions_delta_removed.csv  exclusion_ids no longer present
+     exclusions_delta_npis.csv     providers whose isExcluded flag may change
+3. Apply infra/neo4j_exclusions_delta.cypher to Neo4j.
+4. Apply the same delta to Postgres (postgres_loader merge mode).
+
+Neo4j goes first: if Postgres then fails, the next run recomputes the same
+delta and the Cypher MERGEs re-apply idempotently.
+
+Usage
+-----
+  python -m etl.load.exclusions_sync [--dry-run] [--skip-neo4j]
+"""
+import argparse
+import io
+
+import polars as pl
+
+from etl.load.postgres_loader import (
+    EXPORTS,
+    _get_conn,
+    _MergeDiff,
+    _resolve_parquet,
+    load_table,
+    stream_batches,
+)
+
+TABLE = "exclusions"
+NODE_COLS = ["exclusion_id", "source", "display_name", "excl_type",
+             "excl_type_label", "excldate", "reinstated", "state"]
+EDGE_COLS = ["npi", "exclusion_id", "excldate"]
+
+
+def _fetch_synced() -> pl.DataFrame:
+    """(_key, npi, row_hash) for every exclusion currently in Postgres."""
+    schema = {"_key": pl.Utf8, "npi": pl.Utf8, "row_hash": pl.Int64}
+    conn = _get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s)", (TABLE,))
+            if cur.fetchone()[0] is None:
+                return pl.DataFrame(schema=schema)
+            buf = io.BytesIO()
+            cur.copy_expert(
+                f"COPY (SELECT exclusion_id AS _key, npi, row_hash FROM {TABLE}) TO STDOUT WITH (FORMAT CSV, HEADER TRUE)",
+                buf,
+            )
+    finally:
+        conn.close()
+    buf.seek(0)
+    return pl.read_csv(buf, schema=schema)
+
+
+def compute_delta(current: pl.DataFrame, synced: pl.DataFrame) -> tuple[pl.DataFrame, pl.DataFrame, _MergeDiff]:
+    """(changed rows, removed (_key, npi), diff stats) of ``current`` against ``synced``.
+
+    ``current`` carries the loader's ``_key`` and ``row_hash`` columns. Legacy
+    random-uuid ids never match and so come back as removed.
+    """
+    diff = _MergeDiff(synced.select("_key", "row_hash"))
+    changed = diff(current)
+    removed = synced.join(diff.gone(), on="_key", how="inner").select("_key", "npi")
+    return changed, removed, diff
+
+
+def write_delta_csvs(changed: pl.DataFrame, removed: pl.DataFrame) -> None:
+    EXPORTS.mkdir(parents=True, exist_ok=True)
+    changed.select([c for c in NODE_COLS if c in changed.columns]).write_csv(
+        EXPORTS / "exclusions_delta_nodes.csv"
+    )
+    changed.filter(pl.col("npi").is_not_null()).select(
+        [c for c in EDGE_COLS if c in changed.columns]
+    ).write_csv(EXPORTS / "exclusions_delta_edges.csv")
+    removed.select(pl.col("_key").alias("exclusion_id")).write_csv(EXPORTS / "exclusions_delta_removed.csv")
+    pl.concat([changed.select("npi"), removed.select("npi")]).drop_nulls().unique().write_csv(
+        EXPORTS / "exclusions_delta_npis.csv"
+    )
+
+
+def sync(dry_run: bool = False, skip_neo4j: bool = False) -> None:
+    parquet_path = _resolve_parquet(TABLE)
+    if parquet_path is None:
+        print(f"[excl_sync] SKIP: no {TABLE} parquet — run exclusions_transform first")
+        return
+
+    _, frames = stream_batches(TABLE, parquet_path, hashed=True)
+    current = pl.concat(list(frames), how="vertical_relaxed")
+    synced = _fetch_synced()
+    changed, removed, diff = compute_delta(current, synced)
+    print(
+        f"[excl_sync] {len(current):,} current, {len(synced):,} synced → "
+        f"{diff.inserted:,} new, {diff.updated:,} changed, {len(removed):,} removed"
+    )
+    if changed.is_empty() and removed.is_empty():
+        print("[excl_sync] Nothing to sync")
+        return
+
+    write_delta_csvs(changed, removed)
+    if dry_run:
+        print(f"[excl_sync] Dry run — delta CSVs written to {EXPORTS}, no writes applied")
+        return
+
+    if not skip_neo4j:
+        from etl.load.neo4j_loader import EXCLUSIONS_DELTA_CYPHER, _synced_exports, run_cypher_file
+        # A graph without Exclusion nodes gets them all from the next full graph
+        # load; a partial delta here would make that load skip them
+        if "nodes_exclusions.csv" in _synced_exports():
+            print("[excl_sync] Applying delta to Neo4j…")
+            run_cypher_file(EXCLUSIONS_DELTA_CYPHER)
+        else:
+            print("[excl_sync] Neo4j has no Exclusion nodes yet — left to neo4j_loader's full load")
+
+    print("[excl_sync] Applying delta to Postgres…")
+    load_table(TABLE, mode="merge")
+    print("[excl_sync] Done")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sync only changed LEIE exclusions to Postgres and Neo4j")
+    parser.add_argument("--dry-run", action="store_true", help="Compute and export the delta without applying it")
+    parser.add_argument("--skip-neo4j", action="store_true", help="Apply the delta to Postgres only")
+    args = parser.parse_args()
+    sync(dry_run=args.dry_run, skip_neo4j=args.skip_neo4j)
+
+
+if __name__ == "__main__":
+    main()
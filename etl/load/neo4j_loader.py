@@ -8,9 +8,13 @@ Steps
 2. Read infra/neo4j_init.cypher and execute each statement in order
    via the Bolt driver, logging progress and result counters.
 
+Exclusion nodes are loaded in full only while the graph has none; after
+that etl/load/exclusions_sync.py applies the monthly delta and the
+nodes_exclusions.csv statement is skipped (--full reloads it).
+
 Usage
 -----
-  python etl/load/neo4j_loader.py [all|export|load]
+  python etl/load/neo4j_loader.py [all|export|load] [--full]
 
   all    (default) — export CSVs then load graph
   export           — export CSVs only
@@ -38,6 +42,8 @@ EXPORTS        = Path(os.environ.get("DATA_EXPORTS", str(_exports_default)))
 if not EXPORTS.is_absolute():
     EXPORTS = _REPO_ROOT / EXPORTS
 CYPHER_INIT    = _REPO_ROOT / "infra" / "neo4j_init.cypher"
+# Delta statements applied by etl/load/exclusions_sync.py
+EXCLUSIONS_DELTA_CYPHER = _REPO_ROOT / "infra" / "neo4j_exclusions_delta.cypher"
 
 # Validate password is set
 if not NEO4J_PASSWORD:
@@ -47,6 +53,11 @@ if not NEO4J_PASSWORD:
         "  Or export: export NEO4J_PASSWORD=yourpassword"
     )
 
+# Export → node label kept current by exclusions_sync once the graph has any
+SYNCED_EXPORTS: dict[str, str] = {
+    "nodes_exclusions.csv": "Exclusion",
+}
+
 # Large-import statements log at a lower verbosity
 LARGE_IMPORT_PREFIXES = ("LOAD CSV",)
 
@@ -94,7 +105,10 @@ _REQUIRED_COLUMNS: dict[str, list[str]] = {
     "nodes_exclusions.csv": ["exclusion_id", "source"],
     "edges_payments.csv":   ["record_id", "npi", "year", "program"],
     "edges_exclusions.csv": ["npi", "exclusion_id"],
+    "edges_entity_exclusions.csv": ["entity_id", "exclusion_id"],
+    "edges_person_exclusions.csv": ["associate_id", "exclusion_id"],
     "edges_ownership.csv":  ["from_id", "from_type", "to_id"],
+    "edges_chain_membership.csv": ["chain_id", "facility_id"],
 }
 
 
@@ -218,11 +232,30 @@ def _run_statements(statements: list[str]) -> None:
         driver.close()
 
 
+def run_cypher_file(path: Path) -> None:
+    """Execute every statement of a .cypher file in order."""
+    _run_statements(_parse_cypher(path))
+
+
+def _synced_exports() -> list[str]:
+    """SYNCED_EXPORTS whose label already has nodes in the graph."""
+    driver = _driver()
+    _verify_connection(driver)
+    try:
+        with driver.session() as session:
+            return [
+                export for export, label in SYNCED_EXPORTS.items()
+                if session.run(f"MATCH (n:{label}) RETURN 1 LIMIT 1").single() is not None
+            ]
+    finally:
+        driver.close()
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
-def load_all(mode: str = "all") -> None:
+def load_all(mode: str = "all", full: bool = False) -> None:
     if mode in ("all", "export"):
         log.info("=== Step 1: Export Parquets → CSVs ===")
         # Dynamic import so the loader can run standalone or as part of a package
@@ -239,6 +272,10 @@ def load_all(mode: str = "all") -> None:
 
         log.info("=== Step 3: Execute neo4j_init.cypher ===")
         statements = _parse_cypher(CYPHER_INIT)
+        if not full:
+            for export in _synced_exports():
+                log.info("Skipping %s — already loaded, kept current by exclusions_sync", export)
+                statements = [s for s in statements if f"'file:///{export}'" not in s]
         _run_statements(statements)
 
     log.info("=== Done ===")
@@ -253,8 +290,9 @@ def load_all(mode: str = "all") -> None:
 #   curl "http://localhost:4001/v1/providers/1316250707"  # expect 200 + JSON
 
 if __name__ == "__main__":
-    mode = sys.argv[1] if len(sys.argv) > 1 else "all"
+    args = [a for a in sys.argv[1:] if a != "--full"]
+    mode = args[0] if args else "all"
     if mode not in ("all", "export", "load"):
-        print(f"Usage: neo4j_loader.py [all|export|load]  (got: {mode!r})", file=sys.stderr)
+        print(f"Usage: neo4j_loader.py [all|export|load] [--full]  (got: {mode!r})", file=sys.stderr)
         sys.exit(1)
-    load_all(mode)
+    load_all(mode, full="--full" in sys.argv[1:])
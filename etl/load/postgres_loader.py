@@ -1,27 +1,78 @@
 """
-Postgres loader: exports each processed Parquet to a CSV in data/exports/,
-then bulk-loads into Postgres using COPY (fast path).
+Postgres loader: streams each processed Parquet into Postgres with COPY and
+tees the same CSV stream to data/exports/ for Neo4j.
+
+Record batches are serialized on a reader thread and handed to COPY through a
+bounded pipe, so memory stays flat regardless of table size. Secondary indexes
+in the schema file are deferred until after COPY. Independent tables load in
+parallel on separate connections (LOAD_WORKERS, default 4); the final
+shadow-table swaps run one at a time.
 
 Tables loaded:
   providers                (from providers_final.parquet)
   payments_medicaid        (from medicaid_by_npi_year.parquet)
   payments_medicare        (from medicare_by_npi_year.parquet)
   exclusions               (from exclusions_final.parquet)
+  exclusion_name_matches   (from exclusions/exclusion_name_matches.parquet)
   ownership_snf            (from ownership_edges.parquet)
+  ubo_effective_ownership  (from ownership/ubo_effective_ownership.parquet)
+  ownership_history        (from ownership/ownership_history.parquet)
+  chain_membership         (from ownership/chain_membership.parquet)
   chow_events              (from ownership/chow_events.parquet)
   hcris_financials         (from hcris/hcris_by_npi_year.parquet)
+  fec_contributions        (from fec/contributions/cycle=*/, all cycles)
+  fec_committees           (from fec/committees/cycle=*/, all cycles)
+  provider_taxonomies      (from providers/provider_taxonomies/npi_prefix=*/)
+  provider_licenses        (from providers/provider_licenses/npi_prefix=*/)
+  provider_identifiers     (from providers/provider_identifiers/npi_prefix=*/)
+  entity_cluster_members   (from entities/entity_cluster_members.parquet)
+  address_index            (from addresses/address_index.parquet)
+  address_colocation       (from addresses/address_colocation.parquet)
+
+After COPY, providers also gets its search indexes (tsvector GIN, pg_trgm on the
+normalized name) and the provider_name_tokens autocomplete table built from
+providers_search.sql.
+
+By default each table is loaded into a shadow copy (<table>__new) and swapped
+in with an atomic rename, so the API never sees a missing or partial table.
+--mode replace drops and reloads in place (half the peak disk on Neon).
+--mode merge (monthly refreshes) hashes each row, diffs on the table's natural
+key against the stored row_hash column, and writes only the delta.
+
+Tables with a natural key carry a row_hash BIGINT column for merge mode. The
+hash is a per-row Python blake2b (stable across Polars versions, unlike
+Expr.hash), which is slow over tens of millions of payment rows, so it is
+computed only when merging (and for SYNCED_TABLES); swap / replace / append
+leave row_hash NULL and the first merge after a full load rewrites every row
+once.
+
+Tables in SYNCED_TABLES (exclusions) are loaded in full only the first time:
+once the table exists, a default run leaves it to its incremental sync
+(etl/load/exclusions_sync.py). Name the table explicitly to force a reload.
+
+Reloading payments_medicaid, payments_medicare, medicare_part_d or providers
+also refreshes the affected year partitions of payments_combined (the
+materialized payments_combined_v); pass "payments_combined" to refresh it alone.
 
 Usage:
-  python -m etl.load.postgres_loader [table ...]
+  python -m etl.load.postgres_loader [table ...] [--mode swap|replace|append|merge]
   or: python etl/load/postgres_loader.py          # loads all
   or: python etl/load/postgres_loader.py providers exclusions
 """
+import argparse
+import hashlib
 import io
 import os
-import sys
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO, Callable, Iterator
+
 import polars as pl
 import psycopg2
+import pyarrow.dataset as ds
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -62,11 +113,31 @@ TABLE_CONFIG: dict[str, tuple[str, str, list[str] | None]] = {
          "display_name", "excl_type", "excl_type_label", "excldate", "reindate",
          "state", "reinstated"],
     ),
+    "exclusion_name_matches": (
+        "exclusions/exclusion_name_matches.parquet",
+        "exclusion_name_matches.sql",
+        None,
+    ),
     "ownership_snf": (
         "ownership/ownership_edges.parquet",
         "ownership_snf.sql",
         None,
     ),
+    "ubo_effective_ownership": (
+        "ownership/ubo_effective_ownership.parquet",
+        "ubo_effective_ownership.sql",
+        None,
+    ),
+    "ownership_history": (
+        "ownership/ownership_history.parquet",
+        "ownership_history.sql",
+        None,
+    ),
+    "chain_membership": (
+        "ownership/chain_membership.parquet",
+        "chain_membership.sql",
+        None,
+    ),
     "medicare_inpatient": (
         "payments/medicare_inpatient_by_facility.parquet",
         "medicare_inpatient.sql",
@@ -83,7 +154,7 @@ TABLE_CONFIG: dict[str, tuple[str, str, list[str] | None]] = {
         None,
     ),
     "fec_contributions": (
-        "fec/fec_contributions.parquet",
+        "fec/contributions",
         "fec_contributions.sql",
         [
             "contributor_name", "normalized_name", "normalized_last_name",
@@ -93,7 +164,7 @@ TABLE_CONFIG: dict[str, tuple[str, str, list[str] | None]] = {
         ],
     ),
     "fec_committees": (
-        "fec/fec_committees.parquet",
+        "fec/committees",
         "fec_committees.sql",
         None,
     ),
@@ -107,6 +178,49 @@ TABLE_CONFIG: dict[str, tuple[str, str, list[str] | None]] = {
         "hcris.sql",
         None,
     ),
+    "provider_taxonomies": (
+        "providers/provider_taxonomies",
+        "provider_taxonomies.sql",
+        ["npi", "slot", "taxonomy_code", "is_primary"],
+    ),
+    "provider_licenses": (
+        "providers/provider_licenses",
+        "provider_licenses.sql",
+        ["npi", "slot", "license_number", "license_state", "taxonomy_code"],
+    ),
+    "provider_identifiers": (
+        "providers/provider_identifiers",
+        "provider_identifiers.sql",
+        ["npi", "slot", "identifier", "type_code", "identifier_type", "state", "issuer"],
+    ),
+    "entity_cluster_members": (
+        "entities/entity_cluster_members.parquet",
+        "entity_cluster_members.sql",
+        None,
+    ),
+    "address_index": (
+        "addresses/address_index.parquet",
+        "address_index.sql",
+        None,
+    ),
+    "address_colocation": (
+        "addresses/address_colocation.parquet",
+        "address_colocation.sql",
+        None,
+    ),
+}
+
+
+# Tables kept current by an incremental sync once loaded: skipped by a default
+# (all-tables) run when they already exist, and hashed on full loads so the
+# sync's first diff is already a delta
+SYNCED_TABLES: dict[str, str] = {
+    "exclusions": "etl.load.exclusions_sync",
+}
+
+# Schema files applied after COPY (indexes / derived tables built over the loaded data)
+POST_LOAD_SCHEMAS: dict[str, str] = {
+    "providers": "providers_search.sql",
 }
 
 
@@ -168,35 +282,205 @@ def _apply_schema(cur: psycopg2.extensions.cursor, schema_file: str) -> None:
         cur.execute(path.read_text())
 
 
-def _drop_and_recreate(cur: psycopg2.extensions.cursor, table: str, schema_file: str) -> None:
+_INDEX_STMT = re.compile(r"^\s*CREATE\s+(UNIQUE\s+)?INDEX\b", re.IGNORECASE)
+
+
+def _split_schema(schema_file: str) -> tuple[list[str], list[str]]:
+    """Split a table schema file into (table DDL, CREATE INDEX statements).
+
+    The DDL runs before COPY; the indexes are deferred until the rows are in so
+    each one is built in a single sort instead of maintained row by row.
+    """
+    path = SCHEMAS_DIR / schema_file
+    if not path.exists():
+        return [], []
+    text = "\n".join(line.split("--", 1)[0] for line in path.read_text().splitlines())
+    ddl: list[str] = []
+    indexes: list[str] = []
+    for stmt in (s.strip() for s in text.split(";")):
+        if stmt:
+            (indexes if _INDEX_STMT.match(stmt) else ddl).append(stmt)
+    return ddl, indexes
+
+
+def _drop_and_recreate(cur: psycopg2.extensions.cursor, table: str, ddl: list[str]) -> None:
     """Drop the table then apply the schema fresh — used when doing a full reload
     so schema changes (new columns, etc.) are picked up cleanly."""
     cur.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
-    _apply_schema(cur, schema_file)
+    for stmt in ddl:
+        cur.execute(stmt)
 
 
 def _truncate(cur: psycopg2.extensions.cursor, table: str) -> None:
     cur.execute(f"TRUNCATE TABLE {table} RESTART IDENTITY CASCADE")
 
 
-def load_table(table: str, truncate: bool = True) -> None:
-    parquet_rel, schema_file, col_subset = TABLE_CONFIG[table]
-    parquet_path = PROCESSED / parquet_rel
+# ---------------------------------------------------------------------------
+# Shadow-table swap: load <table>__new off to the side, then rename it in
+# ---------------------------------------------------------------------------
 
-    # Fallback paths for providers when building from Modal or single-file ETL
-    if table == "providers" and not parquet_path.exists():
-        for fallback in ["providers.parquet", "modal_input/providers.parquet"]:
-            candidate = PROCESSED / fallback
-            if candidate.exists():
-                parquet_path = candidate
-                print(f"[postgres] Using fallback {parquet_path} for providers")
-                break
+# Load modes:
+#   swap    — COPY into <table>__new, index + analyze it, then atomically rename
+#             it over the live table (API keeps reading the old copy meanwhile)
+#   replace — DROP … CASCADE and recreate in place (least disk; table is briefly
+#             missing and dependent views must be re-applied)
+#   append  — apply the schema and COPY onto existing rows
+#   merge   — diff against stored row hashes on the natural key and apply only
+#             inserts / updates / deletes (tables without a key use swap)
+LOAD_MODES = ("swap", "replace", "append", "merge")
+SHADOW_SUFFIX = "__new"
+# Max wait for the ACCESS EXCLUSIVE lock on the live table during the swap
+SWAP_LOCK_TIMEOUT = os.environ.get("LOAD_SWAP_LOCK_TIMEOUT", "60s")
+# Advisory lock key serializing swaps: tables sharing a dependent view
+# (payments_combined_v) would otherwise deadlock or recreate it against a
+# table another swap has just retired
+_SWAP_LOCK_KEY = 0x636C6169  # "clai"
+
+_INDEX_NAME = re.compile(
+    r"(CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?)(\w+)(\s+ON\s+(?:ONLY\s+)?)(\w+)",
+    re.IGNORECASE,
+)
+
+
+def _references(sql: str, table: str) -> bool:
+    return re.search(rf"\b{re.escape(table)}\b", sql) is not None
+
+
+def _retarget(sql: str, table: str, target: str) -> str:
+    """Point schema SQL for ``table`` at ``target``, suffixing the names of
+    indexes on it so they do not collide with the live table's indexes."""
+    if target == table:
+        return sql
+
+    def _index(m: re.Match) -> str:
+        name = m.group(2) + SHADOW_SUFFIX if m.group(4) == table else m.group(2)
+        return f"{m.group(1)}{name}{m.group(3)}{m.group(4)}"
+
+    sql = _INDEX_NAME.sub(_index, sql)
+    return re.sub(rf"\b{re.escape(table)}\b", target, sql)
 
-    if not parquet_path.exists():
-        print(f"[postgres] SKIP {table}: {parquet_path} not found")
-        return
 
-    df = pl.read_parquet(parquet_path)
+_DEPENDENT_VIEWS_SQL = """
+WITH RECURSIVE deps (oid, depth) AS (
+    SELECT r.ev_class, 1
+    FROM pg_depend d
+    JOIN pg_rewrite r ON r.oid = d.objid
+    WHERE d.refobjid = %(rel)s::regclass AND r.ev_class <> %(rel)s::regclass
+    UNION
+    SELECT r.ev_class, deps.depth + 1
+    FROM deps
+    JOIN pg_depend d ON d.refobjid = deps.oid
+    JOIN pg_rewrite r ON r.oid = d.objid
+    WHERE r.ev_class <> deps.oid
+)
+SELECT c.oid::regclass::text, c.relkind, pg_get_viewdef(c.oid),
+       ARRAY(SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i WHERE i.indrelid = c.oid)
+FROM deps
+JOIN pg_class c ON c.oid = deps.oid
+GROUP BY c.oid, c.relkind
+ORDER BY max(deps.depth)
+"""
+
+
+def _swap_in(conn: psycopg2.extensions.connection, table: str) -> None:
+    """Replace ``table`` with ``<table>__new`` in one short transaction.
+
+    Views bind to the table's OID, so views (and materialized views) that
+    depend on the live table are captured, dropped with it, and recreated
+    against the swapped-in table. Swaps run one at a time (the COPY that
+    builds the shadow table does not).
+    """
+    shadow = f"{table}{SHADOW_SUFFIX}"
+    retired = f"{table}__old"
+    with conn, conn.cursor() as cur:
+        # Taken before lock_timeout applies and before any table lock is held
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (_SWAP_LOCK_KEY,))
+        cur.execute("SET LOCAL lock_timeout = %s", (SWAP_LOCK_TIMEOUT,))
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+        live = cur.fetchone()[0]
+        views = []
+        if live:
+            cur.execute(_DEPENDENT_VIEWS_SQL, {"rel": table})
+            views = cur.fetchall()
+            cur.execute(f"ALTER TABLE {table} RENAME TO {retired}")
+        cur.execute(f"ALTER TABLE {shadow} RENAME TO {table}")
+        if live:
+            cur.execute(f"DROP TABLE {retired} CASCADE")
+
+        # Give indexes / serial sequences their usual names back
+        cur.execute(
+            """
+            SELECT c.relname, c.relkind
+            FROM pg_class c
+            WHERE c.oid IN (SELECT indexrelid FROM pg_index WHERE indrelid = %(rel)s::regclass)
+               OR c.oid IN (SELECT objid FROM pg_depend
+                            WHERE refobjid = %(rel)s::regclass AND deptype = 'a'
+                              AND classid = 'pg_class'::regclass)
+            """,
+            {"rel": table},
+        )
+        for name, relkind in cur.fetchall():
+            if shadow in name:
+                renamed = name.replace(shadow, table)
+            elif name.endswith(SHADOW_SUFFIX):
+                renamed = name[: -len(SHADOW_SUFFIX)]
+            else:
+                continue
+            kind = "SEQUENCE" if relkind == "S" else "INDEX"
+            cur.execute(f"ALTER {kind} {name} RENAME TO {renamed}")
+
+        for name, relkind, definition, index_defs in views:
+            if relkind == "m":
+                cur.execute(f"CREATE MATERIALIZED VIEW {name} AS {definition}")
+            else:
+                cur.execute(f"CREATE OR REPLACE VIEW {name} AS {definition}")
+            for index_def in index_defs:
+                cur.execute(index_def)
+    print(f"[postgres] Swapped {shadow} → {table} ({len(views)} dependent views recreated)")
+
+
+# ---------------------------------------------------------------------------
+# Streaming: Parquet record batches → CSV chunks → bounded pipe → COPY
+# ---------------------------------------------------------------------------
+
+# Rows per Parquet record batch, and how many CSV chunks may be in flight
+# between the reader thread and COPY
+BATCH_ROWS = int(os.environ.get("LOAD_BATCH_ROWS", "250000"))
+PIPE_DEPTH = int(os.environ.get("LOAD_PIPE_DEPTH", "4"))
+# Independent tables loaded concurrently, one connection each
+LOAD_WORKERS = int(os.environ.get("LOAD_WORKERS", "4"))
+
+# Natural key per table: later duplicates are dropped to avoid UniqueViolation,
+# and merge mode diffs on it. Keyed tables also carry a row_hash column.
+NATURAL_KEYS: dict[str, list[str]] = {
+    "providers": ["npi"],
+    "payments_medicaid": ["npi", "year"],
+    "payments_medicare": ["npi", "year"],
+    "exclusions": ["exclusion_id"],
+    "exclusion_name_matches": ["exclusion_id", "target_type", "target_id"],
+    "ownership_snf": ["enrollment_id", "owner_associate_id"],
+    "ubo_effective_ownership": ["ultimate_owner_id", "facility_id"],
+    "ownership_history": ["owner_associate_id", "facility_id", "valid_from"],
+    "chain_membership": ["chain_id", "facility_id"],
+    "medicare_inpatient": ["ccn", "year"],
+    "medicare_part_d": ["npi", "year"],
+    "order_referring": ["npi"],
+    "fec_committees": ["committee_id", "cycle"],
+    "hcris_financials": ["npi", "ccn", "year"],
+    "provider_taxonomies": ["npi", "slot"],
+    "provider_licenses": ["npi", "slot"],
+    "provider_identifiers": ["npi", "slot"],
+    "entity_cluster_members": ["source", "source_id"],
+    "address_index": ["source", "source_id"],
+    "address_colocation": ["address_key"],
+}
+
+_KEY_SEP = "\x1f"
+
+
+def _prepare_batch(table: str, df: pl.DataFrame) -> pl.DataFrame:
+    """Per-batch column derivation, subsetting and renames to match the schema."""
+    _, _, col_subset = TABLE_CONFIG[table]
 
     # If providers from fallback parquet lack display_name, derive it
     if table == "providers" and "display_name" not in df.columns:
@@ -223,71 +507,458 @@ def load_table(table: str, truncate: bool = True) -> None:
         for col in ["total_beds", "total_patient_days"]:
             if col in df.columns:
                 df = df.with_columns(pl.col(col).cast(pl.Int32, strict=False))
+    return df
+
+
+def _dedupe_batch(table: str, df: pl.DataFrame, seen: set[str]) -> pl.DataFrame:
+    """Keep the first occurrence of each natural key across the whole stream.
+
+    ``seen`` holds the keys already emitted and is updated in place; each
+    batch costs one set lookup per row however many keys came before. The
+    returned frame keeps its ``_key`` column for merge mode.
+    """
+    keys = [k for k in NATURAL_KEYS.get(table, []) if k in df.columns]
+    if not keys:
+        return df
+    df = df.with_columns(
+        pl.concat_str([pl.col(k).cast(pl.Utf8).fill_null("") for k in keys], separator=_KEY_SEP).alias("_key")
+    ).unique(subset=["_key"], keep="first", maintain_order=True)
+    batch_keys = df["_key"].to_list()
+    if seen:
+        df = df.filter(pl.Series([k not in seen for k in batch_keys], dtype=pl.Boolean))
+        batch_keys = df["_key"].to_list()
+    seen.update(batch_keys)
+    return df
+
+
+def _blake2b_int64(values: pl.Series) -> pl.Series:
+    return pl.Series(
+        [int.from_bytes(hashlib.blake2b(v.encode(), digest_size=8).digest(), "big", signed=True) for v in values],
+        dtype=pl.Int64,
+    )
+
+
+def _row_hash_expr(columns: list[str]) -> pl.Expr:
+    """64-bit content hash of a row. blake2b rather than Expr.hash so stored
+    hashes stay comparable across Polars upgrades."""
+    return (
+        pl.concat_str([pl.col(c).cast(pl.Utf8).fill_null("\\N") for c in columns], separator=_KEY_SEP)
+        .map_batches(_blake2b_int64, return_dtype=pl.Int64)
+        .alias("row_hash")
+    )
+
+
+def _key_sql(table: str, alias: str) -> str:
+    """SQL twin of the ``_key`` column built in _dedupe_batch."""
+    parts = [f"coalesce({alias}.{k}::text, '')" for k in NATURAL_KEYS[table]]
+    return parts[0] if len(parts) == 1 else f"concat_ws(E'\\x1f', {', '.join(parts)})"
+
+
+# Alternate inputs tried when the TABLE_CONFIG path is missing
+FALLBACK_PATHS: dict[str, list[str]] = {
+    # Modal or single-file ETL builds
+    "providers": ["providers.parquet", "modal_input/providers.parquet"],
+    # Single-cycle files written before the FEC store was partitioned by cycle
+    "fec_contributions": ["fec/fec_contributions.parquet"],
+    "fec_committees": ["fec/fec_committees.parquet"],
+}
+
+
+def _resolve_parquet(table: str) -> Path | None:
+    parquet_rel, _, _ = TABLE_CONFIG[table]
+    parquet_path = PROCESSED / parquet_rel
+
+    if not parquet_path.exists():
+        for fallback in FALLBACK_PATHS.get(table, []):
+            candidate = PROCESSED / fallback
+            if candidate.exists():
+                print(f"[postgres] Using fallback {candidate} for {table}")
+                return candidate
+
+    return parquet_path if parquet_path.exists() else None
+
+
+def stream_batches(
+    table: str, parquet_path: Path, hashed: bool = False
+) -> tuple[list[str], Iterator[pl.DataFrame]]:
+    """Return (COPY column list, iterator of prepared, deduplicated frames).
+
+    Reads the Parquet file or dataset one record batch at a time, projecting
+    only the columns the table needs. Keyed tables get a ``_key`` column (not
+    copied) and, when ``hashed``, a ``row_hash`` column (part of the COPY).
+    """
+    # A single file, or a hive-partitioned directory (e.g. fec/contributions/cycle=YYYY/)
+    dataset = ds.dataset(parquet_path, format="parquet", partitioning="hive")
+    source_cols = dataset.schema.names
+    _, _, col_subset = TABLE_CONFIG[table]
+    read_cols = None
+    if col_subset:
+        # Name parts are needed to derive display_name when it is missing
+        wanted = set(col_subset) | {"org_name", "last_name", "first_name"}
+        read_cols = [c for c in source_cols if c in wanted]
+
+    data_cols = _prepare_batch(table, pl.from_arrow(dataset.schema.empty_table().select(read_cols or source_cols))).columns
+    hashed = hashed and table in NATURAL_KEYS
+    columns = data_cols + ["row_hash"] if hashed else data_cols
+
+    def _frames() -> Iterator[pl.DataFrame]:
+        seen: set[str] = set()
+        dropped = 0
+        for rb in dataset.to_batches(columns=read_cols, batch_size=BATCH_ROWS):
+            df = _prepare_batch(table, pl.from_arrow(rb))
+            n_in = len(df)
+            df = _dedupe_batch(table, df, seen)
+            dropped += n_in - len(df)
+            if hashed:
+                df = df.with_columns(_row_hash_expr(data_cols))
+            yield df
+        if dropped:
+            print(f"[postgres] Deduped {table}: dropped {dropped:,} duplicate-key rows")
+
+    return columns, _frames()
 
-    # Deduplicate by primary key to avoid UniqueViolation
-    if table == "providers" and "npi" in df.columns:
-        n_before = len(df)
-        df = df.unique(subset=["npi"], keep="first")
-        if len(df) < n_before:
-            print(f"[postgres] Deduped providers: {n_before:,} -> {len(df):,} rows")
-    if table == "ownership_snf" and "enrollment_id" in df.columns and "owner_associate_id" in df.columns:
-        n_before = len(df)
-        df = df.unique(subset=["enrollment_id", "owner_associate_id"], keep="first")
-        if len(df) < n_before:
-            print(f"[postgres] Deduped ownership_snf: {n_before:,} -> {len(df):,} rows")
-    if table in ("payments_medicaid", "payments_medicare") and "npi" in df.columns and "year" in df.columns:
-        n_before = len(df)
-        df = df.unique(subset=["npi", "year"], keep="first")
-        if len(df) < n_before:
-            print(f"[postgres] Deduped {table}: {n_before:,} -> {len(df):,} rows")
-    if table == "hcris_financials" and "ccn" in df.columns and "year" in df.columns:
-        n_before = len(df)
-        keys = ["npi", "ccn", "year"]
-        df = df.unique(subset=[c for c in keys if c in df.columns], keep="first")
-        if len(df) < n_before:
-            print(f"[postgres] Deduped {table}: {n_before:,} -> {len(df):,} rows")
-
-    print(f"[postgres] Loading {table}: {len(df):,} rows, {len(df.columns)} cols")
-
-    # Export to in-memory CSV buffer
+
+def _csv(df: pl.DataFrame, columns: list[str], header: bool = False) -> bytes:
     buf = io.BytesIO()
-    df.write_csv(buf)
+    df.select(columns).write_csv(buf, include_header=header)
+    return buf.getvalue()
+
+
+def _csv_chunks(
+    columns: list[str],
+    frames: Iterator[pl.DataFrame],
+    select: Callable[[pl.DataFrame], pl.DataFrame] | None = None,
+) -> Iterator[tuple[bytes, bytes]]:
+    """Yield (COPY chunk, export chunk) pairs, header first.
+
+    Without ``select`` both are the same bytes. With it (merge mode), COPY
+    only gets the selected rows while the export still gets every row.
+    """
+    header = _csv(pl.DataFrame(schema={c: pl.Utf8 for c in columns}), columns, header=True)
+    yield header, header
+    for df in frames:
+        if df.is_empty():
+            continue
+        full = _csv(df, columns)
+        if select is None:
+            yield full, full
+            continue
+        subset = select(df)
+        yield (_csv(subset, columns) if not subset.is_empty() else b""), full
+
+
+class _PipeReader:
+    """File-like reader over a bounded queue of byte chunks, for copy_expert.
+
+    A producer thread serializes batches and tees them to the export file while
+    COPY consumes; at most PIPE_DEPTH chunks are buffered in between.
+    """
+
+    def __init__(self, chunks: Iterator[tuple[bytes, bytes]], tee: BinaryIO | None = None) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=PIPE_DEPTH)
+        self._stop = threading.Event()
+        self._chunk = memoryview(b"")
+        self._pos = 0
+        self._done = False
+        self._thread = threading.Thread(target=self._produce, args=(chunks, tee), daemon=True)
+        self._thread.start()
+
+    def _put(self, item: object) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, chunks: Iterator[tuple[bytes, bytes]], tee: BinaryIO | None) -> None:
+        try:
+            for chunk, tee_chunk in chunks:
+                if tee is not None:
+                    tee.write(tee_chunk)
+                if chunk and not self._put(chunk):
+                    return
+            self._put(None)
+        except BaseException as e:  # noqa: BLE001 — re-raised on the COPY side
+            self._put(e)
+
+    def read(self, size: int = -1) -> bytes:
+        while self._pos >= len(self._chunk):
+            if self._done:
+                return b""
+            item = self._queue.get()
+            if item is None:
+                self._done = True
+                return b""
+            if isinstance(item, BaseException):
+                self._done = True
+                raise item
+            self._chunk, self._pos = memoryview(item), 0
+        end = len(self._chunk) if size is None or size < 0 else self._pos + size
+        out = bytes(self._chunk[self._pos:end])
+        self._pos += len(out)
+        return out
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+# ---------------------------------------------------------------------------
+# Table load
+# ---------------------------------------------------------------------------
+
+def _fetch_row_hashes(cur: psycopg2.extensions.cursor, table: str) -> pl.DataFrame:
+    """(_key, row_hash) for every live row; row_hash is null for rows loaded
+    before hashing existed, so they count as changed on the first merge."""
+    buf = io.BytesIO()
+    cur.copy_expert(
+        f"COPY (SELECT {_key_sql(table, 't')} AS _key, t.row_hash FROM {table} t) TO STDOUT WITH (FORMAT CSV, HEADER TRUE)",
+        buf,
+    )
     buf.seek(0)
+    return pl.read_csv(buf, schema={"_key": pl.Utf8, "row_hash": pl.Int64})
+
+
+class _MergeDiff:
+    """Row selector for merge mode: passes through new or changed rows and
+    remembers every incoming key so vanished rows can be deleted afterwards."""
+
+    def __init__(self, existing: pl.DataFrame) -> None:
+        self.existing = existing.rename({"row_hash": "_old_hash"}).with_columns(pl.lit(True).alias("_exists"))
+        self.keys: list[pl.Series] = []
+        self.inserted = 0
+        self.updated = 0
+
+    def __call__(self, df: pl.DataFrame) -> pl.DataFrame:
+        self.keys.append(df["_key"])
+        joined = df.join(self.existing, on="_key", how="left")
+        changed = joined.filter(
+            pl.col("_exists").is_null()
+            | pl.col("_old_hash").is_null()
+            | (pl.col("_old_hash") != pl.col("row_hash"))
+        )
+        n_new = changed.filter(pl.col("_exists").is_null()).height
+        self.inserted += n_new
+        self.updated += changed.height - n_new
+        return changed
+
+    def gone(self) -> pl.DataFrame:
+        incoming = pl.DataFrame({"_key": pl.concat(self.keys) if self.keys else pl.Series([], dtype=pl.Utf8)})
+        return self.existing.select("_key").join(incoming, on="_key", how="anti")
+
+
+def _merge(
+    cur: psycopg2.extensions.cursor,
+    table: str,
+    columns: list[str],
+    frames: Iterator[pl.DataFrame],
+    tee: BinaryIO,
+) -> None:
+    """Diff the incoming rows against stored row hashes and apply only the delta.
+
+    Changed/new rows are COPYed into a temp staging table; rows whose key is
+    no longer present are deleted. Both are applied set-wise: one DELETE for
+    changed + vanished keys, one INSERT from staging.
+    """
+    cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS row_hash BIGINT")
+    diff = _MergeDiff(_fetch_row_hashes(cur, table))
+    print(f"[postgres] Merging {table}: {diff.existing.height:,} live rows")
+
+    col_names = ", ".join(columns)
+    cur.execute(f"CREATE TEMP TABLE {table}__stage ON COMMIT DROP AS SELECT {col_names} FROM {table} WITH NO DATA")
+    pipe = _PipeReader(_csv_chunks(columns, frames, select=diff), tee)
+    try:
+        cur.copy_expert(
+            f"COPY {table}__stage ({col_names}) FROM STDIN WITH (FORMAT CSV, HEADER TRUE, NULL '')",
+            pipe,
+            size=1 << 20,
+        )
+    finally:
+        pipe.close()
+
+    gone = diff.gone()
+    cur.execute(f"CREATE TEMP TABLE {table}__gone (_key TEXT) ON COMMIT DROP")
+    if gone.height:
+        buf = io.BytesIO()
+        gone.write_csv(buf)
+        buf.seek(0)
+        cur.copy_expert(f"COPY {table}__gone (_key) FROM STDIN WITH (FORMAT CSV, HEADER TRUE)", buf)
+
+    cur.execute(
+        f"""
+        DELETE FROM {table} t
+        WHERE {_key_sql(table, 't')} IN (
+            SELECT {_key_sql(table, 's')} FROM {table}__stage s
+            UNION ALL
+            SELECT _key FROM {table}__gone
+        )
+        """
+    )
+    cur.execute(f"INSERT INTO {table} ({col_names}) SELECT {col_names} FROM {table}__stage")
+    print(
+        f"[postgres] Merged {table}: {diff.inserted:,} inserted, {diff.updated:,} updated, "
+        f"{gone.height:,} deleted"
+    )
+
+
+def load_table(table: str, mode: str = "swap") -> bool:
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode {mode!r} (known: {LOAD_MODES})")
+    if mode == "merge" and table not in NATURAL_KEYS:
+        print(f"[postgres] {table} has no natural key; merge falls back to swap")
+        mode = "swap"
+    _, schema_file, _ = TABLE_CONFIG[table]
+    parquet_path = _resolve_parquet(table)
+    if parquet_path is None:
+        print(f"[postgres] SKIP {table}: {PROCESSED / TABLE_CONFIG[table][0]} not found")
+        return False
+
+    columns, frames = stream_batches(table, parquet_path, hashed=mode == "merge" or table in SYNCED_TABLES)
+    ddl, indexes = _split_schema(schema_file)
+    post_load = POST_LOAD_SCHEMAS.get(table)
+    post_load_sql = (SCHEMAS_DIR / post_load).read_text() if post_load else None
+    target = table
+    if mode == "swap":
+        # Only the statements for this table, pointed at the shadow copy
+        target = f"{table}{SHADOW_SUFFIX}"
+        ddl = [_retarget(s, table, target) for s in ddl if _references(s, table)]
+        indexes = [_retarget(s, table, target) for s in indexes if _references(s, table)]
+        if post_load_sql:
+            post_load_sql = _retarget(post_load_sql, table, target)
+    print(f"[postgres] Loading {table} ({mode}): {len(columns)} cols from {parquet_path.name}")
+
+    # The export CSV for Neo4j is a tee of the COPY stream, renamed into place on success
+    EXPORTS.mkdir(parents=True, exist_ok=True)
+    csv_out = EXPORTS / f"{table}.csv"
+    csv_tmp = csv_out.with_suffix(".csv.part")
 
     conn = _get_conn()
     try:
-        with conn:
-            with conn.cursor() as cur:
-                if truncate:
-                    # Drop and recreate so any schema changes (new columns) are applied
-                    _drop_and_recreate(cur, table, schema_file)
-                else:
-                    _apply_schema(cur, schema_file)
+        with conn, conn.cursor() as cur, open(csv_tmp, "wb") as tee:
+            if mode in ("append", "merge"):
+                for stmt in ddl:
+                    cur.execute(stmt)
+            else:
+                # Fresh table so any schema changes (new columns) are applied
+                _drop_and_recreate(cur, target, ddl)
 
-                col_names = ", ".join(df.columns)
-                cur.copy_expert(
-                    f"COPY {table} ({col_names}) FROM STDIN WITH (FORMAT CSV, HEADER TRUE, NULL '')",
-                    buf,
-                )
-                print(f"[postgres] ✓ {table}")
+            if mode == "merge":
+                _merge(cur, table, columns, frames, tee)
+            else:
+                pipe = _PipeReader(_csv_chunks(columns, frames), tee)
+                try:
+                    cur.copy_expert(
+                        f"COPY {target} ({', '.join(columns)}) FROM STDIN WITH (FORMAT CSV, HEADER TRUE, NULL '')",
+                        pipe,
+                        size=1 << 20,
+                    )
+                finally:
+                    pipe.close()
+                print(f"[postgres] Copied {cur.rowcount:,} rows into {target}")
+
+            print(f"[postgres] Building {len(indexes)} indexes on {target}…")
+            for stmt in indexes:
+                cur.execute(stmt)
+            if post_load_sql:
+                print(f"[postgres] Building post-load objects ({post_load})…")
+                cur.execute(post_load_sql)
+            cur.execute(f"ANALYZE {target}")
+
+        if mode == "swap":
+            _swap_in(conn, table)
+        print(f"[postgres] ✓ {table}")
+    except BaseException:
+        csv_tmp.unlink(missing_ok=True)
+        raise
     finally:
         conn.close()
 
-    # Also save the export CSV to disk for Neo4j
-    csv_out = EXPORTS / f"{table}.csv"
-    EXPORTS.mkdir(parents=True, exist_ok=True)
-    df.write_csv(csv_out)
+    csv_tmp.replace(csv_out)
     print(f"[postgres] Export → {csv_out}")
+    return True
 
 
-def load_all(tables: list[str] | None = None) -> None:
-    targets = tables or list(TABLE_CONFIG)
-    for table in targets:
-        if table not in TABLE_CONFIG:
-            print(f"[postgres] Unknown table: {table}  (known: {list(TABLE_CONFIG)})")
-            continue
+# ---------------------------------------------------------------------------
+# payments_combined: year-partitioned materialization of payments_combined_v
+# ---------------------------------------------------------------------------
+
+# Source table → program label in payments_combined_v
+PAYMENTS_COMBINED_SOURCES: dict[str, str] = {
+    "payments_medicaid": "Medicaid",
+    "payments_medicare": "Medicare",
+    "medicare_part_d": "MedicarePartD",
+}
+
+_PAYMENTS_COMBINED_COLS = "npi, year, program, payments, allowed, claims, beneficiaries, taxonomy, state"
+
+
+def refresh_payments_combined(sources: list[str] | None = None) -> None:
+    """Rebuild the payments_combined partitions affected by a reload.
+
+    ``sources`` limits the refresh to years present in those source tables
+    (plus years they previously contributed, so removed rows disappear).
+    None refreshes every year — used after a providers reload, since taxonomy
+    and state come from providers. Each year is its own transaction, so only
+    one partition is locked at a time.
+    """
+    conn = _get_conn()
+    try:
+        with conn, conn.cursor() as cur:
+            _apply_schema(cur, "payments_combined.sql")
+            cur.execute("SELECT to_regclass('payments_combined_v') IS NOT NULL")
+            if not cur.fetchone()[0]:
+                _apply_schema(cur, "risk_scores.sql")
+
+            tables = [t for t in (sources or PAYMENTS_COMBINED_SOURCES) if t in PAYMENTS_COMBINED_SOURCES]
+            live = []
+            for t in tables:
+                cur.execute("SELECT to_regclass(%s) IS NOT NULL", (t,))
+                if cur.fetchone()[0]:
+                    live.append(t)
+            years: set[int] = set()
+            if live:
+                cur.execute(" UNION ".join(f"SELECT DISTINCT year::INTEGER FROM {t}" for t in live))
+                years |= {y for (y,) in cur.fetchall() if y is not None}
+            if sources is None:
+                cur.execute("SELECT DISTINCT year FROM payments_combined")
+            else:
+                programs = [PAYMENTS_COMBINED_SOURCES[t] for t in tables]
+                cur.execute("SELECT DISTINCT year FROM payments_combined WHERE program = ANY(%s)", (programs,))
+            years |= {y for (y,) in cur.fetchall()}
+
+        print(f"[postgres] Refreshing payments_combined: {len(years)} year partitions")
+        for year in sorted(years):
+            partition = f"payments_combined_y{year}"
+            with conn, conn.cursor() as cur:
+                cur.execute(
+                    f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF payments_combined "
+                    f"FOR VALUES FROM ({year}) TO ({year + 1})"
+                )
+                cur.execute(f"TRUNCATE {partition}")
+                cur.execute(
+                    f"INSERT INTO {partition} ({_PAYMENTS_COMBINED_COLS}) "
+                    f"SELECT {_PAYMENTS_COMBINED_COLS} FROM payments_combined_v WHERE year = %s",
+                    (year,),
+                )
+                n = cur.rowcount
+                if n == 0:
+                    cur.execute(f"DROP TABLE {partition}")
+                else:
+                    cur.execute(f"ANALYZE {partition}")
+            print(f"[postgres]   {partition}: {n:,} rows")
+        print("[postgres] ✓ payments_combined")
+    finally:
+        conn.close()
+
+
+def _load_group(tables: list[str], mode: str) -> list[str]:
+    loaded = []
+    for table in tables:
         try:
-            load_table(table)
+            if load_table(table, mode):
+                loaded.append(table)
         except Exception as e:  # noqa: BLE001
             # Neon free tier has ~512 MB project limit; large COPY can raise DiskFull
             err_msg = str(e).lower()
@@ -296,8 +967,62 @@ def load_all(tables: list[str] | None = None) -> None:
             else:
                 print(f"[postgres] ⚠ {table}: {e}")
             # Continue to next table so other tables (e.g. exclusions, risk_scores) can still load
+    return loaded
+
+
+def _existing_tables(tables: list[str]) -> set[str]:
+    conn = _get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT t FROM unnest(%s::text[]) AS t WHERE to_regclass(t) IS NOT NULL", (tables,))
+            return {t for (t,) in cur.fetchall()}
+    finally:
+        conn.close()
+
+
+def load_all(tables: list[str] | None = None, mode: str = "swap", workers: int = LOAD_WORKERS) -> None:
+    targets = tables or list(TABLE_CONFIG)
+    if not tables:
+        for table in _existing_tables(list(SYNCED_TABLES)):
+            print(f"[postgres] {table} already loaded — left to {SYNCED_TABLES[table]} (name it to force a full reload)")
+            targets.remove(table)
+    # Tables sharing a schema file (payments_medicaid / payments_medicare) load
+    # serially so their DDL cannot interleave
+    groups: dict[str, list[str]] = {}
+    for table in targets:
+        if table == "payments_combined":
+            continue
+        if table not in TABLE_CONFIG:
+            print(f"[postgres] Unknown table: {table}  (known: {list(TABLE_CONFIG)} + payments_combined)")
+            continue
+        groups.setdefault(TABLE_CONFIG[table][1], []).append(table)
+
+    if workers <= 1 or len(groups) <= 1:
+        loaded = [t for group in groups.values() for t in _load_group(group, mode)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(lambda group: _load_group(group, mode), groups.values())
+            loaded = [t for group in results for t in group]
+
+    # Once all loads are in, so concurrent source reloads share one refresh
+    try:
+        if "payments_combined" in targets or "providers" in loaded:
+            refresh_payments_combined()
+        elif any(t in PAYMENTS_COMBINED_SOURCES for t in loaded):
+            refresh_payments_combined([t for t in loaded if t in PAYMENTS_COMBINED_SOURCES])
+    except Exception as e:  # noqa: BLE001
+        print(f"[postgres] ⚠ payments_combined: {e}")
 
 
 if __name__ == "__main__":
-    args = sys.argv[1:]
-    load_all(args if args else None)
+    parser = argparse.ArgumentParser(description="Load processed Parquet into Postgres")
+    parser.add_argument("tables", nargs="*", help="Tables to load, or payments_combined to refresh it (default: all)")
+    parser.add_argument(
+        "--mode", choices=LOAD_MODES, default="swap",
+        help=(
+            "swap: shadow table + atomic rename (default); replace: drop and reload in place; "
+            "append: COPY onto existing rows; merge: apply only new/changed/removed rows"
+        ),
+    )
+    args = parser.parse_args()
+    load_all(args.tables or None, mode=args.mode)
@@ -0,0 +1,18 @@
+-- Co-location clusters: addresses shared by two or more address_index records.
+-- Built by etl/transform/address_normalizer.py.
+CREATE TABLE IF NOT EXISTS address_colocation (
+    address_key         TEXT PRIMARY KEY,
+    street              TEXT,
+    city                TEXT,
+    state               TEXT,
+    zip5                TEXT,
+    record_count        INTEGER,
+    provider_count      INTEGER,
+    snf_owner_count     INTEGER,
+    leie_count          INTEGER,
+    pos_count           INTEGER,
+    unit_count          INTEGER,            -- distinct suites / units at the address
+    row_hash            BIGINT
+);
+
+CREATE INDEX IF NOT EXISTS idx_address_colocation_providers ON address_colocation (provider_count DESC);
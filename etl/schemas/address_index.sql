@@ -0,0 +1,17 @@
+-- Normalized (USPS-style) addresses of providers, SNF owners, LEIE exclusions and POS
+-- facilities, keyed by address_key. Built by etl/transform/address_normalizer.py.
+CREATE TABLE IF NOT EXISTS address_index (
+    source              TEXT NOT NULL,      -- provider (npi), snf_owner (entity_id), leie (exclusion_id), pos (ccn)
+    source_id           TEXT NOT NULL,
+    address_key         TEXT NOT NULL,      -- blake2b of street + zip5 (or city/state); unit excluded
+    street              TEXT,
+    unit                TEXT,
+    city                TEXT,
+    state               TEXT,
+    zip5                TEXT,
+    row_hash            BIGINT,
+    PRIMARY KEY (source, source_id)
+);
+
+-- Everything registered at one address
+CREATE INDEX IF NOT EXISTS idx_address_index_key ON address_index (address_key, source);
@@ -0,0 +1,19 @@
+-- SNF chain membership: one row per (chain, facility) from CMS's affiliated-entity
+-- file. Built by etl/transform/chain_membership.py; chain siblings of a provider
+-- are a self-join on chain_id instead of an OWNS*1..5 graph traversal.
+CREATE TABLE IF NOT EXISTS chain_membership (
+    chain_id        TEXT NOT NULL,      -- affiliated entity id, else 'name:<name key>'
+    chain_name      TEXT,
+    facility_id     TEXT NOT NULL,      -- provider_associate_id of the SNF
+    facility_ccn    TEXT,
+    facility_name   TEXT,
+    facility_npi    TEXT,
+    entity_id       TEXT,               -- corporate entity heading the chain (NULL if unmatched)
+    row_hash        BIGINT,
+    PRIMARY KEY (chain_id, facility_id)
+);
+
+-- Sibling lookups: provider NPI → chain_id → every NPI in the chain
+CREATE INDEX IF NOT EXISTS idx_chain_membership_chain_npi ON chain_membership (chain_id, facility_npi);
+CREATE INDEX IF NOT EXISTS idx_chain_membership_npi ON chain_membership (facility_npi);
+CREATE INDEX IF NOT EXISTS idx_chain_membership_entity ON chain_membership (entity_id);
@@ -9,7 +9,10 @@ CREATE TABLE IF NOT EXISTS chow_events (
   to_owner_entity_id text,
   to_owner_name text,
   event_type text,
-  source_file text
+  source_file text,
+  associate_id_buyer text,
+  associate_id_seller text,
+  state_seller text
 );
 
 CREATE INDEX IF NOT EXISTS idx_chow_facility_entity ON chow_events (facility_entity_id);
@@ -0,0 +1,17 @@
+-- Resolved organization records: every source record (SNF owner/facility, NPPES org,
+-- LEIE business, CHOW buyer/seller, FEC employer) with its canonical entity cluster.
+-- Built by etl/transform/entity_resolution.py.
+CREATE TABLE IF NOT EXISTS entity_cluster_members (
+    source              TEXT NOT NULL,      -- snf_owner, snf_facility, nppes_org, leie_business, chow_buyer, chow_seller, fec_employer
+    source_id           TEXT NOT NULL,      -- entity_id / associate_id / npi / exclusion_id / "<employer>|<state>"
+    entity_cluster_id   TEXT NOT NULL,
+    name                TEXT,
+    name_key            TEXT,               -- normalized name the records were matched on
+    state               TEXT,
+    zip5                TEXT,
+    row_hash            BIGINT,
+    PRIMARY KEY (source, source_id)
+);
+
+-- All records of one cluster (cross-source lookups, risk job)
+CREATE INDEX IF NOT EXISTS idx_entity_cluster_members_cluster ON entity_cluster_members (entity_cluster_id, source);
@@ -0,0 +1,15 @@
+-- NPI-less LEIE exclusions linked by name, built by etl/compute/exclusion_matching.py.
+-- target_type: provider (target_id = NPI), entity / person (SNF organizational /
+-- individual owner, target_id = owner_associate_id as in ownership_snf).
+CREATE TABLE IF NOT EXISTS exclusion_name_matches (
+    exclusion_id        TEXT NOT NULL,
+    target_type         TEXT NOT NULL,
+    target_id           TEXT NOT NULL,
+    match_method        TEXT,
+    confidence          REAL,
+    row_hash            BIGINT,
+    PRIMARY KEY (exclusion_id, target_type, target_id)
+);
+
+-- Owner lookups (risk job: is this SNF owner excluded?)
+CREATE INDEX IF NOT EXISTS idx_exclusion_name_matches_target ON exclusion_name_matches (target_type, target_id);
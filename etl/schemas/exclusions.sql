@@ -12,6 +12,7 @@ CREATE TABLE IF NOT EXISTS exclusions (
     reindate        DATE,
     state           CHAR(2),
     reinstated      BOOLEAN DEFAULT FALSE,
+    row_hash        BIGINT,
     created_at      TIMESTAMPTZ DEFAULT NOW()
 );
 
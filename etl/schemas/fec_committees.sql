@@ -1,6 +1,10 @@
+-- FEC committee master, one row per committee per election cycle
 CREATE TABLE IF NOT EXISTS fec_committees (
-    committee_id   TEXT PRIMARY KEY,
+    committee_id   TEXT NOT NULL,
+    cycle          SMALLINT NOT NULL,
     committee_name TEXT,
     party          TEXT,
-    type           TEXT
+    type           TEXT,
+    row_hash       BIGINT,
+    PRIMARY KEY (committee_id, cycle)
 );
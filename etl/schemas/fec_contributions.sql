@@ -31,6 +31,10 @@ CREATE INDEX IF NOT EXISTS idx_fec_contrib_state
 CREATE INDEX IF NOT EXISTS idx_fec_contrib_occupation
     ON fec_contributions (occupation text_pattern_ops);
 
--- Committee join
+-- Committee join (fec_committees is keyed by committee_id + cycle)
 CREATE INDEX IF NOT EXISTS idx_fec_contrib_cmte
-    ON fec_contributions (committee_id);
+    ON fec_contributions (committee_id, cycle);
+
+-- Per-cycle filters (political endpoint ?cycle=)
+CREATE INDEX IF NOT EXISTS idx_fec_contrib_cycle
+    ON fec_contributions (cycle);
@@ -15,7 +15,8 @@ CREATE TABLE IF NOT EXISTS hcris_financials (
   total_beds int,
   total_patient_days int,
   revenue_per_patient_day numeric,
-  link_type text
+  link_type text,
+  row_hash bigint
 );
 
 CREATE INDEX IF NOT EXISTS idx_hcris_npi ON hcris_financials (npi);
@@ -16,6 +16,7 @@ CREATE TABLE IF NOT EXISTS medicare_inpatient (
     total_medicare_payments  NUMERIC,
     total_discharges         NUMERIC,
     total_covered_days       NUMERIC,
+    row_hash                 BIGINT,
 
     PRIMARY KEY (ccn, year)
 );
@@ -14,6 +14,7 @@ CREATE TABLE IF NOT EXISTS medicare_part_d (
     total_benes      NUMERIC,
     opioid_claims    NUMERIC,
     opioid_cost      NUMERIC,
+    row_hash         BIGINT,
 
     PRIMARY KEY (npi, year)
 );
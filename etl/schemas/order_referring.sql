@@ -12,7 +12,8 @@ CREATE TABLE IF NOT EXISTS order_referring (
     eligible_dme      BOOLEAN NOT NULL DEFAULT FALSE,
     eligible_hha      BOOLEAN NOT NULL DEFAULT FALSE,
     eligible_pmd      BOOLEAN NOT NULL DEFAULT FALSE,
-    eligible_hospice  BOOLEAN NOT NULL DEFAULT FALSE
+    eligible_hospice  BOOLEAN NOT NULL DEFAULT FALSE,
+    row_hash          BIGINT
 );
 
 CREATE INDEX IF NOT EXISTS idx_order_referring_partb    ON order_referring (eligible_partb) WHERE eligible_partb = TRUE;
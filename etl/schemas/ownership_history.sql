@@ -0,0 +1,26 @@
+-- SCD2 ownership history: one row per (owner, facility) version, valid over
+-- [valid_from, valid_to); valid_to NULL = still reported in the latest snapshot.
+-- Built by etl/transform/ownership_history.py from every monthly SNF_All_Owners
+-- snapshot and CHOW effective dates.
+CREATE TABLE IF NOT EXISTS ownership_history (
+    owner_associate_id  TEXT NOT NULL,
+    owner_type          CHAR(1),            -- O=Organization, I=Individual
+    facility_id         TEXT NOT NULL,      -- provider_associate_id of the SNF
+    facility_name       TEXT,
+    ownership_pct       NUMERIC(5,2),
+    valid_from          DATE NOT NULL,
+    valid_to            DATE,               -- exclusive
+    valid_from_basis    TEXT,               -- association_date | chow | snapshot | previous_version
+    valid_to_basis      TEXT,               -- chow | snapshot (NULL while current)
+    first_snapshot      DATE,
+    last_snapshot       DATE,
+    row_hash            BIGINT,
+    PRIMARY KEY (owner_associate_id, facility_id, valid_from)
+);
+
+-- As-of lookups: WHERE facility_id = $1 AND valid_from <= $2 AND (valid_to IS NULL OR valid_to > $2)
+CREATE INDEX IF NOT EXISTS idx_ownership_history_facility ON ownership_history (facility_id, valid_from DESC);
+CREATE INDEX IF NOT EXISTS idx_ownership_history_owner ON ownership_history (owner_associate_id, valid_from DESC);
+-- Interval index: everything valid on a date (or overlapping a range) across all facilities
+CREATE INDEX IF NOT EXISTS idx_ownership_history_period ON ownership_history
+    USING gist (daterange(valid_from, valid_to, '[)'));
@@ -8,6 +8,7 @@ CREATE TABLE IF NOT EXISTS ownership_snf (
     role_text               TEXT,
     association_date        DATE,
     ownership_pct           NUMERIC(5,2),
+    row_hash                BIGINT,
     PRIMARY KEY (enrollment_id, owner_associate_id)
 );
 
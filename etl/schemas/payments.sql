@@ -5,6 +5,7 @@ CREATE TABLE IF NOT EXISTS payments_medicaid (
     payments             NUMERIC(18,2),
     claims               NUMERIC(18,0),
     beneficiaries        NUMERIC(18,0),
+    row_hash             BIGINT,
     PRIMARY KEY (npi, year)
 );
 
@@ -27,6 +28,7 @@ CREATE TABLE IF NOT EXISTS payments_medicare (
     medicare_standardized NUMERIC(18,2),
     total_services       NUMERIC(18,0),
     total_beneficiaries  NUMERIC(18,0),
+    row_hash             BIGINT,
     PRIMARY KEY (npi, year)
 );
 
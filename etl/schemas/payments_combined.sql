@@ -0,0 +1,31 @@
+-- =============================================================================
+-- payments_combined — materialized, year-partitioned copy of payments_combined_v
+-- =============================================================================
+--
+-- Same columns as the payments_combined_v view (risk_scores.sql), stored
+-- physically so readers with a year window prune partitions instead of
+-- re-running the three-way UNION and providers joins on every query.
+--
+-- One partition per year (payments_combined_y<year>), created and refreshed
+-- by etl/load/postgres_loader.py whenever payments_medicaid,
+-- payments_medicare, medicare_part_d or providers is reloaded.
+--
+-- Idempotent — safe to re-run.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS payments_combined (
+    npi             TEXT        NOT NULL,
+    year            INTEGER     NOT NULL,
+    program         TEXT        NOT NULL,
+    payments        NUMERIC,
+    allowed         NUMERIC,
+    claims          NUMERIC,
+    beneficiaries   NUMERIC,
+    taxonomy        TEXT,
+    state           TEXT,
+    PRIMARY KEY (npi, year, program)
+) PARTITION BY RANGE (year);
+
+-- Peer-group scans (benchmarks, risk peer stats)
+CREATE INDEX IF NOT EXISTS idx_payments_combined_taxonomy_state_year
+    ON payments_combined (taxonomy, state, year);
@@ -0,0 +1,38 @@
+-- Precomputed peer benchmarks, written by etl/compute/peer_benchmarks.py and
+-- served by GET /v1/providers/:npi/benchmark as a single primary-key read.
+-- peer_group is a text key: L1|taxonomy|state|entity_type, L2|taxonomy|division, L3|taxonomy.
+
+-- Per-peer-group statistics (one row per group, year, program, metric)
+CREATE TABLE IF NOT EXISTS peer_benchmark_groups (
+    peer_group           TEXT NOT NULL,
+    year                 SMALLINT NOT NULL,
+    program              TEXT NOT NULL,
+    metric               TEXT NOT NULL,
+    peer_level           SMALLINT NOT NULL,
+    peer_count           INTEGER,
+    median               DOUBLE PRECISION,
+    quantiles            DOUBLE PRECISION[],   -- p01, p05, p10, p25, p50, p75, p90, p95, p99
+    log_median           DOUBLE PRECISION,     -- median of ln(x + 1)
+    log_mad              DOUBLE PRECISION,     -- MAD of ln(x + 1)
+    PRIMARY KEY (peer_group, year, program, metric)
+);
+
+-- Per-provider benchmark rows (one row per NPI, year, program, metric)
+CREATE TABLE IF NOT EXISTS peer_benchmarks (
+    npi                  TEXT NOT NULL,
+    year                 SMALLINT NOT NULL,
+    program              TEXT NOT NULL,
+    metric               TEXT NOT NULL,
+    peer_level           SMALLINT,
+    peer_group           TEXT,
+    peer_count           INTEGER,
+    provider_value       NUMERIC(20,4),
+    peer_median          NUMERIC(20,4),
+    peer_p10             NUMERIC(20,4),
+    peer_p90             NUMERIC(20,4),
+    provider_percentile  SMALLINT,
+    z_score              NUMERIC(8,2),
+    direction            TEXT,
+    flag                 TEXT,
+    PRIMARY KEY (npi, year, program, metric)
+);
@@ -0,0 +1,24 @@
+-- Precomputed FEC ↔ provider matches, written by etl/compute/fec_matching.py and
+-- served by GET /v1/providers/:npi/political as a single indexed read.
+-- match_type: individual (contributor name + state), employer (NPPES organization
+-- name + state) or snf_owner (SNF organizational owner of the provider's facility).
+-- matched_name is the normalized contributor name or employer key.
+
+CREATE TABLE IF NOT EXISTS provider_fec_matches (
+    npi                  TEXT NOT NULL,
+    cycle                SMALLINT NOT NULL,
+    match_type           TEXT NOT NULL,
+    matched_name         TEXT NOT NULL,
+    match_score          REAL,
+    contribution_count   INTEGER,
+    total_amount         NUMERIC(14,2),
+    dem_amount           NUMERIC(14,2),
+    rep_amount           NUMERIC(14,2),
+    committee_count      INTEGER,
+    first_date           DATE,
+    last_date            DATE,
+    PRIMARY KEY (npi, cycle, match_type, matched_name)
+);
+
+-- Per-cycle rematch deletes (fec_matching --cycle)
+CREATE INDEX IF NOT EXISTS idx_provider_fec_matches_cycle ON provider_fec_matches (cycle);
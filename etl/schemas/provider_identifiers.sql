@@ -0,0 +1,17 @@
+-- NPPES "Other Provider Identifier" slots (1–50) per provider.
+-- type_code 05 = Medicaid ID, 06 = Medicare OSCAR/Certification (CCN).
+-- Built by etl/ingest/nppes_ingest.py from the same pass as providers.
+CREATE TABLE IF NOT EXISTS provider_identifiers (
+    npi                 TEXT NOT NULL,
+    slot                SMALLINT NOT NULL,
+    identifier          TEXT NOT NULL,
+    type_code           TEXT,
+    identifier_type     TEXT,
+    state               TEXT,
+    issuer              TEXT,
+    row_hash            BIGINT,
+    PRIMARY KEY (npi, slot)
+);
+
+-- Identifier → NPI lookups (CCN crosswalk, Medicaid ID)
+CREATE INDEX IF NOT EXISTS idx_provider_identifiers_type_id ON provider_identifiers (type_code, identifier);
@@ -0,0 +1,13 @@
+-- All NPPES license slots (1–15) per provider, with the taxonomy of the same slot.
+-- Built by etl/ingest/nppes_ingest.py from the same pass as providers.
+CREATE TABLE IF NOT EXISTS provider_licenses (
+    npi                 TEXT NOT NULL,
+    slot                SMALLINT NOT NULL,
+    license_number      TEXT NOT NULL,
+    license_state       TEXT,
+    taxonomy_code       TEXT,
+    row_hash            BIGINT,
+    PRIMARY KEY (npi, slot)
+);
+
+CREATE INDEX IF NOT EXISTS idx_provider_licenses_state_number ON provider_licenses (license_state, license_number);
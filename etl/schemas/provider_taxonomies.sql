@@ -0,0 +1,13 @@
+-- All NPPES taxonomy slots (1–15) per provider; providers.taxonomy_1 is slot 1.
+-- Built by etl/ingest/nppes_ingest.py from the same pass as providers.
+CREATE TABLE IF NOT EXISTS provider_taxonomies (
+    npi                 TEXT NOT NULL,
+    slot                SMALLINT NOT NULL,
+    taxonomy_code       TEXT NOT NULL,
+    is_primary          BOOLEAN DEFAULT FALSE,
+    row_hash            BIGINT,
+    PRIMARY KEY (npi, slot)
+);
+
+-- Multi-taxonomy peer lookups: every NPI carrying a taxonomy in any slot
+CREATE INDEX IF NOT EXISTS idx_provider_taxonomies_code ON provider_taxonomies (taxonomy_code, npi);
@@ -20,13 +20,18 @@ CREATE TABLE IF NOT EXISTS providers (
     eligible_hha        BOOLEAN DEFAULT FALSE,
     eligible_pmd        BOOLEAN DEFAULT FALSE,
     eligible_hospice     BOOLEAN DEFAULT FALSE,
-    updated_at          TIMESTAMPTZ DEFAULT NOW()
+    updated_at          TIMESTAMPTZ DEFAULT NOW(),
+    row_hash            BIGINT,
+    -- Search columns, computed once during COPY (indexed in providers_search.sql)
+    search_vector       TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(display_name, '') || ' ' || coalesce(npi, '') || ' ' || coalesce(city, ''))
+    ) STORED,
+    search_name         TEXT GENERATED ALWAYS AS (
+        btrim(regexp_replace(lower(coalesce(display_name, '')), '[^a-z0-9]+', ' ', 'g'))
+    ) STORED
 );
 
 CREATE INDEX IF NOT EXISTS idx_providers_state     ON providers (state);
 CREATE INDEX IF NOT EXISTS idx_providers_zip       ON providers (zip);
 CREATE INDEX IF NOT EXISTS idx_providers_excluded  ON providers (is_excluded) WHERE is_excluded = TRUE;
-CREATE INDEX IF NOT EXISTS idx_providers_name_fts
-    ON providers USING gin(to_tsvector('english', coalesce(display_name, '')));
-CREATE INDEX IF NOT EXISTS idx_providers_fts
-    ON providers USING gin(to_tsvector('english', coalesce(display_name, '') || ' ' || coalesce(npi, '') || ' ' || coalesce(city, '')));
+-- Search indexes and provider_name_tokens are built after COPY: see providers_search.sql
@@ -0,0 +1,43 @@
+-- Provider search materialization. Applied by postgres_loader after the
+-- providers COPY so the indexes are built once over the loaded table.
+-- Idempotent — safe to re-run.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Tables created before the search columns were added to providers.sql
+ALTER TABLE providers ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    to_tsvector('english', coalesce(display_name, '') || ' ' || coalesce(npi, '') || ' ' || coalesce(city, ''))
+) STORED;
+ALTER TABLE providers ADD COLUMN IF NOT EXISTS search_name TEXT GENERATED ALWAYS AS (
+    btrim(regexp_replace(lower(coalesce(display_name, '')), '[^a-z0-9]+', ' ', 'g'))
+) STORED;
+
+-- Full-text search over the stored tsvector (display_name, npi, city)
+CREATE INDEX IF NOT EXISTS idx_providers_search_vector
+    ON providers USING gin (search_vector);
+
+-- Fuzzy / substring name matching on the normalized name
+CREATE INDEX IF NOT EXISTS idx_providers_search_name_trgm
+    ON providers USING gin (search_name gin_trgm_ops);
+
+-- Prefix-autocomplete: one row per (normalized name token, npi)
+CREATE TABLE IF NOT EXISTS provider_name_tokens (
+    token               TEXT NOT NULL,
+    npi                 TEXT NOT NULL,
+    PRIMARY KEY (token, npi)
+);
+
+TRUNCATE provider_name_tokens;
+
+INSERT INTO provider_name_tokens (token, npi)
+SELECT DISTINCT t.token, p.npi
+FROM providers p
+CROSS JOIN LATERAL unnest(string_to_array(p.search_name, ' ')) AS t(token)
+WHERE length(t.token) >= 2;
+
+-- token LIKE 'abc%' lookups
+CREATE INDEX IF NOT EXISTS idx_provider_name_tokens_prefix
+    ON provider_name_tokens (token text_pattern_ops);
+
+ANALYZE providers;
+ANALYZE provider_name_tokens;
@@ -8,6 +8,9 @@
 -- 2. provider_risk_scores — precomputed risk scores table, populated by the
 --    batch ETL job (etl/compute/risk_scores.py) and served directly by the API.
 --
+-- 3. risk_score_calibration — r_raw → risk_score breakpoints of the last
+--    global calibration, for scoring new NPIs without a re-rank.
+--
 -- Idempotent — safe to re-run.
 -- =============================================================================
 
@@ -120,3 +123,19 @@ CREATE INDEX IF NOT EXISTS idx_risk_scores_billing
 
 CREATE INDEX IF NOT EXISTS idx_risk_scores_updated
     ON provider_risk_scores (updated_at DESC);
+
+
+-- ---------------------------------------------------------------------------
+-- 3. Calibration breakpoints
+--    One row per distinct r_raw from the last global calibration, replaced
+--    on each full batch run.  A new NPI is scored without a global re-rank:
+--      SELECT risk_score FROM risk_score_calibration
+--      WHERE r_raw <= $1 ORDER BY r_raw DESC LIMIT 1;
+-- ---------------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS risk_score_calibration (
+    r_raw                       DOUBLE PRECISION PRIMARY KEY,
+    risk_score                  NUMERIC(6,2) NOT NULL,
+    risk_label                  TEXT         NOT NULL,
+    calibrated_at               TIMESTAMPTZ  DEFAULT NOW()
+);
@@ -0,0 +1,19 @@
+-- Effective ownership of each SNF by the owners at the top of its ownership chains
+-- (product of ownership_pct along each path, summed across paths).
+-- Built by etl/transform/ubo_inference.py from ownership_edges.parquet.
+CREATE TABLE IF NOT EXISTS ubo_effective_ownership (
+    ultimate_owner_id   TEXT NOT NULL,      -- owner_associate_id (organization or individual)
+    owner_type          CHAR(1),            -- O=Organization, I=Individual
+    facility_id         TEXT NOT NULL,      -- provider_associate_id of the SNF
+    effective_pct       NUMERIC(9,4),       -- 0–100
+    min_depth           SMALLINT,           -- shortest chain length (NULL for reported indirect interests)
+    path_count          INTEGER,
+    basis               TEXT,               -- derived (propagated) | reported (CMS indirect interest)
+    depth_capped        BOOLEAN DEFAULT FALSE,
+    in_cycle            BOOLEAN DEFAULT FALSE,
+    row_hash            BIGINT,
+    PRIMARY KEY (ultimate_owner_id, facility_id)
+);
+
+-- Facility → its ultimate owners
+CREATE INDEX IF NOT EXISTS idx_ubo_facility ON ubo_effective_ownership (facility_id, effective_pct DESC);
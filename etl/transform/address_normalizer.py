@@ -1,17 +1,303 @@
 """
-Address cleaning and normalization (e.g. USPS-style).
+Address cleaning and normalization (USPS Publication 28 style), as Polars
+expressions, plus the address index and co-location tables built from them.
+
+Expressions
+-----------
+  normalize_street(line1)   uppercase, punctuation dropped, street suffixes /
+                            directionals / unit designators abbreviated
+                            ("1200 North Main Street, Suite 4" → "1200 N MAIN ST STE 4")
+  street_only(street)       normalized street without the unit ("1200 N MAIN ST");
+                            a leading unit ("STE 200 55 ELM ST") is dropped too
+  unit_only(street)         the unit part ("STE 4"), or null
+  zip5(zip)                 first 5 digits; 4/8-digit zips regain their leading zero
+  valid_state(state)        2-letter USPS code, or null
+  address_key(...)          stable 64-bit blake2b hex of street + zip5
+                            (street + city + state when the zip is missing)
+  normalize_frame(lf, ...)  all of the above as columns, each computed once
+
+Abbreviations are applied word-by-word with one vectorized replace_many, so
+the whole NPPES file normalizes in a few seconds.
+
+Index (python -m etl.transform.address_normalizer)
+---------------------------------------------------
+Reads:  providers/providers_final.parquet     (NPPES practice location)
+        ownership/corporate_entities.parquet  (SNF owner organizations)
+        exclusions/exclusions_final.parquet   (LEIE)
+        raw pos/pos*.csv                      (Provider of Services facilities, optional)
+Writes: data/processed/addresses/
+          address_index.parquet       source, source_id, address_key, street, unit, city, state, zip5
+          address_colocation.parquet  one row per address_key shared by 2+ records, with
+                                      per-source counts (co-location clusters)
 """
-import re
+import hashlib
+import os
+from pathlib import Path
 from typing import Optional
 
+import polars as pl
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+_raw = os.environ.get("DATA_RAW", str(_REPO_ROOT / "data" / "raw"))
+_proc = os.environ.get("DATA_PROCESSED", str(_REPO_ROOT / "data" / "processed"))
+RAW = Path(_raw) if Path(_raw).is_absolute() else _REPO_ROOT / _raw
+PROCESSED = Path(_proc) if Path(_proc).is_absolute() else _REPO_ROOT / _proc
+OUT_DIR = PROCESSED / "addresses"
+
+# ---------------------------------------------------------------------------
+# USPS abbreviation tables (Publication 28, Appendix C)
+# ---------------------------------------------------------------------------
+
+STREET_SUFFIXES = {
+    "ALLEY": "ALY", "AVENUE": "AVE", "AV": "AVE", "BOULEVARD": "BLVD", "BOULV": "BLVD",
+    "BRIDGE": "BRG", "BYPASS": "BYP", "CAUSEWAY": "CSWY", "CENTER": "CTR", "CENTRE": "CTR",
+    "CIRCLE": "CIR", "COURT": "CT", "COVE": "CV", "CREEK": "CRK", "CROSSING": "XING",
+    "DRIVE": "DR", "DRV": "DR", "EXPRESSWAY": "EXPY", "EXTENSION": "EXT", "FREEWAY": "FWY",
+    "GARDENS": "GDNS", "GROVE": "GRV", "HEIGHTS": "HTS", "HIGHWAY": "HWY", "HIWAY": "HWY",
+    "HILL": "HL", "HOLLOW": "HOLW", "JUNCTION": "JCT", "LAKE": "LK", "LANDING": "LNDG",
+    "LANE": "LN", "LOOP": "LOOP", "MANOR": "MNR", "MEADOWS": "MDWS", "MOUNT": "MT",
+    "MOUNTAIN": "MTN", "PARKWAY": "PKWY", "PARKWY": "PKWY", "PIKE": "PIKE", "PLACE": "PL",
+    "PLAZA": "PLZ", "POINT": "PT", "RIDGE": "RDG", "ROAD": "RD", "ROUTE": "RTE",
+    "SQUARE": "SQ", "STATION": "STA", "STREET": "ST", "STR": "ST", "SUMMIT": "SMT",
+    "TERRACE": "TER", "TRAIL": "TRL", "TURNPIKE": "TPKE", "VALLEY": "VLY", "VIEW": "VW",
+    "VILLAGE": "VLG", "VISTA": "VIS", "WAY": "WAY",
+}
+DIRECTIONALS = {
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "NORTHEAST": "NE", "NORTHWEST": "NW", "SOUTHEAST": "SE", "SOUTHWEST": "SW",
+}
+UNIT_DESIGNATORS = {
+    "APARTMENT": "APT", "BUILDING": "BLDG", "BLD": "BLDG", "DEPARTMENT": "DEPT",
+    "FLOOR": "FL", "FLR": "FL", "OFFICE": "OFC", "ROOM": "RM", "SPACE": "SPC",
+    "SUITE": "STE", "SUIT": "STE", "STES": "STE", "UNIT": "UNIT", "LOT": "LOT",
+    "TRAILER": "TRLR",
+}
+ORDINALS = {
+    "FIRST": "1ST", "SECOND": "2ND", "THIRD": "3RD", "FOURTH": "4TH", "FIFTH": "5TH",
+    "SIXTH": "6TH", "SEVENTH": "7TH", "EIGHTH": "8TH", "NINTH": "9TH", "TENTH": "10TH",
+}
+_WORD_MAP = {**STREET_SUFFIXES, **DIRECTIONALS, **UNIT_DESIGNATORS, **ORDINALS}
+_UNIT_RE = "|".join(sorted(set(UNIT_DESIGNATORS.values()))) + "|#"
+# A designator is only a unit when an identifier follows: a token with a digit
+# ("STE 4", "APT 2B", "STE A-1", "RM 12/14") or a single letter ("UNIT C"), so
+# street names such as "PARKING LOT RD" are left whole
+_UNIT = rf"(?:{_UNIT_RE}) (?:[A-Z0-9/\-]*\d[A-Z0-9/\-]*|[A-Z])"
+
+US_STATES = frozenset(
+    "AL AK AZ AR CA CO CT DE DC FL GA HI ID IL IN IA KS KY LA ME MD MA MI MN MS MO MT NE NV NH NJ NM "
+    "NY NC ND OH OK OR PA RI SC SD TN TX UT VT VA WA WV WI WY PR VI GU AS MP AA AE AP".split()
+)
+
+
+# ---------------------------------------------------------------------------
+# Expressions
+# ---------------------------------------------------------------------------
+
+def _squeeze(expr: pl.Expr) -> pl.Expr:
+    return expr.str.replace_all(r"\s+", " ").str.strip_chars()
+
+
+def normalize_street(expr: pl.Expr) -> pl.Expr:
+    """USPS-style street line: uppercase, punctuation dropped, words abbreviated."""
+    cleaned = _squeeze(
+        expr.cast(pl.Utf8).str.to_uppercase()
+        .str.replace_all(r"[.,']", "")
+        .str.replace_all("#", " # ")
+        .str.replace_all(r"[^A-Z0-9#/\- ]", " ")
+    ).str.replace(r"^(?:P ?O|POST OFFICE) (?:BOX|BX)\b", "PO BOX")
+    # Words are matched as " WORD " on a double-spaced string, so adjacent
+    # words never share the space between them and all are replaced in one pass
+    padded = pl.concat_str([pl.lit("  "), cleaned.str.replace_all(" ", "  "), pl.lit("  ")])
+    abbreviated = padded.str.replace_many(
+        [f" {w} " for w in _WORD_MAP], [f" {a} " for a in _WORD_MAP.values()]
+    )
+    return _squeeze(abbreviated)
+
+
+def street_only(street: pl.Expr) -> pl.Expr:
+    """Normalized street without its unit ("1200 N MAIN ST STE 4" / "STE 4 1200 N MAIN ST" → "1200 N MAIN ST")."""
+    return (
+        street.str.replace(rf"^(?:{_UNIT} )+", "")
+        .str.extract(rf"^(.*?)(?: {_UNIT}(?: .*)?)?$", 1)
+    )
+
+
+def unit_only(street: pl.Expr) -> pl.Expr:
+    """Unit part of a normalized street ("STE 4"), trailing or leading, or null."""
+    return pl.coalesce(
+        street.str.extract(rf"^((?:{_UNIT} )*{_UNIT}) .", 1),
+        street.str.extract(rf"^.*? ({_UNIT}(?: .*)?)$", 1),
+    )
+
+
+def zip5(expr: pl.Expr) -> pl.Expr:
+    """5-digit ZIP; 4- and 8-digit values (leading zero lost in a numeric column) are padded."""
+    digits = expr.cast(pl.Utf8).str.replace_all(r"\D", "")
+    n = digits.str.len_chars()
+    z = (
+        pl.when(n.is_in([5, 9])).then(digits.str.slice(0, 5))
+        .when(n.is_in([4, 8])).then(pl.concat_str([pl.lit("0"), digits.str.slice(0, 4)]))
+    )
+    return pl.when(z != "00000").then(z)
+
+
+def valid_state(expr: pl.Expr) -> pl.Expr:
+    """2-letter USPS state / territory code, or null."""
+    s = expr.cast(pl.Utf8).str.strip_chars().str.to_uppercase()
+    return pl.when(s.is_in(list(US_STATES))).then(s)
+
+
+def _blake2b_hex(values: pl.Series) -> pl.Series:
+    """Stable hash of each distinct value (addresses repeat heavily, so hash uniques only)."""
+    uniques = values.drop_nulls().unique()
+    digests = pl.Series([hashlib.blake2b(v.encode(), digest_size=8).hexdigest() for v in uniques], dtype=pl.Utf8)
+    return values.replace_strict(uniques, digests, default=None, return_dtype=pl.Utf8)
+
+
+def address_key(street: pl.Expr, city: pl.Expr, state: pl.Expr, zip_code: pl.Expr) -> pl.Expr:
+    """Stable key of normalized street (unit excluded) + zip5, else + city/state."""
+    locality = pl.when(zip_code.is_not_null()).then(zip_code).otherwise(
+        pl.concat_str([city, state], separator="|")
+    )
+    return (
+        pl.when(street.is_not_null() & locality.is_not_null())
+        .then(pl.concat_str([street, locality], separator="|"))
+        .map_batches(_blake2b_hex, return_dtype=pl.Utf8)
+    )
+
+
+def normalize_frame(
+    frame: pl.LazyFrame,
+    line1: str = "address_line1", city: str = "city", state: str = "state", zip_code: str = "zip",
+) -> pl.LazyFrame:
+    """``frame`` + street, unit, city, state, zip5, address_key from raw address columns.
+
+    Built in stages so each normalized column is computed once and reused.
+    """
+    city_expr = _squeeze(pl.col(city).cast(pl.Utf8).str.to_uppercase())
+    return (
+        frame.with_columns(
+            normalize_street(pl.col(line1)).alias("_full"),
+            pl.when(city_expr.str.len_chars() > 0).then(city_expr).alias("city"),
+            valid_state(pl.col(state)).alias("state"),
+            zip5(pl.col(zip_code)).alias("zip5"),
+        )
+        .with_columns(street_only(pl.col("_full")).alias("street"), unit_only(pl.col("_full")).alias("unit"))
+        .with_columns(pl.when(pl.col("street").str.len_chars() > 0).then(pl.col("street")).alias("street"))
+        .with_columns(address_key(pl.col("street"), pl.col("city"), pl.col("state"), pl.col("zip5")).alias("address_key"))
+        .drop("_full")
+    )
+
 
 def normalize_address(line1: str, city: str, state: str, zip_code: str) -> dict[str, Optional[str]]:
-    """Return normalized address components."""
-    state = (state or "").strip().upper()[:2]
-    zip_code = re.sub(r"\D", "", (zip_code or ""))[:10]
-    return {
-        "line1": (line1 or "").strip() or None,
-        "city": (city or "").strip() or None,
-        "state": state or None,
-        "zip": zip_code or None,
-    }
+    """Normalized components of a single address (same expressions as the bulk path)."""
+    row = pl.LazyFrame(
+        {"address_line1": [line1], "city": [city], "state": [state], "zip": [zip_code]},
+        schema={"address_line1": pl.Utf8, "city": pl.Utf8, "state": pl.Utf8, "zip": pl.Utf8},
+    )
+    cols = ["street", "unit", "city", "state", "zip5", "address_key"]
+    return normalize_frame(row).select(cols).collect().row(0, named=True)
+
+
+# ---------------------------------------------------------------------------
+# Address index + co-location
+# ---------------------------------------------------------------------------
+
+INDEX_SCHEMA = {
+    "source": pl.Utf8, "source_id": pl.Utf8, "address_key": pl.Utf8, "street": pl.Utf8,
+    "unit": pl.Utf8, "city": pl.Utf8, "state": pl.Utf8, "zip5": pl.Utf8,
+}
+SOURCES = ("provider", "snf_owner", "leie", "pos")
+
+
+def _source_frame(lf: pl.LazyFrame, source: str, id_col: str, line1: str, city: str, state: str, zip_code: str) -> pl.LazyFrame:
+    available = set(lf.collect_schema().names())
+    col = lambda c: pl.col(c).cast(pl.Utf8) if c in available else pl.lit(None, dtype=pl.Utf8)  # noqa: E731
+    raw = lf.select(
+        col(id_col).alias("source_id"),
+        col(line1).alias("_line1"), col(city).alias("_city"),
+        col(state).alias("_state"), col(zip_code).alias("_zip"),
+    )
+    return (
+        normalize_frame(raw, "_line1", "_city", "_state", "_zip")
+        .with_columns(pl.lit(source).alias("source"))
+        .filter(pl.col("source_id").is_not_null() & pl.col("address_key").is_not_null())
+        .select(list(INDEX_SCHEMA))
+    )
+
+
+def _pos_frame() -> pl.LazyFrame | None:
+    paths = sorted((RAW / "pos").glob("pos*.csv")) if (RAW / "pos").exists() else []
+    frames = []
+    for path in paths:
+        lf = pl.scan_csv(path, infer_schema_length=0, null_values=["", "."], ignore_errors=True,
+                         truncate_ragged_lines=True)
+        if {"prvdr_num", "st_adr", "zip_cd"} <= set(lf.collect_schema().names()):
+            frames.append(lf.select("prvdr_num", "st_adr", "city_name", "state_cd", "zip_cd"))
+    if not frames:
+        return None
+    # Latest file wins per CCN
+    return pl.concat(frames).unique(subset=["prvdr_num"], keep="last")
+
+
+def build_address_index() -> pl.DataFrame:
+    """One row per (source, source_id) with its normalized address and address_key."""
+    frames = []
+    providers = PROCESSED / "providers" / "providers_final.parquet"
+    if providers.exists():
+        frames.append(_source_frame(pl.scan_parquet(providers), "provider", "npi",
+                                    "address_line1", "city", "state", "zip"))
+    corp = PROCESSED / "ownership" / "corporate_entities.parquet"
+    if corp.exists():
+        frames.append(_source_frame(pl.scan_parquet(corp), "snf_owner", "entity_id",
+                                    "owner_address", "owner_city", "owner_state", "owner_zip"))
+    leie = PROCESSED / "exclusions" / "exclusions_final.parquet"
+    if leie.exists():
+        frames.append(_source_frame(pl.scan_parquet(leie), "leie", "exclusion_id",
+                                    "address", "city", "state", "zip"))
+    pos = _pos_frame()
+    if pos is not None:
+        frames.append(_source_frame(pos, "pos", "prvdr_num", "st_adr", "city_name", "state_cd", "zip_cd"))
+    if not frames:
+        return pl.DataFrame(schema=INDEX_SCHEMA)
+    return pl.concat(frames).unique(subset=["source", "source_id"], keep="first").collect()
+
+
+def colocation(index: pl.DataFrame, min_records: int = 2) -> pl.DataFrame:
+    """Addresses shared by ``min_records``+ records, with a count per source."""
+    return (
+        index.group_by("address_key")
+        .agg(
+            pl.col("street").first(),
+            pl.col("city").first(),
+            pl.col("state").first(),
+            pl.col("zip5").first(),
+            pl.len().cast(pl.Int32).alias("record_count"),
+            *[(pl.col("source") == s).sum().cast(pl.Int32).alias(f"{s}_count") for s in SOURCES],
+            pl.col("unit").drop_nulls().n_unique().cast(pl.Int32).alias("unit_count"),
+        )
+        .filter(pl.col("record_count") >= min_records)
+        .sort("record_count", descending=True)
+    )
+
+
+def run() -> tuple[pl.DataFrame, pl.DataFrame]:
+    index = build_address_index()
+    print(f"[address] {len(index):,} addresses indexed "
+          + ", ".join(f"{s}={n:,}" for s, n in index.group_by("source").len().sort("source").iter_rows()))
+    coloc = colocation(index)
+    print(f"[address] {len(coloc):,} co-located addresses "
+          f"({coloc.filter(pl.col('provider_count') >= 10).height:,} with 10+ providers)")
+
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    index.write_parquet(OUT_DIR / "address_index.parquet", compression="zstd")
+    coloc.write_parquet(OUT_DIR / "address_colocation.parquet", compression="zstd")
+    print(f"[address] → {OUT_DIR}/address_index.parquet, address_colocation.parquet")
+    return index, coloc
+
+
+if __name__ == "__main__":
+    run()
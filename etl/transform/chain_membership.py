@@ -0,0 +1,248 @@
+"""
+SNF chain membership: facility → chain from CMS's affiliated-entity file.
+
+CMS already groups nursing facilities under affiliated entities (chains).
+This normalizes snf_affiliated_entities.parquet (raw CSV headers, which vary
+between releases) into one row per (chain, facility), so a provider's chain
+siblings are one indexed join instead of an OWNS*1..5 traversal.
+
+Resolution
+----------
+  facility_id   provider_associate_id (the SNF CorporateEntity): the file's
+                ASSOCIATE ID, else its ENROLLMENT ID via ownership_edges, else
+                its CCN via chow_events (newest event)
+  facility_npi  the file's NPI, else the CCN via provider_identifiers
+                (type 06), else the nppes_org in the facility's entity cluster
+  entity_id     the organization owner (corporate_entities) whose name key
+                equals the chain's, preferring the one that owns the most of
+                the chain's facilities
+  chain_id      the file's affiliated entity / chain id, else "name:<name key>"
+
+Rows whose facility cannot be resolved to an associate id are dropped.
+
+Reads:  data/processed/ownership/snf_affiliated_entities.parquet
+        data/processed/ownership/{ownership_edges, corporate_entities,
+          chow_events}.parquet                       (optional)
+        data/processed/providers/provider_identifiers/   (optional)
+        data/processed/entities/entity_cluster_members.parquet  (optional)
+Writes: data/processed/ownership/chain_membership.parquet
+          chain_id, chain_name, facility_id, facility_ccn, facility_name,
+          facility_npi, entity_id
+
+Usage
+-----
+  python -m etl.transform.chain_membership
+"""
+import os
+from pathlib import Path
+
+import polars as pl
+from dotenv import load_dotenv
+
+from etl.transform.name_normalizer import org_key
+
+load_dotenv()
+
+PROCESSED = Path(os.environ.get("DATA_PROCESSED", "data/processed"))
+OWNERSHIP = PROCESSED / "ownership"
+
+# Output column → accepted affiliated-entity headers (matched upper-cased, stripped)
+AFFILIATED_COLS = {
+    "chain_id": ["AFFILIATED ENTITY ID", "AFFILIATION ENTITY ID", "CHAIN ID"],
+    "chain_name": ["AFFILIATED ENTITY NAME", "AFFILIATION ENTITY NAME", "AFFILIATED ENTITY", "CHAIN NAME", "CHAIN"],
+    "facility_id": ["ASSOCIATE ID", "PROVIDER ASSOCIATE ID"],
+    "enrollment_id": ["ENROLLMENT ID"],
+    "facility_ccn": ["CCN", "CMS CERTIFICATION NUMBER (CCN)", "PROVIDER CCN", "FEDERAL PROVIDER NUMBER"],
+    "facility_name": ["ORGANIZATION NAME", "PROVIDER NAME"],
+    "facility_npi": ["NPI"],
+}
+
+RESULT_SCHEMA = {
+    "chain_id": pl.Utf8, "chain_name": pl.Utf8, "facility_id": pl.Utf8, "facility_ccn": pl.Utf8,
+    "facility_name": pl.Utf8, "facility_npi": pl.Utf8, "entity_id": pl.Utf8,
+}
+
+
+def _read(path: Path, columns: list[str]) -> pl.DataFrame | None:
+    """Selected columns of an optional parquet (None if missing or lacking a column)."""
+    if not path.exists() or not set(columns) <= set(pl.read_parquet_schema(path)):
+        return None
+    return pl.read_parquet(path, columns=columns)
+
+
+def _lookup(df: pl.DataFrame | None, key: str, value: str) -> pl.DataFrame:
+    """(key, value) Utf8 pairs, one value per key (first wins)."""
+    if df is None:
+        return pl.DataFrame(schema={key: pl.Utf8, value: pl.Utf8})
+    return (
+        df.select(pl.col(key).cast(pl.Utf8).str.strip_chars(), pl.col(value).cast(pl.Utf8).str.strip_chars())
+        .drop_nulls()
+        .unique(subset=[key], keep="first", maintain_order=True)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Affiliated entities → (chain, facility) rows
+# ---------------------------------------------------------------------------
+
+def affiliated_rows(affiliated: pl.DataFrame) -> pl.DataFrame:
+    """Project the raw affiliated-entity columns onto AFFILIATED_COLS (missing → null)."""
+    headers = {c.strip().upper(): c for c in affiliated.columns}
+
+    def _col(names: list[str]) -> pl.Expr:
+        for name in names:
+            if name in headers:
+                return pl.col(headers[name]).cast(pl.Utf8).str.strip_chars()
+        return pl.lit(None, dtype=pl.Utf8)
+
+    rows = affiliated.select([_col(names).alias(col) for col, names in AFFILIATED_COLS.items()])
+    return (
+        rows.with_columns(
+            pl.coalesce(
+                "chain_id",
+                pl.concat_str([pl.lit("name:"), org_key(pl.col("chain_name"))]),
+            ).alias("chain_id"),
+        )
+        .filter(pl.col("chain_id").is_not_null() & (pl.col("chain_id") != "name:"))
+    )
+
+
+def resolve_facilities(
+    rows: pl.DataFrame,
+    edges: pl.DataFrame | None = None,
+    chow: pl.DataFrame | None = None,
+    identifiers: pl.DataFrame | None = None,
+    clusters: pl.DataFrame | None = None,
+) -> pl.DataFrame:
+    """Fill facility_id (associate id) and facility_npi from the crosswalks available."""
+    by_enrollment = _lookup(edges, "enrollment_id", "provider_associate_id")
+    by_ccn = _lookup(
+        chow.sort("effective_date", descending=True, nulls_last=True) if chow is not None else None,
+        "facility_ccn", "associate_id_buyer",
+    )
+    npi_by_ccn = _lookup(
+        identifiers.filter(pl.col("type_code") == "06") if identifiers is not None else None,
+        "identifier", "npi",
+    )
+    npi_by_cluster = (
+        _lookup(clusters.filter(pl.col("source") == "snf_facility"), "source_id", "entity_cluster_id")
+        .join(
+            _lookup(clusters.filter(pl.col("source") == "nppes_org"), "entity_cluster_id", "source_id")
+            .rename({"source_id": "_cluster_npi"}),
+            on="entity_cluster_id",
+        )
+        .select(pl.col("source_id").alias("facility_id"), "_cluster_npi")
+        if clusters is not None else pl.DataFrame(schema={"facility_id": pl.Utf8, "_cluster_npi": pl.Utf8})
+    )
+    return (
+        rows
+        .join(by_enrollment.rename({"provider_associate_id": "_by_enrollment"}), on="enrollment_id", how="left")
+        .join(by_ccn.rename({"associate_id_buyer": "_by_ccn"}), on="facility_ccn", how="left")
+        .with_columns(pl.coalesce("facility_id", "_by_enrollment", "_by_ccn").alias("facility_id"))
+        .join(npi_by_ccn.rename({"identifier": "facility_ccn", "npi": "_ccn_npi"}), on="facility_ccn", how="left")
+        .join(npi_by_cluster, on="facility_id", how="left")
+        .with_columns(pl.coalesce("facility_npi", "_ccn_npi", "_cluster_npi").alias("facility_npi"))
+        .drop("_by_enrollment", "_by_ccn", "_ccn_npi", "_cluster_npi")
+    )
+
+
+def chain_entities(
+    members: pl.DataFrame,
+    entities: pl.DataFrame | None,
+    edges: pl.DataFrame | None,
+) -> pl.DataFrame:
+    """(chain_id, entity_id): the organization owner named like the chain, most facilities owned first."""
+    empty = pl.DataFrame(schema={"chain_id": pl.Utf8, "entity_id": pl.Utf8})
+    if entities is None:
+        return empty
+    chains = members.select(
+        "chain_id", org_key(pl.col("chain_name")).alias("name_key")
+    ).filter(pl.col("name_key").str.len_chars() > 0).unique()
+    candidates = chains.join(
+        entities.select(pl.col("entity_id").cast(pl.Utf8), org_key(pl.col("name")).alias("name_key")).drop_nulls(),
+        on="name_key",
+    )
+    if candidates.is_empty():
+        return empty
+    owned = (
+        edges.select(
+            pl.col("owner_associate_id").cast(pl.Utf8).alias("entity_id"),
+            pl.col("provider_associate_id").cast(pl.Utf8).alias("facility_id"),
+        ).unique()
+        if edges is not None else pl.DataFrame(schema={"entity_id": pl.Utf8, "facility_id": pl.Utf8})
+    )
+    counts = (
+        candidates.select("chain_id", "entity_id")
+        .join(members.select("chain_id", "facility_id"), on="chain_id")
+        .join(owned.with_columns(pl.lit(1).alias("_owns")), on=["entity_id", "facility_id"], how="left")
+        .group_by("chain_id", "entity_id")
+        .agg(pl.col("_owns").sum().alias("owned"))
+    )
+    return (
+        counts.sort(["chain_id", "owned", "entity_id"], descending=[False, True, False])
+        .unique(subset=["chain_id"], keep="first", maintain_order=True)
+        .select("chain_id", "entity_id")
+    )
+
+
+def build_membership(
+    affiliated: pl.DataFrame,
+    edges: pl.DataFrame | None = None,
+    entities: pl.DataFrame | None = None,
+    chow: pl.DataFrame | None = None,
+    identifiers: pl.DataFrame | None = None,
+    clusters: pl.DataFrame | None = None,
+) -> pl.DataFrame:
+    """chain_membership rows (RESULT_SCHEMA), one per (chain_id, facility_id)."""
+    if affiliated.is_empty():
+        return pl.DataFrame(schema=RESULT_SCHEMA)
+    members = (
+        resolve_facilities(affiliated_rows(affiliated), edges, chow, identifiers, clusters)
+        .filter(pl.col("facility_id").is_not_null())
+        .unique(subset=["chain_id", "facility_id"], keep="first", maintain_order=True)
+    )
+    return (
+        members.join(chain_entities(members, entities, edges), on="chain_id", how="left")
+        .select(list(RESULT_SCHEMA))
+        .sort("chain_id", "facility_id")
+    )
+
+
+def run() -> pl.DataFrame:
+    affiliated_path = OWNERSHIP / "snf_affiliated_entities.parquet"
+    if not affiliated_path.exists():
+        raise FileNotFoundError(f"Run snf_ownership_ingest.py first: {affiliated_path}")
+
+    affiliated = pl.read_parquet(affiliated_path)
+    print(f"[chain_membership] Loaded {len(affiliated):,} affiliated-entity rows")
+    identifiers_dir = PROCESSED / "providers" / "provider_identifiers"
+    identifiers = (
+        pl.scan_parquet(identifiers_dir / "**" / "*.parquet", hive_partitioning=True)
+        .select("npi", "identifier", "type_code")
+        .filter(pl.col("type_code") == "06")
+        .collect()
+        if identifiers_dir.exists() else None
+    )
+    membership = build_membership(
+        affiliated,
+        edges=_read(OWNERSHIP / "ownership_edges.parquet", ["enrollment_id", "provider_associate_id", "owner_associate_id"]),
+        entities=_read(OWNERSHIP / "corporate_entities.parquet", ["entity_id", "name"]),
+        chow=_read(OWNERSHIP / "chow_events.parquet", ["facility_ccn", "associate_id_buyer", "effective_date"]),
+        identifiers=identifiers,
+        clusters=_read(PROCESSED / "entities" / "entity_cluster_members.parquet",
+                       ["source", "source_id", "entity_cluster_id"]),
+    )
+    print(
+        f"[chain_membership] {len(membership):,} facilities in {membership['chain_id'].n_unique():,} chains "
+        f"({membership['facility_npi'].is_not_null().sum():,} with NPI, "
+        f"{membership.filter(pl.col('entity_id').is_not_null())['chain_id'].n_unique():,} chains tied to an entity)"
+    )
+
+    out = OWNERSHIP / "chain_membership.parquet"
+    membership.write_parquet(out, compression="zstd")
+    print(f"[chain_membership] → {out}")
+    return membership
+
+
+if __name__ == "__main__":
+    run()
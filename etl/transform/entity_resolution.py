@@ -1,15 +1,371 @@
 """
-Entity resolution: match and merge provider/entity records across sources.
+Entity resolution: clusters organization records that describe the same
+company across sources into canonical ``entity_cluster_id``s.
+
+Sources (each optional; missing files are skipped):
+  snf_owner      ownership/corporate_entities.parquet     entity_id
+  snf_facility   ownership/ownership_edges.parquet        provider_associate_id
+  nppes_org      providers/providers_nppes_orgs.parquet   npi
+  leie_business  exclusions/exclusions_final.parquet      exclusion_id
+  chow_buyer     ownership/chow_events.parquet            associate_id_buyer
+  chow_seller    ownership/chow_events.parquet            associate_id_seller
+  fec_employer   fec/contributions/                       "<employer>|<state>"
+
+Pipeline (Polars / numpy throughout, no per-row Python):
+  1. Normalize  name_key (legal-form tokens dropped), USPS street without
+                unit (address_normalizer), zip5, state, 10-digit phone.
+  2. Block      records sharing a key become candidate pairs:
+                  tok:   state + each of the two rarest name tokens
+                  zip:   zip5 + first 3 chars of name_key
+                  phone: phone
+                Blocks larger than ER_MAX_BLOCK are skipped.
+  3. Score      character-trigram Dice similarity of the name keys, from
+                512-bit trigram signatures compared with popcount in
+                parallel chunks of pairs; plus address / zip / phone /
+                state agreement. Conflicting states are rejected.
+  4. Cluster    vectorized union-find (numpy hooking + pointer jumping)
+                over pairs scoring >= ER_MIN_SCORE.
+
+entity_cluster_id is a hash of the cluster's smallest "source:source_id",
+so it is stable while that record stays in the cluster.
+
+Writes data/processed/entities/:
+  entity_cluster_members.parquet   source, source_id, entity_cluster_id,
+                                   name, name_key, state, zip5
+  entity_clusters.parquet          entity_cluster_id, canonical_name, state,
+                                   record_count, sources
+
+Usage
+-----
+  python -m etl.transform.entity_resolution
 """
-import pandas as pd
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
+import polars as pl
+from dotenv import load_dotenv
+
+from etl.compute.fec_matching import NON_EMPLOYERS
+from etl.transform.address_normalizer import normalize_street, street_only, valid_state, zip5
+from etl.transform.name_normalizer import org_key
+
+load_dotenv()
+
+PROCESSED = Path(os.environ.get("DATA_PROCESSED", "data/processed"))
+OUT_DIR = PROCESSED / "entities"
+
+# Pairs scoring at or above this are linked
+ER_MIN_SCORE = float(os.environ.get("ER_MIN_SCORE", "0.8"))
+# Name similarity below this never links, whatever else agrees
+ER_MIN_NAME_SIM = float(os.environ.get("ER_MIN_NAME_SIM", "0.5"))
+# Blocks with more records than this are too generic to compare pairwise
+ER_MAX_BLOCK = int(os.environ.get("ER_MAX_BLOCK", "200"))
+# Name tokens used as blocks, rarest first
+ER_BLOCK_TOKENS = 2
+# Candidate pairs scored per worker task
+ER_CHUNK_PAIRS = int(os.environ.get("ER_CHUNK_PAIRS", "1000000"))
+# Trigram signature width in 64-bit words; collisions inflate similarity slightly
+SIG_WORDS = 8
+
+# Score weights
+W_NAME = 0.75
+W_ADDRESS = 0.15
+W_ZIP = 0.10
+W_PHONE = 0.15
+W_STATE = 0.05
+
+RECORD_SCHEMA = {
+    "source": pl.Utf8, "source_id": pl.Utf8, "name": pl.Utf8,
+    "address": pl.Utf8, "state": pl.Utf8, "zip": pl.Utf8, "phone": pl.Utf8,
+}
+
+
+# ---------------------------------------------------------------------------
+# Sources → records
+# ---------------------------------------------------------------------------
+
+def _scan(path: Path) -> pl.LazyFrame | None:
+    return pl.scan_parquet(path) if path.exists() else None
+
+
+def _records(lf: pl.LazyFrame, source: str, **cols: str | None) -> pl.LazyFrame:
+    """Project one source onto RECORD_SCHEMA; ``cols`` maps field → source column."""
+    available = set(lf.collect_schema().names())
+    return lf.select(
+        pl.lit(source).alias("source"),
+        *[
+            (pl.col(col).cast(pl.Utf8) if col and col in available else pl.lit(None, dtype=pl.Utf8)).alias(field)
+            for field, col in cols.items()
+        ],
+    ).filter(pl.col("source_id").is_not_null() & pl.col("name").is_not_null())
+
+
+def load_records() -> pl.LazyFrame:
+    """All organization records from the available sources, one row per (source, source_id)."""
+    frames = []
+    if (lf := _scan(PROCESSED / "ownership" / "corporate_entities.parquet")) is not None:
+        frames.append(_records(lf, "snf_owner", source_id="entity_id", name="name", address="owner_address",
+                               state="owner_state", zip="owner_zip", phone=None))
+    if (lf := _scan(PROCESSED / "ownership" / "ownership_edges.parquet")) is not None:
+        frames.append(_records(lf, "snf_facility", source_id="provider_associate_id", name="provider_org_name",
+                               address=None, state=None, zip=None, phone=None))
+    if (lf := _scan(PROCESSED / "providers" / "providers_nppes_orgs.parquet")) is not None:
+        frames.append(_records(lf, "nppes_org", source_id="npi", name="org_name", address="address_line1",
+                               state="state", zip="zip", phone="auth_official_phone"))
+    if (lf := _scan(PROCESSED / "exclusions" / "exclusions_final.parquet")) is not None:
+        frames.append(_records(lf, "leie_business", source_id="exclusion_id", name="business_name",
+                               address="address", state="state", zip="zip", phone=None))
+    if (lf := _scan(PROCESSED / "ownership" / "chow_events.parquet")) is not None:
+        frames.append(_records(lf, "chow_buyer", source_id="associate_id_buyer", name="org_name_buyer",
+                               address=None, state="state", zip=None, phone=None))
+        frames.append(_records(lf, "chow_seller", source_id="associate_id_seller", name="org_name_seller",
+                               address=None, state="state_seller", zip=None, phone=None))
+    fec = PROCESSED / "fec" / "contributions"
+    if fec.exists():
+        employers = (
+            pl.scan_parquet(fec / "*" / "*.parquet", hive_partitioning=True)
+            .select(pl.col("normalized_employer").alias("name"), "state")
+            .filter(~pl.col("name").is_in(list(NON_EMPLOYERS)))
+            .unique()
+            .with_columns(pl.concat_str(["name", pl.col("state").fill_null("")], separator="|").alias("source_id"))
+        )
+        frames.append(_records(employers, "fec_employer", source_id="source_id", name="name",
+                               address=None, state="state", zip=None, phone=None))
+    if not frames:
+        return pl.LazyFrame(schema=RECORD_SCHEMA)
+    return pl.concat(frames, how="vertical_relaxed").unique(subset=["source", "source_id"], keep="first")
+
+
+# ---------------------------------------------------------------------------
+# Normalization and blocking
+# ---------------------------------------------------------------------------
+
+def address_key(expr: pl.Expr) -> pl.Expr:
+    """USPS-normalized street without the unit ("1200 North Main St, Suite 4" → "1200 N MAIN ST")."""
+    street = street_only(normalize_street(expr))
+    return pl.when(street.str.len_chars() > 0).then(street)
+
+
+def normalize_records(records: pl.LazyFrame) -> pl.DataFrame:
+    """Records with name_key, address_key, zip5, phone10 and a dense integer ``rid``."""
+    digits = lambda c: pl.col(c).str.replace_all(r"\D", "")  # noqa: E731
+    return (
+        records
+        .with_columns(
+            org_key(pl.col("name")).alias("name_key"),
+            address_key(pl.col("address")).alias("address_key"),
+            valid_state(pl.col("state")).alias("state"),
+            zip5(pl.col("zip")).alias("zip5"),
+            digits("phone").str.slice(-10).alias("phone10"),
+        )
+        .with_columns(
+            pl.when(pl.col("phone10").str.len_chars() == 10).then(pl.col("phone10")).alias("phone10"),
+        )
+        .filter(pl.col("name_key").str.len_chars() > 0)
+        .sort("source", "source_id")
+        .with_row_index("rid")
+        .collect()
+    )
+
+
+def candidate_pairs(df: pl.DataFrame) -> pl.DataFrame:
+    """(rid_l, rid_r) pairs, rid_l < rid_r, that share at least one blocking key."""
+    tokens = (
+        df.select("rid", "state", pl.col("name_key").str.split(" ").alias("token"))
+        .explode("token")
+        .filter(pl.col("token").str.len_chars() > 1)
+        .unique()
+    )
+    token_df = tokens.group_by("state", "token").agg(pl.len().alias("df"))
+    token_keys = (
+        tokens.join(token_df, on=["state", "token"])
+        .sort("rid", "df", "token")
+        .group_by("rid", maintain_order=True)
+        .head(ER_BLOCK_TOKENS)
+        .select("rid", pl.concat_str([pl.lit("tok:"), pl.col("state").fill_null(""), pl.lit(":"), "token"]).alias("key"))
+    )
+    zip_keys = df.filter(pl.col("zip5").is_not_null()).select(
+        "rid", pl.concat_str([pl.lit("zip:"), "zip5", pl.lit(":"), pl.col("name_key").str.slice(0, 3)]).alias("key")
+    )
+    phone_keys = df.filter(pl.col("phone10").is_not_null()).select(
+        "rid", pl.concat_str([pl.lit("phone:"), "phone10"]).alias("key")
+    )
+    keys = (
+        pl.concat([token_keys, zip_keys, phone_keys])
+        .unique()
+        .filter(pl.len().over("key").is_between(2, ER_MAX_BLOCK))
+    )
+    return (
+        keys.join(keys, on="key", suffix="_r")
+        .filter(pl.col("rid") < pl.col("rid_r"))
+        .select(pl.col("rid").alias("rid_l"), "rid_r")
+        .unique()
+    )
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+def trigram_signatures(df: pl.DataFrame) -> np.ndarray:
+    """(len(df), SIG_WORDS) uint64 bitsets of the character trigrams of " name_key ", indexed by rid."""
+    padded = pl.concat_str([pl.lit(" "), pl.col("name_key"), pl.lit(" ")])
+    bits = (
+        df.select("rid", padded.alias("s"))
+        .with_columns(pl.int_ranges(0, pl.col("s").str.len_chars() - 2).alias("pos"))
+        .explode("pos")
+        .select("rid", (pl.col("s").str.slice(pl.col("pos"), 3).hash() % (64 * SIG_WORDS)).alias("bit"))
+        .unique()
+    )
+    bit = bits["bit"].to_numpy().astype(np.uint64)
+    sig = np.zeros((len(df), SIG_WORDS), dtype=np.uint64)
+    np.bitwise_or.at(
+        sig,
+        (bits["rid"].to_numpy().astype(np.int64), (bit // 64).astype(np.int64)),
+        np.left_shift(np.uint64(1), bit % np.uint64(64)),
+    )
+    return sig
+
+
+def name_similarity(sig: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Dice coefficient of the trigram signatures of each (left, right) pair."""
+    a, b = sig[left], sig[right]
+    shared = np.bitwise_count(a & b).sum(axis=1, dtype=np.int64)
+    total = np.bitwise_count(a).sum(axis=1, dtype=np.int64) + np.bitwise_count(b).sum(axis=1, dtype=np.int64)
+    return 2.0 * shared / np.maximum(total, 1)
+
+
+def score_pairs(df: pl.DataFrame, pairs: pl.DataFrame, workers: int | None = None) -> pl.DataFrame:
+    """pairs + name_sim (trigram Dice) + score."""
+    sig = trigram_signatures(df)
+    left, right = pairs["rid_l"].to_numpy(), pairs["rid_r"].to_numpy()
+    # numpy releases the GIL in the gathers and popcounts, so chunks run in parallel
+    chunks = [slice(i, i + ER_CHUNK_PAIRS) for i in range(0, len(pairs), ER_CHUNK_PAIRS)]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        sims = list(pool.map(lambda c: name_similarity(sig, left[c], right[c]), chunks))
+    name_sim = np.concatenate(sims) if sims else np.zeros(0)
+
+    attrs = df.select("rid", "state", "address_key", "zip5", "phone10", "name_key")
+    same = lambda c: (pl.col(c).is_not_null() & (pl.col(c) == pl.col(f"{c}_r"))).cast(pl.Float64)  # noqa: E731
+    return (
+        pairs.with_columns(pl.Series("name_sim", name_sim))
+        .join(attrs.rename({"rid": "rid_l"}), on="rid_l")
+        .join(attrs.rename({"rid": "rid_r"}), on="rid_r", suffix="_r")
+        .with_columns(
+            pl.when(pl.col("name_key") == pl.col("name_key_r")).then(1.0)
+            .otherwise(pl.col("name_sim"))
+            .alias("name_sim")
+        )
+        .filter(
+            (pl.col("name_sim") >= ER_MIN_NAME_SIM)
+            # records in different states are different registrations
+            & ~(pl.col("state").is_not_null() & pl.col("state_r").is_not_null()
+                & (pl.col("state") != pl.col("state_r")))
+        )
+        .with_columns(
+            (
+                W_NAME * pl.col("name_sim")
+                + W_ADDRESS * same("address_key")
+                + W_ZIP * same("zip5")
+                + W_PHONE * same("phone10")
+                + W_STATE * same("state")
+            ).clip(0.0, 1.0).alias("score")
+        )
+        .select("rid_l", "rid_r", "name_sim", "score")
+    )
+
+
+# ---------------------------------------------------------------------------
+# Clustering
+# ---------------------------------------------------------------------------
+
+def union_find(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Connected-component root (smallest member index) for each of ``n`` nodes.
+
+    Vectorized union-find: each round hooks the larger root of every edge
+    onto the smaller one, then compresses paths by pointer jumping, until no
+    edge joins two different roots.
+    """
+    parent = np.arange(n, dtype=np.int64)
+    left = np.asarray(left, dtype=np.int64)
+    right = np.asarray(right, dtype=np.int64)
+    while True:
+        pl_, pr = parent[left], parent[right]
+        differ = pl_ != pr
+        if not differ.any():
+            return parent
+        lo = np.minimum(pl_[differ], pr[differ])
+        hi = np.maximum(pl_[differ], pr[differ])
+        np.minimum.at(parent, hi, lo)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+def _cluster_id(values: pl.Series) -> pl.Series:
+    return pl.Series(
+        ["ec_" + hashlib.blake2b(v.encode(), digest_size=8).hexdigest() for v in values],
+        dtype=pl.Utf8,
+    )
+
+
+def resolve_entities(records: pl.LazyFrame) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """(members, clusters) for the given records."""
+    df = normalize_records(records)
+    if df.is_empty():
+        members = df.select("source", "source_id", pl.lit(None, dtype=pl.Utf8).alias("entity_cluster_id"),
+                            "name", "name_key", "state", "zip5")
+        return members, summarize(members)
+
+    pairs = candidate_pairs(df)
+    links = score_pairs(df, pairs).filter(pl.col("score") >= ER_MIN_SCORE)
+    print(f"[entity_resolution] {len(df):,} records, {len(pairs):,} candidate pairs, {len(links):,} links")
+
+    root = union_find(len(df), links["rid_l"].to_numpy(), links["rid_r"].to_numpy())
+    # rids are assigned in (source, source_id) order, so the root is the
+    # cluster's smallest record key
+    record_key = pl.concat_str(["source", pl.lit(":"), "source_id"])
+    members = (
+        df.with_columns(pl.Series("root", root))
+        .with_columns(record_key.gather(pl.col("root")).alias("root_key"))
+        .with_columns(pl.col("root_key").map_batches(_cluster_id, return_dtype=pl.Utf8).alias("entity_cluster_id"))
+        .select("source", "source_id", "entity_cluster_id", "name", "name_key", "state", "zip5")
+    )
+    return members, summarize(members)
+
+
+def summarize(members: pl.DataFrame) -> pl.DataFrame:
+    """One row per cluster: most common name / state, record count, sources."""
+    return (
+        members.group_by("entity_cluster_id")
+        .agg(
+            pl.col("name").mode().sort().first().alias("canonical_name"),
+            pl.col("state").drop_nulls().mode().sort().first().alias("state"),
+            pl.len().alias("record_count"),
+            pl.col("source").unique().sort().str.join(",").alias("sources"),
+        )
+        .sort("entity_cluster_id")
+    )
+
 
-def resolve_entities(providers_df: pd.DataFrame, entities_df: pd.DataFrame) -> pd.DataFrame:
-    """Stub: return entities with optional merged keys."""
-    return entities_df
+def run() -> tuple[pl.DataFrame, pl.DataFrame]:
+    members, clusters = resolve_entities(load_records())
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    members.write_parquet(OUT_DIR / "entity_cluster_members.parquet", compression="zstd")
+    clusters.write_parquet(OUT_DIR / "entity_clusters.parquet", compression="zstd")
+    multi = clusters.filter(pl.col("record_count") > 1)
+    print(
+        f"[entity_resolution] {len(members):,} records → {len(clusters):,} clusters "
+        f"({len(multi):,} with more than one record)"
+    )
+    print(f"[entity_resolution] → {OUT_DIR}/entity_cluster_members.parquet, entity_clusters.parquet")
+    return members, clusters
 
 
 if __name__ == "__main__":
-    # Example: load from processed/ and write resolved output
-    pass
+    run()
@@ -3,15 +3,25 @@ Exclusions transform: standardizes LEIE exclusions and joins to providers.
 
 Reads:  data/processed/exclusions/leie_current.parquet
         data/processed/providers/providers_final.parquet
+        data/processed/ownership/corporate_entities.parquet, entity_officers.parquet
 Writes: data/processed/exclusions/exclusions_final.parquet
+        data/processed/exclusions/exclusion_name_matches.parquet
         data/exports/nodes_exclusions.csv
-        data/exports/edges_exclusions.csv
+        data/exports/edges_exclusions.csv          (Provider, by NPI or name)
+        data/exports/edges_entity_exclusions.csv   (SNF org owner, by name)
+        data/exports/edges_person_exclusions.csv   (SNF individual owner, by name)
+
+Rows without an NPI are linked by name (etl/compute/exclusion_matching.py);
+every edge carries match_method ('npi', 'name', 'business_name') and a
+confidence in [0, 1].
 """
 import os
 from pathlib import Path
 import polars as pl
 from dotenv import load_dotenv
 
+from etl.compute import exclusion_matching
+
 load_dotenv()
 
 PROCESSED = Path(os.environ.get("DATA_PROCESSED", "data/processed"))
@@ -33,6 +43,39 @@ EXCL_TYPE_LABELS = {
 }
 
 
+# Edge file → (id column, name-match target_type or None for the Provider file)
+EDGE_FILES = {
+    "edges_exclusions": ("npi", "provider"),
+    "edges_entity_exclusions": ("entity_id", "entity"),
+    "edges_person_exclusions": ("associate_id", "person"),
+}
+
+
+def exclusion_edges(leie: pl.DataFrame, matches: pl.DataFrame | None) -> dict[str, pl.DataFrame]:
+    """EXCLUDED_BY edge tables: NPI-linked rows plus name matches, per target label.
+
+    The only builder of these files: export_for_neo4j calls it too. Without
+    name matches only the NPI-linked edges are produced.
+    """
+    if matches is None:
+        matches = pl.DataFrame(schema=exclusion_matching.OUTPUT_SCHEMA)
+    dates = leie.select("exclusion_id", "excldate")
+    by_npi = leie.filter(pl.col("npi").is_not_null() & (pl.col("npi").cast(pl.Utf8) != "")).select(
+        "npi", "exclusion_id", "excldate",
+        pl.lit("npi").alias("match_method"),
+        pl.lit(1.0).alias("confidence"),
+    )
+    out = {}
+    for name, (id_col, target_type) in EDGE_FILES.items():
+        named = (
+            matches.filter(pl.col("target_type") == target_type)
+            .join(dates, on="exclusion_id", how="inner")
+            .select(pl.col("target_id").alias(id_col), "exclusion_id", "excldate", "match_method", "confidence")
+        )
+        out[name] = pl.concat([by_npi, named], how="vertical_relaxed") if target_type == "provider" else named
+    return out
+
+
 def transform() -> pl.DataFrame:
     leie_path = PROCESSED / "exclusions" / "leie_current.parquet"
     if not leie_path.exists():
@@ -80,13 +123,10 @@ def transform() -> pl.DataFrame:
     nodes.write_csv(EXPORTS / "nodes_exclusions.csv")
     print(f"[exclusions_transform] → {EXPORTS}/nodes_exclusions.csv")
 
-    edge_cols = ["npi", "exclusion_id", "excldate"]
-    edges = (
-        leie.filter(pl.col("npi").is_not_null())
-        .select([c for c in edge_cols if c in leie.columns])
-    )
-    edges.write_csv(EXPORTS / "edges_exclusions.csv")
-    print(f"[exclusions_transform] → {EXPORTS}/edges_exclusions.csv  ({len(edges):,} linked by NPI)")
+    matches = exclusion_matching.run()
+    for name, edges in exclusion_edges(leie, matches).items():
+        edges.write_csv(EXPORTS / f"{name}.csv")
+        print(f"[exclusions_transform] → {EXPORTS}/{name}.csv  ({len(edges):,} rows)")
 
     return leie
 
@@ -0,0 +1,50 @@
+"""
+Person and organization name normalization, as Polars expressions.
+
+Shared by every name-keyed join: FEC ingest and matching, LEIE name matching,
+roster screening, entity resolution and chain membership.
+
+Expressions
+-----------
+  normalize_name(name)   uppercase, punctuation dropped, whitespace compressed
+                         ("O'Brien,  Mary-Ann" → "O BRIEN MARY ANN")
+  org_key(name)          normalize_name without legal-form tokens
+                         ("Acme Clinic, L.L.C." → "ACME CLINIC")
+  first_token(name)      first space-separated token ("MARY ANN" → "MARY")
+  state_code(state)      trimmed, uppercase state code
+"""
+
+from __future__ import annotations
+
+import polars as pl
+
+# Legal-form tokens dropped from organization names before keying
+_ORG_SUFFIX_RE = r"\b(THE|INC|INCORPORATED|LLC|L L C|LLP|PLLC|PLC|PC|P C|PA|P A|CORP|CORPORATION|CO|COMPANY|LTD|LP)\b"
+
+
+def normalize_name(expr: pl.Expr) -> pl.Expr:
+    """Uppercase → strip punctuation → compress whitespace."""
+    return (
+        expr.str.to_uppercase()
+        .str.replace_all(r"[^A-Z0-9 ]", " ")
+        .str.replace_all(r" {2,}", " ")
+        .str.strip_chars()
+    )
+
+
+def org_key(expr: pl.Expr) -> pl.Expr:
+    """Organization match key: normalized name without legal-form tokens."""
+    return (
+        normalize_name(expr)
+        .str.replace_all(_ORG_SUFFIX_RE, " ")
+        .str.replace_all(r" {2,}", " ")
+        .str.strip_chars()
+    )
+
+
+def first_token(expr: pl.Expr) -> pl.Expr:
+    return expr.str.split(" ").list.first()
+
+
+def state_code(expr: pl.Expr) -> pl.Expr:
+    return expr.str.strip_chars().str.to_uppercase()
@@ -0,0 +1,242 @@
+"""
+SCD2 ownership history: who owned each SNF, and when.
+
+Consecutive monthly SNF_All_Owners snapshots are diffed as a whole: every
+(facility, owner) pair is laid out on the snapshot axis and split into
+versions wherever it drops out of a snapshot or its ownership_pct changes
+(gaps-and-islands over the snapshot index). Each version becomes one interval
+[valid_from, valid_to); valid_to is NULL while the owner is still reported.
+
+Interval bounds
+---------------
+  A version is only known to start somewhere after the previous snapshot and
+  no later than the first snapshot that shows it (and to end after the last
+  snapshot that shows it, no later than the next one). Within that window:
+    valid_from  association_date      if it falls in the window
+                CHOW effective_date   latest CHOW of the facility in the window
+                first_snapshot        otherwise
+    valid_to    CHOW effective_date   earliest CHOW of the facility in the window
+                next snapshot         otherwise
+  A facility's CHOW events are those naming it as buyer or seller. A version
+  that continues the previous one (percentage change only) starts where the
+  previous one ended.
+
+Reads:  data/processed/ownership/snf_owner_snapshots.parquet
+        data/processed/ownership/chow_events.parquet   (optional)
+Writes: data/processed/ownership/ownership_history.parquet
+          owner_associate_id, owner_type, facility_id, facility_name,
+          ownership_pct, valid_from, valid_to, valid_from_basis,
+          valid_to_basis, first_snapshot, last_snapshot
+
+As-of lookups ("who owned this SNF on 2021-06-30") are index seeks on the
+Postgres table (ownership_history.sql); owners_as_of() is the same filter
+over the Parquet.
+
+Usage
+-----
+  python -m etl.transform.ownership_history
+"""
+import os
+from datetime import date, timedelta
+from pathlib import Path
+
+import polars as pl
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROCESSED = Path(os.environ.get("DATA_PROCESSED", "data/processed"))
+
+RESULT_SCHEMA = {
+    "owner_associate_id": pl.Utf8, "owner_type": pl.Utf8, "facility_id": pl.Utf8, "facility_name": pl.Utf8,
+    "ownership_pct": pl.Float64, "valid_from": pl.Date, "valid_to": pl.Date,
+    "valid_from_basis": pl.Utf8, "valid_to_basis": pl.Utf8,
+    "first_snapshot": pl.Date, "last_snapshot": pl.Date,
+}
+
+_PAIR = ["facility_id", "owner_associate_id"]
+
+
+# ---------------------------------------------------------------------------
+# Snapshots → versions
+# ---------------------------------------------------------------------------
+
+def snapshot_pairs(snapshots: pl.DataFrame) -> pl.DataFrame:
+    """One row per (snapshot_date, facility, owner): largest pct, earliest association_date."""
+    return (
+        snapshots.select(
+            "snapshot_date",
+            pl.col("provider_associate_id").cast(pl.Utf8).alias("facility_id"),
+            pl.col("provider_org_name").cast(pl.Utf8).alias("facility_name"),
+            pl.col("owner_associate_id").cast(pl.Utf8),
+            pl.col("owner_type").cast(pl.Utf8),
+            pl.col("ownership_pct").cast(pl.Float64),
+            pl.col("association_date"),
+        )
+        .drop_nulls(["facility_id", "owner_associate_id", "snapshot_date"])
+        .group_by("snapshot_date", *_PAIR)
+        .agg(
+            pl.col("facility_name").first(),
+            pl.col("owner_type").first(),
+            pl.col("ownership_pct").max(),
+            pl.col("association_date").min(),
+        )
+    )
+
+
+def _new_pair() -> pl.Expr:
+    """True on the first row of each (facility, owner) pair in a frame sorted by pair."""
+    return (
+        (pl.col("facility_id") != pl.col("facility_id").shift(1))
+        | (pl.col("owner_associate_id") != pl.col("owner_associate_id").shift(1))
+    ).fill_null(True)
+
+
+def versions(pairs: pl.DataFrame) -> pl.DataFrame:
+    """Split each pair's run of snapshots into versions, with the window around each."""
+    dates = pairs.select(pl.col("snapshot_date").unique().sort())
+    axis = dates.with_columns(
+        pl.int_range(pl.len(), dtype=pl.Int32).alias("idx"),
+        pl.col("snapshot_date").shift(1).alias("prev_snapshot"),
+        pl.col("snapshot_date").shift(-1).alias("next_snapshot"),
+    )
+    # Rows are sorted by pair then snapshot, so a version starts at a new pair,
+    # a skipped snapshot or a changed percentage; its id is the running count
+    new_version = (
+        _new_pair()
+        | (pl.col("idx") != pl.col("idx").shift(1) + 1)
+        | pl.col("ownership_pct").ne_missing(pl.col("ownership_pct").shift(1))
+    ).fill_null(True)
+    return (
+        pairs.join(axis.select("snapshot_date", "idx"), on="snapshot_date")
+        .sort(*_PAIR, "idx")
+        .with_columns(new_version.cum_sum().alias("version"))
+        .group_by("version")
+        .agg(
+            *[pl.col(c).first() for c in _PAIR],
+            pl.col("facility_name").last(),
+            pl.col("owner_type").last(),
+            pl.col("ownership_pct").first(),
+            pl.col("association_date").min(),
+            pl.col("idx").min().alias("first_idx"),
+            pl.col("idx").max().alias("last_idx"),
+            pl.col("snapshot_date").min().alias("first_snapshot"),
+            pl.col("snapshot_date").max().alias("last_snapshot"),
+        )
+        .join(axis.select(pl.col("idx").alias("first_idx"), "prev_snapshot"), on="first_idx", how="left")
+        .join(axis.select(pl.col("idx").alias("last_idx"), "next_snapshot"), on="last_idx", how="left")
+        .sort("version")
+    )
+
+
+# ---------------------------------------------------------------------------
+# CHOW effective dates
+# ---------------------------------------------------------------------------
+
+def chow_dates(chow: pl.DataFrame | None) -> pl.DataFrame:
+    """(facility_id, chow_date): each CHOW under both its buyer and seller associate ids."""
+    empty = pl.DataFrame(schema={"facility_id": pl.Utf8, "chow_date": pl.Date})
+    if chow is None or "effective_date" not in chow.columns:
+        return empty
+    sides = [
+        chow.select(pl.col(col).cast(pl.Utf8).alias("facility_id"), pl.col("effective_date").alias("chow_date"))
+        for col in ("associate_id_buyer", "associate_id_seller", "facility_entity_id")
+        if col in chow.columns
+    ]
+    if not sides:
+        return empty
+    return pl.concat(sides).drop_nulls().unique().sort("chow_date")
+
+
+def _after_prev(col: str) -> pl.Expr:
+    return pl.col("prev_snapshot").is_null() | (pl.col(col) > pl.col("prev_snapshot"))
+
+
+def intervals(ver: pl.DataFrame, chow: pl.DataFrame) -> pl.DataFrame:
+    """Versions + CHOW dates → [valid_from, valid_to) with the basis of each bound."""
+    # Latest CHOW on or before the first snapshot / earliest after the last one
+    ver = (
+        ver.sort("first_snapshot")
+        .join_asof(chow.rename({"chow_date": "chow_from"}), left_on="first_snapshot", right_on="chow_from",
+                   by="facility_id", strategy="backward", check_sortedness=False)
+        .with_columns((pl.col("last_snapshot") + timedelta(days=1)).alias("_after_last"))
+        .sort("_after_last")
+        .join_asof(chow.rename({"chow_date": "chow_to"}), left_on="_after_last", right_on="chow_to",
+                   by="facility_id", strategy="forward", check_sortedness=False)
+        .drop("_after_last")
+    )
+    assoc_ok = pl.col("association_date").is_not_null() & (pl.col("association_date") <= pl.col("first_snapshot"))
+    chow_from_ok = pl.col("chow_from").is_not_null()
+    chow_to_ok = pl.col("chow_to").is_not_null() & (pl.col("chow_to") <= pl.col("next_snapshot"))
+    ver = ver.with_columns(
+        pl.when(assoc_ok & _after_prev("association_date")).then(pl.col("association_date"))
+        .when(chow_from_ok & _after_prev("chow_from")).then(pl.col("chow_from"))
+        .otherwise(pl.col("first_snapshot")).alias("valid_from"),
+        pl.when(assoc_ok & _after_prev("association_date")).then(pl.lit("association_date"))
+        .when(chow_from_ok & _after_prev("chow_from")).then(pl.lit("chow"))
+        .otherwise(pl.lit("snapshot")).alias("valid_from_basis"),
+        pl.when(pl.col("next_snapshot").is_null()).then(pl.lit(None, dtype=pl.Date))
+        .when(chow_to_ok).then(pl.col("chow_to"))
+        .otherwise(pl.col("next_snapshot")).alias("valid_to"),
+        pl.when(pl.col("next_snapshot").is_null()).then(pl.lit(None, dtype=pl.Utf8))
+        .when(chow_to_ok).then(pl.lit("chow"))
+        .otherwise(pl.lit("snapshot")).alias("valid_to_basis"),
+    )
+    # A percentage change continues the previous version: start where it ended
+    continues = (~_new_pair() & (pl.col("first_idx") == pl.col("last_idx").shift(1) + 1)).fill_null(False)
+    return (
+        ver.sort("version")
+        .with_columns(
+            pl.when(continues).then(pl.col("valid_to").shift(1))
+            .otherwise(pl.col("valid_from")).alias("valid_from"),
+            pl.when(continues).then(pl.lit("previous_version"))
+            .otherwise(pl.col("valid_from_basis")).alias("valid_from_basis"),
+        )
+        .select(list(RESULT_SCHEMA))
+    )
+
+
+def build_history(snapshots: pl.DataFrame, chow: pl.DataFrame | None = None) -> pl.DataFrame:
+    """Ownership intervals (RESULT_SCHEMA) from monthly owner snapshots and CHOW events."""
+    if snapshots.is_empty():
+        return pl.DataFrame(schema=RESULT_SCHEMA)
+    return intervals(versions(snapshot_pairs(snapshots)), chow_dates(chow)).sort(*_PAIR, "valid_from")
+
+
+def owners_as_of(history: pl.DataFrame, facility_id: str, as_of: date) -> pl.DataFrame:
+    """Owners of one facility on ``as_of`` (valid_from <= as_of < valid_to)."""
+    return history.filter(
+        (pl.col("facility_id") == facility_id)
+        & (pl.col("valid_from") <= as_of)
+        & (pl.col("valid_to").is_null() | (pl.col("valid_to") > as_of))
+    )
+
+
+def run() -> pl.DataFrame:
+    snapshots_path = PROCESSED / "ownership" / "snf_owner_snapshots.parquet"
+    if not snapshots_path.exists():
+        raise FileNotFoundError(f"Run snf_ownership_ingest.py first: {snapshots_path}")
+    chow_path = PROCESSED / "ownership" / "chow_events.parquet"
+
+    snapshots = pl.read_parquet(snapshots_path)
+    chow = pl.read_parquet(chow_path) if chow_path.exists() else None
+    print(
+        f"[ownership_history] {len(snapshots):,} owner rows over "
+        f"{snapshots['snapshot_date'].n_unique()} snapshots; "
+        f"{0 if chow is None else len(chow):,} CHOW events"
+    )
+    history = build_history(snapshots, chow)
+    current = history.filter(pl.col("valid_to").is_null())
+    print(
+        f"[ownership_history] {len(history):,} intervals "
+        f"({len(current):,} current, {len(history) - len(current):,} closed)"
+    )
+
+    out = PROCESSED / "ownership" / "ownership_history.parquet"
+    history.write_parquet(out, compression="zstd")
+    print(f"[ownership_history] → {out}")
+    return history
+
+
+if __name__ == "__main__":
+    run()
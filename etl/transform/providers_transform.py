@@ -2,7 +2,7 @@
 Providers transform: merges canonical NPPES table with LEIE exclusion flags,
 deduplicates, and produces the final provider dimension used by loaders.
 
-Reads:  data/processed/providers/providers_canonical.parquet
+Reads:  data/processed/providers/providers_canonical/  (NPI-prefix partitions)
         data/processed/exclusions/leie_current.parquet  (optional)
 Writes: data/processed/providers/providers_final.parquet
 """
@@ -21,11 +21,15 @@ PROCESSED = Path(_proc) if Path(_proc).is_absolute() else _REPO_ROOT / _proc
 
 
 def transform() -> pl.DataFrame:
-    providers_path = PROCESSED / "providers" / "providers_canonical.parquet"
-    if not providers_path.exists():
+    providers_path = PROCESSED / "providers" / "providers_canonical"
+    legacy_path = PROCESSED / "providers" / "providers_canonical.parquet"
+    if providers_path.exists():
+        df = pl.read_parquet(providers_path / "*" / "*.parquet", hive_partitioning=True).drop("npi_prefix")
+    elif legacy_path.exists():
+        # Single-file store written before nppes_ingest partitioned by NPI prefix
+        df = pl.read_parquet(legacy_path)
+    else:
         raise FileNotFoundError(f"Run nppes_ingest.py first: {providers_path}")
-
-    df = pl.read_parquet(providers_path)
     print(f"[providers_transform] Loaded {len(df):,} providers")
 
     # Drop rows with no NPI
@@ -60,6 +64,7 @@ def transform() -> pl.DataFrame:
         excluded_npis = (
             leie.filter(pl.col("reinstated") == False)
             .select("npi")
+            .unique()
             .with_columns(pl.lit(True).alias("is_excluded"))
         )
         df = df.join(excluded_npis, on="npi", how="left")
@@ -0,0 +1,104 @@
+"""
+Unit tests for the USPS-style address normalization expressions.
+
+Run:
+    pytest etl/transform/test_address_normalizer.py -v
+"""
+
+from __future__ import annotations
+
+import polars as pl
+
+from etl.transform.address_normalizer import (
+    normalize_address,
+    normalize_street,
+    street_only,
+    unit_only,
+    valid_state,
+    zip5,
+)
+
+
+def _apply(expr_fn, values: list) -> list:
+    return pl.DataFrame({"v": values}, schema={"v": pl.Utf8}).select(expr_fn(pl.col("v")).alias("v"))["v"].to_list()
+
+
+def _split(lines: list[str]) -> list[tuple]:
+    df = pl.DataFrame({"line": lines}).with_columns(normalize_street(pl.col("line")).alias("n"))
+    return df.select(street_only(pl.col("n")), unit_only(pl.col("n")).alias("unit")).rows()
+
+
+# ---------------------------------------------------------------------------
+# normalize_street
+# ---------------------------------------------------------------------------
+
+class TestNormalizeStreet:
+    def test_suffixes_directionals_and_units(self):
+        assert _apply(normalize_street, [
+            "1200 North Main Street, Suite 4",
+            "12 Oak Ave. #4B",
+            "P.O. Box 55",
+            "  500  first   avenue  southwest ",
+        ]) == ["1200 N MAIN ST STE 4", "12 OAK AVE # 4B", "PO BOX 55", "500 1ST AVE SW"]
+
+    def test_adjacent_abbreviated_words(self):
+        # every word is replaced in the single pass, including neighbours
+        assert _apply(normalize_street, ["1 North East Street Suite"]) == ["1 N E ST STE"]
+
+    def test_null(self):
+        assert _apply(normalize_street, [None]) == [None]
+
+
+# ---------------------------------------------------------------------------
+# street_only / unit_only
+# ---------------------------------------------------------------------------
+
+class TestStreetAndUnit:
+    def test_trailing_unit(self):
+        assert _split(["1200 North Main Street, Suite 4", "12 Oak Ave #4B", "5 Main St Apt B"]) == [
+            ("1200 N MAIN ST", "STE 4"), ("12 OAK AVE", "# 4B"), ("5 MAIN ST", "APT B"),
+        ]
+
+    def test_hyphenated_identifiers(self):
+        assert _split(["77 First Avenue Ste. A-1", "12 Oak St Apt B-2", "Suite A-1, 55 Elm St"]) == [
+            ("77 1ST AVE", "STE A-1"), ("12 OAK ST", "APT B-2"), ("55 ELM ST", "STE A-1"),
+        ]
+        a = normalize_address("77 First Avenue Ste. A-1", "Springfield", "IL", "62701")
+        assert a["address_key"] == normalize_address("77 1st Ave", "Springfield", "IL", "62701")["address_key"]
+
+    def test_designator_without_identifier_is_street(self):
+        assert _split(["100 Parking Lot Road", "1 Unit Way", "100 Space Center Blvd"]) == [
+            ("100 PARKING LOT RD", None), ("1 UNIT WAY", None), ("100 SPC CTR BLVD", None),
+        ]
+
+    def test_leading_units(self):
+        assert _split(["Suite 200, 55 Elm St", "Apt 3 Bldg 2 9 Pine Rd"]) == [
+            ("55 ELM ST", "STE 200"), ("9 PINE RD", "APT 3 BLDG 2"),
+        ]
+
+    def test_leading_unit_shares_address_key(self):
+        a = normalize_address("Suite 200, 55 Elm St", "Springfield", "IL", "62701")
+        b = normalize_address("55 Elm Street", "Springfield", "IL", "62701-1234")
+        assert a["street"] == b["street"] == "55 ELM ST"
+        assert a["address_key"] == b["address_key"]
+        assert a["unit"] == "STE 200" and b["unit"] is None
+
+
+# ---------------------------------------------------------------------------
+# zip5 / valid_state / normalize_address
+# ---------------------------------------------------------------------------
+
+class TestZipAndState:
+    def test_zip5(self):
+        assert _apply(zip5, ["62701", "62701-1234", "2134", "21341234", "00000", "123"]) == [
+            "62701", "62701", "02134", "02134", None, None,
+        ]
+
+    def test_valid_state(self):
+        assert _apply(valid_state, [" il", "PR", "XX", None]) == ["IL", "PR", None, None]
+
+    def test_key_falls_back_to_city_and_state(self):
+        a = normalize_address("55 Elm St", "Springfield", "IL", None)
+        b = normalize_address("55 ELM STREET", " springfield ", "il", "")
+        assert a["zip5"] is None and a["address_key"] == b["address_key"]
+        assert normalize_address("55 Elm St", "Springfield", "MO", None)["address_key"] != a["address_key"]
@@ -0,0 +1,116 @@
+"""
+Unit tests for entity resolution blocking, scoring and clustering.
+
+Run:
+    pytest etl/transform/test_entity_resolution.py -v
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import polars as pl
+import pytest
+
+from etl.transform import entity_resolution
+from etl.transform.entity_resolution import (
+    W_ADDRESS,
+    W_NAME,
+    W_STATE,
+    candidate_pairs,
+    score_pairs,
+    union_find,
+)
+
+
+def _records(rows: list[tuple]) -> pl.DataFrame:
+    """Normalized records as candidate_pairs / score_pairs see them; rid is the row index."""
+    return pl.DataFrame(
+        rows,
+        schema={"name_key": pl.Utf8, "state": pl.Utf8, "address_key": pl.Utf8,
+                "zip5": pl.Utf8, "phone10": pl.Utf8},
+        orient="row",
+    ).with_row_index("rid")
+
+
+# ---------------------------------------------------------------------------
+# union_find
+# ---------------------------------------------------------------------------
+
+class TestUnionFind:
+    def test_components_rooted_at_smallest_member(self):
+        root = union_find(6, np.array([4, 1, 2]), np.array([5, 2, 5]))
+        assert root.tolist() == [0, 1, 1, 3, 1, 1]
+
+    def test_no_edges(self):
+        assert union_find(3, np.array([]), np.array([])).tolist() == [0, 1, 2]
+
+    def test_long_chain_in_reverse_order(self):
+        left = np.arange(9, -1, -1)
+        assert union_find(11, left, left + 1).tolist() == [0] * 11
+
+
+# ---------------------------------------------------------------------------
+# candidate_pairs
+# ---------------------------------------------------------------------------
+
+class TestCandidatePairs:
+    def test_shared_token_within_state(self):
+        df = _records([
+            ("ACME NURSING", "IL", None, None, None),
+            ("ACME NURSING CENTER", "IL", None, None, None),
+            ("ACME NURSING", "WI", None, None, None),   # same tokens, other state
+        ])
+        assert candidate_pairs(df).sort("rid_l", "rid_r").rows() == [(0, 1)]
+
+    def test_phone_and_zip_blocks(self):
+        df = _records([
+            ("ACME NURSING", "IL", None, "60601", "3125550100"),
+            ("SUNRISE CARE", "WI", None, None, "3125550100"),      # phone only
+            ("ACME HOLDINGS", "IN", None, "60601", None),           # zip + name prefix only
+        ])
+        assert candidate_pairs(df).sort("rid_l", "rid_r").rows() == [(0, 1), (0, 2)]
+
+    def test_oversized_blocks_dropped(self, monkeypatch):
+        monkeypatch.setattr(entity_resolution, "ER_MAX_BLOCK", 2)
+        df = _records([(f"ACME {c}", "IL", None, None, None) for c in "XYZ"])
+        # ACME blocks three records; each X/Y/Z token blocks one
+        assert candidate_pairs(df).is_empty()
+
+
+# ---------------------------------------------------------------------------
+# score_pairs
+# ---------------------------------------------------------------------------
+
+class TestScorePairs:
+    def _score(self, rows):
+        df = _records(rows)
+        pairs = pl.DataFrame({"rid_l": [0], "rid_r": [1]}, schema={"rid_l": pl.UInt32, "rid_r": pl.UInt32})
+        return score_pairs(df, pairs, workers=1)
+
+    def test_identical_name_and_address(self):
+        scored = self._score([
+            ("ACME NURSING", "IL", "100 MAIN ST", None, None),
+            ("ACME NURSING", "IL", "100 MAIN ST", None, None),
+        ])
+        assert scored["name_sim"].to_list() == [1.0]
+        assert scored["score"].to_list() == pytest.approx([min(1.0, W_NAME + W_ADDRESS + W_STATE)])
+
+    def test_similar_names_score_between(self):
+        scored = self._score([
+            ("ACME NURSING CENTER", "IL", None, None, None),
+            ("ACME NURSING CENTRE", "IL", None, None, None),
+        ])
+        assert 0.5 < scored["name_sim"][0] < 1.0
+        assert scored["score"][0] == pytest.approx(W_NAME * scored["name_sim"][0] + W_STATE)
+
+    def test_different_states_rejected(self):
+        assert self._score([
+            ("ACME NURSING", "IL", None, None, None),
+            ("ACME NURSING", "WI", None, None, None),
+        ]).is_empty()
+
+    def test_dissimilar_names_rejected(self):
+        assert self._score([
+            ("ACME NURSING", "IL", "100 MAIN ST", None, None),
+            ("SUNRISE HOSPICE", "IL", "100 MAIN ST", None, None),
+        ]).is_empty()
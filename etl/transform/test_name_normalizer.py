@@ -0,0 +1,42 @@
+"""
+Unit tests for the shared name normalization expressions.
+
+Run:
+    pytest etl/transform/test_name_normalizer.py -v
+"""
+
+from __future__ import annotations
+
+import polars as pl
+
+from etl.transform.name_normalizer import (
+    first_token,
+    normalize_name,
+    org_key,
+    state_code,
+)
+
+
+def _apply(expr_fn, values: list) -> list:
+    return pl.DataFrame({"v": values}, schema={"v": pl.Utf8}).select(expr_fn(pl.col("v")).alias("v"))["v"].to_list()
+
+
+class TestNormalizeName:
+    def test_punctuation_and_whitespace(self):
+        assert _apply(normalize_name, ["O'Brien,  Mary-Ann", " smith jr. ", None]) == [
+            "O BRIEN MARY ANN", "SMITH JR", None,
+        ]
+
+    def test_first_token_and_state(self):
+        assert _apply(first_token, ["MARY ANN", "JOHN"]) == ["MARY", "JOHN"]
+        assert _apply(state_code, [" tx ", "IL"]) == ["TX", "IL"]
+
+
+class TestOrgKey:
+    def test_strips_punctuation_and_legal_form(self):
+        assert _apply(org_key, ["The Acme Clinic, Inc.", "ACME CLINIC LLC", "Acme Clinic, L.L.C."]) == [
+            "ACME CLINIC", "ACME CLINIC", "ACME CLINIC",
+        ]
+
+    def test_legal_forms_only_as_whole_words(self):
+        assert _apply(org_key, ["Papa Care PA", "Incline Therapy Co"]) == ["PAPA CARE", "INCLINE THERAPY"]
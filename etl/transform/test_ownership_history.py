@@ -0,0 +1,125 @@
+"""
+Unit tests for SCD2 ownership history: versions from monthly snapshots and
+the interval bounds derived from association and CHOW dates.
+
+Run:
+    pytest etl/transform/test_ownership_history.py -v
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import polars as pl
+
+from etl.transform.ownership_history import (
+    build_history,
+    chow_dates,
+    intervals,
+    owners_as_of,
+    snapshot_pairs,
+    versions,
+)
+
+JAN, FEB, MAR, APR = date(2021, 1, 1), date(2021, 2, 1), date(2021, 3, 1), date(2021, 4, 1)
+
+
+def _snapshots(rows: list[tuple]) -> pl.DataFrame:
+    """(snapshot_date, owner, ownership_pct, association_date) rows for facility F."""
+    return pl.DataFrame(
+        [(snap, "F", "ACME SNF", owner, "O", pct, assoc) for snap, owner, pct, assoc in rows],
+        schema={
+            "snapshot_date": pl.Date, "provider_associate_id": pl.Utf8, "provider_org_name": pl.Utf8,
+            "owner_associate_id": pl.Utf8, "owner_type": pl.Utf8, "ownership_pct": pl.Float64,
+            "association_date": pl.Date,
+        },
+        orient="row",
+    )
+
+
+# A: 50% in Jan–Feb, 60% from Mar; B: Jan, gone in Feb, back in Mar;
+# C: from Feb, associated mid-January
+SNAPSHOTS = _snapshots([
+    (JAN, "A", 50.0, None), (FEB, "A", 50.0, None), (MAR, "A", 60.0, None), (APR, "A", 60.0, None),
+    (JAN, "B", 10.0, None), (MAR, "B", 10.0, None),
+    (FEB, "C", 40.0, date(2021, 1, 15)), (MAR, "C", 40.0, date(2021, 1, 15)), (APR, "C", 40.0, date(2021, 1, 15)),
+])
+# CHOW of F on Jan 20, between B's Jan and Mar appearances
+CHOW = pl.DataFrame({"associate_id_buyer": ["F"], "associate_id_seller": ["S"], "effective_date": [date(2021, 1, 20)]})
+
+
+def _by_owner(df: pl.DataFrame, cols: list[str]) -> list[tuple]:
+    return df.sort("owner_associate_id", "first_snapshot").select("owner_associate_id", *cols).rows()
+
+
+# ---------------------------------------------------------------------------
+# versions
+# ---------------------------------------------------------------------------
+
+class TestVersions:
+    def test_split_on_gap_and_pct_change(self):
+        ver = versions(snapshot_pairs(SNAPSHOTS))
+        assert _by_owner(ver, ["ownership_pct", "first_snapshot", "last_snapshot", "prev_snapshot", "next_snapshot"]) == [
+            ("A", 50.0, JAN, FEB, None, MAR),
+            ("A", 60.0, MAR, APR, FEB, None),
+            ("B", 10.0, JAN, JAN, None, FEB),
+            ("B", 10.0, MAR, MAR, FEB, APR),
+            ("C", 40.0, FEB, APR, JAN, None),
+        ]
+
+    def test_duplicate_rows_keep_largest_pct(self):
+        pairs = snapshot_pairs(_snapshots([(JAN, "A", 20.0, None), (JAN, "A", 30.0, date(2020, 5, 1))]))
+        assert pairs.select("ownership_pct", "association_date").rows() == [(30.0, date(2020, 5, 1))]
+
+
+# ---------------------------------------------------------------------------
+# intervals
+# ---------------------------------------------------------------------------
+
+class TestIntervals:
+    def test_bounds_without_chow(self):
+        hist = intervals(versions(snapshot_pairs(SNAPSHOTS)), chow_dates(None))
+        assert _by_owner(hist, ["valid_from", "valid_from_basis", "valid_to", "valid_to_basis"]) == [
+            ("A", JAN, "snapshot", MAR, "snapshot"),
+            ("A", MAR, "previous_version", None, None),
+            ("B", JAN, "snapshot", FEB, "snapshot"),
+            ("B", MAR, "snapshot", APR, "snapshot"),
+            ("C", date(2021, 1, 15), "association_date", None, None),
+        ]
+
+    def test_chow_closes_and_opens_versions(self):
+        hist = intervals(versions(snapshot_pairs(SNAPSHOTS)), chow_dates(CHOW))
+        rows = _by_owner(hist, ["valid_from", "valid_from_basis", "valid_to", "valid_to_basis"])
+        # B's first version ends at the CHOW, inside its (Jan, Feb] window
+        assert rows[2] == ("B", JAN, "snapshot", date(2021, 1, 20), "chow")
+        # the CHOW precedes B's second window (Feb, Mar], so it does not open it
+        assert rows[3] == ("B", MAR, "snapshot", APR, "snapshot")
+        # association_date wins over a CHOW in the same window
+        assert rows[4][1:3] == (date(2021, 1, 15), "association_date")
+
+    def test_chow_opens_version_without_association_date(self):
+        snaps = _snapshots([(JAN, "A", 100.0, None), (FEB, "B", 100.0, None)])
+        hist = build_history(snaps, CHOW)
+        assert _by_owner(hist, ["valid_from", "valid_from_basis", "valid_to", "valid_to_basis"]) == [
+            ("A", JAN, "snapshot", date(2021, 1, 20), "chow"),
+            ("B", date(2021, 1, 20), "chow", None, None),
+        ]
+
+
+# ---------------------------------------------------------------------------
+# build_history / owners_as_of
+# ---------------------------------------------------------------------------
+
+class TestOwnersAsOf:
+    def _owners(self, as_of: date) -> list[str]:
+        hist = build_history(SNAPSHOTS, CHOW)
+        return sorted(owners_as_of(hist, "F", as_of)["owner_associate_id"].to_list())
+
+    def test_as_of_lookup(self):
+        assert self._owners(date(2021, 1, 10)) == ["A", "B"]
+        assert self._owners(date(2021, 1, 25)) == ["A", "C"]
+        assert self._owners(date(2021, 3, 15)) == ["A", "B", "C"]
+        assert self._owners(date(2020, 12, 31)) == []
+
+    def test_empty_snapshots(self):
+        assert build_history(_snapshots([])).is_empty()
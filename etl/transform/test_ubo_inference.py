@@ -0,0 +1,103 @@
+"""
+Unit tests for UBO inference: ownership links, propagation through chains,
+cycles and the depth cap.
+
+Run:
+    pytest etl/transform/test_ubo_inference.py -v
+"""
+
+from __future__ import annotations
+
+import polars as pl
+import pytest
+
+from etl.transform.ubo_inference import infer_ubo, ownership_links, propagate
+
+
+def _links(rows: list[tuple[str, str, float]]) -> pl.DataFrame:
+    """(owner, owned, w) links, w a fraction."""
+    return pl.DataFrame(rows, schema={"owner": pl.Utf8, "owned": pl.Utf8, "w": pl.Float64}, orient="row")
+
+
+def _owners_of(result: pl.DataFrame, facility: str) -> dict[str, dict]:
+    return {r["owner"]: r for r in result.filter(pl.col("facility") == facility).iter_rows(named=True)}
+
+
+# ---------------------------------------------------------------------------
+# ownership_links
+# ---------------------------------------------------------------------------
+
+class TestOwnershipLinks:
+    def test_filters_and_splits_indirect(self):
+        edges = pl.DataFrame({
+            "owner_associate_id": ["H", "H", "H", "B", "F", "I"],
+            "provider_associate_id": ["F", "F", "G", "F", "F", "F"],
+            "ownership_pct": [30.0, 40.0, 100.0, 50.0, 100.0, 20.0],
+            "role_text": ["5% OR GREATER DIRECT OWNERSHIP INTEREST"] * 2
+                         + ["5% OR GREATER MORTGAGE INTEREST", "5% OR GREATER DIRECT OWNERSHIP INTEREST",
+                            "5% OR GREATER DIRECT OWNERSHIP INTEREST", "5% OR GREATER INDIRECT OWNERSHIP INTEREST"],
+        })
+        direct, indirect = ownership_links(edges)
+        # mortgage and self-loop dropped; a pair on several enrollments keeps its largest pct
+        assert sorted(direct.rows()) == [("B", "F", 0.5), ("H", "F", 0.4)]
+        assert indirect.rows() == [("I", "F", 0.2)]
+
+
+# ---------------------------------------------------------------------------
+# propagate
+# ---------------------------------------------------------------------------
+
+class TestPropagate:
+    def test_chain_multiplies_and_diamond_sums(self):
+        result = propagate(_links([
+            ("H", "A", 0.6), ("H", "B", 0.4), ("A", "F", 0.5), ("B", "F", 0.5),
+        ]))
+        owners = _owners_of(result, "F")
+        assert list(owners) == ["H"]  # A and B are owned: only the top of the chain is kept
+        assert owners["H"]["w"] == pytest.approx(0.5)
+        assert owners["H"]["min_depth"] == 2
+        assert owners["H"]["path_count"] == 2
+        assert not owners["H"]["depth_capped"]
+
+    def test_cycle_members_are_chain_tops(self):
+        result = propagate(_links([("A", "B", 0.5), ("B", "A", 0.5), ("B", "F", 1.0)]))
+        owners = _owners_of(result, "F")
+        assert list(owners) == ["B"]
+        assert owners["B"]["w"] == pytest.approx(1.0)
+        assert owners["B"]["in_cycle"]
+        assert result["in_cycle"].all()
+
+    def test_depth_cap_keeps_reached_owner(self):
+        chain = [("O5", "O4", 1.0), ("O4", "O3", 1.0), ("O3", "O2", 1.0), ("O2", "O1", 1.0), ("O1", "F", 1.0)]
+        owners = _owners_of(propagate(_links(chain), max_depth=3), "F")
+        assert list(owners) == ["O3"]
+        assert owners["O3"]["min_depth"] == 3 and owners["O3"]["depth_capped"]
+
+        owners = _owners_of(propagate(_links(chain), max_depth=5), "F")
+        assert list(owners) == ["O5"] and not owners["O5"]["depth_capped"]
+
+    def test_small_paths_pruned(self):
+        result = propagate(_links([("H", "M", 0.1), ("M", "F", 0.05)]), min_pct=1.0)
+        assert _owners_of(result, "F") == {}  # 0.5% < 1%
+        assert _owners_of(result, "M")["H"]["w"] == pytest.approx(0.1)
+
+
+# ---------------------------------------------------------------------------
+# infer_ubo
+# ---------------------------------------------------------------------------
+
+class TestInferUbo:
+    def test_reported_indirect_only_where_chain_is_silent(self):
+        edges = pl.DataFrame({
+            "owner_associate_id": ["H", "M", "H", "P"],
+            "provider_associate_id": ["M", "F", "F", "G"],
+            "owner_type": ["O", "O", "O", "I"],
+            "ownership_pct": [100.0, 80.0, 100.0, 25.0],
+            "role_text": ["DIRECT", "DIRECT", "INDIRECT", "INDIRECT"],
+        })
+        ubo = infer_ubo(edges)
+        rows = {(r["ultimate_owner_id"], r["facility_id"]): r for r in ubo.iter_rows(named=True)}
+        assert rows[("H", "F")]["basis"] == "derived"
+        assert rows[("H", "F")]["effective_pct"] == pytest.approx(80.0)
+        assert rows[("P", "G")]["basis"] == "reported"
+        assert rows[("P", "G")]["owner_type"] == "I"
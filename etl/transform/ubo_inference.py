@@ -1,14 +1,245 @@
 """
-UBO (Ultimate Beneficial Owner) inference from ownership graphs.
+UBO (Ultimate Beneficial Owner) inference: effective ownership of every SNF
+by the owners at the top of its ownership chains.
+
+Effective ownership is the product of ownership_pct along each path from an
+owner down to a facility, summed across paths. The whole graph is propagated
+at once: the edge list is a sparse matrix W (owner × owned, fraction owned),
+and each level is one sparse product frontier · W computed as a hash join +
+group_by, i.e. sum_k W^k truncated at UBO_MAX_DEPTH.
+
+Rules
+-----
+  - Only ownership interests propagate: edges with a positive ownership_pct,
+    excluding mortgage / security interests and self-loops.
+  - Reported INDIRECT interests are not propagated (they would double-count
+    the chain); they fill in (owner, facility) pairs the chain does not reach.
+  - A path stops at an owner nobody owns (the ultimate owner), or at
+    UBO_MAX_DEPTH, where the reached owner is kept and flagged depth_capped.
+  - Cycles: owners in a cross-holding loop (each reachable from itself) are
+    treated as the top of the chain and flagged in_cycle, so paths never go
+    round the loop.
+
+Reads:  data/processed/ownership/ownership_edges.parquet
+Writes: data/processed/ownership/ubo_effective_ownership.parquet
+          ultimate_owner_id, owner_type, facility_id, effective_pct (0–100),
+          min_depth, path_count, basis (derived | reported), depth_capped,
+          in_cycle
+
+Usage
+-----
+  python -m etl.transform.ubo_inference
 """
-import pandas as pd
+import os
 from pathlib import Path
 
+import polars as pl
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROCESSED = Path(os.environ.get("DATA_PROCESSED", "data/processed"))
+
+# OWNS chains in the graph are at most 5 levels deep
+UBO_MAX_DEPTH = int(os.environ.get("UBO_MAX_DEPTH", "5"))
+# Paths whose effective ownership falls below this (percent) are pruned
+UBO_MIN_PCT = float(os.environ.get("UBO_MIN_PCT", "0.01"))
+
+RESULT_SCHEMA = {
+    "ultimate_owner_id": pl.Utf8, "owner_type": pl.Utf8, "facility_id": pl.Utf8,
+    "effective_pct": pl.Float64, "min_depth": pl.Int32, "path_count": pl.Int64,
+    "basis": pl.Utf8, "depth_capped": pl.Boolean, "in_cycle": pl.Boolean,
+}
+
+
+# ---------------------------------------------------------------------------
+# Edges → weighted links
+# ---------------------------------------------------------------------------
+
+def ownership_links(edges: pl.DataFrame) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """(direct, indirect) links: owner, owned, w (fraction 0–1), one row per pair.
+
+    Edges are per enrollment, so a pair reported on several enrollments of
+    the same facility keeps its largest percentage.
+    """
+    role = (
+        pl.col("role_text").cast(pl.Utf8).str.to_uppercase().fill_null("")
+        if "role_text" in edges.columns else pl.lit("")
+    )
+    links = (
+        edges.select(
+            pl.col("owner_associate_id").cast(pl.Utf8).alias("owner"),
+            pl.col("provider_associate_id").cast(pl.Utf8).alias("owned"),
+            (pl.col("ownership_pct").cast(pl.Float64, strict=False) / 100).clip(0.0, 1.0).alias("w"),
+            role.alias("role"),
+        )
+        .filter(
+            pl.col("owner").is_not_null() & pl.col("owned").is_not_null()
+            & (pl.col("owner") != pl.col("owned"))
+            & (pl.col("w") > 0)
+            & ~pl.col("role").str.contains("MORTGAGE|SECURITY")
+        )
+        .with_columns(pl.col("role").str.contains("INDIRECT").alias("indirect"))
+    )
+
+    def _pairs(df: pl.DataFrame) -> pl.DataFrame:
+        return df.group_by("owner", "owned").agg(pl.col("w").max())
+
+    return _pairs(links.filter(~pl.col("indirect"))), _pairs(links.filter(pl.col("indirect")))
+
+
+# ---------------------------------------------------------------------------
+# Propagation
+# ---------------------------------------------------------------------------
+
+def cycle_nodes(links: pl.DataFrame, max_depth: int = UBO_MAX_DEPTH) -> pl.DataFrame:
+    """(owner) of every node that can reach itself within ``max_depth`` ownership hops."""
+    # Only nodes that both own and are owned can sit on a cycle
+    middle = links.select("owner").unique().join(links.select(pl.col("owned").alias("owner")).unique(), on="owner")
+    inner = links.join(middle, on="owner").join(middle.rename({"owner": "owned"}), on="owned").select("owner", "owned")
+    frontier = inner.select(pl.col("owned").alias("start"), pl.col("owner").alias("node"))
+    found: list[pl.DataFrame] = []
+    for _ in range(max_depth):
+        found.append(frontier.filter(pl.col("start") == pl.col("node")).select(pl.col("start").alias("owner")))
+        frontier = (
+            frontier.filter(pl.col("start") != pl.col("node"))
+            .join(inner.rename({"owned": "node", "owner": "parent"}), on="node")
+            .select("start", pl.col("parent").alias("node"))
+            .unique()
+        )
+        if frontier.is_empty():
+            break
+    found.append(frontier.filter(pl.col("start") == pl.col("node")).select(pl.col("start").alias("owner")))
+    return pl.concat(found).unique()
+
+
+def propagate(
+    links: pl.DataFrame,
+    max_depth: int = UBO_MAX_DEPTH,
+    min_pct: float = UBO_MIN_PCT,
+) -> pl.DataFrame:
+    """(owner, facility, w, min_depth, path_count, depth_capped, in_cycle) for owners at the top of each chain.
+
+    Level k holds sum over length-k paths of the product of weights; rows
+    whose owner is itself owned (and not on a cycle) move up one level, the
+    rest are final.
+    """
+    cycles = cycle_nodes(links, max_depth)
+    owned = (
+        links.select(pl.col("owned").alias("owner")).unique()
+        .join(cycles, on="owner", how="anti")
+        .with_columns(pl.lit(True).alias("_has_owner"))
+    )
+    up = links.rename({"owner": "parent", "owned": "owner", "w": "w_up"})
+    min_w = min_pct / 100
+
+    frontier = links.select(
+        "owner", pl.col("owned").alias("facility"), "w",
+        pl.lit(1, dtype=pl.Int32).alias("min_depth"), pl.lit(1, dtype=pl.Int64).alias("path_count"),
+    )
+    done: list[pl.DataFrame] = []
+    for depth in range(1, max_depth + 1):
+        frontier = frontier.join(owned, on="owner", how="left").with_columns(pl.col("_has_owner").fill_null(False))
+        capped = depth == max_depth
+        done.append(
+            frontier.filter(~pl.col("_has_owner") | capped)
+            .with_columns((pl.col("_has_owner") & capped).alias("depth_capped"))
+            .drop("_has_owner")
+        )
+        climbing = frontier.filter(pl.col("_has_owner"))
+        if capped or climbing.is_empty():
+            break
+        frontier = (
+            climbing.join(up, on="owner")
+            .filter(pl.col("parent") != pl.col("facility"))  # facility owning itself through the chain
+            .group_by(pl.col("parent").alias("owner"), "facility")
+            .agg(
+                (pl.col("w") * pl.col("w_up")).sum().alias("w"),
+                pl.lit(depth + 1, dtype=pl.Int32).alias("min_depth"),
+                pl.col("path_count").sum(),
+            )
+            .filter(pl.col("w") >= min_w)
+        )
+
+    if not done:
+        return pl.DataFrame(schema={"owner": pl.Utf8, "facility": pl.Utf8, "w": pl.Float64, "min_depth": pl.Int32,
+                                    "path_count": pl.Int64, "depth_capped": pl.Boolean, "in_cycle": pl.Boolean})
+    return (
+        pl.concat(done)
+        .group_by("owner", "facility")
+        .agg(
+            pl.col("w").sum(),
+            pl.col("min_depth").min(),
+            pl.col("path_count").sum(),
+            pl.col("depth_capped").any(),
+        )
+        .join(cycles.with_columns(pl.lit(True).alias("in_cycle")), on="owner", how="left")
+        .with_columns(pl.col("in_cycle").fill_null(False))
+    )
+
+
+def infer_ubo(edges: pl.DataFrame) -> pl.DataFrame:
+    """Ultimate owner → facility effective ownership (RESULT_SCHEMA) from ownership edges."""
+    if edges.is_empty() or "ownership_pct" not in edges.columns:
+        return pl.DataFrame(schema=RESULT_SCHEMA)
+
+    direct, indirect = ownership_links(edges)
+    derived = propagate(direct).with_columns(pl.lit("derived").alias("basis"))
+    has_owner = direct.select(pl.col("owned").alias("owner")).unique()
+    # Reported indirect interests only where the chain gives nothing, and only
+    # for owners nobody is recorded as owning
+    reported = (
+        indirect.rename({"owned": "facility"})
+        .join(derived.select("owner", "facility"), on=["owner", "facility"], how="anti")
+        .join(has_owner, on="owner", how="anti")
+        .with_columns(
+            pl.lit(None, dtype=pl.Int32).alias("min_depth"),
+            pl.lit(1, dtype=pl.Int64).alias("path_count"),
+            pl.lit(False).alias("depth_capped"),
+            pl.lit(False).alias("in_cycle"),
+            pl.lit("reported").alias("basis"),
+        )
+    )
+    owner_types = (
+        edges.select(pl.col("owner_associate_id").cast(pl.Utf8).alias("owner"), "owner_type")
+        .drop_nulls("owner")
+        .unique(subset=["owner"], keep="first")
+        if "owner_type" in edges.columns else
+        pl.DataFrame(schema={"owner": pl.Utf8, "owner_type": pl.Utf8})
+    )
+    return (
+        pl.concat([derived, reported.select(derived.columns)])
+        .join(owner_types, on="owner", how="left")
+        .select(
+            pl.col("owner").alias("ultimate_owner_id"),
+            pl.col("owner_type").cast(pl.Utf8),
+            pl.col("facility").alias("facility_id"),
+            (pl.col("w") * 100).clip(upper_bound=100.0).round(4).alias("effective_pct"),
+            "min_depth", "path_count", "basis", "depth_capped", "in_cycle",
+        )
+        .sort("facility_id", "effective_pct", descending=[False, True])
+    )
+
+
+def run() -> pl.DataFrame:
+    edges_path = PROCESSED / "ownership" / "ownership_edges.parquet"
+    if not edges_path.exists():
+        raise FileNotFoundError(f"Run ownership_transform.py first: {edges_path}")
+
+    edges = pl.read_parquet(edges_path)
+    print(f"[ubo_inference] Loaded {len(edges):,} ownership edges")
+    ubo = infer_ubo(edges)
+    capped = ubo.filter(pl.col("depth_capped"))
+    print(
+        f"[ubo_inference] {len(ubo):,} owner → facility rows over "
+        f"{ubo['facility_id'].n_unique():,} facilities ({len(capped):,} cut at depth {UBO_MAX_DEPTH})"
+    )
 
-def infer_ubo(ownership_df: pd.DataFrame) -> pd.DataFrame:
-    """Stub: infer UBOs from ownership chains."""
-    return ownership_df
+    out = PROCESSED / "ownership" / "ubo_effective_ownership.parquet"
+    ubo.write_parquet(out, compression="zstd")
+    print(f"[ubo_inference] → {out}")
+    return ubo
 
 
 if __name__ == "__main__":
-    pass
+    run()
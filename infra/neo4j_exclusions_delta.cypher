@@ -0,0 +1,88 @@
+// =============================================================================
+// Claidex — incremental Exclusion sync
+// =============================================================================
+//
+// Applied by etl/load/exclusions_sync.py after it diffs the current LEIE
+// exclusions against what is already loaded. Only the delta CSVs are read:
+//
+//   exclusions_delta_removed.csv  exclusion_id
+//   exclusions_delta_nodes.csv    exclusion_id, source, display_name, excl_type,
+//                                 excl_type_label, excldate, reinstated, state
+//   exclusions_delta_edges.csv    npi, exclusion_id, excldate
+//   exclusions_delta_npis.csv     npi
+//
+// exclusion_id is content-derived (leie_ingest), so MERGE matches the nodes
+// created by neo4j_init.cypher. Every statement is idempotent.
+//
+// Statement separator: semicolon on its own line — parsed by neo4j_loader.py
+// =============================================================================
+
+
+// -----------------------------------------------------------------------------
+// 1. Removed exclusions (and their EXCLUDED_BY edges)
+// -----------------------------------------------------------------------------
+
+LOAD CSV WITH HEADERS FROM 'file:///exclusions_delta_removed.csv' AS row
+CALL {
+  WITH row
+  MATCH (x:Exclusion {exclusion_id: row.exclusion_id})
+  DETACH DELETE x
+} IN TRANSACTIONS OF 10000 ROWS;
+
+
+// -----------------------------------------------------------------------------
+// 2. New / changed Exclusion nodes (same properties as neo4j_init.cypher §6)
+// -----------------------------------------------------------------------------
+
+LOAD CSV WITH HEADERS FROM 'file:///exclusions_delta_nodes.csv' AS row
+CALL {
+  WITH row
+  MERGE (x:Exclusion {exclusion_id: row.exclusion_id})
+  SET x.source     = row.source,
+      x.name       = row.display_name,
+      x.exclType   = row.excl_type,
+      x.exclLabel  = row.excl_type_label,
+      x.exclDate   = CASE
+                       WHEN row.excldate IS NOT NULL AND row.excldate <> ''
+                       THEN date(row.excldate)
+                       ELSE null
+                     END,
+      x.reinstated = toBoolean(row.reinstated),
+      x.state      = row.state
+} IN TRANSACTIONS OF 10000 ROWS;
+
+
+// -----------------------------------------------------------------------------
+// 3. EXCLUDED_BY edges for the new / changed exclusions (NPI-linked; name
+//    matches are rebuilt by exclusions_transform + the full graph load)
+// -----------------------------------------------------------------------------
+
+LOAD CSV WITH HEADERS FROM 'file:///exclusions_delta_edges.csv' AS row
+CALL {
+  WITH row
+  MATCH (p:Provider  {npi:          row.npi})
+  MATCH (x:Exclusion {exclusion_id: row.exclusion_id})
+  MERGE (p)-[r:EXCLUDED_BY]->(x)
+  SET r.exclDate    = CASE
+                        WHEN row.excldate IS NOT NULL AND row.excldate <> ''
+                        THEN date(row.excldate)
+                        ELSE null
+                      END,
+      r.matchMethod = 'npi',
+      r.confidence  = 1.0
+} IN TRANSACTIONS OF 10000 ROWS;
+
+
+// -----------------------------------------------------------------------------
+// 4. Provider.isExcluded for providers touched by the delta
+// -----------------------------------------------------------------------------
+
+LOAD CSV WITH HEADERS FROM 'file:///exclusions_delta_npis.csv' AS row
+CALL {
+  WITH row
+  MATCH (p:Provider {npi: row.npi})
+  SET p.isExcluded = EXISTS {
+    MATCH (p)-[:EXCLUDED_BY]->(x:Exclusion)
+    WHERE NOT coalesce(x.reinstated, false)
+  }
+} IN TRANSACTIONS OF 10000 ROWS;
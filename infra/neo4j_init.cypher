@@ -10,12 +10,17 @@
 //     (:Person)            associate_id (unique)
 //     (:Exclusion)         exclusion_id (unique)
 //     (:PaymentSummary)    record_id (unique)  — keyed npi:year:program
+//     (:Chain)             chain_id (unique)   — CMS affiliated entity (SNF chain)
 //
 //   Relationships
 //     (:Provider)       -[:RECEIVED_PAYMENT]-> (:PaymentSummary)
 //     (:Provider)       -[:EXCLUDED_BY]->      (:Exclusion)
+//     (:CorporateEntity)-[:EXCLUDED_BY]->      (:Exclusion)        (name-matched)
+//     (:Person)         -[:EXCLUDED_BY]->      (:Exclusion)        (name-matched)
 //     (:CorporateEntity)-[:OWNS]->             (:CorporateEntity)  (org owns SNF)
 //     (:CorporateEntity)-[:CONTROLLED_BY]->    (:Person)           (SNF → individual owner)
+//     (:CorporateEntity)-[:IN_CHAIN]->         (:Chain)            (SNF member of chain)
+//     (:CorporateEntity)-[:HEADS_CHAIN]->      (:Chain)            (owner named as the chain)
 //
 // CSV source files are in /var/lib/neo4j/import  (= data/exports/ on host)
 //
@@ -37,6 +42,8 @@ CREATE CONSTRAINT IF NOT EXISTS FOR (x:Exclusion)         REQUIRE x.exclusion_id
 
 CREATE CONSTRAINT IF NOT EXISTS FOR (ps:PaymentSummary)   REQUIRE ps.record_id    IS UNIQUE;
 
+CREATE CONSTRAINT IF NOT EXISTS FOR (c:Chain)            REQUIRE c.chain_id      IS UNIQUE;
+
 
 // -----------------------------------------------------------------------------
 // 2. INDEXES  (for fast lookup on common filter/join columns)
@@ -50,6 +57,10 @@ CREATE INDEX IF NOT EXISTS FOR (e:CorporateEntity)  ON (e.state);
 
 CREATE INDEX IF NOT EXISTS FOR (e:CorporateEntity)  ON (e.entityType);
 
+CREATE INDEX IF NOT EXISTS FOR (p:Provider)         ON (p.entityClusterId);
+
+CREATE INDEX IF NOT EXISTS FOR (e:CorporateEntity)  ON (e.entityClusterId);
+
 CREATE INDEX IF NOT EXISTS FOR (x:Exclusion)        ON (x.exclType);
 
 CREATE INDEX IF NOT EXISTS FOR (ps:PaymentSummary)  ON (ps.year);
@@ -61,7 +72,7 @@ CREATE INDEX IF NOT EXISTS FOR (ps:PaymentSummary)  ON (ps.program);
 // 3. PROVIDER NODES
 //    Source: nodes_providers.csv
 //    Columns: npi, display_name, entity_type, city, state, zip,
-//             taxonomy_1, is_excluded
+//             taxonomy_1, is_excluded, entity_cluster_id
 // -----------------------------------------------------------------------------
 
 LOAD CSV WITH HEADERS FROM 'file:///nodes_providers.csv' AS row
@@ -74,7 +85,8 @@ CALL {
       p.state      = row.state,
       p.zip        = row.zip,
       p.taxonomy   = row.taxonomy_1,
-      p.isExcluded = toBoolean(row.is_excluded)
+      p.isExcluded = toBoolean(row.is_excluded),
+      p.entityClusterId = row.entity_cluster_id
 } IN TRANSACTIONS OF 10000 ROWS;
 
 
@@ -84,7 +96,7 @@ CALL {
 //    Columns: entity_id, name, dba, city, state, zip, entity_type,
 //             flag_corporation, flag_llc, flag_holding_company,
 //             flag_investment_firm, flag_private_equity,
-//             flag_for_profit, flag_non_profit
+//             flag_for_profit, flag_non_profit, entity_cluster_id
 // -----------------------------------------------------------------------------
 
 LOAD CSV WITH HEADERS FROM 'file:///nodes_entities.csv' AS row
@@ -103,7 +115,8 @@ CALL {
       e.isInvestmentFirm = toBoolean(row.flag_investment_firm),
       e.isPrivateEquity  = toBoolean(row.flag_private_equity),
       e.isForProfit      = toBoolean(row.flag_for_profit),
-      e.isNonProfit      = toBoolean(row.flag_non_profit)
+      e.isNonProfit      = toBoolean(row.flag_non_profit),
+      e.entityClusterId  = row.entity_cluster_id
 } IN TRANSACTIONS OF 10000 ROWS;
 
 
@@ -179,22 +192,68 @@ CALL {
 
 
 // -----------------------------------------------------------------------------
-// 8. EXCLUDED_BY edges
+// 8. EXCLUDED_BY edges  (provider; by NPI, or by name for NPI-less rows)
 //    Source: edges_exclusions.csv
-//    Columns: npi, exclusion_id, excldate
+//    Columns: npi, exclusion_id, excldate, match_method, confidence
 // -----------------------------------------------------------------------------
 
 LOAD CSV WITH HEADERS FROM 'file:///edges_exclusions.csv' AS row
 CALL {
   WITH row
-  MATCH (p:Provider  {npi:          row.npi})
+  MATCH (p:Provider {npi: row.npi})
   MATCH (x:Exclusion {exclusion_id: row.exclusion_id})
   MERGE (p)-[r:EXCLUDED_BY]->(x)
-  SET r.exclDate = CASE
-                     WHEN row.excldate IS NOT NULL AND row.excldate <> ''
-                     THEN date(row.excldate)
-                     ELSE null
-                   END
+  SET r.exclDate    = CASE
+                        WHEN row.excldate IS NOT NULL AND row.excldate <> ''
+                        THEN date(row.excldate)
+                        ELSE null
+                      END,
+      r.matchMethod = row.match_method,
+      r.confidence  = toFloat(row.confidence)
+} IN TRANSACTIONS OF 10000 ROWS;
+
+
+// -----------------------------------------------------------------------------
+// 8b. EXCLUDED_BY edges  (SNF organizational owner, name-matched)
+//    Source: edges_entity_exclusions.csv
+//    Columns: entity_id, exclusion_id, excldate, match_method, confidence
+// -----------------------------------------------------------------------------
+
+LOAD CSV WITH HEADERS FROM 'file:///edges_entity_exclusions.csv' AS row
+CALL {
+  WITH row
+  MATCH (e:CorporateEntity {entity_id: row.entity_id})
+  MATCH (x:Exclusion {exclusion_id: row.exclusion_id})
+  MERGE (e)-[r:EXCLUDED_BY]->(x)
+  SET r.exclDate    = CASE
+                        WHEN row.excldate IS NOT NULL AND row.excldate <> ''
+                        THEN date(row.excldate)
+                        ELSE null
+                      END,
+      r.matchMethod = row.match_method,
+      r.confidence  = toFloat(row.confidence)
+} IN TRANSACTIONS OF 10000 ROWS;
+
+
+// -----------------------------------------------------------------------------
+// 8c. EXCLUDED_BY edges  (SNF individual owner, name-matched)
+//    Source: edges_person_exclusions.csv
+//    Columns: associate_id, exclusion_id, excldate, match_method, confidence
+// -----------------------------------------------------------------------------
+
+LOAD CSV WITH HEADERS FROM 'file:///edges_person_exclusions.csv' AS row
+CALL {
+  WITH row
+  MATCH (pe:Person {associate_id: row.associate_id})
+  MATCH (x:Exclusion {exclusion_id: row.exclusion_id})
+  MERGE (pe)-[r:EXCLUDED_BY]->(x)
+  SET r.exclDate    = CASE
+                        WHEN row.excldate IS NOT NULL AND row.excldate <> ''
+                        THEN date(row.excldate)
+                        ELSE null
+                      END,
+      r.matchMethod = row.match_method,
+      r.confidence  = toFloat(row.confidence)
 } IN TRANSACTIONS OF 10000 ROWS;
 
 
@@ -236,3 +295,34 @@ CALL {
       r.roleText        = row.role_text,
       r.associationDate = CASE WHEN row.association_date IS NOT NULL AND row.association_date <> '' THEN date(row.association_date) ELSE null END
 } IN TRANSACTIONS OF 10000 ROWS;
+
+
+// -----------------------------------------------------------------------------
+// 10a. IN_CHAIN edges  (SNF → Chain)
+//     Source: edges_chain_membership.csv  (chain_membership.parquet)
+//     Columns: chain_id, chain_name, facility_id, entity_id
+// -----------------------------------------------------------------------------
+
+LOAD CSV WITH HEADERS FROM 'file:///edges_chain_membership.csv' AS row
+CALL {
+  WITH row
+  MATCH (snf:CorporateEntity {entity_id: row.facility_id})
+  MERGE (c:Chain {chain_id: row.chain_id})
+  SET c.name = row.chain_name
+  MERGE (snf)-[:IN_CHAIN]->(c)
+} IN TRANSACTIONS OF 10000 ROWS;
+
+
+// -----------------------------------------------------------------------------
+// 10b. HEADS_CHAIN edges  (owning entity → Chain)
+//     Source: edges_chain_membership.csv  (rows with entity_id)
+// -----------------------------------------------------------------------------
+
+LOAD CSV WITH HEADERS FROM 'file:///edges_chain_membership.csv' AS row
+CALL {
+  WITH row
+  MATCH (e:CorporateEntity {entity_id: row.entity_id})
+  WHERE row.entity_id IS NOT NULL AND row.entity_id <> ''
+  MATCH (c:Chain {chain_id: row.chain_id})
+  MERGE (e)-[:HEADS_CHAIN]->(c)
+} IN TRANSACTIONS OF 10000 ROWS;
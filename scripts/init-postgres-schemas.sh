@@ -61,9 +61,12 @@ echo ""
 SCHEMA_ORDER=(
   chow.sql entities.sql exclusions.sql fec_committees.sql fec_contributions.sql
   hcris.sql medicare_inpatient.sql medicare_part_d.sql order_referring.sql
-  ownership_snf.sql payments.sql providers.sql
+  ownership_snf.sql ubo_effective_ownership.sql ownership_history.sql chain_membership.sql payments.sql providers.sql providers_search.sql
+  provider_taxonomies.sql provider_licenses.sql provider_identifiers.sql
+  entity_cluster_members.sql address_index.sql address_colocation.sql
   users.sql organizations.sql
-  payments_combined_v.sql risk_scores.sql
+  payments_combined_v.sql risk_scores.sql payments_combined.sql peer_benchmarks.sql
+  provider_fec_matches.sql
   api_keys.sql organization_members.sql user_notification_preferences.sql user_security_log.sql
   watchlist.sql watchlists.sql
 )
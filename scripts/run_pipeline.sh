@@ -5,7 +5,11 @@
 # Steps (run all if none specified):
 #   ingest_nppes   ingest_leie   ingest_medicaid   ingest_medicare   ingest_snf
 #   transform_providers   transform_payments   transform_ownership   transform_exclusions
-#   load_postgres   load_neo4j
+#   infer_ubo   build_ownership_history   index_addresses   resolve_entities   build_chains
+#   load_postgres   sync_exclusions   load_neo4j   compute_benchmarks
+#
+# After the first load, exclusions are not reloaded in full: load_postgres and
+# load_neo4j skip them and sync_exclusions applies only the monthly delta.
 #
 # Example (run only ingest + transforms, skip load):
 #   ./scripts/run_pipeline.sh ingest_nppes ingest_leie transform_providers
@@ -39,9 +43,17 @@ ALL_STEPS=(
   transform_providers
   transform_payments
   transform_ownership
+  infer_ubo
+  build_ownership_history
   transform_exclusions
+  index_addresses
+  resolve_entities
+  build_chains
   load_postgres
+  sync_exclusions
   load_neo4j
+  compute_benchmarks
+  compute_fec_matches
 )
 
 run_step() {
@@ -67,12 +79,28 @@ run_step() {
       $PYTHON -m etl.transform.payments_transform ;;
     transform_ownership)
       $PYTHON -m etl.transform.ownership_transform ;;
+    infer_ubo)
+      $PYTHON -m etl.transform.ubo_inference ;;
+    build_ownership_history)
+      $PYTHON -m etl.transform.ownership_history ;;
     transform_exclusions)
       $PYTHON -m etl.transform.exclusions_transform ;;
+    index_addresses)
+      $PYTHON -m etl.transform.address_normalizer ;;
+    resolve_entities)
+      $PYTHON -m etl.transform.entity_resolution ;;
+    build_chains)
+      $PYTHON -m etl.transform.chain_membership ;;
     load_postgres)
       $PYTHON -m etl.load.postgres_loader ;;
     load_neo4j)
       $PYTHON -m etl.load.neo4j_loader all ;;
+    sync_exclusions)
+      $PYTHON -m etl.load.exclusions_sync ;;
+    compute_benchmarks)
+      $PYTHON -m etl.compute.peer_benchmarks ;;
+    compute_fec_matches)
+      $PYTHON -m etl.compute.fec_matching ;;
     *)
       echo "Unknown step: $step" >&2
       echo "Valid steps: ${ALL_STEPS[*]}" >&2
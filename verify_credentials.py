@@ -126,11 +126,21 @@ try:
         cur.execute("SELECT COUNT(*) FROM payments_combined_v")
         payment_count = cur.fetchone()[0]
 
+        cur.execute("SELECT to_regclass('payments_combined') IS NOT NULL")
+        materialized_count = None
+        if cur.fetchone()[0]:
+            cur.execute("SELECT COUNT(*) FROM payments_combined")
+            materialized_count = cur.fetchone()[0]
+
         print()
         print("  Row counts:")
         print(f"    - Providers: {provider_count:,}")
         print(f"    - Exclusions: {exclusion_count:,}")
         print(f"    - Payments (combined view): {payment_count:,}")
+        if materialized_count is None:
+            print("    - Payments (payments_combined): not built — run: python -m etl.load.postgres_loader payments_combined")
+        else:
+            print(f"    - Payments (payments_combined): {materialized_count:,}")
     else:
         print("  ✗ payments_combined_v view NOT found")
         print("    Run: psql -f etl/schemas/risk_scores.sql")